@@ -14,6 +14,7 @@ from app.channels.commands import KNOWN_CHANNEL_COMMANDS
 from app.channels.message_bus import InboundMessage, InboundMessageType, MessageBus, OutboundMessage, ResolvedAttachment
 from deerflow.config.paths import VIRTUAL_PATH_PREFIX, get_paths
 from deerflow.sandbox.sandbox_provider import get_sandbox_provider
+from deerflow.sandbox.transfer import upload_files
 
 logger = logging.getLogger(__name__)
 
@@ -295,16 +296,42 @@ class FeishuChannel(Channel):
             logger.warning("[Feishu] received message with no files: %s", msg)
             return msg
         text = msg.text
+        received: dict[str, str] = {}
         for file in files:
             if file.get("image_key"):
                 virtual_path = await self._receive_single_file(msg.thread_ts, file["image_key"], "image", thread_id)
                 text = text.replace("[image]", virtual_path, 1)
+                received[virtual_path] = "image"
             elif file.get("file_key"):
                 virtual_path = await self._receive_single_file(msg.thread_ts, file["file_key"], "file", thread_id)
                 text = text.replace("[file]", virtual_path, 1)
+                received[virtual_path] = "file"
+        synced = [path for path in received if path.startswith(f"{VIRTUAL_PATH_PREFIX}/uploads/")]
+        if synced and not await self._sync_to_sandbox(thread_id, synced):
+            for virtual_path in synced:
+                text = text.replace(virtual_path, f"Failed to obtain the [{received[virtual_path]}]")
         msg.text = text
         return msg
 
+    async def _sync_to_sandbox(self, thread_id: str, virtual_paths: list[str]) -> bool:
+        """Copy received uploads into a non-local sandbox in one archive."""
+        try:
+            sandbox_provider = get_sandbox_provider()
+            sandbox_id = sandbox_provider.acquire(thread_id)
+            if sandbox_id == "local":
+                return True
+            sandbox = sandbox_provider.get(sandbox_id)
+            if sandbox is None:
+                logger.warning("[Feishu] sandbox not found for thread_id=%s", thread_id)
+                return False
+            uploads_dir = get_paths().sandbox_uploads_dir(thread_id).resolve()
+            host_files = [uploads_dir / virtual_path.rsplit("/", 1)[-1] for virtual_path in virtual_paths]
+            await asyncio.to_thread(upload_files, sandbox, f"{VIRTUAL_PATH_PREFIX}/uploads", host_files)
+        except Exception:
+            logger.exception("[Feishu] failed to sync resources into non-local sandbox: %s", virtual_paths)
+            return False
+        return True
+
     async def _receive_single_file(self, message_id: str, file_key: str, type: Literal["image", "file"], thread_id: str) -> str:
         request = self._GetMessageResourceRequest.builder().message_id(message_id).file_key(file_key).type(type).build()
 
@@ -371,20 +398,6 @@ class FeishuChannel(Channel):
             return f"Failed to obtain the [{type}]"
 
         virtual_path = f"{VIRTUAL_PATH_PREFIX}/uploads/{resolved_target.name}"
-
-        try:
-            sandbox_provider = get_sandbox_provider()
-            sandbox_id = sandbox_provider.acquire(thread_id)
-            if sandbox_id != "local":
-                sandbox = sandbox_provider.get(sandbox_id)
-                if sandbox is None:
-                    logger.warning("[Feishu] sandbox not found for thread_id=%s", thread_id)
-                    return f"Failed to obtain the [{type}]"
-                sandbox.update_file(virtual_path, content)
-        except Exception:
-            logger.exception("[Feishu] failed to sync resource into non-local sandbox: %s", virtual_path)
-            return f"Failed to obtain the [{type}]"
-
         logger.info("[Feishu] downloaded resource mapped: file_key=%s -> %s", file_key, virtual_path)
         return virtual_path
 
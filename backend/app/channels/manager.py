@@ -8,6 +8,7 @@ import mimetypes
 import re
 import time
 from collections.abc import Awaitable, Callable, Mapping
+from pathlib import Path
 from typing import Any
 
 import httpx
@@ -308,7 +309,67 @@ def _format_artifact_text(artifacts: list[str]) -> str:
 _OUTPUTS_VIRTUAL_PREFIX = "/mnt/user-data/outputs/"
 
 
-def _resolve_attachments(thread_id: str, artifacts: list[str]) -> list[ResolvedAttachment]:
+def _pull_outputs_from_sandbox(thread_id: str, names: list[str], outputs_dir: Path) -> None:
+    """Copy output files the host cannot see out of the thread's sandbox in one archive.
+
+    Outputs normally reach the host through the thread directory mount; a
+    sandbox running elsewhere (e.g. a provisioner Pod on another node) only
+    has them in the container. Nothing is pulled when the provider's outputs
+    are on the host, and no sandbox is started or reclaimed for the pull.
+    Blocking; call it off the event loop.
+    """
+    from deerflow.sandbox.sandbox_provider import get_sandbox_provider
+    from deerflow.sandbox.transfer import download_files
+
+    try:
+        provider = get_sandbox_provider()
+        if provider.outputs_on_host:
+            return
+        sandbox = provider.find(thread_id)
+        if sandbox is None:
+            logger.info("[Manager] no running sandbox for thread %s to pull outputs from", thread_id)
+            return
+        try:
+            pulled = download_files(sandbox, _OUTPUTS_VIRTUAL_PREFIX.rstrip("/"), names, outputs_dir)
+        finally:
+            sandbox.close()
+        logger.info("[Manager] pulled %d output file(s) from sandbox %s", len(pulled), sandbox.id)
+    except Exception:
+        logger.warning("[Manager] failed to pull outputs from sandbox for thread %s", thread_id, exc_info=True)
+
+
+def _outputs_on_host() -> bool:
+    """Whether the sandbox provider writes outputs straight to the host (no pull needed)."""
+    from deerflow.sandbox.sandbox_provider import get_sandbox_provider
+
+    try:
+        return get_sandbox_provider().outputs_on_host
+    except Exception:
+        logger.warning("[Manager] failed to get the sandbox provider; not pulling outputs", exc_info=True)
+        return True
+
+
+def _pull_missing_outputs(thread_id: str, artifacts: list[str]) -> None:
+    """Pull the outputs among ``artifacts`` that are missing on the host out of the thread's sandbox."""
+    from deerflow.config.paths import get_paths
+
+    paths = get_paths()
+    outputs_dir = paths.sandbox_outputs_dir(thread_id).resolve()
+    missing: list[str] = []
+    for virtual_path in artifacts:
+        if not virtual_path.startswith(_OUTPUTS_VIRTUAL_PREFIX):
+            continue
+        try:
+            actual = paths.resolve_virtual_path(thread_id, virtual_path).resolve()
+            if not actual.exists():
+                missing.append(actual.relative_to(outputs_dir).as_posix())
+        except ValueError:
+            continue
+    if missing:
+        _pull_outputs_from_sandbox(thread_id, missing, outputs_dir)
+
+
+def _resolve_attachments(thread_id: str, artifacts: list[str], *, pull: bool = True) -> list[ResolvedAttachment]:
     """Resolve virtual artifact paths to host filesystem paths with metadata.
 
     Only paths under ``/mnt/user-data/outputs/`` are accepted; any other
@@ -316,13 +377,17 @@ def _resolve_attachments(thread_id: str, artifacts: list[str]) -> list[ResolvedA
     or workspace files via IM channels.
 
     Skips artifacts that cannot be resolved (missing files, invalid paths)
-    and logs warnings for them.
+    and logs warnings for them. With ``pull``, outputs missing on the host
+    are first pulled out of the thread's sandbox (blocking).
     """
     from deerflow.config.paths import get_paths
 
     attachments: list[ResolvedAttachment] = []
     paths = get_paths()
     outputs_dir = paths.sandbox_outputs_dir(thread_id).resolve()
+    if pull:
+        _pull_missing_outputs(thread_id, artifacts)
+
     for virtual_path in artifacts:
         # Security: only allow files from the agent outputs directory
         if not virtual_path.startswith(_OUTPUTS_VIRTUAL_PREFIX):
@@ -361,13 +426,15 @@ def _prepare_artifact_delivery(
     thread_id: str,
     response_text: str,
     artifacts: list[str],
+    *,
+    pull: bool = True,
 ) -> tuple[str, list[ResolvedAttachment]]:
     """Resolve attachments and append filename fallbacks to the text response."""
     attachments: list[ResolvedAttachment] = []
     if not artifacts:
         return response_text, attachments
 
-    attachments = _resolve_attachments(thread_id, artifacts)
+    attachments = _resolve_attachments(thread_id, artifacts, pull=pull)
     resolved_virtuals = {attachment.virtual_path for attachment in attachments}
     unresolved = [path for path in artifacts if path not in resolved_virtuals]
 
@@ -384,6 +451,17 @@ def _prepare_artifact_delivery(
     return response_text, attachments
 
 
+async def _aprepare_artifact_delivery(thread_id: str, response_text: str, artifacts: list[str]) -> tuple[str, list[ResolvedAttachment]]:
+    """Async :func:`_prepare_artifact_delivery` for the chat handlers.
+
+    Pulling outputs out of a remote sandbox blocks, so it runs in a worker
+    thread, and only when the provider's outputs are not on the host.
+    """
+    if artifacts and not _outputs_on_host():
+        await asyncio.to_thread(_pull_missing_outputs, thread_id, artifacts)
+    return _prepare_artifact_delivery(thread_id, response_text, artifacts, pull=False)
+
+
 async def _ingest_inbound_files(thread_id: str, msg: InboundMessage) -> list[dict[str, Any]]:
     if not msg.files:
         return []
@@ -724,7 +802,7 @@ class ChannelManager:
             len(artifacts),
         )
 
-        response_text, attachments = _prepare_artifact_delivery(thread_id, response_text, artifacts)
+        response_text, attachments = await _aprepare_artifact_delivery(thread_id, response_text, artifacts)
 
         if not response_text:
             if attachments:
@@ -815,7 +893,7 @@ class ChannelManager:
             result = last_values if last_values is not None else {"messages": [{"type": "ai", "content": latest_text}]}
             response_text = _extract_response_text(result)
             artifacts = _extract_artifacts(result)
-            response_text, attachments = _prepare_artifact_delivery(thread_id, response_text, artifacts)
+            response_text, attachments = await _aprepare_artifact_delivery(thread_id, response_text, artifacts)
 
             if not response_text:
                 if attachments:
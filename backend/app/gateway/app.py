@@ -71,6 +71,14 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         except Exception:
             logger.exception("Failed to stop channel service")
 
+        # Close pooled MCP sessions (stdio servers exit with them)
+        try:
+            from deerflow.mcp.session_pool import close_mcp_session_pool
+
+            await close_mcp_session_pool()
+        except Exception:
+            logger.exception("Failed to close MCP session pool")
+
     logger.info("Shutting down API Gateway")
 
 
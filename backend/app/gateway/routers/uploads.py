@@ -1,5 +1,6 @@
 """Upload router for handling file uploads."""
 
+import asyncio
 import logging
 import os
 import stat
@@ -7,8 +8,9 @@ import stat
 from fastapi import APIRouter, File, HTTPException, UploadFile
 from pydantic import BaseModel
 
-from deerflow.config.paths import get_paths
+from deerflow.config.paths import VIRTUAL_PATH_PREFIX, get_paths
 from deerflow.sandbox.sandbox_provider import get_sandbox_provider
+from deerflow.sandbox.transfer import upload_files as upload_files_to_sandbox
 from deerflow.uploads.manager import (
     PathTraversalError,
     delete_file_safe,
@@ -72,6 +74,8 @@ async def upload_files(
     sandbox_provider = get_sandbox_provider()
     sandbox_id = sandbox_provider.acquire(thread_id)
     sandbox = sandbox_provider.get(sandbox_id)
+    # Non-local sandboxes get every file of the request in one archive.
+    sandbox_files = []
 
     for file in files:
         if not file.filename:
@@ -92,7 +96,7 @@ async def upload_files(
 
             if sandbox_id != "local":
                 _make_file_sandbox_writable(file_path)
-                sandbox.update_file(virtual_path, content)
+                sandbox_files.append(file_path)
 
             file_info = {
                 "filename": safe_filename,
@@ -112,7 +116,7 @@ async def upload_files(
 
                     if sandbox_id != "local":
                         _make_file_sandbox_writable(md_path)
-                        sandbox.update_file(md_virtual_path, md_path.read_bytes())
+                        sandbox_files.append(md_path)
 
                     file_info["markdown_file"] = md_path.name
                     file_info["markdown_path"] = str(sandbox_uploads / md_path.name)
@@ -125,6 +129,13 @@ async def upload_files(
             logger.error(f"Failed to upload {file.filename}: {e}")
             raise HTTPException(status_code=500, detail=f"Failed to upload {file.filename}: {str(e)}")
 
+    if sandbox_files:
+        try:
+            await asyncio.to_thread(upload_files_to_sandbox, sandbox, f"{VIRTUAL_PATH_PREFIX}/uploads", sandbox_files)
+        except Exception as e:
+            logger.error(f"Failed to sync {len(sandbox_files)} uploaded file(s) to sandbox {sandbox_id}: {e}")
+            raise HTTPException(status_code=500, detail=f"Failed to sync uploads to sandbox: {str(e)}")
+
     return UploadResponse(
         success=True,
         files=uploaded_files,
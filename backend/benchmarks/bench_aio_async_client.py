@@ -0,0 +1,97 @@
+"""Benchmark concurrent AioSandbox file reads from an event loop.
+
+Starts a local stub of the sandbox file API that answers after ``--latency``
+seconds, then issues ``--calls`` concurrent reads from one event loop with:
+
+- ``to_thread``: the sync client on the default thread pool (as the async
+  tool path did before the native async API)
+- ``async``: ``AioSandbox.aread_file`` on the pooled async HTTP client
+
+Reports wall time, throughput and the peak number of client threads (the
+stub server's own request threads are not counted).
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from deerflow.community.aio_sandbox.aio_sandbox import AioSandbox
+
+
+class _StubFileAPI(BaseHTTPRequestHandler):
+    latency = 0.05
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:  # noqa: N802
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.latency)
+        payload = json.dumps({"success": True, "data": {"content": "x" * 1024, "file": body["file"]}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+class _StubServer(ThreadingHTTPServer):
+    request_queue_size = 256
+
+
+def _client_threads() -> int:
+    return sum(1 for thread in threading.enumerate() if "process_request_thread" not in thread.name and "serve_forever" not in thread.name)
+
+
+async def _run(sandbox: AioSandbox, mode: str, calls: int) -> tuple[float, int]:
+    peak = _client_threads()
+    done = asyncio.Event()
+
+    async def sample() -> None:
+        nonlocal peak
+        while not done.is_set():
+            peak = max(peak, _client_threads())
+            await asyncio.sleep(0.005)
+
+    async def call(index: int) -> str:
+        path = f"/mnt/user-data/workspace/file_{index}.txt"
+        if mode == "to_thread":
+            return await asyncio.to_thread(sandbox.read_file, path)
+        return await sandbox.aread_file(path)
+
+    sampler = asyncio.create_task(sample())
+    start = time.perf_counter()
+    results = await asyncio.gather(*(call(index) for index in range(calls)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await sampler
+    assert all(len(result) == 1024 for result in results)
+    return elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub response latency in seconds")
+    args = parser.parse_args()
+
+    _StubFileAPI.latency = args.latency
+    server = _StubServer(("127.0.0.1", 0), _StubFileAPI)
+    threading.Thread(target=server.serve_forever, daemon=True, name="serve_forever").start()
+    sandbox = AioSandbox(id="bench", base_url=f"http://127.0.0.1:{server.server_address[1]}", home_dir="/home/user")
+    try:
+        print(f"{'mode':>10}{'wall':>10}{'calls/s':>10}{'threads':>9}")
+        for mode in ("to_thread", "async"):
+            # Each mode runs on a fresh event loop (and default thread pool).
+            elapsed, peak = asyncio.run(_run(sandbox, mode, args.calls))
+            print(f"{mode:>10}{elapsed * 1000:>8.0f}ms{args.calls / elapsed:>10.0f}{peak:>9}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
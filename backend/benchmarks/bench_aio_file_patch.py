@@ -0,0 +1,103 @@
+"""Benchmark AioSandbox edits of large files: whole-file round trip vs in-sandbox patch.
+
+Starts a local stub of the sandbox file and code execution APIs backed by a
+temporary directory and counts the bytes sent and received per edit. For
+each ``--sizes`` file size it times:
+
+- ``rewrite``: read the whole file, replace in Python, write it all back
+  (as str_replace and append did before the in-sandbox operations)
+- ``patch``: ``AioSandbox.replace_in_file``
+- ``append rewrite`` / ``append``: the same for appending one line
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from deerflow.community.aio_sandbox.aio_sandbox import AioSandbox
+
+
+class _StubAPI(BaseHTTPRequestHandler):
+    traffic = 0
+
+    def do_POST(self) -> None:  # noqa: N802
+        raw = self.rfile.read(int(self.headers["Content-Length"]))
+        body = json.loads(raw)
+        if self.path == "/v1/file/read":
+            data = {"content": Path(body["file"]).read_text(encoding="utf-8"), "file": body["file"]}
+        elif self.path == "/v1/file/write":
+            with open(body["file"], "a" if body.get("append") else "w", encoding="utf-8") as handle:
+                handle.write(body["content"])
+            data = {"file": body["file"]}
+        elif self.path == "/v1/code/execute":
+            proc = subprocess.run([sys.executable, "-c", body["code"]], capture_output=True, text=True)
+            data = {"language": "python", "status": "ok", "code": "", "stdout": proc.stdout, "stderr": proc.stderr, "exit_code": proc.returncode}
+        else:
+            self.send_error(404)
+            return
+        payload = json.dumps({"success": True, "data": data}).encode()
+        type(self).traffic += len(raw) + len(payload)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def _measure(fn) -> tuple[float, int]:
+    _StubAPI.traffic = 0
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start, _StubAPI.traffic
+
+
+def _rewrite_replace(sandbox: AioSandbox, path: str) -> None:
+    content = sandbox._client.file.read_file(file=path).data.content
+    sandbox._client.file.write_file(file=path, content=content.replace("MARKER", "marker", 1))
+
+
+def _rewrite_append(sandbox: AioSandbox, path: str) -> None:
+    content = sandbox._client.file.read_file(file=path).data.content
+    sandbox._client.file.write_file(file=path, content=content + "log line\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=float, nargs="+", default=[0.1, 1, 10], help="file sizes in MB")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    sandbox = AioSandbox(id="bench", base_url=f"http://127.0.0.1:{server.server_address[1]}", home_dir="/home/user")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "big.txt")
+            print(f"{'size':>8}{'operation':>16}{'time':>10}{'traffic':>12}")
+            for size in args.sizes:
+                line = "x" * 79 + "\n"
+                body = line * int(size * 1e6 / len(line))
+                cases = [
+                    ("rewrite", lambda: _rewrite_replace(sandbox, path)),
+                    ("patch", lambda: sandbox.replace_in_file(path, "MARKER", "marker")),
+                    ("append rewrite", lambda: _rewrite_append(sandbox, path)),
+                    ("append", lambda: sandbox.append_file(path, "log line\n")),
+                ]
+                for name, fn in cases:
+                    Path(path).write_text("MARKER\n" + body, encoding="utf-8")
+                    elapsed, traffic = _measure(fn)
+                    print(f"{size:>6g}MB{name:>16}{elapsed * 1000:>8.0f}ms{traffic / 1e3:>10.1f}KB")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Benchmark first-turn sandbox acquire latency with and without the prewarm pool.
+
+Uses a fake container backend whose ``create`` sleeps ``--startup`` seconds
+(container start plus readiness polling) and runs AioSandboxProvider in a
+temporary base directory. New threads arrive every ``--interval`` seconds;
+each acquires once and releases. Reports the provider's own acquire latency
+stats per kind for ``prewarm_min`` 0 (off) and each ``--prewarm`` value.
+"""
+
+import argparse
+import importlib
+import tempfile
+import threading
+import time
+
+from deerflow.community.aio_sandbox.backend import SandboxBackend
+from deerflow.community.aio_sandbox.sandbox_info import SandboxInfo
+from deerflow.config.paths import Paths
+
+aio_mod = importlib.import_module("deerflow.community.aio_sandbox.aio_sandbox_provider")
+
+
+class _SlowBackend(SandboxBackend):
+    def __init__(self, startup: float):
+        self._startup = startup
+        self._containers: dict[str, SandboxInfo] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def supports_prewarm(self) -> bool:
+        return True
+
+    def create(self, thread_id, sandbox_id, extra_mounts=None) -> SandboxInfo:
+        time.sleep(self._startup)
+        info = SandboxInfo(sandbox_id=sandbox_id, sandbox_url=f"http://fake/{sandbox_id}", container_name=sandbox_id)
+        with self._lock:
+            self._containers[sandbox_id] = info
+        return info
+
+    def destroy(self, info: SandboxInfo) -> None:
+        with self._lock:
+            self._containers.pop(info.container_name, None)
+
+    def is_alive(self, info: SandboxInfo) -> bool:
+        return info.container_name in self._containers
+
+    def discover(self, sandbox_id: str) -> SandboxInfo | None:
+        return None
+
+    def adopt(self, info: SandboxInfo, sandbox_id: str) -> SandboxInfo | None:
+        with self._lock:
+            self._containers[sandbox_id] = self._containers.pop(info.container_name)
+        return SandboxInfo(sandbox_id=sandbox_id, sandbox_url=info.sandbox_url, container_name=sandbox_id)
+
+
+def _run(prewarm_min: int, args: argparse.Namespace, base_dir: str) -> dict:
+    config = {"idle_timeout": 0, "replicas": 100, "shell_sessions": 1, "prewarm_min": prewarm_min, "prewarm_max": max(prewarm_min, 4)}
+    aio_mod.AioSandboxProvider._load_config = lambda self: config
+    aio_mod.AioSandboxProvider._create_backend = lambda self: _SlowBackend(args.startup)
+    provider = aio_mod.AioSandboxProvider()
+    try:
+        # Let the pool fill before the first thread arrives.
+        time.sleep(args.startup * 1.5 if prewarm_min else 0)
+        for i in range(args.threads):
+            sandbox_id = provider.acquire(f"bench-{prewarm_min}-{i}")
+            provider.destroy(sandbox_id)
+            time.sleep(args.interval)
+        return provider.acquire_latency_stats()
+    finally:
+        provider.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--startup", type=float, default=1.5, help="simulated container start + ready time in seconds")
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds between new threads")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--prewarm", type=int, nargs="+", default=[1])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        aio_mod.get_paths = lambda: Paths(base_dir=tmp)
+        aio_mod.wait_for_sandbox_ready = lambda url, timeout=60: True
+        aio_mod.AioSandboxProvider._register_signal_handlers = lambda self: None
+        aio_mod.AioSandboxProvider._get_skills_mount = staticmethod(lambda: None)
+
+        print(f"{'prewarm_min':>12}{'kind':>12}{'count':>8}{'p50':>10}{'p95':>10}")
+        for prewarm_min in [0, *args.prewarm]:
+            for kind, stats in sorted(_run(prewarm_min, args, tmp).items()):
+                print(f"{prewarm_min:>12}{kind:>12}{stats['count']:>8}{stats['p50_ms']:>8.0f}ms{stats['p95_ms']:>8.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark AioSandbox command latency with mixed long and short commands.
+
+Starts a local stub of the sandbox shell API in which each session runs one
+command at a time (like the real container) and ``sleep <seconds>`` commands
+take that long. One thread runs a long command (a "build") while
+``--short`` quick commands arrive from other threads; the latency of the
+quick commands is reported for each shell session pool size.
+"""
+
+import argparse
+import json
+import re
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from deerflow.community.aio_sandbox.aio_sandbox import AioSandbox
+from deerflow.utils.stats import percentile
+
+_SLEEP_RE = re.compile(r"sleep ([\d.]+)")
+
+
+class _StubShellAPI(BaseHTTPRequestHandler):
+    session_locks: defaultdict[str, threading.Lock] = defaultdict(threading.Lock)
+
+    def do_POST(self) -> None:  # noqa: N802
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        session = body.get("id") or "default"
+        with self.session_locks[session]:
+            match = _SLEEP_RE.search(body["command"])
+            if match:
+                time.sleep(float(match.group(1)))
+        payload = json.dumps({"success": True, "data": {"session_id": session, "command": body["command"], "status": "completed", "output": "ok", "exit_code": 0}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def _run(base_url: str, sessions: int, long_seconds: float, short_count: int, short_seconds: float) -> list[float]:
+    sandbox = AioSandbox(id=f"bench-{sessions}", base_url=base_url, home_dir="/home/user", shell_sessions=sessions)
+    latencies: list[float] = []
+
+    def short(index: int) -> None:
+        # Spread arrivals over the long command's runtime.
+        time.sleep(index * long_seconds / (short_count + 1))
+        start = time.perf_counter()
+        sandbox.execute_command(f"sleep {short_seconds}")
+        latencies.append(time.perf_counter() - start)
+
+    with ThreadPoolExecutor(max_workers=short_count + 1) as pool:
+        pool.submit(sandbox.execute_command, f"sleep {long_seconds}")
+        time.sleep(0.01)
+        for index in range(short_count):
+            pool.submit(short, index)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--long", type=float, default=2.0, help="long command duration in seconds")
+    parser.add_argument("--short", type=int, default=20, help="number of short commands")
+    parser.add_argument("--short-seconds", type=float, default=0.02)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubShellAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        print(f"{'sessions':>9}{'p50':>10}{'p95':>10}{'max':>10}")
+        for sessions in args.sessions:
+            latencies = sorted(_run(base_url, sessions, args.long, args.short, args.short_seconds))
+            p95 = percentile(latencies, 0.95)
+            print(f"{sessions:>9}{statistics.median(latencies) * 1000:>8.0f}ms{p95 * 1000:>8.0f}ms{latencies[-1] * 1000:>8.0f}ms")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
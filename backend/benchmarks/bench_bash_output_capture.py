@@ -0,0 +1,51 @@
+"""Benchmark memory use of LocalSandbox command output capture.
+
+Runs a command that prints a configurable amount of output and reports
+wall time and peak Python heap (``tracemalloc``) for:
+
+- ``unbounded``: every byte kept in memory, as before bounded capture
+- ``bounded``: head/tail windows of ``--window`` characters per stream,
+  with the complete output spilled to a file
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from deerflow.sandbox.local.command_runner import run_command
+
+
+def _measure(megabytes: int, **kwargs) -> tuple[float, float, int]:
+    # ~1 MB per 16384 lines of 64 bytes.
+    script = f"yes '{'x' * 63}' | head -n {megabytes * 16384}"
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = asyncio.run(run_command(["/bin/sh", "-c", script], **kwargs))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6, len(result.stdout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 16, 64, 256], help="output sizes in MB")
+    parser.add_argument("--window", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'output':>8}{'mode':>12}{'time':>10}{'peak heap':>12}{'kept chars':>12}")
+    with tempfile.TemporaryDirectory(prefix="deerflow-capture-bench-") as tmp:
+        for size in args.sizes:
+            for mode, kwargs in [
+                ("unbounded", {}),
+                ("bounded", {"capture_chars": args.window, "spill_path": str(Path(tmp) / f"{size}.log")}),
+            ]:
+                elapsed, peak_mb, kept = _measure(size, **kwargs)
+                print(f"{size:>6}MB{mode:>12}{elapsed * 1000:>8.0f}ms{peak_mb:>10.1f}MB{kept:>12}")
+
+
+if __name__ == "__main__":
+    main()
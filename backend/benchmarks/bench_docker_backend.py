@@ -0,0 +1,127 @@
+"""Benchmark container status operations: docker CLI subprocesses vs the Engine API socket.
+
+No Docker daemon is needed. The CLI backend runs a fake ``docker`` script
+put first on PATH; it is a Python script, so each call costs one fork/exec
+plus interpreter start, close to the real Go CLI's cost. The API backend
+talks to a fake daemon on a unix socket that answers inspect and list
+requests from memory.
+
+For each operation it reports the mean latency over ``--iterations`` runs:
+
+- ``is_alive``: one container's running state
+- ``discover``: running state plus port lookup (readiness check skipped)
+- ``status xN``: the state of ``--containers`` sandboxes, one ``is_alive``
+  each (per-container) and with ``alive_sandboxes`` (batched)
+"""
+
+import argparse
+import json
+import os
+import shutil
+import socketserver
+import stat
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+
+from deerflow.community.aio_sandbox import docker_api_backend, local_backend
+from deerflow.community.aio_sandbox.docker_api_backend import DockerApiBackend
+from deerflow.community.aio_sandbox.local_backend import LocalContainerBackend
+from deerflow.community.aio_sandbox.sandbox_info import SandboxInfo
+
+PREFIX = "deer-flow-sandbox"
+
+_FAKE_CLI = """#!{python}
+import sys
+args = sys.argv[1:]
+if args[0] == "inspect":
+    print("true")
+elif args[0] == "port":
+    print("0.0.0.0:18080")
+elif args[0] == "ps":
+    print("\\n".join("{prefix}-sandbox%d" % i for i in range({containers})))
+"""
+
+
+class _FakeDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    containers = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:  # noqa: N802
+        if self.path.startswith("/containers/json"):
+            payload = [{"Names": [f"/{PREFIX}-sandbox{i}"]} for i in range(self.server.containers)]
+        elif self.path == "/_ping":
+            payload = "OK"
+        else:
+            payload = {"Id": "c1", "State": {"Running": True}, "NetworkSettings": {"Ports": {"8080/tcp": [{"HostPort": "18080"}]}}}
+        body = payload.encode() if isinstance(payload, str) else json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        return "unix"
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def _mean_ms(fn, iterations: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--containers", type=int, default=10)
+    args = parser.parse_args()
+
+    local_backend.wait_for_sandbox_ready = lambda url, timeout=30: True
+    docker_api_backend.wait_for_sandbox_ready = lambda url, timeout=30: True
+    directory = tempfile.mkdtemp(prefix="dkr")
+    try:
+        cli = Path(directory) / "docker"
+        cli.write_text(_FAKE_CLI.format(python=sys.executable, prefix=PREFIX, containers=args.containers))
+        cli.chmod(cli.stat().st_mode | stat.S_IEXEC)
+        os.environ["PATH"] = f"{directory}{os.pathsep}{os.environ['PATH']}"
+
+        server = _FakeDaemon(str(Path(directory) / "docker.sock"), _Handler)
+        server.containers = args.containers
+        threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True).start()
+
+        kwargs = {"image": "sandbox", "base_port": 18080, "container_prefix": PREFIX, "config_mounts": [], "environment": {}}
+        backends = {"cli": LocalContainerBackend(**kwargs), "api": DockerApiBackend(socket_path=server.server_address, **kwargs)}
+        infos = [SandboxInfo(sandbox_id=f"sandbox{i}", sandbox_url="", container_name=f"{PREFIX}-sandbox{i}") for i in range(args.containers)]
+
+        print(f"{'operation':>28}{'cli':>12}{'api':>12}")
+        rows = [
+            ("is_alive", lambda b: b.is_alive(infos[0])),
+            ("discover", lambda b: b.discover("sandbox0")),
+            (f"status x{args.containers} per-container", lambda b: [b.is_alive(info) for info in infos]),
+            (f"status x{args.containers} batched", lambda b: b.alive_sandboxes(infos)),
+        ]
+        for name, op in rows:
+            cli_ms, api_ms = (_mean_ms(lambda b=b: op(b), args.iterations) for b in backends.values())
+            print(f"{name:>28}{cli_ms:>10.2f}ms{api_ms:>10.2f}ms")
+
+        backends["api"].close()
+        server.shutdown()
+        server.server_close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
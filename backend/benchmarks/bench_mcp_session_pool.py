@@ -0,0 +1,85 @@
+"""Benchmark MCP tool call latency: a new session per call vs the persistent MCPSessionPool.
+
+Starts the fake MCP server from ``tests/fake_mcp_server.py``, over stdio and
+over streamable HTTP, and calls its ``echo`` tool ``--calls`` times in a row
+through LangChain tools built by:
+
+- ``per-call``: ``MultiServerMCPClient``, which opens a session for every
+  call (a new server process for stdio, a new initialize handshake for HTTP)
+- ``pooled``: ``MCPSessionPool.load_tools``, which reuses one session
+
+and reports the mean and p95 latency per call.
+"""
+
+import argparse
+import asyncio
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from langchain_mcp_adapters.client import MultiServerMCPClient
+
+from deerflow.mcp.session_pool import MCPSessionPool, PooledServer
+from deerflow.utils.stats import percentile
+
+FAKE_SERVER = str(Path(__file__).resolve().parents[1] / "tests" / "fake_mcp_server.py")
+
+
+def _start_http_server() -> tuple[subprocess.Popen, dict]:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen([sys.executable, FAKE_SERVER, "--http", str(port)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return process, {"transport": "streamable_http", "url": f"http://127.0.0.1:{port}/mcp"}
+        except OSError:
+            time.sleep(0.1)
+
+
+async def _time_calls(tools: list, calls: int) -> list[float]:
+    echo = next(tool for tool in tools if tool.name == "fake_echo")
+    await echo.ainvoke({"text": "warm-up"})
+    timings = []
+    for i in range(calls):
+        start = time.perf_counter()
+        await echo.ainvoke({"text": f"call {i}"})
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def _bench(transport: str, connection: dict, calls: int) -> None:
+    per_call_tools = await MultiServerMCPClient({"fake": connection}, tool_name_prefix=True).get_tools()
+    pool = MCPSessionPool()
+    await pool.configure({"fake": PooledServer(connection)})
+    try:
+        pooled_tools = await pool.load_tools()
+        for mode, tools in (("per-call", per_call_tools), ("pooled", pooled_tools)):
+            timings = sorted(await _time_calls(tools, calls))
+            mean = sum(timings) / len(timings)
+            p95 = percentile(timings, 0.95)
+            print(f"{transport:>10}{mode:>10}{mean * 1000:>10.2f}ms{p95 * 1000:>10.2f}ms")
+    finally:
+        await pool.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'transport':>10}{'mode':>10}{'mean':>12}{'p95':>12}")
+    asyncio.run(_bench("stdio", {"transport": "stdio", "command": sys.executable, "args": [FAKE_SERVER]}, args.calls))
+    process, connection = _start_http_server()
+    try:
+        asyncio.run(_bench("http", connection, args.calls))
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Benchmark synchronous MCP tool calls: a new event loop per call vs the shared MCP event loop.
+
+A fake async tool awaits ``--work-ms``. Synchronous callers invoke it the
+way the embedded client does, from inside a running event loop, for:
+
+- ``asyncio.run``: the previous wrapper, which submitted ``asyncio.run`` to a
+  10-worker thread pool, creating and closing an event loop per call
+- ``mcp loop``: ``_make_sync_tool_wrapper``, which blocks on the shared MCP
+  event loop
+
+Each mode is run with ``--calls`` sequential calls and with ``--callers``
+threads calling at once, and the script reports the mean time per call.
+Tool calls that finish on one loop can reuse sessions and HTTP clients
+across calls; calls on throwaway loops cannot.
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import time
+
+from deerflow.mcp.tools import _make_sync_tool_wrapper
+
+_OLD_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=10, thread_name_prefix="mcp-sync-tool")
+
+
+def _old_sync_wrapper(coro):
+    def sync_wrapper(*args, **kwargs):
+        return _OLD_EXECUTOR.submit(asyncio.run, coro(*args, **kwargs)).result()
+
+    return sync_wrapper
+
+
+def _bench(sync_tool, calls: int, callers: int) -> tuple[float, float]:
+    async def sequential() -> float:
+        start = time.perf_counter()
+        for _ in range(calls):
+            sync_tool()
+        return (time.perf_counter() - start) / calls
+
+    def concurrent_calls() -> float:
+        start = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=callers) as pool:
+            list(pool.map(lambda _: sync_tool(), range(calls)))
+        return (time.perf_counter() - start) / calls
+
+    return asyncio.run(sequential()), concurrent_calls()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--callers", type=int, default=32)
+    parser.add_argument("--work-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    work = args.work_ms / 1000
+
+    async def tool() -> str:
+        await asyncio.sleep(work)
+        return "ok"
+
+    print(f"{'mode':>12}{'sequential':>14}{f'{args.callers} callers':>14}")
+    for mode, sync_tool in (("asyncio.run", _old_sync_wrapper(tool)), ("mcp loop", _make_sync_tool_wrapper(tool, "bench"))):
+        sync_tool()
+        sequential, concurrent_ = _bench(sync_tool, args.calls, args.callers)
+        print(f"{mode:>12}{sequential * 1e6:>12.0f}us{concurrent_ * 1e6:>12.0f}us")
+    _OLD_EXECUTOR.shutdown()
+
+
+if __name__ == "__main__":
+    main()
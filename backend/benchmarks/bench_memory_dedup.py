@@ -0,0 +1,98 @@
+"""Benchmark the near-duplicate fact index at memory sizes of 10k+ facts.
+
+Generates a synthetic fact stream in which a share of facts are paraphrases
+of earlier ones (case, punctuation, leading "The user", small word edits),
+then reports:
+
+- per-fact insert latency (duplicate lookup + add) through ``FactDedupIndex.insert``
+- offline ``compact_facts`` time over the uncompacted list
+- fact count and serialized JSON size before and after deduplication
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+
+from deerflow.agents.memory.dedup import DEFAULT_SIMILARITY_THRESHOLD, FactDedupIndex, compact_facts
+from deerflow.utils.stats import percentile
+
+SUBJECTS = ["Python", "Rust", "TypeScript", "Go", "Kubernetes", "PostgreSQL", "LangGraph", "React", "Docker", "FastAPI", "pandas", "DuckDB"]
+VERBS = ["prefers", "uses", "is learning", "maintains a project in", "dislikes", "is evaluating", "writes tests with", "deploys with"]
+CONTEXTS = ["at work", "for side projects", "for data analysis", "in production", "for scripting", "on weekends", "with a small team", "for prototyping"]
+
+
+def _vocabulary(rng: random.Random, size: int = 5000) -> list[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choices(letters, k=rng.randint(4, 9))) for _ in range(size)]
+
+
+def _base_fact(rng: random.Random, vocabulary: list[str]) -> str:
+    detail = " ".join(rng.sample(vocabulary, 3))
+    return f"User {rng.choice(VERBS)} {rng.choice(SUBJECTS)} {rng.choice(CONTEXTS)} for {detail}"
+
+
+def _paraphrase(rng: random.Random, content: str) -> str:
+    variants = [
+        lambda s: "The " + s[0].lower() + s[1:] + ".",
+        lambda s: s.upper(),
+        lambda s: s.replace("User ", "The user "),
+        lambda s: s + " as well",
+        lambda s: s.replace(" at ", " @ ").replace(" for ", " for their "),
+    ]
+    return rng.choice(variants)(content)
+
+
+def generate_facts(count: int, duplicate_ratio: float, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    vocabulary = _vocabulary(rng)
+    facts: list[dict] = []
+    originals: list[str] = []
+    for i in range(count):
+        if originals and rng.random() < duplicate_ratio:
+            content = _paraphrase(rng, rng.choice(originals))
+        else:
+            content = _base_fact(rng, vocabulary)
+            originals.append(content)
+        facts.append({"id": f"fact_{i:06d}", "content": content, "category": "preference", "confidence": round(rng.uniform(0.7, 1.0), 2)})
+    return facts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--facts", type=int, default=12_000)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.3)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_SIMILARITY_THRESHOLD)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    facts = generate_facts(args.facts, args.duplicate_ratio, args.seed)
+
+    index = FactDedupIndex(args.threshold)
+    latencies_us: list[float] = []
+    rejected = 0
+    for fact in facts:
+        start = time.perf_counter()
+        if index.insert(fact["id"], fact["content"]) is not None:
+            rejected += 1
+        latencies_us.append((time.perf_counter() - start) * 1e6)
+    latencies_us.sort()
+
+    start = time.perf_counter()
+    compacted, merged = compact_facts(facts, args.threshold)
+    compact_seconds = time.perf_counter() - start
+
+    size_before = len(json.dumps(facts, ensure_ascii=False).encode("utf-8"))
+    size_after = len(json.dumps(compacted, ensure_ascii=False).encode("utf-8"))
+
+    print(f"facts generated        : {len(facts)} (duplicate ratio {args.duplicate_ratio:.0%}, threshold {args.threshold})")
+    print(f"insert latency (us)    : mean {statistics.fmean(latencies_us):.1f}  p50 {percentile(latencies_us, 0.5):.1f}  p99 {percentile(latencies_us, 0.99):.1f}")
+    print(f"rejected at insert     : {rejected}")
+    print(f"offline compaction     : {compact_seconds:.2f}s, merged {merged}")
+    print(f"fact count             : {len(facts)} -> {len(compacted)} ({1 - len(compacted) / len(facts):.1%} smaller)")
+    print(f"serialized facts bytes : {size_before} -> {size_after} ({1 - size_after / size_before:.1%} smaller)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Benchmark path rewriting over large command output.
+
+Builds an output of ``--lines`` lines, each containing a host path under one
+of ``--mounts`` mapped directories, and times masking it back to virtual
+paths with:
+
+- ``legacy``: one regex per mapping and separator style, compiled on every
+  call (as before the shared path mapper)
+- ``mapper``: one combined regex from a precompiled :class:`PathMapper`
+
+Also times single-path lookups (legacy sorted scan vs trie).
+"""
+
+import argparse
+import re
+import time
+
+from deerflow.sandbox.path_mapper import PathMapper, get_path_mapper
+
+
+def _legacy_mask(output: str, mappings: list[tuple[str, str]]) -> str:
+    result = output
+    for host, virtual in sorted(mappings, key=lambda item: len(item[0]), reverse=True):
+        for base in {host, host.replace("/", "\\")}:
+            pattern = re.compile(re.escape(base).replace(r"\\", r"[/\\]") + r"(?:[/\\][^\s\"';&|<>()]*)?")
+
+            def replace(match: re.Match, _base: str = base, _virtual: str = virtual) -> str:
+                relative = match.group(0)[len(_base) :].lstrip("/\\")
+                return f"{_virtual}/{relative}" if relative else _virtual
+
+            result = pattern.sub(replace, result)
+    return result
+
+
+def _legacy_lookup(path: str, mappings: list[tuple[str, str]]) -> str:
+    for source, target in sorted(mappings, key=lambda item: len(item[0]), reverse=True):
+        if path == source or path.startswith(f"{source}/"):
+            relative = path[len(source) :].lstrip("/")
+            return f"{target}/{relative}" if relative else target
+    return path
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=100_000)
+    parser.add_argument("--mounts", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'mounts':>8}{'output':>10}{'legacy':>10}{'mapper':>10}{'lookup legacy':>15}{'lookup trie':>13}")
+    for count in args.mounts:
+        mappings = [(f"/home/user/.deer-flow/threads/t1/mount-{i}", f"/mnt/m{i}") for i in range(count)]
+        output = "\n".join(f"{mappings[i % count][0]}/src/file_{i}.py:12: match" for i in range(args.lines))
+        mapper = get_path_mapper(tuple(mappings), any_separator=True)
+        assert mapper.sub(output) == _legacy_mask(output, mappings)
+
+        legacy = _time(lambda: _legacy_mask(output, mappings), args.repeat)
+        compiled = _time(lambda: get_path_mapper(tuple(mappings), any_separator=True).sub(output), args.repeat)
+
+        paths = [f"/mnt/m{i % count}/src/file_{i}.py" for i in range(10_000)]
+        reverse = [(virtual, host) for host, virtual in mappings]
+        trie = PathMapper(reverse)
+        lookup_legacy = _time(lambda: [_legacy_lookup(path, reverse) for path in paths], args.repeat)
+        lookup_trie = _time(lambda: [trie.match(path).join() for path in paths], args.repeat)
+
+        print(f"{count:>8}{len(output) / 1e6:>8.1f}MB{legacy * 1000:>8.0f}ms{compiled * 1000:>8.0f}ms{lookup_legacy * 1000:>13.1f}ms{lookup_trie * 1000:>11.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark paging through a large file with ``LocalSandbox.read_file_lines``.
+
+Writes a synthetic log file and reads consecutive windows of lines, the
+way an agent pages through a file, comparing:
+
+- ``full read``: the previous behaviour, reading and splitting the whole
+  file for every window
+- ``streaming``: ``read_file_lines`` with its sparse line index
+
+and checks both return identical text.
+"""
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from deerflow.sandbox.local.local_sandbox import LocalSandbox
+
+
+def build_file(path: Path, lines: int, seed: int) -> None:
+    rng = random.Random(seed)
+    levels = ["INFO", "DEBUG", "WARN", "ERROR"]
+    with path.open("w", encoding="utf-8") as handle:
+        for n in range(lines):
+            handle.write(f"2026-01-01T00:00:{n % 60:02d} {rng.choice(levels)} worker-{rng.randrange(16)} request {n} took {rng.randrange(1000)}ms\n")
+
+
+def _time(fn, repeat: int):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=2_000_000)
+    parser.add_argument("--window", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    sandbox = LocalSandbox(id="bench", path_mappings=[])
+    with tempfile.TemporaryDirectory(prefix="deerflow-lines-bench-") as tmp:
+        path = Path(tmp) / "app.log"
+        build_file(path, args.lines, args.seed)
+        print(f"file: {args.lines} lines, {path.stat().st_size / 1e6:.1f} MB")
+
+        starts = [1 + i * (args.lines // args.pages) for i in range(args.pages)]
+        print(f"{'start line':>12}{'full read':>12}{'streaming':>12}{'speedup':>9}")
+        totals = [0.0, 0.0]
+        for start in starts:
+            end = start + args.window - 1
+            full_t, expected = _time(lambda: "\n".join(sandbox.read_file(str(path)).splitlines()[start - 1 : end]), 1)
+            stream_t, got = _time(lambda: sandbox.read_file_lines(str(path), start, end), 1)
+            assert got == expected, f"lines {start}-{end} differ"
+            totals[0] += full_t
+            totals[1] += stream_t
+            print(f"{start:>12}{full_t * 1000:>10.1f}ms{stream_t * 1000:>10.1f}ms{full_t / stream_t:>8.1f}x")
+
+        # Pages already passed are served from the nearest cached checkpoint.
+        revisit_t, _ = _time(lambda: sandbox.read_file_lines(str(path), starts[-1], starts[-1] + args.window - 1), 5)
+        print(f"total: full read {totals[0] * 1000:.0f}ms, streaming {totals[1] * 1000:.0f}ms; revisiting last page {revisit_t * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Benchmark moving many files into and out of an AioSandbox: per-file requests vs one tar stream.
+
+Starts a local stub of the sandbox file and code execution APIs backed by a
+temporary directory, with ``--latency-ms`` added to every request to stand in
+for the network round trip. For each ``--counts`` batch of ``--size-kb``
+files it times:
+
+- ``upload per file``: ``AioSandbox.update_file`` for each file (base64 JSON,
+  as the uploads router and channel ingestion did before)
+- ``upload tar``: ``deerflow.sandbox.transfer.upload_files``
+- ``download per file``: ``AioSandbox.download_file`` for each file
+- ``download tar``: ``deerflow.sandbox.transfer.download_files``
+
+and reports throughput, bytes on the wire and the peak Python heap of the
+client (tracemalloc; the stub runs in a forked process so it is not counted).
+"""
+
+import argparse
+import base64
+import email.parser
+import email.policy
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from deerflow.community.aio_sandbox.aio_sandbox import AioSandbox
+from deerflow.sandbox.transfer import download_files, upload_files
+
+
+class _StubAPI(BaseHTTPRequestHandler):
+    traffic = multiprocessing.get_context("fork").Value("q", 0)
+    latency = 0.0
+
+    def _count(self, size: int) -> None:
+        with type(self).traffic.get_lock():
+            type(self).traffic.value += size
+
+    def _send(self, payload: bytes, content_type: str) -> None:
+        time.sleep(type(self).latency)
+        self._count(len(payload))
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _reply(self, data: dict) -> None:
+        self._send(json.dumps({"success": True, "data": data}).encode(), "application/json")
+
+    def do_GET(self) -> None:  # noqa: N802
+        url = urlparse(self.path)
+        self._send(Path(parse_qs(url.query)["path"][0]).read_bytes(), "application/octet-stream")
+
+    def do_POST(self) -> None:  # noqa: N802
+        raw = self.rfile.read(int(self.headers["Content-Length"]))
+        self._count(len(raw))
+        if self.path == "/v1/file/write":
+            body = json.loads(raw)
+            Path(body["file"]).write_bytes(base64.b64decode(body["content"]))
+            return self._reply({"file": body["file"]})
+        if self.path == "/v1/file/upload":
+            message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + raw)
+            fields = {part.get_param("name", header="content-disposition"): part.get_content() for part in message.iter_parts()}
+            Path(fields["path"]).write_bytes(fields["file"])
+            return self._reply({"file_path": fields["path"], "file_size": len(fields["file"]), "success": True})
+        if self.path == "/v1/code/execute":
+            body = json.loads(raw)
+            proc = subprocess.run([sys.executable, "-c", body["code"]], capture_output=True, text=True)
+            return self._reply({"language": "python", "status": "ok", "code": "", "stdout": proc.stdout, "stderr": proc.stderr, "exit_code": proc.returncode})
+        self.send_error(404)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def _measure(fn) -> tuple[float, int, int]:
+    _StubAPI.traffic.value = 0
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, _StubAPI.traffic.value, peak
+
+
+def _upload_per_file(sandbox: AioSandbox, dest: Path, files: list[Path]) -> None:
+    for file in files:
+        sandbox.update_file(str(dest / file.name), file.read_bytes())
+
+
+def _download_per_file(sandbox: AioSandbox, source: Path, names: list[str], dest: Path) -> None:
+    for name in names:
+        with open(dest / name, "wb") as handle:
+            for chunk in sandbox.download_file(str(source / name)):
+                handle.write(chunk)
+
+
+def _reset(*dirs: Path) -> None:
+    for directory in dirs:
+        shutil.rmtree(directory, ignore_errors=True)
+        directory.mkdir(parents=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 100, 500], help="files per batch")
+    parser.add_argument("--size-kb", type=int, default=64, help="size of each file in KB")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="added to every stub request")
+    args = parser.parse_args()
+
+    _StubAPI.latency = args.latency_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubAPI)
+    stub = multiprocessing.get_context("fork").Process(target=server.serve_forever, daemon=True)
+    stub.start()
+    sandbox = AioSandbox(id="bench", base_url=f"http://127.0.0.1:{server.server_address[1]}", home_dir="/home/user")
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            host, inside, back = Path(tmp) / "host", Path(tmp) / "sandbox", Path(tmp) / "back"
+            print(f"{'files':>6}{'operation':>20}{'time':>10}{'MB/s':>9}{'traffic':>11}{'peak heap':>12}")
+            for count in args.counts:
+                _reset(host)
+                files = [host / f"file-{i:05d}.bin" for i in range(count)]
+                for file in files:
+                    file.write_bytes(os.urandom(args.size_kb * 1024))
+                names = [file.name for file in files]
+                total_mb = count * args.size_kb / 1024
+                cases = [
+                    ("upload per file", lambda: _upload_per_file(sandbox, inside, files)),
+                    ("upload tar", lambda: upload_files(sandbox, str(inside), files)),
+                    ("download per file", lambda: _download_per_file(sandbox, inside, names, back)),
+                    ("download tar", lambda: download_files(sandbox, str(inside), names, back)),
+                ]
+                for name, fn in cases:
+                    if name.startswith("upload"):
+                        _reset(inside)
+                    _reset(back)
+                    elapsed, traffic, peak = _measure(fn)
+                    print(f"{count:>6}{name:>20}{elapsed * 1000:>8.0f}ms{total_mb / elapsed:>9.1f}{traffic / 1e6:>9.1f}MB{peak / 1e6:>10.1f}MB")
+    finally:
+        stub.terminate()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
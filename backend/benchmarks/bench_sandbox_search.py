@@ -0,0 +1,153 @@
+"""Benchmark sandbox grep/glob against the original single-threaded scanner.
+
+Builds a synthetic repository corpus (nested packages of source files plus
+ignored vendor directories, logs and binaries) in a temporary directory,
+then times:
+
+- ``legacy``: the original os.walk + fnmatch + line-by-line scanner
+- ``engine``: ``deerflow.sandbox.search`` without ripgrep
+- ``engine+rg``: the same with the ripgrep prefilter (when ``rg`` is on PATH)
+
+and checks every backend returns identical results.
+"""
+
+import argparse
+import fnmatch
+import os
+import random
+import re
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from deerflow.sandbox.search import IGNORE_PATTERNS, GrepMatch, find_glob_matches, find_grep_matches, is_binary_file, path_matches, truncate_line
+
+WORDS = ["alpha", "beta", "gamma", "delta", "request", "response", "handler", "config", "token", "stream", "buffer", "cache", "session", "worker"]
+
+
+def build_corpus(root: Path, packages: int, files_per_dir: int, lines_per_file: int, seed: int) -> int:
+    rng = random.Random(seed)
+    count = 0
+    for pkg in range(packages):
+        for sub in ("core", "api", "util", "tests"):
+            directory = root / f"pkg_{pkg:03d}" / sub
+            directory.mkdir(parents=True)
+            for i in range(files_per_dir):
+                lines = []
+                for n in range(lines_per_file):
+                    words = " ".join(rng.choices(WORDS, k=6))
+                    if rng.random() < 0.002:
+                        words += "  # FIXME rare marker"
+                    lines.append(f"    {words} = {n}")
+                (directory / f"module_{i:03d}.py").write_text("\n".join(lines) + "\n", encoding="utf-8")
+                count += 1
+        vendor = root / f"pkg_{pkg:03d}" / "node_modules" / "dep"
+        vendor.mkdir(parents=True)
+        (vendor / "index.js").write_text("FIXME vendored\n" * 200, encoding="utf-8")
+        (root / f"pkg_{pkg:03d}" / "debug.log").write_text("FIXME log line\n" * 200, encoding="utf-8")
+        (root / f"pkg_{pkg:03d}" / "blob.bin").write_bytes(os.urandom(4096) + b"\0")
+    return count
+
+
+def _legacy_ignore(name: str) -> bool:
+    return any(fnmatch.fnmatch(name, pattern) for pattern in IGNORE_PATTERNS)
+
+
+def legacy_grep(root: Path, pattern: str, *, literal=False, case_sensitive=False, max_results=100):
+    matches = []
+    root = root.resolve()
+    regex = re.compile(re.escape(pattern) if literal else pattern, 0 if case_sensitive else re.IGNORECASE)
+    for current_root, dirs, files in os.walk(root):
+        dirs[:] = [name for name in dirs if not _legacy_ignore(name)]
+        for name in files:
+            if _legacy_ignore(name):
+                continue
+            candidate = Path(current_root) / name
+            try:
+                if candidate.is_symlink():
+                    continue
+                file_path = candidate.resolve()
+                if file_path.stat().st_size > 1_000_000 or is_binary_file(file_path):
+                    continue
+                with file_path.open(encoding="utf-8", errors="replace") as handle:
+                    for line_number, line in enumerate(handle, start=1):
+                        if len(line) > 2000:
+                            continue
+                        if regex.search(line):
+                            matches.append(GrepMatch(str(file_path), line_number, truncate_line(line)))
+                            if len(matches) >= max_results:
+                                return matches, True
+            except OSError:
+                continue
+    return matches, False
+
+
+def legacy_glob(root: Path, pattern: str, max_results=200):
+    matches = []
+    root = root.resolve()
+    for current_root, dirs, files in os.walk(root):
+        dirs[:] = [name for name in dirs if not _legacy_ignore(name)]
+        rel_dir = Path(current_root).relative_to(root)
+        for name in files:
+            if not _legacy_ignore(name) and path_matches(pattern, (rel_dir / name).as_posix()):
+                matches.append(str(Path(current_root) / name))
+                if len(matches) >= max_results:
+                    return matches, True
+    return matches, False
+
+
+def _time(fn, repeat: int):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--packages", type=int, default=60)
+    parser.add_argument("--files-per-dir", type=int, default=20)
+    parser.add_argument("--lines", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="deerflow-search-bench-") as tmp:
+        root = Path(tmp)
+        files = build_corpus(root, args.packages, args.files_per_dir, args.lines, args.seed)
+        size_mb = sum(p.stat().st_size for p in root.rglob("*") if p.is_file()) / 1e6
+        print(f"corpus: {files} source files, {size_mb:.1f} MB, rg={'yes' if shutil.which('rg') else 'no'}")
+
+        cases = [
+            ("grep rare literal", dict(pattern="FIXME rare", literal=True, max_results=1000)),
+            ("grep rare regex", dict(pattern=r"FIXME\s+rare\s+\w+", max_results=1000)),
+            ("grep common word", dict(pattern="session", max_results=100)),
+            ("grep absent", dict(pattern="not_present_anywhere", max_results=100)),
+        ]
+        print(f"{'case':<22}{'legacy':>10}{'engine':>10}{'engine+rg':>11}{'speedup':>9}")
+        for label, kwargs in cases:
+            legacy_t, expected = _time(lambda: legacy_grep(root, **kwargs), args.repeat)
+            engine_t, got = _time(lambda: find_grep_matches(root, use_ripgrep=False, **kwargs), args.repeat)
+            assert got == expected, f"{label}: engine results differ"
+            rg_cell = "-"
+            best = engine_t
+            if shutil.which("rg"):
+                rg_t, got_rg = _time(lambda: find_grep_matches(root, use_ripgrep=True, **kwargs), args.repeat)
+                assert got_rg == expected, f"{label}: ripgrep results differ"
+                rg_cell = f"{rg_t * 1000:.0f}ms"
+                best = min(best, rg_t)
+            print(f"{label:<22}{legacy_t * 1000:>8.0f}ms{engine_t * 1000:>8.0f}ms{rg_cell:>11}{legacy_t / best:>8.1f}x")
+
+        legacy_t, expected = _time(lambda: legacy_glob(root, "**/*.py", max_results=100_000), args.repeat)
+        engine_t, got = _time(lambda: find_glob_matches(root, "**/*.py", max_results=100_000), args.repeat)
+        assert got == expected, "glob results differ"
+        print(f"{'glob **/*.py':<22}{legacy_t * 1000:>8.0f}ms{engine_t * 1000:>8.0f}ms{'-':>11}{legacy_t / engine_t:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
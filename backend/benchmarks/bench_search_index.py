@@ -0,0 +1,101 @@
+"""Benchmark repeated workspace grep with and without the search index.
+
+Builds a synthetic workspace of source files with per-file identifiers (so
+token sets differ between files, as in real code) and a handful of rare
+markers, then times:
+
+- ``plain``: ``find_grep_matches`` with no index (every call reads every file)
+- ``cold``: the first call with an empty index, which also builds it
+- ``warm``: later calls against the populated in-memory index
+- ``reloaded``: a fresh index object loading the persisted SQLite file
+
+and checks every variant returns identical results.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from deerflow.sandbox.search import find_grep_matches
+from deerflow.sandbox.search_index import WorkspaceSearchIndex
+
+WORDS = ["load", "save", "parse", "render", "user", "token", "request", "config", "cache", "stream", "event", "model", "thread", "buffer"]
+
+
+def build_workspace(root: Path, files: int, lines_per_file: int, seed: int) -> None:
+    rng = random.Random(seed)
+    old = time.time() - 3600
+    for i in range(files):
+        directory = root / f"pkg_{i // 50:03d}"
+        directory.mkdir(parents=True, exist_ok=True)
+        names = [f"{rng.choice(WORDS)}_{rng.choice(WORDS)}_{rng.randrange(10_000)}" for _ in range(12)]
+        lines = []
+        for n in range(lines_per_file):
+            lines.append(f"    {rng.choice(names)} = {rng.choice(names)}({n}, {rng.choice(WORDS)!r})")
+        if i % 400 == 7:
+            lines.append("    # FIXME: rare marker")
+        path = directory / f"module_{i:05d}.py"
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        # Entries for files modified in the last few seconds are not trusted.
+        os.utime(path, (old, old))
+
+
+def _time(fn, repeat: int):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--lines", type=int, default=150)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="deerflow-index-bench-") as tmp:
+        root = Path(tmp) / "user-data"
+        build_workspace(root, args.files, args.lines, args.seed)
+        db_path = Path(tmp) / "search_index.db"
+        size_mb = sum(p.stat().st_size for p in root.rglob("*.py")) / 1e6
+        print(f"workspace: {args.files} files, {size_mb:.1f} MB")
+
+        cases = [
+            ("rare literal", dict(pattern="FIXME", literal=True, max_results=500)),
+            ("rare regex", dict(pattern=r"FIXME:\s+rare", max_results=500)),
+            ("absent identifier", dict(pattern="load_save_99999", max_results=100)),
+            ("common word", dict(pattern="request", max_results=100)),
+        ]
+        index = WorkspaceSearchIndex(root, db_path)
+        print(f"{'case':<20}{'plain':>10}{'cold':>10}{'warm':>10}{'reloaded':>10}{'speedup':>9}")
+        for label, kwargs in cases:
+            plain_t, expected = _time(lambda: find_grep_matches(root, use_ripgrep=False, **kwargs), args.repeat)
+
+            index.clear()
+            index.save()
+            cold_t, got = _time(lambda: find_grep_matches(root, use_ripgrep=False, index=index, **kwargs), 1)
+            assert got == expected, f"{label}: cold index results differ"
+            # The cold run may stop early on max_results; finish indexing.
+            find_grep_matches(root, "\\A\\Z", use_ripgrep=False, index=index)
+
+            warm_t, got = _time(lambda: find_grep_matches(root, use_ripgrep=False, index=index, **kwargs), args.repeat)
+            assert got == expected, f"{label}: warm index results differ"
+
+            reloaded_t, got = _time(lambda: find_grep_matches(root, use_ripgrep=False, index=WorkspaceSearchIndex(root, db_path), **kwargs), args.repeat)
+            assert got == expected, f"{label}: reloaded index results differ"
+
+            print(f"{label:<20}{plain_t * 1000:>8.1f}ms{cold_t * 1000:>8.1f}ms{warm_t * 1000:>8.1f}ms{reloaded_t * 1000:>8.1f}ms{plain_t / warm_t:>8.1f}x")
+        print(f"index: {len(index)} entries, {index.size_bytes / 1e6:.1f} MB, {db_path.stat().st_size / 1e6:.1f} MB on disk")
+
+
+if __name__ == "__main__":
+    main()
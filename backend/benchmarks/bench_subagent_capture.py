@@ -0,0 +1,86 @@
+"""Benchmark capturing subagent AI messages from a values stream: scan-based de-duplication vs ID-keyed capture.
+
+A fake agent streams ``--steps`` values chunks. Each chunk carries the whole
+history, as LangGraph's ``values`` mode does, and every step adds one AI
+message with ``--tool-calls`` tool calls. For each run length the script
+times:
+
+- ``scan``: the previous capture loop, which dumped the last message on every
+  chunk and compared it against every captured message
+- ``keyed``: ``SubagentExecutor._aexecute`` with the current ID-keyed capture
+
+and reports total and per-step capture time.
+"""
+
+import argparse
+import asyncio
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+import deerflow.agents  # noqa: F401  (import order the app uses; deerflow.subagents alone is circular)
+from deerflow.subagents.config import SubagentConfig
+from deerflow.subagents.executor import SubagentExecutor
+
+
+class _FakeAgent:
+    def __init__(self, chunks: list[dict]):
+        self._chunks = chunks
+
+    async def astream(self, *args, **kwargs):
+        for chunk in self._chunks:
+            yield chunk
+
+
+def _chunks(steps: int, tool_calls: int) -> list[dict]:
+    history = [HumanMessage(content="Investigate the repository")]
+    chunks = []
+    for i in range(steps):
+        calls = [{"name": "bash", "args": {"command": f"ls /mnt/user-data/workspace/{i}/{j}"}, "id": f"call-{i}-{j}"} for j in range(tool_calls)]
+        history = [*history, AIMessage(content=f"Step {i}: looking at the next directory", id=f"msg-{i}", tool_calls=calls)]
+        chunks.append({"messages": history})
+    return chunks
+
+
+def _scan_capture(chunks: list[dict]) -> list[dict]:
+    captured: list[dict] = []
+    for chunk in chunks:
+        messages = chunk.get("messages", [])
+        if messages and isinstance(messages[-1], AIMessage):
+            message_dict = messages[-1].model_dump()
+            message_id = message_dict.get("id")
+            if message_id:
+                is_duplicate = any(msg.get("id") == message_id for msg in captured)
+            else:
+                is_duplicate = message_dict in captured
+            if not is_duplicate:
+                captured.append(message_dict)
+    return captured
+
+
+async def _keyed_capture(chunks: list[dict]) -> list[dict]:
+    config = SubagentConfig(name="bench", description="bench", system_prompt="", max_turns=10_000, timeout_seconds=600)
+    executor = SubagentExecutor(config=config, tools=[])
+    executor._create_agent = lambda: _FakeAgent(chunks)
+    return (await executor._aexecute("Investigate the repository")).ai_messages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--tool-calls", type=int, default=2, help="tool calls on each AI message")
+    args = parser.parse_args()
+
+    print(f"{'steps':>7}{'capture':>9}{'total':>11}{'per step':>11}")
+    for steps in args.steps:
+        chunks = _chunks(steps, args.tool_calls)
+        for name, run in (("scan", lambda: _scan_capture(chunks)), ("keyed", lambda: asyncio.run(_keyed_capture(chunks)))):
+            start = time.perf_counter()
+            captured = run()
+            elapsed = time.perf_counter() - start
+            assert len(captured) == steps
+            print(f"{steps:>7}{name:>9}{elapsed * 1000:>9.0f}ms{elapsed / steps * 1e6:>9.0f}us")
+
+
+if __name__ == "__main__":
+    main()
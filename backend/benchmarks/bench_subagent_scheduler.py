@@ -0,0 +1,144 @@
+"""Benchmark background subagent throughput: fixed 3-worker thread pools vs asyncio tasks behind SubagentScheduler.
+
+Each simulated subagent awaits ``--work-ms`` (standing in for model and tool
+calls). ``--subagents`` of them are started across ``--threads``
+conversations at once and the script reports wall time, the queue wait
+distribution and the peak number of OS threads for:
+
+- ``thread pools``: the previous executor, where each subagent ran
+  ``asyncio.run`` on a worker of a 3-thread pool
+- ``scheduler``: asyncio tasks on one loop, admitted by
+  ``SubagentScheduler(--max-concurrent, --max-per-thread)``
+
+It also times out one subagent after ``--timeout-ms`` under each model and
+reports whether the subagent's work actually stopped.
+"""
+
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+import deerflow.agents  # noqa: F401  (import order the app uses; deerflow.subagents alone is circular)
+from deerflow.subagents.scheduler import SubagentScheduler
+from deerflow.utils.stats import percentile
+
+
+class _ThreadPeak:
+    def __init__(self):
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._watcher = threading.Thread(target=self._watch, daemon=True)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(0.002):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._watcher.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._watcher.join()
+
+
+def _report(name: str, elapsed: float, waits: list[float], peak_threads: int) -> None:
+    waits_ms = sorted(w * 1000 for w in waits)
+    p95 = percentile(waits_ms, 0.95)
+    print(f"{name:>14}{elapsed * 1000:>10.0f}ms{statistics.median(waits_ms):>10.0f}ms{p95:>10.0f}ms{peak_threads:>9}")
+
+
+def _bench_thread_pools(count: int, work: float) -> None:
+    pool = ThreadPoolExecutor(max_workers=3)
+    waits: list[float] = []
+
+    def run(submitted: float) -> None:
+        waits.append(time.monotonic() - submitted)
+        asyncio.run(asyncio.sleep(work))
+
+    with _ThreadPeak() as threads:
+        start = time.monotonic()
+        futures = [pool.submit(run, time.monotonic()) for _ in range(count)]
+        for future in futures:
+            future.result()
+        elapsed = time.monotonic() - start
+    pool.shutdown()
+    _report("thread pools", elapsed, waits, threads.peak)
+
+
+async def _bench_scheduler(count: int, conversations: int, work: float, max_concurrent: int, max_per_thread: int) -> None:
+    scheduler = SubagentScheduler(max_concurrent, max_per_thread)
+    waits: list[float] = []
+
+    async def run(thread_id: str) -> None:
+        async with scheduler.slot(thread_id) as waited:
+            waits.append(waited)
+            await asyncio.sleep(work)
+
+    with _ThreadPeak() as threads:
+        start = time.monotonic()
+        await asyncio.gather(*(run(f"thread-{i % conversations}") for i in range(count)))
+        elapsed = time.monotonic() - start
+    _report("scheduler", elapsed, waits, threads.peak)
+
+
+def _timeout_thread_pools(work: float, timeout: float) -> bool:
+    finished = threading.Event()
+
+    async def subagent() -> None:
+        await asyncio.sleep(work)
+        finished.set()
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        future = pool.submit(asyncio.run, subagent())
+        try:
+            future.result(timeout=timeout)
+        except FuturesTimeoutError:
+            future.cancel()  # No effect once the worker has started.
+    return not finished.is_set()
+
+
+async def _timeout_scheduler(work: float, timeout: float) -> bool:
+    finished = asyncio.Event()
+
+    async def subagent() -> None:
+        await asyncio.sleep(work)
+        finished.set()
+
+    try:
+        async with asyncio.timeout(timeout):
+            await subagent()
+    except TimeoutError:
+        pass
+    await asyncio.sleep(work)
+    return not finished.is_set()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subagents", type=int, default=24)
+    parser.add_argument("--threads", type=int, default=6, help="conversations the subagents are spread over")
+    parser.add_argument("--work-ms", type=float, default=200)
+    parser.add_argument("--max-concurrent", type=int, default=8)
+    parser.add_argument("--max-per-thread", type=int, default=3)
+    parser.add_argument("--timeout-ms", type=float, default=50)
+    args = parser.parse_args()
+    work = args.work_ms / 1000
+
+    print(f"{args.subagents} subagents over {args.threads} threads, {args.work_ms:.0f}ms each")
+    print(f"{'model':>14}{'wall':>12}{'wait p50':>12}{'wait p95':>12}{'threads':>9}")
+    _bench_thread_pools(args.subagents, work)
+    asyncio.run(_bench_scheduler(args.subagents, args.threads, work, args.max_concurrent, args.max_per_thread))
+
+    timeout = args.timeout_ms / 1000
+    print(f"\ntimeout after {args.timeout_ms:.0f}ms stops the subagent:")
+    print(f"  thread pools: {_timeout_thread_pools(work, timeout)}")
+    print(f"  scheduler:    {asyncio.run(_timeout_scheduler(work, timeout))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Benchmark get_available_tools: rebuilding the tool list on every call vs the cached ToolRegistry.
+
+Loads the ``tools`` and ``sandbox`` sections of ``config.example.yaml`` and
+writes an extensions config with ``--mcp-servers`` (disabled) MCP server
+entries. It then calls ``get_available_tools`` ``--calls`` times the way a
+lead-agent build and a ``task`` call do, and reports the mean and p95 per
+call for:
+
+- ``rebuild``: the registry is reset before every call, so each call re-reads
+  the extensions config, resolves every tool and rebuilds the list (what
+  every call did before the registry)
+- ``cached``: repeated calls against one registry
+
+It also prints the registry's own miss timing from ``stats()``.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+import deerflow.agents  # noqa: F401  (import order the app uses)
+from deerflow.config.app_config import AppConfig, set_app_config
+from deerflow.tools import tools as tools_module
+from deerflow.utils.stats import percentile
+
+EXAMPLE_CONFIG = Path(__file__).resolve().parents[2] / "config.example.yaml"
+
+
+def _time_calls(calls: int, subagent_enabled: bool, reset: bool) -> list[float]:
+    timings = []
+    for _ in range(calls):
+        if reset:
+            tools_module.reset_tool_registry()
+        start = time.perf_counter()
+        tools_module.get_available_tools(model_name=None, subagent_enabled=subagent_enabled)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--mcp-servers", type=int, default=20, help="disabled MCP server entries in the extensions config")
+    args = parser.parse_args()
+
+    raw = yaml.safe_load(EXAMPLE_CONFIG.read_text())
+    set_app_config(AppConfig.model_validate({"models": [], "sandbox": raw["sandbox"], "tools": raw["tools"], "tool_groups": raw.get("tool_groups", [])}))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        extensions = Path(tmp) / "extensions_config.json"
+        servers = {f"server-{i}": {"enabled": False, "type": "stdio", "command": "npx", "args": ["-y", f"@example/mcp-server-{i}"], "description": "x" * 200} for i in range(args.mcp_servers)}
+        extensions.write_text(json.dumps({"mcpServers": servers, "skills": {}}))
+        os.environ["DEER_FLOW_EXTENSIONS_CONFIG_PATH"] = str(extensions)
+
+        # Import every tool module once, so neither mode pays for first imports.
+        _time_calls(1, True, reset=True)
+        print(f"{'caller':>12}{'mode':>10}{'mean':>12}{'p95':>12}")
+        for caller, subagent_enabled in (("lead agent", True), ("task tool", False)):
+            for mode, reset in (("rebuild", True), ("cached", False)):
+                tools_module.reset_tool_registry()
+                timings = sorted(_time_calls(args.calls, subagent_enabled, reset))
+                mean = sum(timings) / len(timings)
+                p95 = percentile(timings, 0.95)
+                print(f"{caller:>12}{mode:>10}{mean * 1e6:>10.0f}us{p95 * 1e6:>10.0f}us")
+        print(f"\nregistry stats after the cached runs: {tools_module.get_tool_registry().stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Benchmark the tool result cache: uncached calls vs the memory and sqlite tiers and single-flight.
+
+A fake search tool takes ``--work-ms`` per call. An agent-like workload of
+``--calls`` calls drawn from ``--distinct`` queries is run for:
+
+- ``uncached``: the plain tool
+- ``memory``: ``cached_tool`` with the in-process tier only
+- ``sqlite``: ``cached_tool`` with a fresh process (empty memory tier)
+  reading results another process stored in the sqlite tier
+
+Then ``--callers`` threads make the same call at once, uncached and cached,
+to show single-flight coalescing. The script reports wall time, tool
+executions and the cache's hit rate.
+"""
+
+import argparse
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from langchain.tools import tool
+
+from deerflow.tools.result_cache import ToolResultCache, cached_tool
+
+
+def _search_tool(work: float, executions: list[int]):
+    @tool
+    def search(query: str) -> str:
+        """Search the web."""
+        executions[0] += 1
+        time.sleep(work)
+        return f"results for {query} " * 50
+
+    return search
+
+
+def _workload(calls: int, distinct: int) -> list[str]:
+    rng = random.Random(0)
+    return [f"query {rng.randrange(distinct)}" for _ in range(calls)]
+
+
+def _run(search, queries: list[str]) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        search.invoke({"query": query})
+    return time.perf_counter() - start
+
+
+def _concurrent(search, callers: int) -> float:
+    barrier = threading.Barrier(callers)
+
+    def call() -> None:
+        barrier.wait()
+        search.invoke({"query": "same query"})
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--distinct", type=int, default=40, help="distinct queries in the workload")
+    parser.add_argument("--work-ms", type=float, default=20.0)
+    parser.add_argument("--callers", type=int, default=16)
+    args = parser.parse_args()
+    work = args.work_ms / 1000
+    queries = _workload(args.calls, args.distinct)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "tool_cache.db"
+        # Another process has already run the workload and stored its results.
+        writer = ToolResultCache(sqlite_path=db)
+        _run(cached_tool(_search_tool(0, [0]), 60, cache=writer), queries)
+        writer.close()
+
+        print(f"{args.calls} calls, {args.distinct} distinct queries, {args.work_ms:g} ms per execution")
+        print(f"{'mode':>10}{'wall':>10}{'executions':>12}{'hit rate':>10}")
+        modes = (("uncached", None), ("memory", ToolResultCache()), ("sqlite", ToolResultCache(sqlite_path=db)))
+        for mode, cache in modes:
+            executions = [0]
+            search = _search_tool(work, executions)
+            if cache is not None:
+                search = cached_tool(search, 60, cache=cache)
+            elapsed = _run(search, queries)
+            hit_rate = f"{cache.stats()['hit_rate']:.0%}" if cache is not None else "-"
+            print(f"{mode:>10}{elapsed * 1000:>8.0f}ms{executions[0]:>12}{hit_rate:>10}")
+
+        print(f"\n{args.callers} concurrent identical calls")
+        for mode, cache in (("uncached", None), ("coalesced", ToolResultCache())):
+            executions = [0]
+            search = _search_tool(work, executions)
+            if cache is not None:
+                search = cached_tool(search, 60, cache=cache)
+            elapsed = _concurrent(search, args.callers)
+            print(f"{mode:>10}{elapsed * 1000:>8.0f}ms{executions[0]:>12}")
+
+
+if __name__ == "__main__":
+    main()
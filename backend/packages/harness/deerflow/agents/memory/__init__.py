@@ -6,6 +6,7 @@ This module provides a global memory mechanism that:
 - Injects relevant memory into system prompts for personalized responses
 """
 
+from deerflow.agents.memory.dedup import FactDedupIndex, compact_facts
 from deerflow.agents.memory.prompt import (
     FACT_EXTRACTION_PROMPT,
     MEMORY_UPDATE_PROMPT,
@@ -18,6 +19,7 @@ from deerflow.agents.memory.queue import (
     get_memory_queue,
     reset_memory_queue,
 )
+from deerflow.agents.memory.sqlite_queue import SqliteMemoryUpdateQueue
 from deerflow.agents.memory.storage import (
     FileMemoryStorage,
     MemoryStorage,
@@ -26,6 +28,7 @@ from deerflow.agents.memory.storage import (
 from deerflow.agents.memory.updater import (
     MemoryUpdater,
     clear_memory_data,
+    compact_memory_data,
     delete_memory_fact,
     get_memory_data,
     reload_memory_data,
@@ -41,8 +44,12 @@ __all__ = [
     # Queue
     "ConversationContext",
     "MemoryUpdateQueue",
+    "SqliteMemoryUpdateQueue",
     "get_memory_queue",
     "reset_memory_queue",
+    # Deduplication
+    "FactDedupIndex",
+    "compact_facts",
     # Storage
     "MemoryStorage",
     "FileMemoryStorage",
@@ -50,6 +57,7 @@ __all__ = [
     # Updater
     "MemoryUpdater",
     "clear_memory_data",
+    "compact_memory_data",
     "delete_memory_fact",
     "get_memory_data",
     "reload_memory_data",
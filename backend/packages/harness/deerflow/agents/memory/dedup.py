@@ -0,0 +1,297 @@
+"""Near-duplicate detection for memory facts.
+
+The LLM frequently re-extracts a fact it has already stored, phrased slightly
+differently ("User prefers Python" / "The user prefers Python."). Exact-match
+checks miss these, so the fact list slowly fills with paraphrases that cost
+prompt tokens on every injection.
+
+:class:`FactDedupIndex` is a MinHash/LSH index over character shingles of
+normalized fact content. Candidate lookup is sub-linear in the number of
+facts; candidates are then verified with exact Jaccard similarity, so the
+index never reports a pair below the configured threshold.
+
+The module doubles as an offline compaction tool for existing memory files::
+
+    python -m deerflow.agents.memory.dedup path/to/memory.json [--threshold 0.7] [--dry-run]
+"""
+
+import argparse
+import functools
+import hashlib
+import json
+import re
+import struct
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+
+DEFAULT_SIMILARITY_THRESHOLD = 0.7
+
+_SHINGLE_SIZE = 4
+# 64 MinHash values come from two salted 64-byte BLAKE2b digests per shingle,
+# split into 16 bands of 4 rows. Pairs at Jaccard 0.7 become candidates ~99%
+# of the time while unrelated facts that share a template ("User prefers ...")
+# mostly do not, which keeps exact verification cheap.
+_NUM_PERM = 64
+_ROWS_PER_BAND = 4
+_DIGEST_FORMAT = struct.Struct("<32H")
+_DIGEST_SALTS = (b"deerflow-mh-0", b"deerflow-mh-1")
+
+_TOKEN_RE = re.compile(r"\w+")
+# Words that carry no meaning in a fact about the user and would otherwise
+# inflate similarity between unrelated facts.
+_STOPWORDS = frozenset({"a", "an", "the", "user", "users", "user's"})
+
+
+def normalize_fact_content(content: str) -> str:
+    """Casefold, strip punctuation and drop filler words from fact content."""
+    return " ".join(token for token in _TOKEN_RE.findall(content.casefold()) if token not in _STOPWORDS)
+
+
+def fact_shingles(content: str) -> frozenset[str]:
+    """Return the set of character shingles for *content* after normalization."""
+    text = normalize_fact_content(content)
+    if len(text) <= _SHINGLE_SIZE:
+        return frozenset({text}) if text else frozenset()
+    return frozenset(text[i : i + _SHINGLE_SIZE] for i in range(len(text) - _SHINGLE_SIZE + 1))
+
+
+@functools.lru_cache(maxsize=65536)
+def _shingle_hashes(shingle: str) -> tuple[int, ...]:
+    # Character 4-grams repeat heavily across facts, so caching per-shingle
+    # hash rows removes most of the hashing cost on large fact lists.
+    data = shingle.encode("utf-8")
+    hashes: tuple[int, ...] = ()
+    for salt in _DIGEST_SALTS:
+        hashes += _DIGEST_FORMAT.unpack(hashlib.blake2b(data, digest_size=_DIGEST_FORMAT.size, salt=salt).digest())
+    return hashes
+
+
+def _minhash(shingles: frozenset[str]) -> tuple[int, ...]:
+    return tuple(map(min, zip(*map(_shingle_hashes, shingles))))
+
+
+def _jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    if not a or not b:
+        return 0.0
+    intersection = len(a & b)
+    return intersection / (len(a) + len(b) - intersection)
+
+
+class FactDedupIndex:
+    """MinHash/LSH index that finds near-duplicate fact contents.
+
+    Keys are opaque identifiers (fact ids in practice). The index keeps each
+    key's shingle set for exact verification, so lookups never return a
+    match below ``threshold``.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_SIMILARITY_THRESHOLD):
+        """Initialize an empty index.
+
+        Args:
+            threshold: Minimum Jaccard similarity (over normalized character
+                shingles) for two contents to count as duplicates.
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        self._threshold = threshold
+        self._shingles: dict[str, frozenset[str]] = {}
+        self._band_keys: dict[str, list[tuple[int, ...]]] = {}
+        self._buckets: dict[tuple[int, ...], set[str]] = defaultdict(set)
+
+    @classmethod
+    def from_facts(cls, facts: Iterable[dict[str, Any]], threshold: float = DEFAULT_SIMILARITY_THRESHOLD) -> "FactDedupIndex":
+        """Build an index over facts that have an ``id`` and string ``content``."""
+        index = cls(threshold)
+        for fact in facts:
+            fact_id = fact.get("id")
+            content = fact.get("content")
+            if isinstance(fact_id, str) and isinstance(content, str):
+                index.add(fact_id, content)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._shingles)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._shingles
+
+    @staticmethod
+    def _bands(signature: tuple[int, ...]) -> list[tuple[int, ...]]:
+        return [(band, *signature[start : start + _ROWS_PER_BAND]) for band, start in enumerate(range(0, _NUM_PERM, _ROWS_PER_BAND))]
+
+    def add(self, key: str, content: str) -> None:
+        """Index *content* under *key*, replacing any previous entry for *key*."""
+        if key in self._shingles:
+            self.remove(key)
+        shingles = fact_shingles(content)
+        if shingles:
+            self._store(key, shingles, self._bands(_minhash(shingles)))
+
+    def _store(self, key: str, shingles: frozenset[str], band_keys: list[tuple[int, ...]]) -> None:
+        self._shingles[key] = shingles
+        self._band_keys[key] = band_keys
+        for band_key in band_keys:
+            self._buckets[band_key].add(key)
+
+    def remove(self, key: str) -> None:
+        """Drop *key* from the index. Unknown keys are ignored."""
+        self._shingles.pop(key, None)
+        for band_key in self._band_keys.pop(key, []):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def find_duplicate(self, content: str, accept: Callable[[str], bool] | None = None) -> tuple[str, float] | None:
+        """Return ``(key, similarity)`` of the closest indexed duplicate, if any.
+
+        Args:
+            content: Content to look up.
+            accept: Optional filter on candidate keys; keys it rejects are
+                never reported as duplicates.
+        """
+        shingles = fact_shingles(content)
+        if not shingles:
+            return None
+        return self._best_match(shingles, self._bands(_minhash(shingles)), accept)
+
+    def insert(self, key: str, content: str, accept: Callable[[str], bool] | None = None) -> tuple[str, float] | None:
+        """Index *content* under *key* unless it duplicates an indexed entry.
+
+        Equivalent to :meth:`find_duplicate` followed by :meth:`add`, but
+        computes the MinHash signature only once.
+
+        Returns:
+            The duplicate's ``(key, similarity)`` (and nothing is indexed), or
+            ``None`` when *content* was added.
+        """
+        shingles = fact_shingles(content)
+        if not shingles:
+            return None
+        band_keys = self._bands(_minhash(shingles))
+        match = self._best_match(shingles, band_keys, accept)
+        if match is None:
+            if key in self._shingles:
+                self.remove(key)
+            self._store(key, shingles, band_keys)
+        return match
+
+    def _best_match(self, shingles: frozenset[str], band_keys: list[tuple[int, ...]], accept: Callable[[str], bool] | None = None) -> tuple[str, float] | None:
+        candidates: set[str] = set()
+        for band_key in band_keys:
+            candidates.update(self._buckets.get(band_key, ()))
+        if accept is not None:
+            candidates = {key for key in candidates if accept(key)}
+
+        best: tuple[str, float] | None = None
+        for key in candidates:
+            similarity = _jaccard(shingles, self._shingles[key])
+            if similarity >= self._threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+
+def fact_category(fact: dict[str, Any]) -> str:
+    """Category of a stored or extracted fact, defaulting to ``"context"``."""
+    return str(fact.get("category", "context")).strip() or "context"
+
+
+def merge_duplicate_fact(existing: dict[str, Any], newer: dict[str, Any]) -> None:
+    """Fold the *newer* near-duplicate into *existing* in place.
+
+    Near-duplicates are often updates ("uses Python 3.11" / "uses Python
+    3.12") or negations ("is working on X" / "is no longer working on X"),
+    so the newer fact's content, timestamp, source and ``sourceError``
+    replace the existing ones. The existing id and the stronger confidence
+    are kept. Callers only merge facts of the same category.
+    """
+    for field in ("content", "createdAt", "source"):
+        if field in newer:
+            existing[field] = newer[field]
+    if "sourceError" in newer:
+        existing["sourceError"] = newer["sourceError"]
+    else:
+        existing.pop("sourceError", None)
+    existing_confidence = existing.get("confidence", 0)
+    newer_confidence = newer.get("confidence", 0)
+    if isinstance(newer_confidence, int | float) and newer_confidence > existing_confidence:
+        existing["confidence"] = newer_confidence
+
+
+def compact_facts(facts: list[dict[str, Any]], threshold: float = DEFAULT_SIMILARITY_THRESHOLD) -> tuple[list[dict[str, Any]], int]:
+    """Merge near-duplicate facts of the same category.
+
+    Each merged fact keeps the position and id of its earliest occurrence and
+    the content of its latest (see :func:`merge_duplicate_fact`).
+
+    Args:
+        facts: Facts in their stored (chronological) order.
+        threshold: Minimum Jaccard similarity for two facts to be merged.
+
+    Returns:
+        ``(compacted_facts, merged_count)``. Kept facts are copies; the input
+        list is not modified.
+    """
+    index = FactDedupIndex(threshold)
+    kept: list[dict[str, Any]] = []
+    by_id: dict[str, dict[str, Any]] = {}
+    merged = 0
+
+    for position, fact in enumerate(facts):
+        content = fact.get("content")
+        if not isinstance(content, str):
+            kept.append(dict(fact))
+            continue
+
+        key = fact.get("id") if isinstance(fact.get("id"), str) else f"#{position}"
+        category = fact_category(fact)
+        match = index.insert(key, content, accept=lambda candidate: fact_category(by_id[candidate]) == category)
+        if match is not None:
+            merge_duplicate_fact(by_id[match[0]], fact)
+            index.add(match[0], content)
+            merged += 1
+            continue
+
+        kept_fact = dict(fact)
+        by_id[key] = kept_fact
+        kept.append(kept_fact)
+
+    return kept, merged
+
+
+def compact_memory_file(path: Path, threshold: float = DEFAULT_SIMILARITY_THRESHOLD, dry_run: bool = False) -> tuple[int, int]:
+    """Compact the facts of a memory JSON file in place.
+
+    Returns:
+        ``(facts_before, facts_after)``.
+    """
+    memory_data = json.loads(path.read_text(encoding="utf-8"))
+    facts = memory_data.get("facts", [])
+    compacted, _ = compact_facts(facts, threshold)
+    if not dry_run and len(compacted) != len(facts):
+        memory_data["facts"] = compacted
+        temp_path = path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(memory_data, indent=2, ensure_ascii=False), encoding="utf-8")
+        temp_path.replace(path)
+    return len(facts), len(compacted)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Merge near-duplicate facts in DeerFlow memory files.")
+    parser.add_argument("paths", nargs="+", type=Path, help="memory.json files to compact")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_SIMILARITY_THRESHOLD, help="Jaccard similarity threshold (default: %(default)s)")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be merged without writing")
+    args = parser.parse_args(argv)
+
+    for path in args.paths:
+        before, after = compact_memory_file(path, args.threshold, args.dry_run)
+        print(f"{path}: {before} -> {after} facts ({before - after} merged{', dry run' if args.dry_run else ''})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
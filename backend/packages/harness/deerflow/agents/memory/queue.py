@@ -128,21 +128,7 @@ class MemoryUpdateQueue:
             updater = MemoryUpdater()
 
             for context in contexts_to_process:
-                try:
-                    logger.info("Updating memory for thread %s", context.thread_id)
-                    success = updater.update_memory(
-                        messages=context.messages,
-                        thread_id=context.thread_id,
-                        agent_name=context.agent_name,
-                        correction_detected=context.correction_detected,
-                        reinforcement_detected=context.reinforcement_detected,
-                    )
-                    if success:
-                        logger.info("Memory updated successfully for thread %s", context.thread_id)
-                    else:
-                        logger.warning("Memory update skipped/failed for thread %s", context.thread_id)
-                except Exception as e:
-                    logger.error("Error updating memory for thread %s: %s", context.thread_id, e)
+                self._apply_update(updater, context)
 
                 # Small delay between updates to avoid rate limiting
                 if len(contexts_to_process) > 1:
@@ -152,6 +138,25 @@ class MemoryUpdateQueue:
             with self._lock:
                 self._processing = False
 
+    @staticmethod
+    def _apply_update(updater: Any, context: ConversationContext) -> None:
+        """Run a single memory update, logging (never raising) failures."""
+        try:
+            logger.info("Updating memory for thread %s", context.thread_id)
+            success = updater.update_memory(
+                messages=context.messages,
+                thread_id=context.thread_id,
+                agent_name=context.agent_name,
+                correction_detected=context.correction_detected,
+                reinforcement_detected=context.reinforcement_detected,
+            )
+            if success:
+                logger.info("Memory updated successfully for thread %s", context.thread_id)
+            else:
+                logger.warning("Memory update skipped/failed for thread %s", context.thread_id)
+        except Exception as e:
+            logger.error("Error updating memory for thread %s: %s", context.thread_id, e)
+
     def flush(self) -> None:
         """Force immediate processing of the queue.
 
@@ -197,13 +202,23 @@ _queue_lock = threading.Lock()
 def get_memory_queue() -> MemoryUpdateQueue:
     """Get the global memory update queue singleton.
 
+    The backend is selected by ``memory.queue_backend``: the in-process
+    queue by default, or :class:`SqliteMemoryUpdateQueue` for a backlog that
+    survives restarts and is shared between workers.
+
     Returns:
         The memory update queue instance.
     """
     global _memory_queue
     with _queue_lock:
         if _memory_queue is None:
-            _memory_queue = MemoryUpdateQueue()
+            config = get_memory_config()
+            if config.queue_backend == "sqlite":
+                from deerflow.agents.memory.sqlite_queue import SqliteMemoryUpdateQueue
+
+                _memory_queue = SqliteMemoryUpdateQueue()
+            else:
+                _memory_queue = MemoryUpdateQueue()
         return _memory_queue
 
 
@@ -0,0 +1,351 @@
+"""SQLite-backed memory update queue that survives restarts.
+
+Pending updates are stored in a small SQLite database instead of an
+in-process list, so a gateway restart or crash resumes the backlog rather
+than dropping it. Every worker process that points at the same database
+shares one queue:
+
+- ``add()`` upserts the pending update for a thread (newer messages replace
+  older ones, correction/reinforcement flags are merged) and pushes its
+  ``available_at`` forward by ``debounce_seconds``.
+- Workers *claim* one update at a time by taking a lease on its row. An
+  update is only ever processed by the worker holding the lease, so no two
+  workers issue the same LLM call. If a worker dies mid-update, the lease
+  expires and another worker reclaims the row.
+- Updates for the same memory file (same ``agent_name``) are never leased to
+  two workers at once, so workers do not race on the memory JSON file.
+"""
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from langchain_core.messages import messages_from_dict, messages_to_dict
+
+from deerflow.agents.memory.queue import ConversationContext, MemoryUpdateQueue
+from deerflow.config.memory_config import get_memory_config
+from deerflow.config.paths import get_paths
+
+logger = logging.getLogger(__name__)
+
+# A row that has been claimed this many times without being acknowledged is
+# assumed to crash its worker and is dropped instead of being retried forever.
+MAX_CLAIM_ATTEMPTS = 3
+
+# Back-off before re-checking rows that are available but blocked by another
+# worker's lease on the same memory file.
+_BLOCKED_RETRY_SECONDS = 5.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memory_updates (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    thread_id TEXT NOT NULL,
+    agent_key TEXT NOT NULL,
+    messages TEXT NOT NULL,
+    correction_detected INTEGER NOT NULL DEFAULT 0,
+    reinforcement_detected INTEGER NOT NULL DEFAULT 0,
+    enqueued_at REAL NOT NULL,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_memory_updates_thread ON memory_updates (thread_id);
+CREATE INDEX IF NOT EXISTS idx_memory_updates_available ON memory_updates (available_at);
+"""
+
+# A row is claimable when nobody holds a live lease on it.
+_UNLEASED = "(lease_owner IS NULL OR lease_expires_at < :now)"
+
+
+def _resolve_queue_path() -> Path:
+    config = get_memory_config()
+    if config.queue_path:
+        p = Path(config.queue_path)
+        return p if p.is_absolute() else get_paths().base_dir / p
+    return get_paths().memory_queue_file
+
+
+def _serialize_messages(messages: list[Any]) -> str:
+    return json.dumps(messages_to_dict(messages), ensure_ascii=False)
+
+
+def _deserialize_messages(raw: str) -> list[Any]:
+    return messages_from_dict(json.loads(raw))
+
+
+class SqliteMemoryUpdateQueue(MemoryUpdateQueue):
+    """Persistent, multi-worker memory update queue with claim/lease semantics.
+
+    The public interface matches :class:`MemoryUpdateQueue`; only where the
+    pending updates live changes. The in-process debounce timer is kept as a
+    wake-up mechanism: it fires when the earliest pending row becomes
+    available, and processing then drains every row this worker can claim.
+    """
+
+    def __init__(self, db_path: str | Path | None = None, lease_seconds: int | None = None):
+        """Initialize the queue and schedule processing of any existing backlog.
+
+        Args:
+            db_path: SQLite database path. Defaults to ``memory.queue_path``
+                or ``{base_dir}/memory_queue.db``.
+            lease_seconds: How long a claim is held before another worker may
+                reclaim it. Defaults to ``memory.queue_lease_seconds``.
+        """
+        super().__init__()
+        self._db_path = Path(db_path) if db_path is not None else _resolve_queue_path()
+        self._lease_seconds = lease_seconds if lease_seconds is not None else get_memory_config().queue_lease_seconds
+        self._worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._setup()
+        # Resume whatever a previous (or sibling) process left behind.
+        with self._lock:
+            self._schedule_next()
+
+    # -- database helpers --------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Yield a connection inside a write-locked (``BEGIN IMMEDIATE``) transaction."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def _setup(self) -> None:
+        self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    # -- queue operations --------------------------------------------------
+
+    def add(
+        self,
+        thread_id: str,
+        messages: list[Any],
+        agent_name: str | None = None,
+        correction_detected: bool = False,
+        reinforcement_detected: bool = False,
+    ) -> None:
+        """Persist a conversation for a debounced memory update.
+
+        Any pending (unleased) update for the same thread is replaced. An
+        update that a worker is currently processing is left alone; the new
+        row is processed after it.
+        """
+        config = get_memory_config()
+        if not config.enabled:
+            return
+
+        now = time.time()
+        with self._transaction() as conn:
+            existing = conn.execute(
+                f"SELECT correction_detected, reinforcement_detected FROM memory_updates WHERE thread_id = :thread_id AND {_UNLEASED}",
+                {"thread_id": thread_id, "now": now},
+            ).fetchall()
+            correction_detected = correction_detected or any(row["correction_detected"] for row in existing)
+            reinforcement_detected = reinforcement_detected or any(row["reinforcement_detected"] for row in existing)
+            conn.execute(
+                f"DELETE FROM memory_updates WHERE thread_id = :thread_id AND {_UNLEASED}",
+                {"thread_id": thread_id, "now": now},
+            )
+            conn.execute(
+                "INSERT INTO memory_updates (thread_id, agent_key, messages, correction_detected, reinforcement_detected, enqueued_at, available_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id,
+                    agent_name or "",
+                    _serialize_messages(messages),
+                    int(correction_detected),
+                    int(reinforcement_detected),
+                    now,
+                    now + config.debounce_seconds,
+                ),
+            )
+
+        with self._lock:
+            self._reset_timer()
+
+        logger.info("Memory update persisted for thread %s, queue size: %d", thread_id, self.pending_count)
+
+    def _claim_next(self, force: bool = False) -> tuple[int, ConversationContext] | None:
+        """Atomically lease the next available update to this worker.
+
+        Args:
+            force: Ignore the debounce deadline (used by ``flush``).
+
+        Returns:
+            ``(row_id, context)`` or ``None`` when nothing is claimable.
+        """
+        while True:
+            now = time.time()
+            with self._transaction() as conn:
+                row = conn.execute(
+                    f"""
+                    SELECT * FROM memory_updates
+                    WHERE {_UNLEASED}
+                      AND (:force OR available_at <= :now)
+                      AND agent_key NOT IN (
+                          SELECT agent_key FROM memory_updates
+                          WHERE lease_owner IS NOT NULL AND lease_owner != :me AND lease_expires_at >= :now
+                      )
+                    ORDER BY available_at, id
+                    LIMIT 1
+                    """,
+                    {"now": now, "force": int(force), "me": self._worker_id},
+                ).fetchone()
+                if row is None:
+                    return None
+
+                if row["attempts"] >= MAX_CLAIM_ATTEMPTS:
+                    conn.execute("DELETE FROM memory_updates WHERE id = ?", (row["id"],))
+                    logger.error("Dropping memory update for thread %s after %d unacknowledged claims", row["thread_id"], row["attempts"])
+                    continue
+
+                conn.execute(
+                    "UPDATE memory_updates SET lease_owner = ?, lease_expires_at = ?, attempts = attempts + 1 WHERE id = ?",
+                    (self._worker_id, now + self._lease_seconds, row["id"]),
+                )
+
+            context = ConversationContext(
+                thread_id=row["thread_id"],
+                messages=_deserialize_messages(row["messages"]),
+                timestamp=datetime.fromtimestamp(row["enqueued_at"], UTC),
+                agent_name=row["agent_key"] or None,
+                correction_detected=bool(row["correction_detected"]),
+                reinforcement_detected=bool(row["reinforcement_detected"]),
+            )
+            return row["id"], context
+
+    def _ack(self, row_id: int) -> None:
+        """Remove a processed update, provided this worker still holds its lease."""
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM memory_updates WHERE id = ? AND lease_owner = ?",
+                (row_id, self._worker_id),
+            )
+
+    def _next_wakeup(self) -> float | None:
+        """Return the earliest time a pending row may become claimable."""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                """
+                SELECT MIN(CASE WHEN lease_owner IS NULL THEN available_at ELSE MAX(available_at, lease_expires_at) END) AS wake
+                FROM memory_updates
+                """
+            ).fetchone()
+        finally:
+            conn.close()
+        return row["wake"] if row is not None else None
+
+    def _schedule_next(self) -> None:
+        """Arm the timer for the next pending row, if any. Caller holds ``_lock``."""
+        wake = self._next_wakeup()
+        if wake is None:
+            return
+        delay = wake - time.time()
+        self._start_timer(delay + 0.1 if delay > 0 else _BLOCKED_RETRY_SECONDS)
+
+    def _reset_timer(self) -> None:
+        """Arm the timer for the debounce deadline of the most recent add."""
+        self._start_timer(get_memory_config().debounce_seconds)
+
+    def _start_timer(self, delay: float) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(delay, self._process_queue)
+        self._timer.daemon = True
+        self._timer.start()
+        logger.debug("Memory update timer set for %.1fs", delay)
+
+    def _process_queue(self, force: bool = False) -> None:
+        """Claim and process updates one at a time until none are available."""
+        # Import here to avoid circular dependency
+        from deerflow.agents.memory.updater import MemoryUpdater
+
+        with self._lock:
+            if self._processing:
+                self._reset_timer()
+                return
+            self._processing = True
+            self._timer = None
+
+        updater = None
+        processed = 0
+        try:
+            while (claimed := self._claim_next(force=force)) is not None:
+                row_id, context = claimed
+                # Small delay between updates to avoid rate limiting
+                if processed:
+                    time.sleep(0.5)
+                if updater is None:
+                    updater = MemoryUpdater()
+                self._apply_update(updater, context)
+                self._ack(row_id)
+                processed += 1
+        except sqlite3.Error as e:
+            logger.error("Memory update queue database error: %s", e)
+        finally:
+            with self._lock:
+                self._processing = False
+                if self._timer is None:
+                    self._schedule_next()
+
+        if processed:
+            logger.info("Processed %d queued memory updates", processed)
+
+    def flush(self) -> None:
+        """Process every claimable update now, ignoring the debounce deadline."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        self._process_queue(force=True)
+
+    def clear(self) -> None:
+        """Delete all pending updates without processing them.
+
+        This is useful for testing. Note that the database is shared, so this
+        also discards updates queued by other workers.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._processing = False
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM memory_updates")
+
+    @property
+    def pending_count(self) -> int:
+        """Get the number of pending updates, including ones being processed."""
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM memory_updates").fetchone()[0]
+        finally:
+            conn.close()
@@ -7,6 +7,7 @@ import re
 import uuid
 from typing import Any
 
+from deerflow.agents.memory.dedup import FactDedupIndex, compact_facts, fact_category, merge_duplicate_fact
 from deerflow.agents.memory.prompt import (
     MEMORY_UPDATE_PROMPT,
     format_conversation_for_update,
@@ -69,6 +70,25 @@ def clear_memory_data(agent_name: str | None = None) -> dict[str, Any]:
     return cleared_memory
 
 
+def compact_memory_data(agent_name: str | None = None) -> tuple[dict[str, Any], int]:
+    """Merge near-duplicate facts in stored memory and persist the result.
+
+    Returns:
+        ``(memory_data, merged_count)``. Memory is only re-saved when at least
+        one fact was merged.
+    """
+    memory_data = get_memory_data(agent_name)
+    compacted, merged = compact_facts(memory_data.get("facts", []), get_memory_config().fact_dedup_threshold)
+    if not merged:
+        return memory_data, 0
+
+    updated_memory = dict(memory_data)
+    updated_memory["facts"] = compacted
+    if not _save_memory_to_file(updated_memory, agent_name):
+        raise OSError("Failed to save memory data after compacting facts")
+    return updated_memory, merged
+
+
 def _validate_confidence(confidence: float) -> float:
     """Validate persisted fact confidence so stored JSON stays standards-compliant."""
     if not math.isfinite(confidence) or confidence < 0 or confidence > 1:
@@ -408,6 +428,8 @@ class MemoryUpdater:
 
         # Add new facts
         existing_fact_keys = {fact_key for fact_key in (_fact_content_key(fact.get("content")) for fact in current_memory.get("facts", [])) if fact_key is not None}
+        facts_by_id = {fact["id"]: fact for fact in current_memory.get("facts", []) if isinstance(fact.get("id"), str)}
+        dedup_index = FactDedupIndex.from_facts(facts_by_id.values(), threshold=config.fact_dedup_threshold)
         new_facts = update_data.get("newFacts", [])
         for fact in new_facts:
             confidence = fact.get("confidence", 0.5)
@@ -419,7 +441,6 @@ class MemoryUpdater:
                 fact_key = _fact_content_key(normalized_content)
                 if fact_key is not None and fact_key in existing_fact_keys:
                     continue
-
                 fact_entry = {
                     "id": f"fact_{uuid.uuid4().hex[:8]}",
                     "content": normalized_content,
@@ -433,7 +454,21 @@ class MemoryUpdater:
                     normalized_source_error = source_error.strip()
                     if normalized_source_error:
                         fact_entry["sourceError"] = normalized_source_error
-                current_memory["facts"].append(fact_entry)
+
+                # Only facts of the same category are merged; the newer
+                # content wins so updates and negations are not lost.
+                category = fact_category(fact_entry)
+                duplicate = dedup_index.find_duplicate(normalized_content, accept=lambda key: fact_category(facts_by_id[key]) == category)
+                if duplicate is not None:
+                    logger.debug("Merging near-duplicate fact into %s (similarity %.2f)", duplicate[0], duplicate[1])
+                    existing = facts_by_id[duplicate[0]]
+                    existing_fact_keys.discard(_fact_content_key(existing.get("content")))
+                    merge_duplicate_fact(existing, fact_entry)
+                    dedup_index.add(duplicate[0], normalized_content)
+                else:
+                    current_memory["facts"].append(fact_entry)
+                    facts_by_id[fact_entry["id"]] = fact_entry
+                    dedup_index.add(fact_entry["id"], normalized_content)
                 if fact_key is not None:
                     existing_fact_keys.add(fact_key)
 
@@ -1,6 +1,7 @@
 from .aio_sandbox import AioSandbox
 from .aio_sandbox_provider import AioSandboxProvider
 from .backend import SandboxBackend
+from .docker_api_backend import DockerApiBackend
 from .local_backend import LocalContainerBackend
 from .remote_backend import RemoteSandboxBackend
 from .sandbox_info import SandboxInfo
@@ -8,6 +9,7 @@ from .sandbox_info import SandboxInfo
 __all__ = [
     "AioSandbox",
     "AioSandboxProvider",
+    "DockerApiBackend",
     "LocalContainerBackend",
     "RemoteSandboxBackend",
     "SandboxBackend",
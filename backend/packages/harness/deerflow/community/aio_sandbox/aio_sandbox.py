@@ -1,40 +1,99 @@
+import asyncio
 import base64
+import inspect
+import json
 import logging
+import re
 import shlex
 import threading
 import uuid
+import weakref
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from typing import BinaryIO
 
+import httpx
+from agent_sandbox import AsyncSandbox as AsyncAioSandboxClient
 from agent_sandbox import Sandbox as AioSandboxClient
+from agent_sandbox.core.api_error import ApiError
 
+from deerflow.community.aio_sandbox import remote_archive, remote_edit, remote_grep
+from deerflow.sandbox.file_operation_lock import acquire_lock_async
 from deerflow.sandbox.sandbox import Sandbox
-from deerflow.sandbox.search import GrepMatch, path_matches, should_ignore_path, truncate_line
+from deerflow.sandbox.search import DEFAULT_LINE_SUMMARY_LENGTH, DEFAULT_MAX_FILE_SIZE_BYTES, IGNORE_PATTERNS, GrepMatch, path_matches, should_ignore_path, truncate_line
 
 logger = logging.getLogger(__name__)
 
 _ERROR_OBSERVATION_SIGNATURE = "'ErrorObservation' object has no attribute 'exit_code'"
+_REMOTE_GREP_SOURCE = inspect.getsource(remote_grep)
+_REMOTE_GREP_TIMEOUT_SECONDS = 120
+_REMOTE_EDIT_SOURCE = inspect.getsource(remote_edit)
+_REMOTE_EDIT_TIMEOUT_SECONDS = 60
+_REMOTE_ARCHIVE_SOURCE = inspect.getsource(remote_archive)
+_REMOTE_ARCHIVE_TIMEOUT_SECONDS = 600
+# Where bulk transfer archives are staged inside the container.
+_ARCHIVE_TMP_DIR = "/tmp"
+_CLIENT_TIMEOUT_SECONDS = 600
+# Statuses meaning the image has no code execution endpoint, so nothing ran.
+_MISSING_ENDPOINT_STATUSES = (404, 405, 501)
+# Connection pool of each async client; idle connections are kept alive for reuse.
+_ASYNC_CLIENT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=32)
+
+
+class _ShellSession:
+    """A persistent shell session in the container, used by one command at a time."""
+
+    def __init__(self, session_id: str | None):
+        # None is the container's default session.
+        self.id = session_id
+        self.lock = threading.Lock()
+
+
+class _PathLock:
+    """Lock for writes to one path, with the number of callers holding or waiting for it."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = 0
 
 
 class AioSandbox(Sandbox):
     """Sandbox implementation using the agent-infra/sandbox Docker container.
 
     This sandbox connects to a running AIO sandbox container via HTTP API.
-    A threading lock serializes shell commands to prevent concurrent requests
-    from corrupting the container's single persistent session (see #1433).
+    A persistent shell session corrupts when it receives concurrent requests
+    (see #1433), so shell commands run on a pool of independent sessions,
+    each used by one command at a time. Commands take the first free session,
+    so sequential commands keep using the default session (and its working
+    directory and environment); only concurrent commands spill over to the
+    others. File writes are serialized per path.
     """
 
-    def __init__(self, id: str, base_url: str, home_dir: str | None = None):
+    def __init__(self, id: str, base_url: str, home_dir: str | None = None, shell_sessions: int = 1):
         """Initialize the AIO sandbox.
 
         Args:
             id: Unique identifier for this sandbox instance.
             base_url: URL of the sandbox API (e.g., http://localhost:8080).
             home_dir: Home directory inside the sandbox. If None, will be fetched from the sandbox.
+            shell_sessions: Number of shell sessions, i.e. how many commands may run at once.
         """
         super().__init__(id)
         self._base_url = base_url
-        self._client = AioSandboxClient(base_url=base_url, timeout=600)
+        self._http_client = httpx.Client(timeout=_CLIENT_TIMEOUT_SECONDS)
+        self._client = AioSandboxClient(base_url=base_url, httpx_client=self._http_client)
         self._home_dir = home_dir
-        self._lock = threading.Lock()
+        self._sessions = [_ShellSession(None)] + [_ShellSession(str(uuid.uuid4())) for _ in range(max(shell_sessions, 1) - 1)]
+        self._free_sessions = threading.Semaphore(len(self._sessions))
+        # Lock of the default session; with one session it serializes all commands.
+        self._lock = self._sessions[0].lock
+        # Entries are dropped once no caller holds or waits for them.
+        self._path_locks: dict[str, _PathLock] = {}
+        self._path_locks_guard = threading.Lock()
+        self._async_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple[AsyncAioSandboxClient, httpx.AsyncClient]] = weakref.WeakKeyDictionary()
+        self._async_clients_guard = threading.Lock()
+        # Set once the code execution endpoint turns out to be missing; edits then rewrite whole files.
+        self._code_api_missing = False
 
     @property
     def base_url(self) -> str:
@@ -48,15 +107,120 @@ class AioSandbox(Sandbox):
             self._home_dir = context.home_dir
         return self._home_dir
 
+    @contextmanager
+    def _shell_session(self) -> Iterator[_ShellSession]:
+        """Hold the first free shell session, waiting if all are busy."""
+        self._free_sessions.acquire()
+        try:
+            # The semaphore guarantees at least one session is free.
+            session = next(session for session in self._sessions if session.lock.acquire(blocking=False))
+        except BaseException:
+            self._free_sessions.release()
+            raise
+        try:
+            yield session
+        finally:
+            session.lock.release()
+            self._free_sessions.release()
+
+    def _exec_in_session(self, session: _ShellSession, command: str):
+        if session.id is None:
+            return self._client.shell.exec_command(command=command)
+        return self._client.shell.exec_command(command=command, id=session.id)
+
+    def _checkout_path_lock(self, path: str) -> threading.Lock:
+        with self._path_locks_guard:
+            entry = self._path_locks.get(path)
+            if entry is None:
+                entry = self._path_locks[path] = _PathLock()
+            entry.users += 1
+            return entry.lock
+
+    def _return_path_lock(self, path: str) -> None:
+        with self._path_locks_guard:
+            entry = self._path_locks[path]
+            entry.users -= 1
+            if not entry.users:
+                del self._path_locks[path]
+
+    @contextmanager
+    def _path_lock(self, path: str) -> Iterator[None]:
+        """Serialize writes to one path; writes to different paths run in parallel."""
+        lock = self._checkout_path_lock(path)
+        try:
+            with lock:
+                yield
+        finally:
+            self._return_path_lock(path)
+
+    def _async_client(self) -> AsyncAioSandboxClient:
+        """Return the async client for the running event loop.
+
+        httpx connection pools belong to the loop that opened them, so each
+        loop gets its own client; calls on one loop share its keep-alive
+        connections.
+        """
+        loop = asyncio.get_running_loop()
+        with self._async_clients_guard:
+            entry = self._async_clients.get(loop)
+            if entry is None:
+                http_client = httpx.AsyncClient(timeout=_CLIENT_TIMEOUT_SECONDS, limits=_ASYNC_CLIENT_LIMITS)
+                entry = (AsyncAioSandboxClient(base_url=self._base_url, httpx_client=http_client), http_client)
+                self._async_clients[loop] = entry
+            return entry[0]
+
+    def close(self) -> None:
+        """Close the HTTP clients and their keep-alive connections.
+
+        Each async client is closed on its own event loop; clients of loops
+        that are no longer running are left to garbage collection. The
+        container keeps running; this object must not be used afterwards.
+        """
+        self._http_client.close()
+        with self._async_clients_guard:
+            entries = list(self._async_clients.items())
+            self._async_clients.clear()
+        for loop, (_, http_client) in entries:
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(http_client.aclose(), loop)
+
+    @asynccontextmanager
+    async def _ashell_session(self) -> AsyncIterator[_ShellSession]:
+        """Async form of :meth:`_shell_session`; waits without blocking the loop."""
+        await acquire_lock_async(self._free_sessions)
+        session = next(session for session in self._sessions if session.lock.acquire(blocking=False))
+        try:
+            yield session
+        finally:
+            session.lock.release()
+            self._free_sessions.release()
+
+    async def _aexec_in_session(self, session: _ShellSession, command: str):
+        client = self._async_client()
+        if session.id is None:
+            return await client.shell.exec_command(command=command)
+        return await client.shell.exec_command(command=command, id=session.id)
+
+    @asynccontextmanager
+    async def _apath_lock(self, path: str) -> AsyncIterator[None]:
+        lock = self._checkout_path_lock(path)
+        try:
+            await acquire_lock_async(lock)
+            try:
+                yield
+            finally:
+                lock.release()
+        finally:
+            self._return_path_lock(path)
+
     def execute_command(self, command: str) -> str:
         """Execute a shell command in the sandbox.
 
-        Uses a lock to serialize concurrent requests. The AIO sandbox
-        container maintains a single persistent shell session that
-        corrupts when hit with concurrent exec_command calls (returns
-        ``ErrorObservation`` instead of real output). If corruption is
-        detected despite the lock (e.g. multiple processes sharing a
-        sandbox), the command is retried on a fresh session.
+        Runs on a free shell session from the pool. A session that receives
+        concurrent exec_command calls corrupts (returns ``ErrorObservation``
+        instead of real output). If corruption is detected anyway (e.g.
+        multiple processes sharing a sandbox), the command is retried on a
+        fresh session, which then replaces the corrupted one.
 
         Args:
             command: The command to execute.
@@ -64,16 +228,14 @@ class AioSandbox(Sandbox):
         Returns:
             The output of the command.
         """
-        with self._lock:
+        with self._shell_session() as session:
             try:
-                result = self._client.shell.exec_command(command=command)
-                output = result.data.output if result.data else ""
+                output = _command_output(self._exec_in_session(session, command))
 
                 if output and _ERROR_OBSERVATION_SIGNATURE in output:
                     logger.warning("ErrorObservation detected in sandbox output, retrying with a fresh session")
-                    fresh_id = str(uuid.uuid4())
-                    result = self._client.shell.exec_command(command=command, id=fresh_id)
-                    output = result.data.output if result.data else ""
+                    session.id = str(uuid.uuid4())
+                    output = _command_output(self._exec_in_session(session, command))
 
                 return output if output else "(no output)"
             except Exception as e:
@@ -96,6 +258,30 @@ class AioSandbox(Sandbox):
             logger.error(f"Failed to read file in sandbox: {e}")
             return f"Error: {e}"
 
+    def read_file_lines(self, path: str, start_line: int, end_line: int) -> str:
+        """Read a range of lines of a file in the sandbox.
+
+        Only the requested lines are transferred; the sandbox API slices the
+        file server-side.
+
+        Args:
+            path: The absolute path of the file to read.
+            start_line: First line to return (1-indexed, inclusive).
+            end_line: Last line to return (1-indexed, inclusive).
+
+        Returns:
+            The requested lines.
+        """
+        if end_line < start_line:
+            return ""
+        try:
+            # The API takes a 0-based start and an exclusive end.
+            result = self._client.file.read_file(file=path, start_line=max(start_line, 1) - 1, end_line=end_line)
+            return _line_range_content(result)
+        except Exception as e:
+            logger.error(f"Failed to read file in sandbox: {e}")
+            return f"Error: {e}"
+
     def list_dir(self, path: str, max_depth: int = 2) -> list[str]:
         """List the contents of a directory in the sandbox.
 
@@ -106,13 +292,9 @@ class AioSandbox(Sandbox):
         Returns:
             The contents of the directory.
         """
-        with self._lock:
+        with self._shell_session() as session:
             try:
-                result = self._client.shell.exec_command(command=f"find {shlex.quote(path)} -maxdepth {max_depth} -type f -o -type d 2>/dev/null | head -500")
-                output = result.data.output if result.data else ""
-                if output:
-                    return [line.strip() for line in output.strip().split("\n") if line.strip()]
-                return []
+                return _parse_list_dir(_command_output(self._exec_in_session(session, _list_dir_command(path, max_depth))))
             except Exception as e:
                 logger.error(f"Failed to list directory in sandbox: {e}")
                 return []
@@ -125,41 +307,72 @@ class AioSandbox(Sandbox):
             content: The text content to write to the file.
             append: Whether to append the content to the file.
         """
-        with self._lock:
+        if append:
+            self.append_file(path, content)
+            return
+        with self._path_lock(path):
             try:
-                if append:
-                    existing = self.read_file(path)
-                    if not existing.startswith("Error:"):
-                        content = existing + content
                 self._client.file.write_file(file=path, content=content)
             except Exception as e:
                 logger.error(f"Failed to write file in sandbox: {e}")
                 raise
 
+    def append_file(self, path: str, content: str) -> None:
+        """Append to a file in the sandbox, sending only the appended text.
+
+        Args:
+            path: The absolute path of the file to append to.
+            content: The text to append.
+        """
+        with self._path_lock(path):
+            try:
+                self._client.file.write_file(file=path, content=content, append=True)
+            except Exception as e:
+                logger.error(f"Failed to append to file in sandbox: {e}")
+                raise
+
+    def replace_in_file(self, path: str, old_str: str, new_str: str, *, replace_all: bool = False) -> int:
+        """Replace an exact substring in a file inside the sandbox.
+
+        The edit runs in the container through the code execution API, so
+        only the two strings are sent. Images without that API (the endpoint
+        answers 404/405/501) fall back to reading and rewriting the whole
+        file. Any other failure is raised: the edit may already have been
+        applied, and running it again could apply it twice.
+
+        Args:
+            path: The absolute path of the file to edit.
+            old_str: The substring to replace.
+            new_str: The replacement.
+            replace_all: Replace every occurrence instead of only the first.
+
+        Returns:
+            The number of occurrences replaced.
+        """
+        code = _remote_edit_code(path, old_str, new_str, replace_all=replace_all)
+        with self._path_lock(path):
+            if not self._code_api_missing:
+                try:
+                    return _parse_remote_edit(self._client.code.execute_code(language="python", code=code, timeout=_REMOTE_EDIT_TIMEOUT_SECONDS), path)
+                except ApiError as e:
+                    self._raise_unless_missing_endpoint(e)
+            result = self._client.file.read_file(file=path)
+            content, replaced = _replace_content(result.data.content if result.data else "", old_str, new_str, replace_all)
+            if replaced:
+                self._client.file.write_file(file=path, content=content)
+            return replaced
+
+    def _raise_unless_missing_endpoint(self, error: ApiError) -> None:
+        """Re-raise ``error`` unless it says the code execution endpoint does not exist."""
+        if error.status_code not in _MISSING_ENDPOINT_STATUSES:
+            raise error
+        self._code_api_missing = True
+        logger.warning("Sandbox %s has no code execution API (HTTP %s); edits rewrite whole files", self.id, error.status_code)
+
     def glob(self, path: str, pattern: str, *, include_dirs: bool = False, max_results: int = 200) -> tuple[list[str], bool]:
         if not include_dirs:
-            result = self._client.file.find_files(path=path, glob=pattern)
-            files = result.data.files if result.data and result.data.files else []
-            filtered = [file_path for file_path in files if not should_ignore_path(file_path)]
-            truncated = len(filtered) > max_results
-            return filtered[:max_results], truncated
-
-        result = self._client.file.list_path(path=path, recursive=True, show_hidden=False)
-        entries = result.data.files if result.data and result.data.files else []
-        matches: list[str] = []
-        root_path = path.rstrip("/") or "/"
-        root_prefix = root_path if root_path == "/" else f"{root_path}/"
-        for entry in entries:
-            if entry.path != root_path and not entry.path.startswith(root_prefix):
-                continue
-            if should_ignore_path(entry.path):
-                continue
-            rel_path = entry.path[len(root_path) :].lstrip("/")
-            if path_matches(pattern, rel_path):
-                matches.append(entry.path)
-                if len(matches) >= max_results:
-                    return matches, True
-        return matches, False
+            return _filter_found_files(self._client.file.find_files(path=path, glob=pattern), max_results)
+        return _match_listed_paths(self._client.file.list_path(path=path, recursive=True, show_hidden=False), path, pattern, max_results)
 
     def grep(
         self,
@@ -171,13 +384,19 @@ class AioSandbox(Sandbox):
         case_sensitive: bool = False,
         max_results: int = 100,
     ) -> tuple[list[GrepMatch], bool]:
-        import re as _re
+        regex_source = _grep_regex_source(pattern, literal=literal, case_sensitive=case_sensitive)
+        try:
+            code = _remote_grep_code(path, regex_source, glob=glob, case_sensitive=case_sensitive, max_results=max_results)
+            return _parse_remote_grep(self._client.code.execute_code(language="python", code=code, timeout=_REMOTE_GREP_TIMEOUT_SECONDS), path)
+        except (FileNotFoundError, NotADirectoryError):
+            raise
+        except Exception as e:
+            # Images without the code execution API fall back to one request per file.
+            logger.warning("Single-request grep failed in sandbox %s, falling back to per-file search: %s", self.id, e)
+        return self._grep_per_file(path, regex_source, glob=glob, case_sensitive=case_sensitive, max_results=max_results)
 
-        regex_source = _re.escape(pattern) if literal else pattern
-        # Validate the pattern locally so an invalid regex raises re.error
-        # (caught by grep_tool's except re.error handler) rather than a
-        # generic remote API error.
-        _re.compile(regex_source, 0 if case_sensitive else _re.IGNORECASE)
+    def _grep_per_file(self, path: str, regex_source: str, *, glob: str | None, case_sensitive: bool, max_results: int) -> tuple[list[GrepMatch], bool]:
+        """Grep by listing candidate files and searching each with its own request."""
         regex = regex_source if case_sensitive else f"(?i){regex_source}"
 
         if glob is not None:
@@ -223,10 +442,311 @@ class AioSandbox(Sandbox):
             path: The absolute path of the file to update.
             content: The binary content to write to the file.
         """
-        with self._lock:
+        with self._path_lock(path):
             try:
                 base64_content = base64.b64encode(content).decode("utf-8")
                 self._client.file.write_file(file=path, content=base64_content, encoding="base64")
             except Exception as e:
                 logger.error(f"Failed to update file in sandbox: {e}")
                 raise
+
+    def download_file(self, path: str) -> Iterator[bytes]:
+        """Stream the raw bytes of a file out of the sandbox.
+
+        Args:
+            path: The absolute path of the file to download.
+        """
+        return self._client.file.download_file(path=path)
+
+    def upload_file(self, path: str, content: BinaryIO) -> None:
+        """Stream raw bytes into a file in the sandbox.
+
+        Args:
+            path: The absolute path of the file to write.
+            content: A binary file object to read the content from.
+        """
+        with self._path_lock(path):
+            self._client.file.upload_file(file=(path.rsplit("/", 1)[-1], content), path=path)
+
+    def create_snapshot(self, paths: list[str], archive: str, *, max_bytes: int) -> dict | None:
+        """Archive ``paths`` into ``archive`` inside the container (see ``remote_archive``).
+
+        Args:
+            paths: Absolute paths to include; missing ones are skipped.
+            archive: Where to write the ``.tar.gz`` in the container.
+            max_bytes: Maximum compressed size.
+
+        Returns:
+            ``{"archive", "size", "sha256", "paths"}``, or None if the archive
+            would exceed ``max_bytes``.
+        """
+        payload = self._archive_op({"op": "create", "paths": paths, "archive": archive, "max_bytes": max_bytes})
+        if payload.get("error") == "too_large":
+            return None
+        return payload
+
+    def restore_snapshot(self, archive: str) -> None:
+        """Extract an archive made by :meth:`create_snapshot` back to ``/`` and delete it.
+
+        Raises:
+            FileNotFoundError: If ``archive`` does not exist in the container.
+        """
+        if self._archive_op({"op": "restore", "archive": archive}).get("error") == "not_found":
+            raise FileNotFoundError(archive)
+
+    def discard_snapshot(self, archive: str) -> None:
+        """Delete an archive made by :meth:`create_snapshot` without restoring it."""
+        self._archive_op({"op": "discard", "archive": archive})
+
+    def put_archive(self, path: str, archive: BinaryIO) -> None:
+        """Stream the archive into the container in one upload and unpack it there."""
+        staged = f"{_ARCHIVE_TMP_DIR}/deerflow-put-{uuid.uuid4().hex}.tar"
+        self.upload_file(staged, archive)
+        if self._archive_op({"op": "restore", "archive": staged, "root": path, "filter": "data"}).get("error") == "not_found":
+            raise FileNotFoundError(staged)
+
+    def get_archive(self, path: str, names: list[str], out: BinaryIO) -> list[str]:
+        """Pack ``names`` in the container and stream the archive down in one download."""
+        staged = f"{_ARCHIVE_TMP_DIR}/deerflow-get-{uuid.uuid4().hex}.tar.gz"
+        try:
+            payload = self._archive_op({"op": "create", "paths": self._relative_names(names), "root": path, "archive": staged})
+            for chunk in self.download_file(staged):
+                out.write(chunk)
+        finally:
+            try:
+                self._archive_op({"op": "discard", "archive": staged})
+            except Exception as e:
+                logger.debug(f"Could not remove staged archive {staged} in sandbox {self.id}: {e}")
+        return payload["paths"]
+
+    def _archive_op(self, request: dict) -> dict:
+        result = self._client.code.execute_code(language="python", code=_remote_code(_REMOTE_ARCHIVE_SOURCE, request), timeout=_REMOTE_ARCHIVE_TIMEOUT_SECONDS)
+        return _remote_payload(result, remote_archive.RESULT_MARKER)
+
+    # ── Async API ────────────────────────────────────────────────────────
+    #
+    # Same behaviour as the sync methods above, awaiting the sandbox HTTP API
+    # through the pooled async client instead of holding a thread per call.
+
+    async def aexecute_command(self, command: str) -> str:
+        async with self._ashell_session() as session:
+            try:
+                output = _command_output(await self._aexec_in_session(session, command))
+
+                if output and _ERROR_OBSERVATION_SIGNATURE in output:
+                    logger.warning("ErrorObservation detected in sandbox output, retrying with a fresh session")
+                    session.id = str(uuid.uuid4())
+                    output = _command_output(await self._aexec_in_session(session, command))
+
+                return output if output else "(no output)"
+            except Exception as e:
+                logger.error(f"Failed to execute command in sandbox: {e}")
+                return f"Error: {e}"
+
+    async def aread_file(self, path: str) -> str:
+        try:
+            result = await self._async_client().file.read_file(file=path)
+            return result.data.content if result.data else ""
+        except Exception as e:
+            logger.error(f"Failed to read file in sandbox: {e}")
+            return f"Error: {e}"
+
+    async def aread_file_lines(self, path: str, start_line: int, end_line: int) -> str:
+        if end_line < start_line:
+            return ""
+        try:
+            result = await self._async_client().file.read_file(file=path, start_line=max(start_line, 1) - 1, end_line=end_line)
+            return _line_range_content(result)
+        except Exception as e:
+            logger.error(f"Failed to read file in sandbox: {e}")
+            return f"Error: {e}"
+
+    async def alist_dir(self, path: str, max_depth: int = 2) -> list[str]:
+        async with self._ashell_session() as session:
+            try:
+                return _parse_list_dir(_command_output(await self._aexec_in_session(session, _list_dir_command(path, max_depth))))
+            except Exception as e:
+                logger.error(f"Failed to list directory in sandbox: {e}")
+                return []
+
+    async def awrite_file(self, path: str, content: str, append: bool = False) -> None:
+        if append:
+            await self.aappend_file(path, content)
+            return
+        async with self._apath_lock(path):
+            try:
+                await self._async_client().file.write_file(file=path, content=content)
+            except Exception as e:
+                logger.error(f"Failed to write file in sandbox: {e}")
+                raise
+
+    async def aappend_file(self, path: str, content: str) -> None:
+        async with self._apath_lock(path):
+            try:
+                await self._async_client().file.write_file(file=path, content=content, append=True)
+            except Exception as e:
+                logger.error(f"Failed to append to file in sandbox: {e}")
+                raise
+
+    async def areplace_in_file(self, path: str, old_str: str, new_str: str, *, replace_all: bool = False) -> int:
+        client = self._async_client()
+        code = _remote_edit_code(path, old_str, new_str, replace_all=replace_all)
+        async with self._apath_lock(path):
+            if not self._code_api_missing:
+                try:
+                    return _parse_remote_edit(await client.code.execute_code(language="python", code=code, timeout=_REMOTE_EDIT_TIMEOUT_SECONDS), path)
+                except ApiError as e:
+                    self._raise_unless_missing_endpoint(e)
+            result = await client.file.read_file(file=path)
+            content, replaced = _replace_content(result.data.content if result.data else "", old_str, new_str, replace_all)
+            if replaced:
+                await client.file.write_file(file=path, content=content)
+            return replaced
+
+    async def aglob(self, path: str, pattern: str, *, include_dirs: bool = False, max_results: int = 200) -> tuple[list[str], bool]:
+        client = self._async_client()
+        if not include_dirs:
+            return _filter_found_files(await client.file.find_files(path=path, glob=pattern), max_results)
+        return _match_listed_paths(await client.file.list_path(path=path, recursive=True, show_hidden=False), path, pattern, max_results)
+
+    async def agrep(
+        self,
+        path: str,
+        pattern: str,
+        *,
+        glob: str | None = None,
+        literal: bool = False,
+        case_sensitive: bool = False,
+        max_results: int = 100,
+    ) -> tuple[list[GrepMatch], bool]:
+        regex_source = _grep_regex_source(pattern, literal=literal, case_sensitive=case_sensitive)
+        try:
+            code = _remote_grep_code(path, regex_source, glob=glob, case_sensitive=case_sensitive, max_results=max_results)
+            return _parse_remote_grep(await self._async_client().code.execute_code(language="python", code=code, timeout=_REMOTE_GREP_TIMEOUT_SECONDS), path)
+        except (FileNotFoundError, NotADirectoryError):
+            raise
+        except Exception as e:
+            logger.warning("Single-request grep failed in sandbox %s, falling back to per-file search: %s", self.id, e)
+        # The per-file fallback is only for old images; run it on a thread.
+        return await asyncio.to_thread(self._grep_per_file, path, regex_source, glob=glob, case_sensitive=case_sensitive, max_results=max_results)
+
+
+def _command_output(result) -> str:
+    return result.data.output if result.data else ""
+
+
+def _line_range_content(result) -> str:
+    content = result.data.content if result.data else ""
+    return content[:-1] if content.endswith("\n") else content
+
+
+def _list_dir_command(path: str, max_depth: int) -> str:
+    return f"find {shlex.quote(path)} -maxdepth {max_depth} -type f -o -type d 2>/dev/null | head -500"
+
+
+def _parse_list_dir(output: str) -> list[str]:
+    if output:
+        return [line.strip() for line in output.strip().split("\n") if line.strip()]
+    return []
+
+
+def _filter_found_files(result, max_results: int) -> tuple[list[str], bool]:
+    files = result.data.files if result.data and result.data.files else []
+    filtered = [file_path for file_path in files if not should_ignore_path(file_path)]
+    truncated = len(filtered) > max_results
+    return filtered[:max_results], truncated
+
+
+def _match_listed_paths(result, path: str, pattern: str, max_results: int) -> tuple[list[str], bool]:
+    entries = result.data.files if result.data and result.data.files else []
+    matches: list[str] = []
+    root_path = path.rstrip("/") or "/"
+    root_prefix = root_path if root_path == "/" else f"{root_path}/"
+    for entry in entries:
+        if entry.path != root_path and not entry.path.startswith(root_prefix):
+            continue
+        if should_ignore_path(entry.path):
+            continue
+        rel_path = entry.path[len(root_path) :].lstrip("/")
+        if path_matches(pattern, rel_path):
+            matches.append(entry.path)
+            if len(matches) >= max_results:
+                return matches, True
+    return matches, False
+
+
+def _grep_regex_source(pattern: str, *, literal: bool, case_sensitive: bool) -> str:
+    regex_source = re.escape(pattern) if literal else pattern
+    # Validate the pattern locally so an invalid regex raises re.error
+    # (caught by grep_tool's except re.error handler) rather than a
+    # generic remote API error.
+    re.compile(regex_source, 0 if case_sensitive else re.IGNORECASE)
+    return regex_source
+
+
+def _remote_grep_code(path: str, regex_source: str, *, glob: str | None, case_sensitive: bool, max_results: int) -> str:
+    """Return the code that runs the whole grep inside the container.
+
+    One code execution request replaces the file listing plus one
+    ``search_in_file`` request per candidate file. Matching follows
+    ``deerflow.sandbox.search`` (see ``remote_grep``).
+    """
+    request = {
+        "path": path,
+        "regex": regex_source,
+        "glob": glob,
+        "case_sensitive": case_sensitive,
+        "max_results": max_results,
+        "max_file_size": DEFAULT_MAX_FILE_SIZE_BYTES,
+        "line_summary_length": DEFAULT_LINE_SUMMARY_LENGTH,
+        "ignore_patterns": IGNORE_PATTERNS,
+    }
+    return _remote_code(_REMOTE_GREP_SOURCE, request)
+
+
+def _parse_remote_grep(result, path: str) -> tuple[list[GrepMatch], bool]:
+    payload = _remote_payload(result, remote_grep.RESULT_MARKER)
+    error = payload.get("error")
+    if error == "not_found":
+        raise FileNotFoundError(path)
+    if error == "not_a_directory":
+        raise NotADirectoryError(path)
+    matches = [GrepMatch(path=file_path, line_number=line_number, line=line) for file_path, line_number, line in payload["matches"]]
+    return matches, bool(payload["truncated"])
+
+
+def _remote_edit_code(path: str, old_str: str, new_str: str, *, replace_all: bool) -> str:
+    """Return the code that applies an exact-string replace inside the container (see ``remote_edit``)."""
+    return _remote_code(_REMOTE_EDIT_SOURCE, {"path": path, "old": old_str, "new": new_str, "replace_all": replace_all})
+
+
+def _parse_remote_edit(result, path: str) -> int:
+    payload = _remote_payload(result, remote_edit.RESULT_MARKER)
+    error = payload.get("error")
+    if error == "not_found":
+        raise FileNotFoundError(path)
+    if error == "is_a_directory":
+        raise IsADirectoryError(path)
+    return int(payload["replaced"])
+
+
+def _replace_content(content: str, old_str: str, new_str: str, replace_all: bool) -> tuple[str, int]:
+    if old_str not in content:
+        return content, 0
+    if replace_all:
+        return content.replace(old_str, new_str), content.count(old_str)
+    return content.replace(old_str, new_str, 1), 1
+
+
+def _remote_code(source: str, request: dict) -> str:
+    """Return ``source`` followed by a call of its ``main`` with ``request`` as JSON."""
+    return f"{source}\nmain({json.dumps(request)!r})\n"
+
+
+def _remote_payload(result, marker: str) -> dict:
+    """Return the JSON object a remote script printed after ``marker``."""
+    stdout = result.data.stdout if result.data else None
+    if not isinstance(stdout, str) or marker not in stdout:
+        stderr = result.data.stderr if result.data else None
+        raise RuntimeError(f"no result in code execution output: {stderr or stdout!r}"[:500])
+    return json.loads(stdout.rsplit(marker, 1)[1].splitlines()[0])
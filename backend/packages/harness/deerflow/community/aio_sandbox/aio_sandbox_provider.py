@@ -11,13 +11,18 @@ The provider itself handles:
 """
 
 import atexit
+import concurrent.futures
 import hashlib
 import logging
 import os
+import platform
+import shutil
 import signal
 import threading
 import time
 import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
 
 try:
     import fcntl
@@ -26,15 +31,18 @@ except ImportError:  # pragma: no cover - Windows fallback
     import msvcrt
 
 from deerflow.config import get_app_config
-from deerflow.config.paths import VIRTUAL_PATH_PREFIX, get_paths
+from deerflow.config.paths import VIRTUAL_PATH_PREFIX, Paths, get_paths, join_host_path
 from deerflow.sandbox.sandbox import Sandbox
 from deerflow.sandbox.sandbox_provider import SandboxProvider
 
 from .aio_sandbox import AioSandbox
 from .backend import SandboxBackend, wait_for_sandbox_ready
+from .docker_api_backend import DockerApiBackend, find_docker_socket
 from .local_backend import LocalContainerBackend
+from .prewarm import AcquireLatencyStats, PrewarmPool
 from .remote_backend import RemoteSandboxBackend
 from .sandbox_info import SandboxInfo
+from .snapshot import EnvironmentSnapshots
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +52,9 @@ DEFAULT_PORT = 8080
 DEFAULT_CONTAINER_PREFIX = "deer-flow-sandbox"
 DEFAULT_IDLE_TIMEOUT = 600  # 10 minutes in seconds
 DEFAULT_REPLICAS = 3  # Maximum concurrent sandbox containers
+DEFAULT_SHELL_SESSIONS = 4  # Concurrent shell commands per sandbox
+DEFAULT_PREWARM_MIN = 0  # Ready, unassigned containers kept for new threads (0 disables prewarming)
+DEFAULT_SNAPSHOT_MAX_MB = 512  # Compressed size cap of a saved sandbox environment
 IDLE_CHECK_INTERVAL = 60  # Check every 60 seconds
 
 
@@ -80,6 +91,13 @@ class AioSandboxProvider(SandboxProvider):
         container_prefix: deer-flow-sandbox
         idle_timeout: 600               # Idle timeout in seconds (0 to disable)
         replicas: 3                     # Max concurrent sandbox containers (LRU eviction when exceeded)
+        docker_api: null                # Docker Engine API over its unix socket instead of the CLI (default: auto on Linux)
+        shell_sessions: 4               # Shell commands that may run at once in one sandbox
+        prewarm_min: 0                  # Ready containers kept for the first turn of new threads (Docker only)
+        prewarm_max: 3                  # Upper bound when sizing the prewarm pool from demand (default: replicas)
+        snapshot_paths:                 # Container paths saved on eviction and restored for the thread's next container
+          - /home/gem/.cache/pip
+        snapshot_max_mb: 512            # Compressed size cap of a saved environment
         mounts:                         # Volume mounts for local containers
           - host_path: /path/on/host
             container_path: /path/in/container
@@ -94,6 +112,7 @@ class AioSandboxProvider(SandboxProvider):
         self._sandboxes: dict[str, AioSandbox] = {}  # sandbox_id -> AioSandbox instance
         self._sandbox_infos: dict[str, SandboxInfo] = {}  # sandbox_id -> SandboxInfo (for destroy)
         self._thread_sandboxes: dict[str, str] = {}  # thread_id -> sandbox_id
+        self._sandbox_threads: dict[str, str] = {}  # sandbox_id -> thread_id, kept while in the warm pool
         self._thread_locks: dict[str, threading.Lock] = {}  # thread_id -> in-process lock
         self._last_activity: dict[str, float] = {}  # sandbox_id -> last activity timestamp
         # Warm pool: released sandboxes whose containers are still running.
@@ -104,9 +123,17 @@ class AioSandboxProvider(SandboxProvider):
         self._shutdown_called = False
         self._idle_checker_stop = threading.Event()
         self._idle_checker_thread: threading.Thread | None = None
+        # Prewarm pool: ready containers that have never served a thread.
+        # Started below only when configured and supported by the backend.
+        self._prewarm_pool: PrewarmPool[SandboxInfo] | None = None
+        self._acquire_stats = AcquireLatencyStats()
+        # Snapshots and destroys warm-pool containers evicted for capacity,
+        # off the acquire that triggered the eviction. Created on first use.
+        self._eviction_executor: concurrent.futures.ThreadPoolExecutor | None = None
 
         self._config = self._load_config()
         self._backend: SandboxBackend = self._create_backend()
+        self._snapshots = EnvironmentSnapshots(self._config["snapshot_paths"], self._config["snapshot_max_mb"] * 1024 * 1024) if self._config.get("snapshot_paths") else None
 
         # Register shutdown handler
         atexit.register(self.shutdown)
@@ -116,6 +143,9 @@ class AioSandboxProvider(SandboxProvider):
         if self._config.get("idle_timeout", DEFAULT_IDLE_TIMEOUT) > 0:
             self._start_idle_checker()
 
+        if self._config.get("prewarm_min", DEFAULT_PREWARM_MIN) > 0:
+            self._start_prewarm_pool()
+
     # ── Factory methods ──────────────────────────────────────────────────
 
     def _create_backend(self) -> SandboxBackend:
@@ -124,7 +154,10 @@ class AioSandboxProvider(SandboxProvider):
         Selection logic (checked in order):
         1. ``provisioner_url`` set → RemoteSandboxBackend (provisioner mode)
               Provisioner dynamically creates Pods + Services in k3s.
-        2. Default → LocalContainerBackend (local mode)
+        2. Docker socket reachable and ``docker_api`` not false → DockerApiBackend
+              Same as local mode, over the Engine API instead of the CLI.
+              Automatic on Linux only, so macOS keeps preferring Apple Container.
+        3. Default → LocalContainerBackend (local mode)
               Local provider manages container lifecycle directly (start/stop).
         """
         provisioner_url = self._config.get("provisioner_url")
@@ -132,14 +165,29 @@ class AioSandboxProvider(SandboxProvider):
             logger.info(f"Using remote sandbox backend with provisioner at {provisioner_url}")
             return RemoteSandboxBackend(provisioner_url=provisioner_url)
 
+        backend_kwargs = {
+            "image": self._config["image"],
+            "base_port": self._config["port"],
+            "container_prefix": self._config["container_prefix"],
+            "config_mounts": self._config["mounts"],
+            "environment": self._config["environment"],
+        }
+        docker_api = self._config.get("docker_api")
+        if docker_api is None:
+            docker_api = platform.system() == "Linux"
+        socket_path = find_docker_socket() if docker_api else None
+        if socket_path:
+            backend = DockerApiBackend(socket_path=socket_path, **backend_kwargs)
+            if backend.ping():
+                logger.info(f"Using Docker Engine API sandbox backend at {socket_path}")
+                return backend
+            backend.close()
+            logger.warning(f"Docker daemon did not answer at {socket_path}; falling back to the container CLI")
+        elif self._config.get("docker_api"):
+            logger.warning("docker_api is enabled but no Docker unix socket was found; falling back to the container CLI")
+
         logger.info("Using local container sandbox backend")
-        return LocalContainerBackend(
-            image=self._config["image"],
-            base_port=self._config["port"],
-            container_prefix=self._config["container_prefix"],
-            config_mounts=self._config["mounts"],
-            environment=self._config["environment"],
-        )
+        return LocalContainerBackend(**backend_kwargs)
 
     # ── Configuration ────────────────────────────────────────────────────
 
@@ -150,19 +198,33 @@ class AioSandboxProvider(SandboxProvider):
 
         idle_timeout = getattr(sandbox_config, "idle_timeout", None)
         replicas = getattr(sandbox_config, "replicas", None)
+        shell_sessions = getattr(sandbox_config, "shell_sessions", None)
+        prewarm_min = getattr(sandbox_config, "prewarm_min", None)
+        prewarm_max = getattr(sandbox_config, "prewarm_max", None)
+        snapshot_max_mb = getattr(sandbox_config, "snapshot_max_mb", None)
+        replicas = replicas if replicas is not None else DEFAULT_REPLICAS
 
         return {
             "image": sandbox_config.image or DEFAULT_IMAGE,
             "port": sandbox_config.port or DEFAULT_PORT,
             "container_prefix": sandbox_config.container_prefix or DEFAULT_CONTAINER_PREFIX,
             "idle_timeout": idle_timeout if idle_timeout is not None else DEFAULT_IDLE_TIMEOUT,
-            "replicas": replicas if replicas is not None else DEFAULT_REPLICAS,
+            "replicas": replicas,
+            "shell_sessions": shell_sessions if shell_sessions is not None else DEFAULT_SHELL_SESSIONS,
+            "prewarm_min": prewarm_min if prewarm_min is not None else DEFAULT_PREWARM_MIN,
+            "prewarm_max": prewarm_max if prewarm_max is not None else replicas,
             "mounts": sandbox_config.mounts or [],
             "environment": self._resolve_env_vars(sandbox_config.environment or {}),
             # provisioner URL for dynamic pod management (e.g. http://provisioner:8002)
             "provisioner_url": getattr(sandbox_config, "provisioner_url", None) or "",
+            "docker_api": getattr(sandbox_config, "docker_api", None),
+            "snapshot_paths": list(getattr(sandbox_config, "snapshot_paths", None) or []),
+            "snapshot_max_mb": snapshot_max_mb if snapshot_max_mb is not None else DEFAULT_SNAPSHOT_MAX_MB,
         }
 
+    def _new_sandbox(self, sandbox_id: str, sandbox_url: str) -> AioSandbox:
+        return AioSandbox(id=sandbox_id, base_url=sandbox_url, shell_sessions=self._config.get("shell_sessions", DEFAULT_SHELL_SESSIONS))
+
     @staticmethod
     def _resolve_env_vars(env_config: dict[str, str]) -> dict[str, str]:
         """Resolve environment variable references (values starting with $)."""
@@ -243,6 +305,198 @@ class AioSandboxProvider(SandboxProvider):
             logger.warning(f"Could not setup skills mount: {e}")
         return None
 
+    @staticmethod
+    def _get_prewarm_slot_mounts(slot_id: str) -> list[tuple[str, str, bool]]:
+        """Create a prewarm slot's directories and return its thread-style mounts.
+
+        The slot mirrors a thread's ``user-data/`` and ``acp-workspace/``
+        layout; on handover those directories are renamed into the thread,
+        and the container's bind mounts follow them.
+        """
+        paths = get_paths()
+        slot_dir = paths.prewarm_slot_dir(slot_id)
+        for d in [
+            slot_dir / "user-data" / "workspace",
+            slot_dir / "user-data" / "uploads",
+            slot_dir / "user-data" / "outputs",
+            slot_dir / "acp-workspace",
+        ]:
+            d.mkdir(parents=True, exist_ok=True)
+            d.chmod(0o777)
+
+        host_slot_dir = paths.host_prewarm_slot_dir(slot_id)
+        return [
+            (join_host_path(host_slot_dir, "user-data", "workspace"), f"{VIRTUAL_PATH_PREFIX}/workspace", False),
+            (join_host_path(host_slot_dir, "user-data", "uploads"), f"{VIRTUAL_PATH_PREFIX}/uploads", False),
+            (join_host_path(host_slot_dir, "user-data", "outputs"), f"{VIRTUAL_PATH_PREFIX}/outputs", False),
+            (join_host_path(host_slot_dir, "acp-workspace"), "/mnt/acp-workspace", True),
+        ]
+
+    # ── Prewarm pool ─────────────────────────────────────────────────────
+
+    def _start_prewarm_pool(self) -> None:
+        """Start keeping ready containers for the first acquire of new threads."""
+        if not self._backend.supports_prewarm:
+            logger.info(f"{type(self._backend).__name__} cannot hand over prewarmed sandboxes; prewarm_min is ignored")
+            return
+        self._prewarm_pool = PrewarmPool(
+            self._create_prewarmed_sandbox,
+            self._destroy_prewarmed_sandbox,
+            min_ready=self._config["prewarm_min"],
+            max_ready=self._config.get("prewarm_max", self._config["prewarm_min"]),
+            has_capacity=self._has_prewarm_capacity,
+        )
+        self._prewarm_pool.start()
+
+    def _has_prewarm_capacity(self, pool_size: int) -> bool:
+        """Prewarmed containers only use replica slots nobody else holds."""
+        replicas = self._config.get("replicas", DEFAULT_REPLICAS)
+        with self._lock:
+            return len(self._sandboxes) + len(self._warm_pool) + pool_size < replicas
+
+    def _create_prewarmed_sandbox(self) -> SandboxInfo:
+        """Start an unassigned container with its own slot directories mounted."""
+        slot_id = f"prewarm-{uuid.uuid4().hex[:8]}"
+        extra_mounts = self._get_prewarm_slot_mounts(slot_id)
+        skills_mount = self._get_skills_mount()
+        if skills_mount:
+            extra_mounts.append(skills_mount)
+
+        info = self._backend.create(None, slot_id, extra_mounts=extra_mounts)
+        if not wait_for_sandbox_ready(info.sandbox_url, timeout=60):
+            self._destroy_prewarmed_sandbox(info)
+            raise RuntimeError(f"Prewarmed sandbox {slot_id} failed to become ready within timeout at {info.sandbox_url}")
+        logger.info(f"Prewarmed sandbox {slot_id} at {info.sandbox_url}")
+        return info
+
+    def _destroy_prewarmed_sandbox(self, info: SandboxInfo) -> None:
+        self._backend.destroy(info)
+        shutil.rmtree(get_paths().prewarm_slot_dir(info.sandbox_id), ignore_errors=True)
+
+    @staticmethod
+    def _is_new_thread(paths: Paths, thread_id: str) -> bool:
+        """True if the thread's mounted directories hold no files yet."""
+        for d in (paths.sandbox_user_data_dir(thread_id), paths.acp_workspace_dir(thread_id)):
+            for _root, _dirs, files in os.walk(d):
+                if files:
+                    return False
+        return True
+
+    @staticmethod
+    def _move_slot_into_thread(paths: Paths, slot_id: str, thread_id: str) -> None:
+        """Replace a new thread's empty directories with the slot's.
+
+        Raises:
+            OSError: If a file appeared in the thread's directories meanwhile
+                (``rmdir`` refuses non-empty directories) or a rename fails.
+        """
+        slot_dir = paths.prewarm_slot_dir(slot_id)
+        if not (slot_dir / "user-data").is_dir():
+            raise FileNotFoundError(f"Slot directory {slot_dir / 'user-data'} does not exist here")
+        for name in ("user-data", "acp-workspace"):
+            if not (slot_dir / name).exists():
+                continue  # Provisioner pool Pods mount only user-data.
+            target = paths.thread_dir(thread_id) / name
+            if target.exists():
+                for root, dirs, _files in os.walk(target, topdown=False):
+                    for d in dirs:
+                        os.rmdir(os.path.join(root, d))
+                os.rmdir(target)
+            os.rename(slot_dir / name, target)
+        slot_dir.rmdir()
+
+    def _adopt_prewarmed(self, thread_id: str, sandbox_id: str) -> str | None:
+        """Hand a prewarmed container over to a new thread.
+
+        Only threads whose directories are still empty can take one: the
+        container's mounts cannot change after start, so the slot's
+        directories become the thread's instead. Returns the sandbox_id, or
+        None if the caller should create a sandbox.
+        """
+        paths = get_paths()
+        if not self._is_new_thread(paths, thread_id):
+            return None
+        if self._prewarm_pool is None:
+            return self._claim_backend_pooled(paths, thread_id, sandbox_id)
+        info = self._prewarm_pool.take()
+        if info is None:
+            return None
+
+        try:
+            self._move_slot_into_thread(paths, info.sandbox_id, thread_id)
+        except OSError as e:
+            logger.warning(f"Could not hand prewarmed sandbox {info.sandbox_id} to thread {thread_id}: {e}")
+            self._destroy_prewarmed_sandbox(info)
+            paths.ensure_thread_dirs(thread_id)
+            return None
+
+        adopted = self._backend.adopt(info, sandbox_id)
+        if adopted is None:
+            # The thread keeps the (empty) slot directories; only the container goes.
+            self._backend.destroy(info)
+            return None
+
+        return self._register_handover(thread_id, adopted, info.sandbox_id)
+
+    def _claim_backend_pooled(self, paths: Paths, thread_id: str, sandbox_id: str) -> str | None:
+        """Hand a sandbox from the backend's own pool over to a new thread.
+
+        Same directory handover as :meth:`_adopt_prewarmed`, for backends
+        such as the provisioner that keep idle sandboxes themselves.
+        """
+        claimed = self._backend.claim_pooled(thread_id, sandbox_id)
+        if claimed is None:
+            return None
+        info, slot_id = claimed
+
+        try:
+            self._move_slot_into_thread(paths, slot_id, thread_id)
+        except OSError as e:
+            logger.warning(f"Could not hand pooled sandbox {slot_id} to thread {thread_id}: {e}")
+            self._backend.destroy(info)
+            shutil.rmtree(paths.prewarm_slot_dir(slot_id), ignore_errors=True)
+            paths.ensure_thread_dirs(thread_id)
+            return None
+
+        if not wait_for_sandbox_ready(info.sandbox_url, timeout=60):
+            logger.warning(f"Pooled sandbox {slot_id} for thread {thread_id} is not ready at {info.sandbox_url}")
+            self._backend.destroy(info)
+            return None
+        return self._register_handover(thread_id, info, slot_id)
+
+    def _register_handover(self, thread_id: str, info: SandboxInfo, source_id: str) -> str:
+        """Register a handed-over sandbox as the thread's, restoring its environment first."""
+        sandbox_id = info.sandbox_id
+        sandbox = self._new_sandbox(sandbox_id, info.sandbox_url)
+        self._restore_environment(thread_id, sandbox)
+        with self._lock:
+            self._sandboxes[sandbox_id] = sandbox
+            self._sandbox_infos[sandbox_id] = info
+            self._last_activity[sandbox_id] = time.time()
+            self._thread_sandboxes[thread_id] = sandbox_id
+            self._sandbox_threads[sandbox_id] = thread_id
+        logger.info(f"Handed prewarmed sandbox {source_id} to thread {thread_id} as {sandbox_id} at {info.sandbox_url}")
+        return sandbox_id
+
+    # ── Acquire latency ──────────────────────────────────────────────────
+
+    def _acquired(self, sandbox_id: str, kind: str, started: float) -> str:
+        elapsed = time.perf_counter() - started
+        self._acquire_stats.record(kind, elapsed)
+        logger.info(f"Acquired {kind} sandbox {sandbox_id} in {elapsed * 1000:.0f}ms")
+        return sandbox_id
+
+    def acquire_latency_stats(self) -> dict[str, dict[str, float]]:
+        """Recent acquire latency per kind (``cold``, ``prewarmed``, ``warm``, ``discovered``).
+
+        ``restore`` is the part of cold and prewarmed acquires spent restoring
+        an environment snapshot.
+
+        Returns:
+            ``{kind: {"count": n, "p50_ms": ..., "p95_ms": ...}}``.
+        """
+        return self._acquire_stats.snapshot()
+
     # ── Idle timeout management ──────────────────────────────────────────
 
     def _start_idle_checker(self) -> None:
@@ -259,10 +513,35 @@ class AioSandboxProvider(SandboxProvider):
         idle_timeout = self._config.get("idle_timeout", DEFAULT_IDLE_TIMEOUT)
         while not self._idle_checker_stop.wait(timeout=IDLE_CHECK_INTERVAL):
             try:
+                self._prune_dead_warm_pool()
                 self._cleanup_idle_sandboxes(idle_timeout)
             except Exception as e:
                 logger.error(f"Error in idle checker loop: {e}")
 
+    def _prune_dead_warm_pool(self) -> None:
+        """Forget warm-pool containers that exited, with one batched status check."""
+        with self._lock:
+            warm_infos = [info for info, _ in self._warm_pool.values()]
+        if not warm_infos:
+            return
+
+        alive = self._backend.alive_sandboxes(warm_infos)
+        dead: list[SandboxInfo] = []
+        with self._lock:
+            for info in warm_infos:
+                entry = self._warm_pool.get(info.sandbox_id)
+                if info.sandbox_id not in alive and entry is not None and entry[0] is info:
+                    del self._warm_pool[info.sandbox_id]
+                    dead.append(info)
+
+        for info in dead:
+            logger.info(f"Warm-pool sandbox {info.sandbox_id} is no longer running, dropping it")
+            try:
+                # Frees the port reservation; the container itself is already gone.
+                self._backend.destroy(info)
+            except Exception as e:
+                logger.error(f"Failed to clean up dead warm-pool sandbox {info.sandbox_id}: {e}")
+
     def _cleanup_idle_sandboxes(self, idle_timeout: float) -> None:
         current_time = time.time()
         active_to_destroy = []
@@ -287,32 +566,95 @@ class AioSandboxProvider(SandboxProvider):
         # Destroy active sandboxes (re-verify still idle before acting)
         for sandbox_id in active_to_destroy:
             try:
-                # Re-verify the sandbox is still idle under the lock before destroying.
-                # Between the snapshot above and here, the sandbox may have been
-                # re-acquired (last_activity updated) or already released/destroyed.
-                with self._lock:
-                    last_activity = self._last_activity.get(sandbox_id)
-                    if last_activity is None:
-                        # Already released or destroyed by another path — skip.
-                        logger.info(f"Sandbox {sandbox_id} already gone before idle destroy, skipping")
-                        continue
-                    if (time.time() - last_activity) < idle_timeout:
-                        # Re-acquired (activity updated) since the snapshot — skip.
-                        logger.info(f"Sandbox {sandbox_id} was re-acquired before idle destroy, skipping")
-                        continue
-                logger.info(f"Destroying idle sandbox {sandbox_id}")
-                self.destroy(sandbox_id)
+                with self._evicting(sandbox_id) as thread_id:
+                    # Re-verify the sandbox is still idle under the lock before destroying.
+                    # Between the snapshot above and here, the sandbox may have been
+                    # re-acquired (last_activity updated) or already released/destroyed.
+                    with self._lock:
+                        last_activity = self._last_activity.get(sandbox_id)
+                        info = self._sandbox_infos.get(sandbox_id)
+                        if last_activity is None or info is None:
+                            # Already released or destroyed by another path — skip.
+                            logger.info(f"Sandbox {sandbox_id} already gone before idle destroy, skipping")
+                            continue
+                        if (time.time() - last_activity) < idle_timeout:
+                            # Re-acquired (activity updated) since the snapshot — skip.
+                            logger.info(f"Sandbox {sandbox_id} was re-acquired before idle destroy, skipping")
+                            continue
+                    self._save_environment(thread_id, sandbox_id, info)
+                    logger.info(f"Destroying idle sandbox {sandbox_id}")
+                    self.destroy(sandbox_id)
             except Exception as e:
                 logger.error(f"Failed to destroy idle sandbox {sandbox_id}: {e}")
 
         # Destroy warm-pool sandboxes (already removed from _warm_pool under lock above)
         for sandbox_id, info in warm_to_destroy:
             try:
-                self._backend.destroy(info)
+                with self._evicting(sandbox_id) as thread_id:
+                    self._save_environment(thread_id, sandbox_id, info)
+                    self._backend.destroy(info)
+                with self._lock:
+                    self._sandbox_threads.pop(sandbox_id, None)
                 logger.info(f"Destroyed idle warm-pool sandbox {sandbox_id}")
             except Exception as e:
                 logger.error(f"Failed to destroy idle warm-pool sandbox {sandbox_id}: {e}")
 
+    # ── Environment snapshots ────────────────────────────────────────────
+
+    @contextmanager
+    def _evicting(self, sandbox_id: str, *, blocking: bool = True) -> Iterator[str | None]:
+        """Hold the evicted sandbox's thread lock while it is saved and destroyed.
+
+        The thread's next acquire waits, then starts a new container and
+        restores the snapshot instead of discovering the dying one. Yields the
+        thread_id, or None if it is unknown or (non-blocking) its lock is busy.
+        """
+        with self._lock:
+            thread_id = self._sandbox_threads.get(sandbox_id)
+        thread_lock = self._get_thread_lock(thread_id) if thread_id else None
+        if thread_lock is None or not thread_lock.acquire(blocking=blocking):
+            yield None
+            return
+        try:
+            yield thread_id
+        finally:
+            thread_lock.release()
+
+    def _save_environment(self, thread_id: str | None, sandbox_id: str, info: SandboxInfo) -> None:
+        """Snapshot the configured paths of a sandbox about to be evicted."""
+        if self._snapshots is None or thread_id is None:
+            return
+        with self._lock:
+            sandbox = self._sandboxes.get(sandbox_id)
+        ad_hoc = sandbox is None
+        sandbox = sandbox or self._new_sandbox(sandbox_id, info.sandbox_url)
+        started = time.perf_counter()
+        try:
+            pointer = self._snapshots.save(sandbox, get_paths().sandbox_snapshots_dir(thread_id))
+        except Exception as e:
+            logger.warning(f"Failed to snapshot sandbox {sandbox_id} of thread {thread_id}: {e}")
+            return
+        finally:
+            if ad_hoc:
+                sandbox.close()
+        if pointer is not None:
+            logger.info(f"Saved environment of sandbox {sandbox_id} for thread {thread_id} ({pointer['size'] / 1e6:.1f} MB, sha256 {pointer['sha256'][:12]}) in {time.perf_counter() - started:.1f}s")
+
+    def _restore_environment(self, thread_id: str, sandbox: AioSandbox) -> None:
+        """Restore the thread's last snapshot into a new sandbox before it is handed out."""
+        if self._snapshots is None:
+            return
+        started = time.perf_counter()
+        try:
+            pointer = self._snapshots.restore(sandbox, get_paths().sandbox_snapshots_dir(thread_id))
+        except Exception as e:
+            logger.warning(f"Failed to restore environment into sandbox {sandbox.id} for thread {thread_id}: {e}")
+            return
+        if pointer is not None:
+            elapsed = time.perf_counter() - started
+            self._acquire_stats.record("restore", elapsed)
+            logger.info(f"Restored environment ({pointer['size'] / 1e6:.1f} MB) into sandbox {sandbox.id} for thread {thread_id} in {elapsed * 1000:.0f}ms")
+
     # ── Signal handling ──────────────────────────────────────────────────
 
     def _register_signal_handlers(self) -> None:
@@ -375,7 +717,9 @@ class AioSandboxProvider(SandboxProvider):
         Layer 2: Backend discovery (covers containers started by other processes;
                  sandbox_id is deterministic from thread_id so no shared state file
                  is needed — any process can derive the same container name)
+        Layer 3: Prewarm pool for new threads, then a cold create
         """
+        started = time.perf_counter()
         # ── Layer 1: In-process cache (fast path) ──
         if thread_id:
             with self._lock:
@@ -396,29 +740,32 @@ class AioSandboxProvider(SandboxProvider):
             with self._lock:
                 if sandbox_id in self._warm_pool:
                     info, _ = self._warm_pool.pop(sandbox_id)
-                    sandbox = AioSandbox(id=sandbox_id, base_url=info.sandbox_url)
+                    sandbox = self._new_sandbox(sandbox_id, info.sandbox_url)
                     self._sandboxes[sandbox_id] = sandbox
                     self._sandbox_infos[sandbox_id] = info
                     self._last_activity[sandbox_id] = time.time()
                     self._thread_sandboxes[thread_id] = sandbox_id
+                    self._sandbox_threads[sandbox_id] = thread_id
                     logger.info(f"Reclaimed warm-pool sandbox {sandbox_id} for thread {thread_id} at {info.sandbox_url}")
-                    return sandbox_id
+                    return self._acquired(sandbox_id, "warm", started)
 
         # ── Layer 2: Backend discovery + create (protected by cross-process lock) ──
         # Use a file lock so that two processes racing to create the same sandbox
         # for the same thread_id serialize here: the second process will discover
         # the container started by the first instead of hitting a name-conflict.
         if thread_id:
-            return self._discover_or_create_with_lock(thread_id, sandbox_id)
+            return self._discover_or_create_with_lock(thread_id, sandbox_id, started)
 
-        return self._create_sandbox(thread_id, sandbox_id)
+        return self._acquired(self._create_sandbox(thread_id, sandbox_id), "cold", started)
 
-    def _discover_or_create_with_lock(self, thread_id: str, sandbox_id: str) -> str:
+    def _discover_or_create_with_lock(self, thread_id: str, sandbox_id: str, started: float | None = None) -> str:
         """Discover an existing sandbox or create a new one under a cross-process file lock.
 
         The file lock serializes concurrent sandbox creation for the same thread_id
         across multiple processes, preventing container-name conflicts.
         """
+        if started is None:
+            started = time.perf_counter()
         paths = get_paths()
         paths.ensure_thread_dirs(thread_id)
         lock_path = paths.thread_dir(thread_id) / f"{sandbox_id}.lock"
@@ -439,27 +786,33 @@ class AioSandboxProvider(SandboxProvider):
                             return existing_id
                     if sandbox_id in self._warm_pool:
                         info, _ = self._warm_pool.pop(sandbox_id)
-                        sandbox = AioSandbox(id=sandbox_id, base_url=info.sandbox_url)
+                        sandbox = self._new_sandbox(sandbox_id, info.sandbox_url)
                         self._sandboxes[sandbox_id] = sandbox
                         self._sandbox_infos[sandbox_id] = info
                         self._last_activity[sandbox_id] = time.time()
                         self._thread_sandboxes[thread_id] = sandbox_id
+                        self._sandbox_threads[sandbox_id] = thread_id
                         logger.info(f"Reclaimed warm-pool sandbox {sandbox_id} for thread {thread_id} (post-lock check)")
-                        return sandbox_id
+                        return self._acquired(sandbox_id, "warm", started)
 
                 # Backend discovery: another process may have created the container.
                 discovered = self._backend.discover(sandbox_id)
                 if discovered is not None:
-                    sandbox = AioSandbox(id=discovered.sandbox_id, base_url=discovered.sandbox_url)
+                    sandbox = self._new_sandbox(discovered.sandbox_id, discovered.sandbox_url)
                     with self._lock:
                         self._sandboxes[discovered.sandbox_id] = sandbox
                         self._sandbox_infos[discovered.sandbox_id] = discovered
                         self._last_activity[discovered.sandbox_id] = time.time()
                         self._thread_sandboxes[thread_id] = discovered.sandbox_id
+                        self._sandbox_threads[discovered.sandbox_id] = thread_id
                     logger.info(f"Discovered existing sandbox {discovered.sandbox_id} for thread {thread_id} at {discovered.sandbox_url}")
-                    return discovered.sandbox_id
+                    return self._acquired(discovered.sandbox_id, "discovered", started)
+
+                adopted_id = self._adopt_prewarmed(thread_id, sandbox_id)
+                if adopted_id is not None:
+                    return self._acquired(adopted_id, "prewarmed", started)
 
-                return self._create_sandbox(thread_id, sandbox_id)
+                return self._acquired(self._create_sandbox(thread_id, sandbox_id), "cold", started)
             finally:
                 if locked:
                     _unlock_file(lock_file)
@@ -467,6 +820,10 @@ class AioSandboxProvider(SandboxProvider):
     def _evict_oldest_warm(self) -> str | None:
         """Destroy the oldest container in the warm pool to free capacity.
 
+        With environment snapshots, the evicted container is snapshotted and
+        destroyed in the background so the caller's acquire does not wait for
+        it; the evicted thread's next acquire does.
+
         Returns:
             The evicted sandbox_id, or None if warm pool is empty.
         """
@@ -475,15 +832,53 @@ class AioSandboxProvider(SandboxProvider):
                 return None
             oldest_id = min(self._warm_pool, key=lambda sid: self._warm_pool[sid][1])
             info, _ = self._warm_pool.pop(oldest_id)
+            thread_id = self._sandbox_threads.get(oldest_id)
 
-        try:
-            self._backend.destroy(info)
-            logger.info(f"Destroyed warm-pool sandbox {oldest_id}")
-        except Exception as e:
-            logger.error(f"Failed to destroy warm-pool sandbox {oldest_id}: {e}")
-            return None
+        # Called while another thread's acquire holds its thread lock, so the
+        # evicted thread's lock is only tried, never waited for.
+        if self._snapshots is not None and thread_id is not None:
+            thread_lock = self._get_thread_lock(thread_id)
+            if thread_lock.acquire(blocking=False):
+                # A snapshot can take minutes, so it runs in the background; the
+                # evicted thread's lock is held until its container is gone.
+                try:
+                    self._get_eviction_executor().submit(self._snapshot_and_destroy, oldest_id, info, thread_id, thread_lock)
+                    return oldest_id
+                except RuntimeError:
+                    # Shutting down: destroy it here without a snapshot.
+                    thread_lock.release()
+
+        with self._evicting(oldest_id, blocking=False):
+            try:
+                self._backend.destroy(info)
+                logger.info(f"Destroyed warm-pool sandbox {oldest_id}")
+            except Exception as e:
+                logger.error(f"Failed to destroy warm-pool sandbox {oldest_id}: {e}")
+                return None
+        with self._lock:
+            self._sandbox_threads.pop(oldest_id, None)
         return oldest_id
 
+    def _get_eviction_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._lock:
+            if self._eviction_executor is None:
+                self._eviction_executor = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="sandbox-evict")
+            return self._eviction_executor
+
+    def _snapshot_and_destroy(self, sandbox_id: str, info: SandboxInfo, thread_id: str, thread_lock: threading.Lock) -> None:
+        """Save and destroy an evicted warm-pool container, then release its thread's lock."""
+        try:
+            self._save_environment(thread_id, sandbox_id, info)
+            try:
+                self._backend.destroy(info)
+                logger.info(f"Destroyed warm-pool sandbox {sandbox_id}")
+            except Exception as e:
+                logger.error(f"Failed to destroy warm-pool sandbox {sandbox_id}: {e}")
+        finally:
+            thread_lock.release()
+        with self._lock:
+            self._sandbox_threads.pop(sandbox_id, None)
+
     def _create_sandbox(self, thread_id: str | None, sandbox_id: str) -> str:
         """Create a new sandbox via the backend.
 
@@ -521,17 +916,46 @@ class AioSandboxProvider(SandboxProvider):
             self._backend.destroy(info)
             raise RuntimeError(f"Sandbox {sandbox_id} failed to become ready within timeout at {info.sandbox_url}")
 
-        sandbox = AioSandbox(id=sandbox_id, base_url=info.sandbox_url)
+        sandbox = self._new_sandbox(sandbox_id, info.sandbox_url)
+        if thread_id:
+            self._restore_environment(thread_id, sandbox)
         with self._lock:
             self._sandboxes[sandbox_id] = sandbox
             self._sandbox_infos[sandbox_id] = info
             self._last_activity[sandbox_id] = time.time()
             if thread_id:
                 self._thread_sandboxes[thread_id] = sandbox_id
+                self._sandbox_threads[sandbox_id] = thread_id
 
         logger.info(f"Created sandbox {sandbox_id} for thread {thread_id} at {info.sandbox_url}")
         return sandbox_id
 
+    @property
+    def outputs_on_host(self) -> bool:
+        # Local containers mount the thread directories; provisioner Pods may
+        # run on another node.
+        return not isinstance(self._backend, RemoteSandboxBackend)
+
+    def find(self, thread_id: str) -> Sandbox | None:
+        """Return the thread's active or warm sandbox, or a running container of another process.
+
+        Unlike :meth:`acquire`, this never creates a container or moves one
+        out of the warm pool. The result is a new client the caller owns and
+        must close when done, even when the thread's sandbox is active.
+        """
+        with self._lock:
+            sandbox_id = self._thread_sandboxes.get(thread_id)
+            info = self._sandbox_infos.get(sandbox_id) if sandbox_id is not None else None
+            if info is not None:
+                found = (sandbox_id, info)
+            else:
+                found = next(((sid, info) for sid, (info, _) in self._warm_pool.items() if self._sandbox_threads.get(sid) == thread_id), None)
+        if found is None:
+            sandbox_id = self._deterministic_sandbox_id(thread_id)
+            info = self._backend.discover(sandbox_id)
+            found = (sandbox_id, info) if info is not None else None
+        return self._new_sandbox(found[0], found[1].sandbox_url) if found is not None else None
+
     def get(self, sandbox_id: str) -> Sandbox | None:
         """Get a sandbox by ID. Updates last activity timestamp.
 
@@ -561,7 +985,7 @@ class AioSandboxProvider(SandboxProvider):
         thread_ids_to_remove: list[str] = []
 
         with self._lock:
-            self._sandboxes.pop(sandbox_id, None)
+            sandbox = self._sandboxes.pop(sandbox_id, None)
             info = self._sandbox_infos.pop(sandbox_id, None)
             thread_ids_to_remove = [tid for tid, sid in self._thread_sandboxes.items() if sid == sandbox_id]
             for tid in thread_ids_to_remove:
@@ -571,6 +995,8 @@ class AioSandboxProvider(SandboxProvider):
             if info and sandbox_id not in self._warm_pool:
                 self._warm_pool[sandbox_id] = (info, time.time())
 
+        if sandbox is not None:
+            sandbox.close()
         logger.info(f"Released sandbox {sandbox_id} to warm pool (container still running)")
 
     def destroy(self, sandbox_id: str) -> None:
@@ -586,11 +1012,12 @@ class AioSandboxProvider(SandboxProvider):
         thread_ids_to_remove: list[str] = []
 
         with self._lock:
-            self._sandboxes.pop(sandbox_id, None)
+            sandbox = self._sandboxes.pop(sandbox_id, None)
             info = self._sandbox_infos.pop(sandbox_id, None)
             thread_ids_to_remove = [tid for tid, sid in self._thread_sandboxes.items() if sid == sandbox_id]
             for tid in thread_ids_to_remove:
                 del self._thread_sandboxes[tid]
+            self._sandbox_threads.pop(sandbox_id, None)
             self._last_activity.pop(sandbox_id, None)
             # Also pull from warm pool if it was parked there
             if info is None and sandbox_id in self._warm_pool:
@@ -598,9 +1025,14 @@ class AioSandboxProvider(SandboxProvider):
             else:
                 self._warm_pool.pop(sandbox_id, None)
 
+        if sandbox is not None:
+            sandbox.close()
         if info:
             self._backend.destroy(info)
             logger.info(f"Destroyed sandbox {sandbox_id}")
+            if self._prewarm_pool is not None:
+                # A replica slot just freed up; let the pool refill now.
+                self._prewarm_pool.wake()
 
     def shutdown(self) -> None:
         """Shutdown all sandboxes. Thread-safe and idempotent."""
@@ -612,6 +1044,14 @@ class AioSandboxProvider(SandboxProvider):
             warm_items = list(self._warm_pool.items())
             self._warm_pool.clear()
 
+        if self._prewarm_pool is not None:
+            self._prewarm_pool.stop()
+            logger.info("Stopped sandbox prewarm pool")
+
+        if self._eviction_executor is not None:
+            # Let evictions in progress finish their snapshots.
+            self._eviction_executor.shutdown(wait=True)
+
         # Stop idle checker
         self._idle_checker_stop.set()
         if self._idle_checker_thread is not None and self._idle_checker_thread.is_alive():
@@ -96,3 +96,55 @@ class SandboxBackend(ABC):
             SandboxInfo if found and healthy, None otherwise.
         """
         ...
+
+    def alive_sandboxes(self, infos: list[SandboxInfo]) -> set[str]:
+        """Return the IDs of the sandboxes in ``infos`` that are still alive.
+
+        Backends that can list all their sandboxes at once should override
+        this; the default checks each one with :meth:`is_alive`.
+
+        Args:
+            infos: The sandboxes to check.
+
+        Returns:
+            sandbox_ids of the live sandboxes.
+        """
+        return {info.sandbox_id for info in infos if self.is_alive(info)}
+
+    @property
+    def supports_prewarm(self) -> bool:
+        """Whether :meth:`adopt` can hand a prewarmed sandbox over to a thread."""
+        return False
+
+    def adopt(self, info: SandboxInfo, sandbox_id: str) -> SandboxInfo | None:
+        """Re-key a running, unassigned sandbox under a thread's deterministic ID.
+
+        After this call :meth:`discover` with ``sandbox_id`` must find the
+        sandbox, so other processes see it as the thread's sandbox. Backends
+        that cannot rename a running sandbox keep the default.
+
+        Args:
+            info: The prewarmed sandbox, created with a throwaway ID.
+            sandbox_id: The deterministic sandbox ID of the receiving thread.
+
+        Returns:
+            SandboxInfo under the new ID, or None if the sandbox could not be adopted.
+        """
+        return None
+
+    def claim_pooled(self, thread_id: str, sandbox_id: str) -> tuple[SandboxInfo, str] | None:
+        """Claim a ready sandbox from a pool the backend keeps itself.
+
+        Unlike :meth:`adopt`, the pool lives outside the provider (e.g. the
+        provisioner's idle Pods). The claimed sandbox mounts a pool slot
+        directory (``Paths.prewarm_slot_dir(slot_id)``) as its user-data,
+        which the provider moves into the thread, so only new threads claim.
+
+        Args:
+            thread_id: The receiving thread.
+            sandbox_id: The deterministic sandbox ID of the receiving thread.
+
+        Returns:
+            ``(info, slot_id)``, or None if there is no pool or it is empty.
+        """
+        return None
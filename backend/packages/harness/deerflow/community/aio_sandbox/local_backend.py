@@ -222,6 +222,55 @@ class LocalContainerBackend(SandboxBackend):
             container_name=container_name,
         )
 
+    def alive_sandboxes(self, infos: list[SandboxInfo]) -> set[str]:
+        """Running sandboxes among ``infos``; one ``docker ps`` call for Docker."""
+        if self._runtime != "docker" or not infos:
+            return super().alive_sandboxes(infos)
+        try:
+            result = subprocess.run(
+                [self._runtime, "ps", "--filter", f"name=^{self._container_prefix}-", "--format", "{{.Names}}"],
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=10,
+            )
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            logger.warning(f"Failed to list sandbox containers: {getattr(e, 'stderr', e)}")
+            return {info.sandbox_id for info in infos}
+        running = set(result.stdout.split())
+        return {info.sandbox_id for info in infos if info.container_name in running}
+
+    @property
+    def supports_prewarm(self) -> bool:
+        """Prewarmed containers are handed over with ``docker rename``.
+
+        Handover also renames the mounted host directories, which the running
+        container only follows with native Linux bind mounts.
+        """
+        import platform
+
+        return self._runtime == "docker" and platform.system() == "Linux"
+
+    def adopt(self, info: SandboxInfo, sandbox_id: str) -> SandboxInfo | None:
+        """Rename a prewarmed container to the thread's deterministic name.
+
+        The port and the container keep running; only the name changes, which
+        is what :meth:`discover` looks up from other processes.
+        """
+        if not self.supports_prewarm or not info.container_name:
+            return None
+        container_name = f"{self._container_prefix}-{sandbox_id}"
+        if not self._rename_container(info.container_name, container_name):
+            return None
+        logger.info(f"Renamed prewarmed container {info.container_name} to {container_name}")
+        return SandboxInfo(
+            sandbox_id=sandbox_id,
+            sandbox_url=info.sandbox_url,
+            container_name=container_name,
+            container_id=info.container_id,
+            created_at=info.created_at,
+        )
+
     # ── Container operations ─────────────────────────────────────────────
 
     def _start_container(
@@ -313,6 +362,21 @@ class LocalContainerBackend(SandboxBackend):
         except subprocess.CalledProcessError as e:
             logger.warning(f"Failed to stop container {container_id}: {e.stderr}")
 
+    def _rename_container(self, container_name: str, new_name: str) -> bool:
+        """Rename a container; returns False (and logs) if that fails."""
+        try:
+            subprocess.run(
+                [self._runtime, "rename", container_name, new_name],
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=10,
+            )
+            return True
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            logger.warning(f"Failed to rename container {container_name} to {new_name}: {getattr(e, 'stderr', e)}")
+            return False
+
     def _is_container_running(self, container_name: str) -> bool:
         """Check if a named container is currently running.
 
@@ -0,0 +1,205 @@
+"""Proactive pool of ready, unassigned sandboxes plus acquire latency stats.
+
+The provider's warm pool only holds containers released by earlier threads,
+so the first turn of a new thread always pays the container start and the
+readiness polling. :class:`PrewarmPool` keeps ready sandboxes on hand for
+those first turns and refills in a background thread after each take.
+
+The pool is sized with Little's law: the number of sandboxes needed in
+flight is the recent take rate times how long one takes to create. The
+result is clamped to ``[min_ready, max_ready]``.
+
+Nothing here knows about containers; the provider passes ``create`` and
+``destroy`` callables, which keeps the pool testable with fakes.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+
+from deerflow.utils.stats import percentile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RATE_WINDOW = 300.0  # Seconds of takes used to estimate the demand rate
+DEFAULT_RECHECK_INTERVAL = 5.0  # Re-check capacity this often while the pool is short
+MAX_RETRY_DELAY = 60.0  # Upper bound for the back-off after failed creates
+_CREATE_TIME_ALPHA = 0.3  # EWMA weight of the newest create duration
+
+
+class PrewarmPool[T]:
+    """Keeps between ``min_ready`` and ``max_ready`` sandboxes ready to hand out.
+
+    Args:
+        create: Creates one ready sandbox. Called from the refill thread.
+        destroy: Destroys a sandbox that will never be handed out.
+        min_ready: Sandboxes kept ready regardless of demand.
+        max_ready: Upper bound for the demand-based target.
+        has_capacity: Called with the number of ready and in-flight pool
+            sandboxes; returns False when creating one more would exceed the
+            provider's capacity.
+        rate_window: Seconds of takes used to estimate the demand rate.
+        recheck_interval: Seconds between capacity re-checks while short.
+        clock: Monotonic clock, injectable for tests.
+    """
+
+    def __init__(
+        self,
+        create: Callable[[], T],
+        destroy: Callable[[T], None],
+        *,
+        min_ready: int,
+        max_ready: int,
+        has_capacity: Callable[[int], bool] | None = None,
+        rate_window: float = DEFAULT_RATE_WINDOW,
+        recheck_interval: float = DEFAULT_RECHECK_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._create = create
+        self._destroy = destroy
+        self._min_ready = min_ready
+        self._max_ready = max(min_ready, max_ready)
+        self._has_capacity = has_capacity or (lambda _count: True)
+        self._rate_window = rate_window
+        self._recheck_interval = recheck_interval
+        self._clock = clock
+
+        self._cond = threading.Condition()
+        self._ready: deque[T] = deque()
+        self._pending = 0
+        self._takes: deque[float] = deque()
+        self._create_seconds: float | None = None
+        self._stopped = False
+        self._thread: threading.Thread | None = None
+
+    # ── Sizing ───────────────────────────────────────────────────────────
+
+    def target(self) -> int:
+        """Number of ready sandboxes the pool currently aims for."""
+        with self._cond:
+            return self._target_locked()
+
+    def _target_locked(self) -> int:
+        now = self._clock()
+        while self._takes and now - self._takes[0] > self._rate_window:
+            self._takes.popleft()
+        if self._create_seconds is None or not self._takes:
+            return self._min_ready
+        demand = len(self._takes) / self._rate_window * self._create_seconds
+        return max(self._min_ready, min(self._max_ready, math.ceil(demand)))
+
+    def _should_refill_locked(self) -> bool:
+        in_pool = len(self._ready) + self._pending
+        return not self._stopped and in_pool < self._target_locked() and self._has_capacity(in_pool)
+
+    # ── Public API ───────────────────────────────────────────────────────
+
+    @property
+    def ready_count(self) -> int:
+        with self._cond:
+            return len(self._ready)
+
+    def start(self) -> None:
+        """Start the background refill thread."""
+        self._thread = threading.Thread(target=self._refill_loop, name="sandbox-prewarm", daemon=True)
+        self._thread.start()
+        logger.info(f"Started sandbox prewarm pool (min={self._min_ready}, max={self._max_ready})")
+
+    def take(self) -> T | None:
+        """Hand out a ready sandbox, or None if the pool is empty.
+
+        Every call counts as demand for sizing, hit or miss, and wakes the
+        refill thread.
+        """
+        with self._cond:
+            self._takes.append(self._clock())
+            item = self._ready.popleft() if self._ready and not self._stopped else None
+            self._cond.notify_all()
+        return item
+
+    def wake(self) -> None:
+        """Re-check the target now, e.g. after the provider freed capacity."""
+        with self._cond:
+            self._cond.notify_all()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop refilling and destroy every sandbox still in the pool."""
+        with self._cond:
+            self._stopped = True
+            leftovers = list(self._ready)
+            self._ready.clear()
+            self._cond.notify_all()
+        if self._thread is not None and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+        for item in leftovers:
+            self._safe_destroy(item)
+
+    # ── Refill thread ────────────────────────────────────────────────────
+
+    def _refill_loop(self) -> None:
+        retry_delay = 1.0
+        while True:
+            with self._cond:
+                while not self._stopped and not self._should_refill_locked():
+                    self._cond.wait(timeout=self._recheck_interval)
+                if self._stopped:
+                    return
+                self._pending += 1
+
+            started = self._clock()
+            try:
+                item = self._create()
+            except Exception as e:
+                logger.warning(f"Failed to prewarm sandbox, retrying in {retry_delay:.0f}s: {e}")
+                with self._cond:
+                    self._pending -= 1
+                    self._cond.wait(timeout=retry_delay)
+                retry_delay = min(retry_delay * 2, MAX_RETRY_DELAY)
+                continue
+            retry_delay = 1.0
+            elapsed = self._clock() - started
+
+            with self._cond:
+                self._pending -= 1
+                self._create_seconds = elapsed if self._create_seconds is None else _CREATE_TIME_ALPHA * elapsed + (1 - _CREATE_TIME_ALPHA) * self._create_seconds
+                if not self._stopped:
+                    self._ready.append(item)
+                    self._cond.notify_all()
+                    continue
+            self._safe_destroy(item)
+            return
+
+    def _safe_destroy(self, item: T) -> None:
+        try:
+            self._destroy(item)
+        except Exception as e:
+            logger.error(f"Failed to destroy prewarmed sandbox: {e}")
+
+
+class AcquireLatencyStats:
+    """Recent acquire latencies grouped by how the sandbox was obtained.
+
+    Kinds used by the provider: ``cold`` (new container), ``prewarmed``
+    (handed over from :class:`PrewarmPool`), ``warm`` (reclaimed from the
+    released-container pool) and ``discovered`` (started by another process).
+    """
+
+    def __init__(self, window: int = 256):
+        self._window = window
+        self._lock = threading.Lock()
+        self._samples: dict[str, deque[float]] = {}
+
+    def record(self, kind: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(kind, deque(maxlen=self._window)).append(seconds)
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        """Return ``{kind: {"count", "p50_ms", "p95_ms"}}`` over the recent window."""
+        with self._lock:
+            samples = {kind: sorted(values) for kind, values in self._samples.items() if values}
+        return {kind: {"count": len(values), "p50_ms": percentile(values, 0.50) * 1000, "p95_ms": percentile(values, 0.95) * 1000} for kind, values in samples.items()}
@@ -0,0 +1,104 @@
+"""Tar archive packing and unpacking that run inside the AIO sandbox container.
+
+Like ``remote_edit``, the source of this module is sent to the container's
+code execution API and run there with the Python standard library only, so
+it must not import anything from ``deerflow``. Environment snapshots and bulk
+file transfers both use it; the archive itself moves through the sandbox's
+streaming file download and upload endpoints.
+
+``create`` writes a gzip-compressed tar of ``paths`` to ``archive``, with
+entries named relative to ``root`` (``/`` unless given). The archive is
+deterministic for unchanged files (sorted entries, zero gzip timestamp), so
+its SHA-256 identifies the content and an unchanged environment yields the
+same digest. With ``max_bytes``, writing stops as soon as the compressed size
+passes it.
+
+``restore`` extracts an archive into ``root`` and deletes it; ``discard``
+only deletes it. ``filter`` is the :mod:`tarfile` extraction filter:
+``"tar"`` for snapshots taken by the sandbox itself, ``"data"`` for archives
+built outside it.
+
+The script prints one line, :data:`RESULT_MARKER` followed by a JSON object:
+``{"archive", "size", "sha256", "paths"}`` for ``create``, ``{"restored": true}``
+for ``restore``, ``{"discarded": true}`` for ``discard``, or
+``{"error": "too_large" | "not_found"}``.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tarfile
+
+RESULT_MARKER = "__DEERFLOW_ARCHIVE_RESULT__"
+
+
+class _TooLarge(Exception):
+    pass
+
+
+class _CappedWriter:
+    """File wrapper that hashes what is written and enforces an optional size cap."""
+
+    def __init__(self, handle, max_bytes):
+        self._handle = handle
+        self._max_bytes = max_bytes
+        self.size = 0
+        self.digest = hashlib.sha256()
+
+    def write(self, data):
+        self.size += len(data)
+        if self._max_bytes is not None and self.size > self._max_bytes:
+            raise _TooLarge()
+        self.digest.update(data)
+        return self._handle.write(data)
+
+    def flush(self):
+        self._handle.flush()
+
+
+def create(request):
+    root = request.get("root") or "/"
+    paths = sorted(path for path in request["paths"] if os.path.lexists(os.path.join(root, path)))
+    archive = request["archive"]
+    try:
+        with open(archive, "wb") as handle:
+            writer = _CappedWriter(handle, request.get("max_bytes"))
+            with gzip.GzipFile(fileobj=writer, mode="wb", mtime=0) as compressed:
+                with tarfile.open(fileobj=compressed, mode="w", format=tarfile.PAX_FORMAT) as tar:
+                    for path in paths:
+                        full = os.path.join(root, path)
+                        tar.add(full, arcname=os.path.relpath(full, root))
+    except _TooLarge:
+        os.remove(archive)
+        return {"error": "too_large"}
+    return {"archive": archive, "size": writer.size, "sha256": writer.digest.hexdigest(), "paths": paths}
+
+
+def restore(request):
+    archive = request["archive"]
+    root = request.get("root") or "/"
+    if not os.path.exists(archive):
+        return {"error": "not_found"}
+    try:
+        os.makedirs(root, exist_ok=True)
+        with tarfile.open(archive, "r:*") as tar:
+            if hasattr(tarfile, "tar_filter"):
+                tar.extractall(root, filter=request.get("filter") or "tar")
+            else:
+                tar.extractall(root)
+    finally:
+        os.remove(archive)
+    return {"restored": True}
+
+
+def discard(request):
+    if os.path.exists(request["archive"]):
+        os.remove(request["archive"])
+    return {"discarded": True}
+
+
+def main(request_json):
+    request = json.loads(request_json)
+    result = {"create": create, "restore": restore, "discard": discard}[request["op"]](request)
+    print(RESULT_MARKER + json.dumps(result))
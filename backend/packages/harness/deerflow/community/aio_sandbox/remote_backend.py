@@ -13,6 +13,10 @@ Architecture:
                            │   backend   │ ────────▸ │  sandbox   │
                            │             │  direct   │  Pod(s)    │
                            └─────────────┘ k3s:NPort └────────────┘
+
+New threads first try to claim one of the provisioner's idle pool Pods.
+Create and claim respond once the provisioner's Pod watch reports the Pod
+Ready, and liveness of all sandboxes is one list call.
 """
 
 from __future__ import annotations
@@ -26,6 +30,10 @@ from .sandbox_info import SandboxInfo
 
 logger = logging.getLogger(__name__)
 
+# The provisioner answers create and claim once the Pod is Ready (its own
+# READY_TIMEOUT defaults to 60s), so allow for that on top of the API calls.
+_CREATE_TIMEOUT = 90
+
 
 class RemoteSandboxBackend(SandboxBackend):
     """Backend that delegates sandbox lifecycle to the provisioner service.
@@ -84,6 +92,21 @@ class RemoteSandboxBackend(SandboxBackend):
         """
         return self._provisioner_discover(sandbox_id)
 
+    def alive_sandboxes(self, infos: list[SandboxInfo]) -> set[str]:
+        """Check all sandboxes with one ``GET /api/sandboxes`` call."""
+        if not infos:
+            return set()
+        return self._provisioner_alive(infos)
+
+    def claim_pooled(self, thread_id: str, sandbox_id: str) -> tuple[SandboxInfo, str] | None:
+        """Claim an idle Pod from the provisioner's pool.
+
+        Calls ``POST /api/sandboxes/claim``, which relabels a pre-created
+        Pod for ``sandbox_id`` and creates its Service. Returns None when
+        the provisioner's pool is disabled or empty.
+        """
+        return self._provisioner_claim(thread_id, sandbox_id)
+
     # ── Provisioner API calls ─────────────────────────────────────────────
 
     def _provisioner_create(self, thread_id: str, sandbox_id: str, extra_mounts: list[tuple[str, str, bool]] | None = None) -> SandboxInfo:
@@ -94,8 +117,9 @@ class RemoteSandboxBackend(SandboxBackend):
                 json={
                     "sandbox_id": sandbox_id,
                     "thread_id": thread_id,
+                    "wait_ready": True,
                 },
-                timeout=30,
+                timeout=_CREATE_TIMEOUT,
             )
             resp.raise_for_status()
             data = resp.json()
@@ -154,3 +178,36 @@ class RemoteSandboxBackend(SandboxBackend):
         except requests.RequestException as exc:
             logger.debug(f"Provisioner discover failed for {sandbox_id}: {exc}")
             return None
+
+    def _provisioner_alive(self, infos: list[SandboxInfo]) -> set[str]:
+        """GET /api/sandboxes → the running sandboxes among ``infos``."""
+        try:
+            resp = requests.get(f"{self._provisioner_url}/api/sandboxes", timeout=10)
+            resp.raise_for_status()
+            running = {sandbox["sandbox_id"] for sandbox in resp.json()["sandboxes"] if sandbox.get("status") == "Running"}
+        except (requests.RequestException, KeyError, ValueError) as exc:
+            logger.warning(f"Provisioner list failed: {exc}")
+            return {info.sandbox_id for info in infos}
+        return {info.sandbox_id for info in infos if info.sandbox_id in running}
+
+    def _provisioner_claim(self, thread_id: str, sandbox_id: str) -> tuple[SandboxInfo, str] | None:
+        """POST /api/sandboxes/claim → relabel an idle pool Pod + create its Service."""
+        try:
+            resp = requests.post(
+                f"{self._provisioner_url}/api/sandboxes/claim",
+                json={
+                    "sandbox_id": sandbox_id,
+                    "thread_id": thread_id,
+                    "wait_ready": True,
+                },
+                timeout=_CREATE_TIMEOUT,
+            )
+            if resp.status_code in (404, 409):
+                return None
+            resp.raise_for_status()
+            data = resp.json()
+        except requests.RequestException as exc:
+            logger.warning(f"Provisioner claim failed for {sandbox_id}: {exc}")
+            return None
+        logger.info(f"Provisioner handed pool slot {data['pool_slot']} to sandbox {sandbox_id}: sandbox_url={data['sandbox_url']}")
+        return SandboxInfo(sandbox_id=sandbox_id, sandbox_url=data["sandbox_url"]), data["pool_slot"]
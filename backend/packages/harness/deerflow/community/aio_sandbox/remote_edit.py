@@ -0,0 +1,46 @@
+"""Exact-string file patch that runs inside the AIO sandbox container.
+
+Like ``remote_grep``, the source of this module is sent to the container's
+code execution API and run there with the Python standard library only, so
+it must not import anything from ``deerflow``. Only the strings being
+replaced travel over the network, not the file.
+
+The script prints one line, :data:`RESULT_MARKER` followed by a JSON object:
+``{"replaced": count}``, or ``{"error": "not_found" | "is_a_directory"}``.
+The file is left untouched when ``count`` is 0.
+"""
+
+import json
+import os
+
+RESULT_MARKER = "__DEERFLOW_EDIT_RESULT__"
+
+
+def replace(request):
+    """Apply one replace request and return the JSON-serializable result."""
+    path = request["path"]
+    if os.path.isdir(path):
+        return {"error": "is_a_directory"}
+    try:
+        # newline="" keeps the file's line endings as they are.
+        with open(path, encoding="utf-8", newline="") as handle:
+            content = handle.read()
+    except FileNotFoundError:
+        return {"error": "not_found"}
+
+    old, new = request["old"], request["new"]
+    if old not in content:
+        return {"replaced": 0}
+    if request["replace_all"]:
+        replaced = content.count(old)
+        content = content.replace(old, new)
+    else:
+        replaced = 1
+        content = content.replace(old, new, 1)
+    with open(path, "w", encoding="utf-8", newline="") as handle:
+        handle.write(content)
+    return {"replaced": replaced}
+
+
+def main(request_json):
+    print(RESULT_MARKER + json.dumps(replace(json.loads(request_json))))
@@ -0,0 +1,119 @@
+"""Grep that runs inside the AIO sandbox container in a single request.
+
+The source of this module is sent to the container's code execution API and
+run there with the Python standard library only, so it must not import
+anything from ``deerflow``. The ignore rules and limits are passed in the
+request by :class:`AioSandbox`; the matching rules mirror
+``deerflow.sandbox.search.find_grep_matches`` and must be kept in sync with
+it.
+
+The script prints one line, :data:`RESULT_MARKER` followed by a JSON object:
+``{"matches": [[path, line_number, line], ...], "truncated": bool}``, or
+``{"error": "not_found" | "not_a_directory"}`` when the root is unusable.
+"""
+
+import fnmatch
+import json
+import os
+import re
+from pathlib import PurePosixPath
+
+RESULT_MARKER = "__DEERFLOW_GREP_RESULT__"
+
+
+def _ignore_matcher(patterns):
+    names = frozenset(os.path.normcase(p) for p in patterns if not any(c in p for c in "*?["))
+    globs = [fnmatch.translate(os.path.normcase(p)) for p in patterns if any(c in p for c in "*?[")]
+    glob_re = re.compile("|".join(globs)) if globs else None
+
+    def should_ignore_name(name):
+        name = os.path.normcase(name)
+        return name in names or (glob_re is not None and glob_re.match(name) is not None)
+
+    return should_ignore_name
+
+
+def _path_matches(pattern, rel_path):
+    path = PurePosixPath(rel_path)
+    if path.match(pattern):
+        return True
+    if pattern.startswith("**/"):
+        return path.match(pattern[3:])
+    return False
+
+
+def _truncate_line(line, max_chars):
+    line = line.rstrip("\n\r")
+    if len(line) <= max_chars:
+        return line
+    return line[: max_chars - 3] + "..."
+
+
+def _grep_file(path, regex, max_file_size, max_line_chars, line_summary_length, limit):
+    try:
+        if os.path.islink(path) or os.path.getsize(path) > max_file_size:
+            return []
+        with open(path, "rb") as handle:
+            data = handle.read(max_file_size + 1)
+    except OSError:
+        return []
+    if b"\0" in data[:8192]:
+        return []
+    text = data.decode("utf-8", errors="replace")
+    # Universal newlines, as in text-mode iteration.
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+
+    results = []
+    lines = text.split("\n")
+    last = len(lines) - 1
+    for index, line in enumerate(lines):
+        if index < last:
+            line += "\n"
+        elif not line:
+            break
+        # Skip lines longer than this to prevent ReDoS on minified / no-newline files.
+        if len(line) > max_line_chars:
+            continue
+        if regex.search(line):
+            results.append((index + 1, _truncate_line(line, line_summary_length)))
+            if len(results) >= limit:
+                break
+    return results
+
+
+def grep(request):
+    """Run one grep request and return the JSON-serializable result."""
+    # Walk the path as given so results use the caller's paths, not resolved ones.
+    root = request["path"]
+    if not os.path.exists(root):
+        return {"error": "not_found"}
+    if not os.path.isdir(root):
+        return {"error": "not_a_directory"}
+
+    flags = 0 if request["case_sensitive"] else re.IGNORECASE
+    regex = re.compile(request["regex"], flags)
+    glob_pattern = request["glob"]
+    max_results = request["max_results"]
+    line_summary_length = request["line_summary_length"]
+    should_ignore_name = _ignore_matcher(request["ignore_patterns"])
+
+    matches = []
+    for current_root, dirs, files in os.walk(root):
+        dirs[:] = [name for name in dirs if not should_ignore_name(name)]
+        rel_dir = os.path.relpath(current_root, root)
+        for name in files:
+            if should_ignore_name(name):
+                continue
+            rel_path = name if rel_dir == "." else f"{rel_dir}/{name}"
+            if glob_pattern is not None and not _path_matches(glob_pattern, rel_path):
+                continue
+            path = os.path.join(current_root, name)
+            for line_number, line in _grep_file(path, regex, request["max_file_size"], line_summary_length * 10, line_summary_length, max_results - len(matches)):
+                matches.append([path, line_number, line])
+                if len(matches) >= max_results:
+                    return {"matches": matches, "truncated": True}
+    return {"matches": matches, "truncated": False}
+
+
+def main(request_json):
+    print(RESULT_MARKER + json.dumps(grep(json.loads(request_json))))
@@ -0,0 +1,118 @@
+"""Environment snapshots that carry a thread's sandbox state across evictions.
+
+When the provider evicts a container, everything outside the mounted thread
+directories is lost: installed packages, build caches, files in the home
+directory. :class:`EnvironmentSnapshots` archives a configured list of
+container paths before the container goes and extracts the archive into the
+next container started for the same thread, before the agent sees it.
+
+Archives are content-addressed: they are stored as
+``{thread_dir}/snapshots/<sha256>.tar.gz`` with ``latest.json`` pointing at
+the current one, outside ``user-data/`` so the sandbox cannot read or alter
+them. Archiving the same environment twice yields the same digest, and the
+archive is then not downloaded again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from pathlib import Path
+
+from .aio_sandbox import AioSandbox
+
+logger = logging.getLogger(__name__)
+
+POINTER_FILE = "latest.json"
+_CONTAINER_TMP = "/tmp"
+
+
+class EnvironmentSnapshots:
+    """Saves and restores one archive of ``paths`` per thread.
+
+    Args:
+        paths: Absolute container paths to archive, e.g. a pip cache or a
+            virtualenv. Missing paths are skipped.
+        max_bytes: Compressed size cap. Larger environments are not saved,
+            and stored archives above the cap are not restored.
+    """
+
+    def __init__(self, paths: list[str], max_bytes: int):
+        self._paths = list(paths)
+        self._max_bytes = max_bytes
+
+    def save(self, sandbox: AioSandbox, snapshot_dir: Path) -> dict | None:
+        """Archive the environment of ``sandbox`` into ``snapshot_dir``.
+
+        Returns:
+            The stored pointer (``sha256``, ``size``, ``paths``,
+            ``created_at``), or None if the archive exceeded the size cap.
+        """
+        archive = f"{_CONTAINER_TMP}/deerflow-snapshot-{uuid.uuid4().hex}.tar.gz"
+        try:
+            created = sandbox.create_snapshot(self._paths, archive, max_bytes=self._max_bytes)
+            if created is None:
+                logger.warning(f"Environment of sandbox {sandbox.id} exceeds the {self._max_bytes} byte snapshot cap, not saved")
+                return None
+            snapshot_dir.mkdir(parents=True, exist_ok=True)
+            blob = snapshot_dir / f"{created['sha256']}.tar.gz"
+            if not blob.exists():
+                self._download(sandbox, archive, blob, created["sha256"])
+        finally:
+            try:
+                sandbox.discard_snapshot(archive)
+            except Exception as e:
+                logger.debug(f"Could not remove snapshot archive {archive} in sandbox {sandbox.id}: {e}")
+
+        pointer = {"sha256": created["sha256"], "size": created["size"], "paths": created["paths"], "created_at": time.time()}
+        tmp_pointer = snapshot_dir / f".{POINTER_FILE}.{uuid.uuid4().hex}"
+        tmp_pointer.write_text(json.dumps(pointer), encoding="utf-8")
+        os.replace(tmp_pointer, snapshot_dir / POINTER_FILE)
+        for old in snapshot_dir.glob("*.tar.gz"):
+            if old != blob:
+                old.unlink(missing_ok=True)
+        return pointer
+
+    def restore(self, sandbox: AioSandbox, snapshot_dir: Path) -> dict | None:
+        """Extract the thread's latest archive into ``sandbox``.
+
+        Returns:
+            The restored pointer, or None if there was nothing to restore.
+        """
+        try:
+            pointer = json.loads((snapshot_dir / POINTER_FILE).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        blob = snapshot_dir / f"{pointer['sha256']}.tar.gz"
+        if not blob.exists():
+            logger.warning(f"Snapshot {pointer['sha256']} listed in {snapshot_dir} is missing")
+            return None
+        if blob.stat().st_size > self._max_bytes:
+            logger.warning(f"Snapshot {blob} exceeds the {self._max_bytes} byte cap, not restored")
+            return None
+
+        archive = f"{_CONTAINER_TMP}/deerflow-restore-{uuid.uuid4().hex}.tar.gz"
+        with open(blob, "rb") as handle:
+            sandbox.upload_file(archive, handle)
+        sandbox.restore_snapshot(archive)
+        return pointer
+
+    @staticmethod
+    def _download(sandbox: AioSandbox, archive: str, blob: Path, sha256: str) -> None:
+        """Stream ``archive`` to ``blob``, verifying the digest before it becomes visible."""
+        tmp_blob = blob.with_name(f".{blob.name}.{uuid.uuid4().hex}")
+        digest = hashlib.sha256()
+        try:
+            with open(tmp_blob, "wb") as handle:
+                for chunk in sandbox.download_file(archive):
+                    digest.update(chunk)
+                    handle.write(chunk)
+            if digest.hexdigest() != sha256:
+                raise RuntimeError(f"Snapshot download from sandbox {sandbox.id} is corrupt (sha256 {digest.hexdigest()} != {sha256})")
+            os.replace(tmp_blob, blob)
+        finally:
+            tmp_blob.unlink(missing_ok=True)
@@ -43,6 +43,11 @@ class McpServerConfig(BaseModel):
     headers: dict[str, str] = Field(default_factory=dict, description="HTTP headers to send (for sse or http type)")
     oauth: McpOAuthConfig | None = Field(default=None, description="OAuth configuration (for sse or http type)")
     description: str = Field(default="", description="Human-readable description of what this MCP server provides")
+    sessions: int = Field(default=1, ge=0, description="Persistent sessions kept open to this server; 0 opens a new session per tool call (OAuth servers always do)")
+    max_concurrent_calls: int = Field(default=4, ge=1, description="Tool calls allowed in flight at once over the pooled sessions")
+    keepalive_seconds: float = Field(default=30.0, ge=0, description="Idle seconds between health-check pings on a pooled session; 0 disables pinging")
+    discovery_timeout_seconds: float = Field(default=30.0, gt=0, description="Seconds to wait for this server's tool list before leaving it out")
+    cache_ttl_seconds: dict[str, float] = Field(default_factory=dict, description="Seconds to cache results of this server's idempotent tools, keyed by the server's tool name")
     model_config = ConfigDict(extra="allow")
 
 
@@ -1,5 +1,7 @@
 """Configuration for memory mechanism."""
 
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
 
@@ -33,6 +35,20 @@ class MemoryConfig(BaseModel):
         le=300,
         description="Seconds to wait before processing queued updates (debounce)",
     )
+    queue_backend: Literal["memory", "sqlite"] = Field(
+        default="memory",
+        description="Backend for pending memory updates. 'memory' keeps them in-process (lost on restart); 'sqlite' persists them so a restarted process resumes the backlog and multiple workers can share the update load.",
+    )
+    queue_path: str = Field(
+        default="",
+        description="Path to the SQLite queue database when queue_backend is 'sqlite'. If empty, defaults to `{base_dir}/memory_queue.db`. Relative paths are resolved against `Paths.base_dir`.",
+    )
+    queue_lease_seconds: int = Field(
+        default=300,
+        ge=30,
+        le=3600,
+        description="Seconds a worker holds a claimed update before another worker may reclaim it (sqlite backend only)",
+    )
     model_name: str | None = Field(
         default=None,
         description="Model name to use for memory updates (None = use default model)",
@@ -49,6 +65,12 @@ class MemoryConfig(BaseModel):
         le=1.0,
         description="Minimum confidence threshold for storing facts",
     )
+    fact_dedup_threshold: float = Field(
+        default=0.7,
+        ge=0.5,
+        le=1.0,
+        description="Similarity (Jaccard over normalized character shingles) at which a new fact replaces an existing near-duplicate of the same category instead of being stored separately",
+    )
     injection_enabled: bool = Field(
         default=True,
         description="Whether to inject memory into system prompt",
@@ -57,7 +57,10 @@ class Paths:
     Directory layout (host side):
         {base_dir}/
         ├── memory.json
+        ├── memory_queue.db  <-- pending memory updates (sqlite queue backend only)
         ├── USER.md          <-- global user profile (injected into all agents)
+        ├── mcp-tools/       <-- cached MCP tool schemas, keyed by server config hash
+        ├── tool_cache.db    <-- cached results of tools with cache_ttl_seconds
         ├── agents/
         │   └── {agent_name}/
         │       ├── config.yaml
@@ -116,6 +119,21 @@ class Paths:
         """Path to the persisted memory file: `{base_dir}/memory.json`."""
         return self.base_dir / "memory.json"
 
+    @property
+    def memory_queue_file(self) -> Path:
+        """Path to the persistent memory update queue: `{base_dir}/memory_queue.db`."""
+        return self.base_dir / "memory_queue.db"
+
+    @property
+    def mcp_tool_cache_dir(self) -> Path:
+        """Directory of cached MCP tool schemas, one file per server config: `{base_dir}/mcp-tools/`."""
+        return self.base_dir / "mcp-tools"
+
+    @property
+    def tool_cache_file(self) -> Path:
+        """Path to the sqlite tier of the tool result cache: `{base_dir}/tool_cache.db`."""
+        return self.base_dir / "tool_cache.db"
+
     @property
     def user_md_file(self) -> Path:
         """Path to the global user profile file: `{base_dir}/USER.md`."""
@@ -147,6 +165,29 @@ class Paths:
         """
         return self.base_dir / "threads" / _validate_thread_id(thread_id)
 
+    def search_index_file(self, thread_id: str) -> Path:
+        """Workspace search index for a thread: `{base_dir}/threads/{thread_id}/search_index.db`.
+
+        Kept next to, not inside, `user-data/` so it is invisible to the sandbox.
+        """
+        return self.thread_dir(thread_id) / "search_index.db"
+
+    def sandbox_snapshots_dir(self, thread_id: str) -> Path:
+        """Saved sandbox environments for a thread: `{base_dir}/threads/{thread_id}/snapshots/`.
+
+        Kept next to, not inside, `user-data/` so it is invisible to the sandbox.
+        """
+        return self.thread_dir(thread_id) / "snapshots"
+
+    def prewarm_slot_dir(self, slot_id: str) -> Path:
+        """
+        Host path for an unassigned prewarmed sandbox: `{base_dir}/sandbox-pool/{slot_id}/`
+
+        Laid out like a thread directory (`user-data/`, `acp-workspace/`) so its
+        subdirectories can be moved into a thread when the sandbox is handed over.
+        """
+        return self.base_dir / "sandbox-pool" / _validate_thread_id(slot_id)
+
     def sandbox_work_dir(self, thread_id: str) -> Path:
         """
         Host path for the agent's workspace directory.
@@ -214,6 +255,10 @@ class Paths:
         """Host path for the ACP workspace mount source."""
         return _join_host_path(self.host_thread_dir(thread_id), "acp-workspace")
 
+    def host_prewarm_slot_dir(self, slot_id: str) -> str:
+        """Host path for a prewarmed sandbox's data, the mount source root."""
+        return _join_host_path(self._host_base_dir_str(), "sandbox-pool", _validate_thread_id(slot_id))
+
     def ensure_thread_dirs(self, thread_id: str) -> None:
         """Create all standard sandbox directories for a thread.
 
@@ -23,6 +23,12 @@ class SandboxConfig(BaseModel):
         replicas: Maximum number of concurrent sandbox containers (default: 3). When the limit is reached the least-recently-used sandbox is evicted to make room.
         container_prefix: Prefix for container names (default: deer-flow-sandbox)
         idle_timeout: Idle timeout in seconds before sandbox is released (default: 600 = 10 minutes). Set to 0 to disable.
+        shell_sessions: Shell sessions per sandbox, i.e. how many commands may run at once (default: 4)
+        docker_api: Use the Docker Engine API over its unix socket instead of the CLI (default: automatic on Linux)
+        prewarm_min: Ready, unassigned containers kept for the first turn of new threads (default: 0 = off, Docker on Linux only)
+        prewarm_max: Upper bound for the prewarm pool when sized from recent demand (default: replicas)
+        snapshot_paths: Container paths saved when a sandbox is evicted and restored into the thread's next sandbox (default: none)
+        snapshot_max_mb: Compressed size cap of a saved environment in MB (default: 512)
         mounts: List of volume mounts to share directories with the container
         environment: Environment variables to inject into the container (values starting with $ are resolved from host env)
     """
@@ -55,6 +61,34 @@ class SandboxConfig(BaseModel):
         default=None,
         description="Idle timeout in seconds before sandbox is released (default: 600 = 10 minutes). Set to 0 to disable.",
     )
+    shell_sessions: int | None = Field(
+        default=None,
+        ge=1,
+        description="Independent shell sessions per AIO sandbox (default: 4). Up to this many commands run in parallel; sequential commands reuse the first session.",
+    )
+    docker_api: bool | None = Field(
+        default=None,
+        description="Manage local containers through the Docker Engine API unix socket instead of the CLI (default: automatic on Linux when the socket exists). Set false to force the CLI.",
+    )
+    prewarm_min: int | None = Field(
+        default=None,
+        ge=0,
+        description="Ready, unassigned containers kept for the first turn of new threads (default: 0 = off). Requires Docker on a Linux host.",
+    )
+    prewarm_max: int | None = Field(
+        default=None,
+        ge=0,
+        description="Upper bound for the prewarm pool, which grows with the recent rate of new threads (default: replicas)",
+    )
+    snapshot_paths: list[str] = Field(
+        default_factory=list,
+        description="Absolute container paths (package dirs, caches) saved when a sandbox is evicted and restored into the thread's next sandbox. Empty disables snapshots.",
+    )
+    snapshot_max_mb: int | None = Field(
+        default=None,
+        ge=1,
+        description="Compressed size cap of a saved sandbox environment in MB (default: 512)",
+    )
     mounts: list[VolumeMountConfig] = Field(
         default_factory=list,
         description="List of volume mounts to share directories between host and container",
@@ -69,6 +103,16 @@ class SandboxConfig(BaseModel):
         ge=0,
         description="Maximum characters to keep from bash tool output. Output exceeding this limit is middle-truncated (head + tail), preserving the first and last half. Set to 0 to disable truncation.",
     )
+    bash_command_timeout: int = Field(
+        default=600,
+        ge=1,
+        description="Wall-clock limit in seconds for a single bash command run by LocalSandboxProvider. The command and its child processes are killed when it is exceeded.",
+    )
+    bash_command_max_output_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        ge=0,
+        description="Combined stdout and stderr limit in bytes for a single bash command run by LocalSandboxProvider. The command is killed once it is reached. Set to 0 to disable the limit.",
+    )
     read_file_output_max_chars: int = Field(
         default=50000,
         ge=0,
@@ -79,5 +123,14 @@ class SandboxConfig(BaseModel):
         ge=0,
         description="Maximum characters to keep from ls tool output. Output exceeding this limit is head-truncated. Set to 0 to disable truncation.",
     )
+    search_index_enabled: bool = Field(
+        default=False,
+        description="Keep a persistent per-thread token index of the workspace (LocalSandboxProvider only) so repeated grep calls skip files that cannot match instead of re-reading them.",
+    )
+    search_index_max_mb: int = Field(
+        default=64,
+        ge=1,
+        description="Upper bound on the size of each thread's search index in megabytes. Least recently used entries are evicted beyond it.",
+    )
 
     model_config = ConfigDict(extra="allow")
@@ -35,6 +35,16 @@ class SubagentsAppConfig(BaseModel):
         ge=1,
         description="Optional default max-turn override for all subagents (None = keep builtin defaults)",
     )
+    max_concurrent: int = Field(
+        default=8,
+        ge=1,
+        description="Background subagents running at once across the process; further ones queue",
+    )
+    max_concurrent_per_thread: int = Field(
+        default=3,
+        ge=1,
+        description="Background subagents running at once for one thread; further ones queue",
+    )
     agents: dict[str, SubagentOverrideConfig] = Field(
         default_factory=dict,
         description="Per-agent configuration overrides keyed by agent name",
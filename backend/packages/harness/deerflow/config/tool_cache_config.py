@@ -0,0 +1,49 @@
+"""Configuration for the tool result cache."""
+
+from pydantic import BaseModel, Field
+
+
+class ToolCacheConfig(BaseModel):
+    """Configuration for caching results of idempotent tools.
+
+    Which tools are cached, and for how long, is set where the tool is
+    configured: ``cache_ttl_seconds`` on an entry under ``tools`` in
+    config.yaml, or a per-server ``cache_ttl_seconds`` map of tool names in
+    extensions_config.json. This section configures the cache tiers.
+    """
+
+    enabled: bool = Field(
+        default=True,
+        description="Cache results of tools that set cache_ttl_seconds",
+    )
+    memory_max_entries: int = Field(
+        default=1024,
+        ge=0,
+        description="Results kept in the in-process tier (least recently used are evicted); 0 disables it",
+    )
+    sqlite: bool = Field(
+        default=True,
+        description="Also keep results in a sqlite file shared by every process and kept across restarts",
+    )
+    sqlite_path: str | None = Field(
+        default=None,
+        description="Path of the sqlite file (default: {base_dir}/tool_cache.db)",
+    )
+
+
+_tool_cache_config: ToolCacheConfig | None = None
+
+
+def get_tool_cache_config() -> ToolCacheConfig:
+    """Get the tool cache config, loading from AppConfig if needed."""
+    global _tool_cache_config
+    if _tool_cache_config is None:
+        _tool_cache_config = ToolCacheConfig()
+    return _tool_cache_config
+
+
+def load_tool_cache_config_from_dict(data: dict) -> ToolCacheConfig:
+    """Load tool cache config from a dict (called during AppConfig loading)."""
+    global _tool_cache_config
+    _tool_cache_config = ToolCacheConfig.model_validate(data)
+    return _tool_cache_config
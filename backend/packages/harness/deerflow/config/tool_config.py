@@ -17,4 +17,9 @@ class ToolConfig(BaseModel):
         ...,
         description="Variable name of the tool provider(e.g. deerflow.sandbox.tools:bash_tool)",
     )
+    cache_ttl_seconds: float | None = Field(
+        default=None,
+        gt=0,
+        description="Cache this tool's results for this many seconds; only for idempotent, read-only tools",
+    )
     model_config = ConfigDict(extra="allow")
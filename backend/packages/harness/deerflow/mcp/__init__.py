@@ -2,6 +2,9 @@
 
 from .cache import get_cached_mcp_tools, initialize_mcp_tools, reset_mcp_tools_cache
 from .client import build_server_params, build_servers_config
+from .discovery import get_mcp_discovery_stats
+from .loop import get_mcp_loop
+from .session_pool import close_mcp_session_pool, get_mcp_session_pool
 from .tools import get_mcp_tools
 
 __all__ = [
@@ -11,4 +14,8 @@ __all__ = [
     "initialize_mcp_tools",
     "get_cached_mcp_tools",
     "reset_mcp_tools_cache",
+    "get_mcp_discovery_stats",
+    "get_mcp_loop",
+    "get_mcp_session_pool",
+    "close_mcp_session_pool",
 ]
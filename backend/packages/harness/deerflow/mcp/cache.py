@@ -6,12 +6,15 @@ import os
 
 from langchain_core.tools import BaseTool
 
+from deerflow.mcp.loop import get_mcp_loop
+
 logger = logging.getLogger(__name__)
 
 _mcp_tools_cache: list[BaseTool] | None = None
 _cache_initialized = False
-_initialization_lock = asyncio.Lock()
+_initialization_lock = asyncio.Lock()  # Only used on the MCP event loop
 _config_mtime: float | None = None  # Track config file modification time
+_cache_generation = 0  # Bumped by every reset
 
 
 def _get_config_mtime() -> float | None:
@@ -56,11 +59,16 @@ def _is_cache_stale() -> bool:
 async def initialize_mcp_tools() -> list[BaseTool]:
     """Initialize and cache MCP tools.
 
-    This should be called once at application startup.
+    This should be called once at application startup. Loading runs on the
+    MCP event loop, where the tools' sessions live.
 
     Returns:
         List of LangChain tools from all enabled MCP servers.
     """
+    return await get_mcp_loop().run_async(_initialize_mcp_tools())
+
+
+async def _initialize_mcp_tools() -> list[BaseTool]:
     global _mcp_tools_cache, _cache_initialized, _config_mtime
 
     async with _initialization_lock:
@@ -70,8 +78,17 @@ async def initialize_mcp_tools() -> list[BaseTool]:
 
         from deerflow.mcp.tools import get_mcp_tools
 
+        generation = _cache_generation
+
+        def on_tools_changed(tools: list[BaseTool]) -> None:
+            # Background revalidation found new schemas; ignore it if the cache was reset since.
+            global _mcp_tools_cache
+            if _cache_generation == generation and _cache_initialized:
+                _mcp_tools_cache = tools
+                logger.info(f"MCP tools updated after revalidation: {len(tools)} tool(s)")
+
         logger.info("Initializing MCP tools...")
-        _mcp_tools_cache = await get_mcp_tools()
+        _mcp_tools_cache = await get_mcp_tools(on_tools_changed)
         _cache_initialized = True
         _config_mtime = _get_config_mtime()  # Record config file mtime
         logger.info(f"MCP tools initialized: {len(_mcp_tools_cache)} tool(s) loaded (config mtime: {_config_mtime})")
@@ -103,22 +120,8 @@ def get_cached_mcp_tools() -> list[BaseTool]:
     if not _cache_initialized:
         logger.info("MCP tools not initialized, performing lazy initialization...")
         try:
-            # Try to initialize in the current event loop
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # If loop is already running (e.g., in LangGraph Studio),
-                # we need to create a new loop in a thread
-                import concurrent.futures
-
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, initialize_mcp_tools())
-                    future.result()
-            else:
-                # If no loop is running, we can use the current loop
-                loop.run_until_complete(initialize_mcp_tools())
-        except RuntimeError:
-            # No event loop exists, create one
-            asyncio.run(initialize_mcp_tools())
+            # Block this thread (not the MCP event loop) until the tools are loaded
+            get_mcp_loop().run(_initialize_mcp_tools())
         except Exception as e:
             logger.error(f"Failed to lazy-initialize MCP tools: {e}")
             return []
@@ -131,8 +134,9 @@ def reset_mcp_tools_cache() -> None:
 
     This is useful for testing or when you want to reload MCP tools.
     """
-    global _mcp_tools_cache, _cache_initialized, _config_mtime
+    global _mcp_tools_cache, _cache_initialized, _config_mtime, _cache_generation
     _mcp_tools_cache = None
     _cache_initialized = False
     _config_mtime = None
+    _cache_generation += 1
     logger.info("MCP tools cache reset")
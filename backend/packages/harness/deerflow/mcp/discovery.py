@@ -0,0 +1,234 @@
+"""Per-server MCP tool discovery with an on-disk schema cache.
+
+Every enabled server is discovered concurrently, each under its own
+``discovery_timeout_seconds``; a server that fails or times out is left out
+and the others' tools are still returned.
+
+Tool schemas are cached under ``{base_dir}/mcp-tools/``, keyed by a hash of
+the server's config. When a cached entry matches, its tools are served at
+once and the server is listed again in the background; if its tools have
+changed, the cache file is rewritten and ``on_change`` is called with the
+new definitions.
+
+Per-server discovery latency is logged and available from
+:func:`get_mcp_discovery_stats`.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from mcp.types import Tool as MCPTool
+
+from deerflow.config.extensions_config import McpServerConfig
+from deerflow.config.paths import get_paths
+
+logger = logging.getLogger(__name__)
+
+# Settings that change how DeerFlow talks to a server, not which tools it has.
+_KEY_EXCLUDED_FIELDS = {"enabled", "description", "sessions", "max_concurrent_calls", "keepalive_seconds", "discovery_timeout_seconds", "cache_ttl_seconds"}
+
+
+def server_cache_key(server_config: McpServerConfig) -> str:
+    """Hash of the server config fields that determine its tools."""
+    payload = json.dumps(server_config.model_dump(mode="json", exclude=_KEY_EXCLUDED_FIELDS), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+async def list_all_tools(session: Any) -> list[MCPTool]:
+    """List every tool of an initialized MCP session, following pagination."""
+    tools: list[MCPTool] = []
+    cursor = None
+    while True:
+        page = await session.list_tools(cursor=cursor)
+        tools.extend(page.tools)
+        cursor = page.nextCursor
+        if not cursor:
+            return tools
+
+
+async def list_tools_per_call(connection: dict[str, Any]) -> list[MCPTool]:
+    """List a server's tools over a session opened just for this listing."""
+    from langchain_mcp_adapters.sessions import create_session
+
+    async with create_session(connection) as session:  # type: ignore[arg-type]
+        await session.initialize()
+        return await list_all_tools(session)
+
+
+class MCPSchemaCache:
+    """MCP tool definitions on disk, one JSON file per server and config hash."""
+
+    def __init__(self, directory: Path | None = None):
+        self._directory = directory
+
+    @property
+    def directory(self) -> Path:
+        return self._directory or get_paths().mcp_tool_cache_dir
+
+    def _prefix(self, server_name: str) -> str:
+        return hashlib.sha256(server_name.encode()).hexdigest()[:12]
+
+    def _path(self, server_name: str, key: str) -> Path:
+        return self.directory / f"{self._prefix(server_name)}-{key}.json"
+
+    def load(self, server_name: str, key: str) -> list[MCPTool] | None:
+        """Return the cached tools, or None when there is no readable entry."""
+        path = self._path(server_name, key)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            return [MCPTool.model_validate(tool) for tool in data["tools"]]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable MCP tool cache {path}: {e}")
+            return None
+
+    def save(self, server_name: str, key: str, tools: list[MCPTool]) -> None:
+        """Write the server's tools and remove its entries for older configs."""
+        path = self._path(server_name, key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            data = {"server": server_name, "saved_at": time.time(), "tools": [tool.model_dump(mode="json", by_alias=True, exclude_none=True) for tool in tools]}
+            temp_path = path.with_suffix(".tmp")
+            temp_path.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(temp_path, path)
+            for stale in path.parent.glob(f"{self._prefix(server_name)}-*.json"):
+                if stale != path:
+                    stale.unlink(missing_ok=True)
+        except OSError as e:
+            logger.warning(f"Failed to cache MCP tools of '{server_name}': {e}")
+
+
+@dataclass
+class DiscoveryTarget:
+    """How to discover one server's tools."""
+
+    key: str
+    timeout: float
+    list_tools: Callable[[], Awaitable[list[MCPTool]]]
+
+
+@dataclass
+class ServerDiscovery:
+    """The latest discovery of one server.
+
+    ``source`` is ``"live"``, ``"cache"`` or ``"failed"``. For cached servers,
+    ``revalidation_ms`` and ``changed`` are filled in once the background
+    listing finishes (``revalidation_error`` when it fails).
+    """
+
+    source: str
+    latency_ms: float
+    tools: int = 0
+    error: str | None = None
+    revalidation_ms: float | None = None
+    revalidation_error: str | None = None
+    changed: bool | None = None
+
+
+_stats: dict[str, ServerDiscovery] = {}
+_background: set[asyncio.Task] = set()
+
+
+def get_mcp_discovery_stats() -> dict[str, dict[str, Any]]:
+    """Latest discovery source, latency and tool count for each server."""
+    return {name: asdict(entry) for name, entry in _stats.items()}
+
+
+def _same_tools(a: list[MCPTool], b: list[MCPTool]) -> bool:
+    return [tool.model_dump(mode="json") for tool in a] == [tool.model_dump(mode="json") for tool in b]
+
+
+async def _list_live(name: str, target: DiscoveryTarget) -> list[MCPTool]:
+    try:
+        return await asyncio.wait_for(target.list_tools(), target.timeout)
+    except TimeoutError:
+        raise TimeoutError(f"MCP server '{name}' did not list its tools within {target.timeout:g}s") from None
+
+
+async def _revalidate(name: str, target: DiscoveryTarget, cached: list[MCPTool], cache: MCPSchemaCache, on_change: Callable[[str, list[MCPTool]], None] | None) -> None:
+    entry = _stats[name]
+    started = time.perf_counter()
+    try:
+        live = await _list_live(name, target)
+    except Exception as e:
+        entry.revalidation_ms = (time.perf_counter() - started) * 1000
+        entry.revalidation_error = str(e)
+        logger.warning(f"Revalidating cached MCP tools of '{name}' failed; keeping the cached schemas: {e}")
+        return
+    entry.revalidation_ms = (time.perf_counter() - started) * 1000
+    entry.changed = not _same_tools(live, cached)
+    if not entry.changed:
+        logger.info(f"MCP server '{name}': cached tools confirmed in {entry.revalidation_ms:.0f}ms")
+        return
+    cache.save(name, target.key, live)
+    entry.tools = len(live)
+    logger.info(f"MCP server '{name}': tools changed ({len(cached)} -> {len(live)}), cache updated in {entry.revalidation_ms:.0f}ms")
+    if on_change is not None:
+        on_change(name, live)
+
+
+async def _discover_server(name: str, target: DiscoveryTarget, cache: MCPSchemaCache, on_change: Callable[[str, list[MCPTool]], None] | None) -> list[MCPTool] | None:
+    started = time.perf_counter()
+    cached = cache.load(name, target.key)
+    if cached is not None:
+        _stats[name] = ServerDiscovery("cache", (time.perf_counter() - started) * 1000, len(cached))
+        logger.info(f"MCP server '{name}': {len(cached)} tool(s) from cache, revalidating in the background")
+        task = asyncio.create_task(_revalidate(name, target, cached, cache, on_change), name=f"mcp-revalidate-{name}")
+        _background.add(task)
+        task.add_done_callback(_background.discard)
+        return cached
+
+    try:
+        tools = await _list_live(name, target)
+    except Exception as e:
+        _stats[name] = ServerDiscovery("failed", (time.perf_counter() - started) * 1000, error=str(e) or type(e).__name__)
+        logger.error(f"MCP server '{name}': discovery failed after {_stats[name].latency_ms:.0f}ms: {_stats[name].error}")
+        return None
+    _stats[name] = ServerDiscovery("live", (time.perf_counter() - started) * 1000, len(tools))
+    logger.info(f"MCP server '{name}': discovered {len(tools)} tool(s) in {_stats[name].latency_ms:.0f}ms")
+    cache.save(name, target.key, tools)
+    return tools
+
+
+async def discover_tools(
+    targets: dict[str, DiscoveryTarget],
+    cache: MCPSchemaCache | None = None,
+    on_change: Callable[[str, list[MCPTool]], None] | None = None,
+) -> dict[str, list[MCPTool]]:
+    """Discover every server concurrently.
+
+    Args:
+        targets: Servers to discover, by name.
+        cache: Schema cache; defaults to the one under the DeerFlow base dir.
+        on_change: Called with a server's new definitions when background
+            revalidation finds that its cached tools are out of date.
+
+    Returns:
+        The latest tool definitions by server name: a cached server whose
+        revalidation finished while other servers were still being discovered
+        is returned with its new definitions. Servers that failed are omitted.
+    """
+    cache = cache or MCPSchemaCache()
+    for name in set(_stats) - set(targets):
+        del _stats[name]
+    revalidated: dict[str, list[MCPTool]] = {}
+
+    def record_change(name: str, tools: list[MCPTool]) -> None:
+        revalidated[name] = tools
+        if on_change is not None:
+            on_change(name, tools)
+
+    names = list(targets)
+    results = await asyncio.gather(*(_discover_server(name, targets[name], cache, record_change) for name in names))
+    found = {name: tools for name, tools in zip(names, results) if tools is not None}
+    found.update(revalidated)
+    return found
@@ -0,0 +1,101 @@
+"""The event loop every MCP session and tool call runs on.
+
+MCP sessions are bound to the event loop that opened them, while DeerFlow
+calls MCP tools from the server's loop, from synchronous code (the embedded
+client streams synchronously) and from worker threads. Rather than creating
+and destroying an event loop per call with ``asyncio.run``, all MCP work
+runs on one long-lived loop in a background thread:
+
+- synchronous callers use :meth:`MCPEventLoop.run`, which blocks on the result;
+- coroutines on other loops use :meth:`MCPEventLoop.run_async`.
+
+Concurrency is limited per server (see ``max_concurrent_calls`` in
+``extensions_config.json``), not by the size of a thread pool.
+"""
+
+import asyncio
+import atexit
+import logging
+import threading
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_STOP_TIMEOUT_SECONDS = 10.0
+
+
+class MCPEventLoop:
+    """A long-lived event loop running in a daemon thread, started on first use."""
+
+    def __init__(self, name: str = "mcp-loop"):
+        self._name = name
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The running loop, started if needed."""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=loop.run_forever, name=self._name, daemon=True)
+                self._thread.start()
+                self._loop = loop
+                logger.debug(f"Started MCP event loop thread '{self._name}'")
+            return self._loop
+
+    def in_loop_thread(self) -> bool:
+        """Whether the caller is running on this loop's thread."""
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+        """Run ``coro`` on the loop and block until it finishes.
+
+        Raises:
+            RuntimeError: When called from the loop's own thread, where blocking would deadlock.
+            TimeoutError: When ``timeout`` elapses first; the coroutine is cancelled.
+        """
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError("MCPEventLoop.run() called from the MCP event loop; await run_async() instead")
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    async def run_async(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Await ``coro`` on the loop from any event loop (inline when already on it)."""
+        loop = self.loop
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def close(self) -> None:
+        """Stop the loop and join its thread; a later call starts a new loop."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=_STOP_TIMEOUT_SECONDS)
+            if not thread.is_alive():
+                loop.close()
+
+
+_mcp_loop = MCPEventLoop()
+
+
+def get_mcp_loop() -> MCPEventLoop:
+    """Return the process-wide MCP event loop."""
+    return _mcp_loop
+
+
+atexit.register(_mcp_loop.close)
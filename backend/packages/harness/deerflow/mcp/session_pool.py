@@ -0,0 +1,361 @@
+"""Long-lived MCP sessions shared by every tool call.
+
+Without a pool, langchain-mcp-adapters opens a new session for each tool
+call: stdio servers are spawned again and HTTP servers repeat the
+initialize handshake. :class:`MCPSessionPool` keeps ``sessions`` sessions
+per server open, pings them every ``keepalive_seconds`` and reconnects with
+backoff when a ping or a call shows the connection is gone. At most
+``max_concurrent_calls`` calls run against one server at a time.
+
+MCP sessions hold anyio task groups, which must be entered and exited by the
+same task on the same event loop. The pool therefore runs every session on
+the MCP event loop (:mod:`deerflow.mcp.loop`); callers on any other loop are
+forwarded to it.
+
+:meth:`MCPSessionPool.load_tools` lists each server's tools over a pooled
+session and converts them with langchain-mcp-adapters, handing it a proxy
+session that sends every call through the pool.
+"""
+
+import asyncio
+import atexit
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from langchain_core.tools import BaseTool
+
+from deerflow.mcp.discovery import list_all_tools
+from deerflow.mcp.loop import MCPEventLoop, get_mcp_loop
+
+logger = logging.getLogger(__name__)
+
+_CONNECT_TIMEOUT_SECONDS = 30.0
+_PING_TIMEOUT_SECONDS = 10.0
+_RECONNECT_BACKOFF_SECONDS = (0.5, 30.0)
+_CLOSE_TIMEOUT_SECONDS = 10.0
+
+
+@dataclass(frozen=True)
+class PooledServer:
+    """How the pool connects to one MCP server.
+
+    Attributes:
+        connection: langchain-mcp-adapters connection parameters, as built by
+            :func:`deerflow.mcp.client.build_server_params`.
+        sessions: Sessions kept open to the server.
+        max_concurrent_calls: Tool calls allowed in flight at once.
+        keepalive_seconds: Idle seconds between pings; 0 disables pinging.
+    """
+
+    connection: dict[str, Any]
+    sessions: int = 1
+    max_concurrent_calls: int = 4
+    keepalive_seconds: float = 30.0
+
+
+class _Slot:
+    """One long-lived session, kept open by its own task."""
+
+    def __init__(self):
+        self.session: Any = None
+        self.ready = asyncio.Event()
+        self.broken = asyncio.Event()
+        self.in_flight = 0
+        self.task: asyncio.Task | None = None
+
+
+@dataclass
+class _ServerStats:
+    calls: int = 0
+    errors: int = 0
+    connects: int = 0
+    connect_failures: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    connect_ms: float | None = None
+
+
+class _Server:
+    def __init__(self, name: str, spec: PooledServer):
+        self.name = name
+        self.spec = spec
+        self.slots = [_Slot() for _ in range(spec.sessions)]
+        self.calls = asyncio.Semaphore(spec.max_concurrent_calls)
+        self.closing = False
+        self.stats = _ServerStats()
+
+
+class _PooledSession:
+    """Stands in for a ``ClientSession`` in adapter tools; calls go through the pool."""
+
+    def __init__(self, pool: "MCPSessionPool", server_name: str):
+        self._pool = pool
+        self._server_name = server_name
+
+    async def call_tool(self, name: str, arguments: dict[str, Any] | None = None, read_timeout_seconds: Any = None, progress_callback: Any = None, **kwargs: Any) -> Any:
+        return await self._pool.call_tool(self._server_name, name, arguments, read_timeout_seconds=read_timeout_seconds, progress_callback=progress_callback)
+
+
+def _connection_lost(exc: BaseException) -> bool:
+    """Whether ``exc`` means the session is unusable and must be reopened.
+
+    Timeouts are not: a slow tool call says nothing about the shared session.
+    """
+    import anyio
+    from mcp.shared.exceptions import McpError
+    from mcp.types import CONNECTION_CLOSED
+
+    if isinstance(exc, TimeoutError):  # A subclass of OSError
+        return False
+    if isinstance(exc, (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream, OSError)):
+        return True
+    if isinstance(exc, McpError) and exc.error.code == CONNECTION_CLOSED:
+        return True
+    try:
+        import httpx
+
+        return isinstance(exc, httpx.TransportError) and not isinstance(exc, httpx.TimeoutException)
+    except ImportError:
+        return False
+
+
+def _request_not_sent(exc: BaseException) -> bool:
+    """Whether the session failed before the request reached the server, so a retry is safe."""
+    import anyio
+
+    return isinstance(exc, (anyio.ClosedResourceError, anyio.BrokenResourceError))
+
+
+class MCPSessionPool:
+    """Keeps MCP client sessions open and routes tool calls through them."""
+
+    def __init__(self, loop: MCPEventLoop | None = None):
+        self._servers: dict[str, _Server] = {}
+        self._loop = loop or get_mcp_loop()
+
+    # ── Public API (callable from any event loop) ──
+
+    async def configure(self, servers: dict[str, PooledServer]) -> None:
+        """Pool exactly ``servers``: open new ones, and close removed or changed ones."""
+        if not servers and not self._servers:
+            return
+        await self._loop.run_async(self._configure(servers))
+
+    async def call_tool(self, server_name: str, tool_name: str, arguments: dict[str, Any] | None = None, *, read_timeout_seconds: Any = None, progress_callback: Any = None) -> Any:
+        """Call a tool over a pooled session and return the MCP ``CallToolResult``."""
+        return await self._loop.run_async(self._call_tool(server_name, tool_name, arguments, read_timeout_seconds, progress_callback))
+
+    async def list_tools(self, server_name: str) -> list[Any]:
+        """List a server's MCP tool definitions over a pooled session."""
+        return await self._loop.run_async(self._list_tools(server_name))
+
+    def build_tools(self, server_name: str, definitions: list[Any], tool_interceptors: list[Any] | None = None) -> list[BaseTool]:
+        """Convert a server's MCP tool definitions into LangChain tools bound to the pool."""
+        from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+
+        session = _PooledSession(self, server_name)
+        return [convert_mcp_tool_to_langchain_tool(session, tool, tool_interceptors=tool_interceptors, server_name=server_name, tool_name_prefix=True) for tool in definitions]  # type: ignore[arg-type]
+
+    async def load_tools(self, tool_interceptors: list[Any] | None = None) -> list[BaseTool]:
+        """Return LangChain tools for every pooled server, named ``<server>_<tool>``.
+
+        A server whose tools cannot be listed is logged and skipped.
+        """
+        names = list(self._servers)
+        results = await asyncio.gather(*(self.list_tools(name) for name in names), return_exceptions=True)
+        tools: list[BaseTool] = []
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to list tools of MCP server '{name}': {result}")
+                continue
+            tools.extend(self.build_tools(name, result, tool_interceptors))
+        return tools
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Per-server sessions, call counts and reconnects."""
+        stats = {}
+        for name, server in list(self._servers.items()):
+            stats[name] = {
+                "sessions": len(server.slots),
+                "sessions_open": sum(1 for slot in server.slots if slot.ready.is_set()),
+                "max_concurrent_calls": server.spec.max_concurrent_calls,
+                **vars(server.stats),
+            }
+        return stats
+
+    async def aclose(self) -> None:
+        """Close every session."""
+        if not self._servers:
+            return
+        try:
+            await asyncio.wait_for(self._loop.run_async(self._close_all()), _CLOSE_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning(f"MCP session pool did not close cleanly: {e}")
+
+    def close(self) -> None:
+        """Synchronous :meth:`aclose`, for callers without an event loop."""
+        if not self._servers:
+            return
+        try:
+            self._loop.run(self._close_all(), timeout=_CLOSE_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning(f"MCP session pool did not close cleanly: {e}")
+
+    # ── Pool loop internals ──
+
+    async def _configure(self, servers: dict[str, PooledServer]) -> None:
+        for name in list(self._servers):
+            if servers.get(name) != self._servers[name].spec:
+                await self._close_server(self._servers.pop(name))
+        for name, spec in servers.items():
+            if name not in self._servers:
+                server = self._servers[name] = _Server(name, spec)
+                for slot in server.slots:
+                    slot.task = asyncio.create_task(self._keep_session(server, slot), name=f"mcp-session-{name}")
+                logger.info(f"MCP session pool: {name} ({spec.sessions} session(s), {spec.max_concurrent_calls} concurrent call(s))")
+
+    async def _keep_session(self, server: _Server, slot: _Slot) -> None:
+        """Open a session, keep it alive, and reopen it whenever it breaks."""
+        from langchain_mcp_adapters.sessions import create_session
+
+        backoff = _RECONNECT_BACKOFF_SECONDS[0]
+        while not server.closing:
+            started = time.perf_counter()
+            try:
+                async with create_session(server.spec.connection) as session:  # type: ignore[arg-type]
+                    await asyncio.wait_for(session.initialize(), _CONNECT_TIMEOUT_SECONDS)
+                    server.stats.connects += 1
+                    server.stats.connect_ms = (time.perf_counter() - started) * 1000
+                    slot.session = session
+                    slot.broken.clear()
+                    slot.ready.set()
+                    backoff = _RECONNECT_BACKOFF_SECONDS[0]
+                    await self._keepalive(server, slot)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not slot.ready.is_set():
+                    server.stats.connect_failures += 1
+                if not server.closing:
+                    logger.warning(f"MCP session to '{server.name}' lost: {e!r}; reconnecting in {backoff:.1f}s")
+            finally:
+                slot.ready.clear()
+                slot.session = None
+            if server.closing:
+                return
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, _RECONNECT_BACKOFF_SECONDS[1])
+
+    async def _keepalive(self, server: _Server, slot: _Slot) -> None:
+        """Return when a call reports the session broken; raise when a ping fails."""
+        interval = server.spec.keepalive_seconds or None
+        while not server.closing:
+            try:
+                await asyncio.wait_for(slot.broken.wait(), interval)
+                return
+            except TimeoutError:
+                pass
+            if slot.in_flight == 0:
+                await asyncio.wait_for(slot.session.send_ping(), _PING_TIMEOUT_SECONDS)
+
+    async def _ready_slot(self, server: _Server) -> _Slot:
+        deadline = time.monotonic() + _CONNECT_TIMEOUT_SECONDS
+        while True:
+            ready = [slot for slot in server.slots if slot.ready.is_set() and not slot.broken.is_set()]
+            if ready:
+                return min(ready, key=lambda slot: slot.in_flight)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or server.closing:
+                raise ConnectionError(f"MCP server '{server.name}' is not reachable")
+            waiters = [asyncio.ensure_future(slot.ready.wait()) for slot in server.slots]
+            try:
+                await asyncio.wait(waiters, timeout=min(remaining, 0.5), return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for waiter in waiters:
+                    waiter.cancel()
+
+    def _server(self, server_name: str) -> _Server:
+        server = self._servers.get(server_name)
+        if server is None:
+            raise ConnectionError(f"MCP server '{server_name}' is not in the session pool")
+        return server
+
+    async def _call_tool(self, server_name: str, tool_name: str, arguments: dict[str, Any] | None, read_timeout_seconds: Any, progress_callback: Any) -> Any:
+        server = self._server(server_name)
+        async with server.calls:
+            server.stats.in_flight += 1
+            server.stats.peak_in_flight = max(server.stats.peak_in_flight, server.stats.in_flight)
+            try:
+                for attempt in range(2):
+                    slot = await self._ready_slot(server)
+                    slot.in_flight += 1
+                    try:
+                        result = await slot.session.call_tool(tool_name, arguments, read_timeout_seconds=read_timeout_seconds, progress_callback=progress_callback)
+                        server.stats.calls += 1
+                        return result
+                    except Exception as e:
+                        if _connection_lost(e):
+                            slot.broken.set()
+                            if attempt == 0 and _request_not_sent(e):
+                                logger.info(f"MCP session to '{server_name}' was closed before calling {tool_name}; retrying on a fresh session")
+                                continue
+                        server.stats.errors += 1
+                        raise
+                    finally:
+                        slot.in_flight -= 1
+            finally:
+                server.stats.in_flight -= 1
+        raise AssertionError("unreachable")
+
+    async def _list_tools(self, server_name: str) -> list[Any]:
+        server = self._server(server_name)
+        async with server.calls:
+            slot = await self._ready_slot(server)
+            return await list_all_tools(slot.session)
+
+    async def _close_server(self, server: _Server) -> None:
+        server.closing = True
+        tasks = [slot.task for slot in server.slots if slot.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info(f"Closed MCP sessions to '{server.name}'")
+
+    async def _close_all(self) -> None:
+        servers, self._servers = list(self._servers.values()), {}
+        await asyncio.gather(*(self._close_server(server) for server in servers))
+
+
+_pool: MCPSessionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_mcp_session_pool() -> MCPSessionPool:
+    """Return the process-wide MCP session pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = MCPSessionPool()
+        return _pool
+
+
+async def close_mcp_session_pool() -> None:
+    """Close the process-wide pool, if one was started (gateway shutdown)."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        await pool.aclose()
+
+
+def _close_at_exit() -> None:
+    with _pool_lock:
+        pool = _pool
+    if pool is not None:
+        pool.close()
+
+
+atexit.register(_close_at_exit)
@@ -1,8 +1,7 @@
 """Load MCP tools using langchain-mcp-adapters."""
 
 import asyncio
-import atexit
-import concurrent.futures
+import functools
 import logging
 from collections.abc import Callable
 from typing import Any
@@ -11,41 +10,31 @@ from langchain_core.tools import BaseTool
 
 from deerflow.config.extensions_config import ExtensionsConfig
 from deerflow.mcp.client import build_servers_config
+from deerflow.mcp.discovery import DiscoveryTarget, discover_tools, list_tools_per_call, server_cache_key
+from deerflow.mcp.loop import get_mcp_loop
 from deerflow.mcp.oauth import build_oauth_tool_interceptor, get_initial_oauth_headers
+from deerflow.mcp.session_pool import PooledServer, get_mcp_session_pool
 
 logger = logging.getLogger(__name__)
 
-# Global thread pool for sync tool invocation in async environments
-_SYNC_TOOL_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=10, thread_name_prefix="mcp-sync-tool")
-
-# Register shutdown hook for the global executor
-atexit.register(lambda: _SYNC_TOOL_EXECUTOR.shutdown(wait=False))
-
 
 def _make_sync_tool_wrapper(coro: Callable[..., Any], tool_name: str) -> Callable[..., Any]:
     """Build a synchronous wrapper for an asynchronous tool coroutine.
 
+    The coroutine runs on the MCP event loop and the calling thread blocks on
+    the result, so it works whether or not the caller has a running loop.
+
     Args:
         coro: The tool's asynchronous coroutine.
         tool_name: Name of the tool (for logging).
 
     Returns:
-        A synchronous function that correctly handles nested event loops.
+        A synchronous function that runs the tool on the MCP event loop.
     """
 
     def sync_wrapper(*args: Any, **kwargs: Any) -> Any:
         try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            loop = None
-
-        try:
-            if loop is not None and loop.is_running():
-                # Use global executor to avoid nested loop issues and improve performance
-                future = _SYNC_TOOL_EXECUTOR.submit(asyncio.run, coro(*args, **kwargs))
-                return future.result()
-            else:
-                return asyncio.run(coro(*args, **kwargs))
+            return get_mcp_loop().run(coro(*args, **kwargs))
         except Exception as e:
             logger.error(f"Error invoking MCP tool '{tool_name}' via sync wrapper: {e}", exc_info=True)
             raise
@@ -53,14 +42,41 @@ def _make_sync_tool_wrapper(coro: Callable[..., Any], tool_name: str) -> Callabl
     return sync_wrapper
 
 
-async def get_mcp_tools() -> list[BaseTool]:
+def _limit_on_mcp_loop(coro: Callable[..., Any], limit: asyncio.Semaphore) -> Callable[..., Any]:
+    """Run a per-call-session tool coroutine on the MCP event loop, at most ``limit`` at a time."""
+
+    async def limited(*args: Any, **kwargs: Any) -> Any:
+        async with limit:
+            return await coro(*args, **kwargs)
+
+    @functools.wraps(coro)
+    async def call(*args: Any, **kwargs: Any) -> Any:
+        return await get_mcp_loop().run_async(limited(*args, **kwargs))
+
+    return call
+
+
+async def get_mcp_tools(on_tools_changed: Callable[[list[BaseTool]], None] | None = None) -> list[BaseTool]:
     """Get all tools from enabled MCP servers.
 
+    Servers are discovered concurrently, each within its
+    ``discovery_timeout_seconds``; a server that fails is left out. Cached
+    tool schemas are served at once and revalidated in the background (see
+    :mod:`deerflow.mcp.discovery`).
+
+    Servers with ``sessions > 0`` are called over persistent sessions from the
+    MCP session pool. OAuth servers, and servers with ``sessions: 0``, open a
+    new session per call so every call carries a fresh token.
+
+    Args:
+        on_tools_changed: Called with the updated tool list when background
+            revalidation finds that a server's tools have changed.
+
     Returns:
         List of LangChain tools from all enabled MCP servers.
     """
     try:
-        from langchain_mcp_adapters.client import MultiServerMCPClient
+        from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
     except ImportError:
         logger.warning("langchain-mcp-adapters not installed. Install it to enable MCP tools: pip install langchain-mcp-adapters")
         return []
@@ -71,14 +87,15 @@ async def get_mcp_tools() -> list[BaseTool]:
     # reflected when initializing MCP tools.
     extensions_config = ExtensionsConfig.from_file()
     servers_config = build_servers_config(extensions_config)
+    pool = get_mcp_session_pool()
 
     if not servers_config:
         logger.info("No enabled MCP servers configured")
+        await pool.configure({})
         return []
 
     try:
-        # Create the multi-server MCP client
-        logger.info(f"Initializing MCP client with {len(servers_config)} server(s)")
+        logger.info(f"Discovering MCP tools from {len(servers_config)} server(s)")
 
         # Inject initial OAuth headers for server connections (tool discovery/session init)
         initial_oauth_headers = await get_initial_oauth_headers(extensions_config)
@@ -95,17 +112,57 @@ async def get_mcp_tools() -> list[BaseTool]:
         if oauth_interceptor is not None:
             tool_interceptors.append(oauth_interceptor)
 
-        client = MultiServerMCPClient(servers_config, tool_interceptors=tool_interceptors, tool_name_prefix=True)
-
-        # Get all tools from all servers
-        tools = await client.get_tools()
-        logger.info(f"Successfully loaded {len(tools)} tool(s) from MCP servers")
+        # Split servers between the session pool and per-call sessions
+        enabled_servers = extensions_config.get_enabled_mcp_servers()
+        pooled_servers: dict[str, PooledServer] = {}
+        per_call_servers: dict[str, Any] = {}
+        targets: dict[str, DiscoveryTarget] = {}
+        for server_name, params in servers_config.items():
+            server = enabled_servers[server_name]
+            if server.sessions > 0 and not (server.oauth and server.oauth.enabled):
+                pooled_servers[server_name] = PooledServer(params, sessions=server.sessions, max_concurrent_calls=server.max_concurrent_calls, keepalive_seconds=server.keepalive_seconds)
+                list_tools = functools.partial(pool.list_tools, server_name)
+            else:
+                per_call_servers[server_name] = params
+                list_tools = functools.partial(list_tools_per_call, params)
+            targets[server_name] = DiscoveryTarget(server_cache_key(server), server.discovery_timeout_seconds, list_tools)
 
-        # Patch tools to support sync invocation, as deerflow client streams synchronously
-        for tool in tools:
-            if getattr(tool, "func", None) is None and getattr(tool, "coroutine", None) is not None:
-                tool.func = _make_sync_tool_wrapper(tool.coroutine, tool.name)
+        # Pooled servers are limited by the pool; limit per-call servers the same way.
+        per_call_limits = {name: asyncio.Semaphore(enabled_servers[name].max_concurrent_calls) for name in per_call_servers}
 
+        def build_tools(server_name: str, definitions: list[Any]) -> list[BaseTool]:
+            if server_name in pooled_servers:
+                tools = pool.build_tools(server_name, definitions, tool_interceptors)
+            else:
+                connection = per_call_servers[server_name]
+                tools = [convert_mcp_tool_to_langchain_tool(None, tool, connection=connection, tool_interceptors=tool_interceptors, server_name=server_name, tool_name_prefix=True) for tool in definitions]
+                for tool in tools:
+                    if getattr(tool, "coroutine", None) is not None:
+                        tool.coroutine = _limit_on_mcp_loop(tool.coroutine, per_call_limits[server_name])
+
+            # Patch tools to support sync invocation, as deerflow client streams synchronously
+            for tool in tools:
+                if getattr(tool, "func", None) is None and getattr(tool, "coroutine", None) is not None:
+                    tool.func = _make_sync_tool_wrapper(tool.coroutine, tool.name)
+            return tools
+
+        server_tools: dict[str, list[BaseTool]] = {}
+        discovering = True
+
+        def on_change(server_name: str, definitions: list[Any]) -> None:
+            server_tools[server_name] = build_tools(server_name, definitions)
+            # Changes found while other servers are still being discovered are part of the returned list.
+            if on_tools_changed is not None and not discovering:
+                on_tools_changed([tool for tools in server_tools.values() for tool in tools])
+
+        await pool.configure(pooled_servers)
+        for server_name, definitions in (await discover_tools(targets, on_change=on_change)).items():
+            if server_name not in server_tools:  # Already built from revalidated definitions
+                server_tools[server_name] = build_tools(server_name, definitions)
+        discovering = False
+
+        tools = [tool for tools in server_tools.values() for tool in tools]
+        logger.info(f"Successfully loaded {len(tools)} tool(s) from {len(server_tools)}/{len(servers_config)} MCP server(s) ({len(pooled_servers)} pooled, {len(per_call_servers)} per-call)")
         return tools
 
     except Exception as e:
@@ -1,3 +1,4 @@
+import asyncio
 import threading
 
 from deerflow.sandbox.sandbox import Sandbox
@@ -21,3 +22,15 @@ def get_file_operation_lock(sandbox: Sandbox, path: str) -> threading.Lock:
             lock = threading.Lock()
             _FILE_OPERATION_LOCKS[lock_key] = lock
         return lock
+
+
+async def acquire_lock_async(lock: "threading.Lock | threading.Semaphore", *, max_poll_interval: float = 0.05) -> None:
+    """Acquire a threading lock or semaphore from async code without blocking the event loop.
+
+    It may also be held by sync callers on other threads, so it is polled
+    with a growing interval instead of waited on.
+    """
+    delay = 0.001
+    while not lock.acquire(blocking=False):
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, max_poll_interval)
@@ -0,0 +1,313 @@
+"""Run commands on asyncio subprocesses, streaming their output as it arrives.
+
+Both pipes are read incrementally and decoded the way ``subprocess.run(...,
+text=True)`` would (locale encoding, universal newlines), except that
+undecodable bytes are replaced instead of raising. Complete lines are handed
+to an optional callback while the command is still running so callers can
+forward them to a live stream.
+
+Captured output can be bounded: each stream then keeps only a head and a
+tail window in memory, and once the two streams together outgrow that size
+(so the caller could not return all of it) the complete output is written to
+a spill file instead, so memory stays flat however much a command prints.
+
+The command is killed, together with its process group on POSIX, when it
+outlives its wall-clock timeout, when it writes more output than allowed, or
+when the awaiting task is cancelled (for example because the run was
+cancelled).
+"""
+
+import asyncio
+import codecs
+import io
+import locale
+import logging
+import os
+import signal
+from collections import deque
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+_READ_SIZE = 64 * 1024
+# Partial lines longer than this are passed to the callback without waiting for a newline.
+_MAX_PENDING_CHARS = 64 * 1024
+_REWRITE_BLOCK_CHARS = 1024 * 1024
+# After a kill, how long to keep reading pipes that orphaned descendants may hold open.
+_DRAIN_GRACE_SECONDS = 1.0
+
+OutputCallback = Callable[[str, str], None]
+"""Called with ``(stream_name, text)`` where ``stream_name`` is ``"stdout"`` or ``"stderr"``."""
+
+
+@dataclass
+class CommandResult:
+    """Outcome of :func:`run_command`."""
+
+    stdout: str
+    stderr: str
+    returncode: int | None
+    timed_out: bool = False
+    output_limit_exceeded: bool = False
+    spill_path: str | None = None
+    """Set when the captured output was truncated and the complete output written to this file."""
+
+
+class _HeadTailBuffer:
+    """Keeps the first and last ``limit // 2`` characters of a stream (everything when ``limit`` is 0)."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.head_limit = limit // 2
+        self.tail_limit = limit - self.head_limit
+        self.head: list[str] = []
+        self.head_len = 0
+        self.tail: deque[str] = deque()
+        self.tail_len = 0
+        self.skipped = 0
+
+    def append(self, text: str) -> bool:
+        """Add ``text``; return True if this dropped characters from the middle."""
+        if not self.limit:
+            self.head.append(text)
+            return False
+        if self.head_len < self.head_limit:
+            piece = text[: self.head_limit - self.head_len]
+            self.head.append(piece)
+            self.head_len += len(piece)
+            text = text[len(piece) :]
+        if not text:
+            return False
+        self.tail.append(text)
+        self.tail_len += len(text)
+        excess = self.tail_len - self.tail_limit
+        if excess <= 0:
+            return False
+        self.skipped += excess
+        self.tail_len -= excess
+        while excess >= len(self.tail[0]):
+            excess -= len(self.tail.popleft())
+        if excess:
+            self.tail[0] = self.tail[0][excess:]
+        return True
+
+    def getvalue(self) -> str:
+        head, tail = "".join(self.head), "".join(self.tail)
+        if not self.skipped:
+            return head + tail
+        return f"{head}\n... [middle truncated: {self.skipped} chars skipped] ...\n{tail}"
+
+
+class _OutputCapture:
+    """Collects output from both pipes against a shared byte budget."""
+
+    def __init__(self, max_output_bytes: int, on_output: OutputCallback | None, capture_chars: int = 0, spill_path: str | None = None):
+        self.max_output_bytes = max_output_bytes
+        self.on_output = on_output
+        self.total_bytes = 0
+        self.limit_exceeded = asyncio.Event()
+        self.buffers = {"stdout": _HeadTailBuffer(capture_chars), "stderr": _HeadTailBuffer(capture_chars)}
+        self.capture_chars = capture_chars
+        self.captured_chars = 0
+        self.spill_path = spill_path if capture_chars else None
+        self.spill_file: io.TextIOBase | None = None
+        # Output in arrival order until the spill starts; bounded by ``capture_chars``.
+        self.journal: list[str] = []
+
+    def record(self, name: str, text: str) -> None:
+        if not text:
+            return
+        self.buffers[name].append(text)
+        self.captured_chars += len(text)
+        if self.spill_path is None:
+            return
+        if self.spill_file is not None:
+            self._write_spill(text)
+            return
+        self.journal.append(text)
+        # Spill as soon as the streams together exceed the budget, even if
+        # each still fits its own window: the caller cannot return both.
+        if self.captured_chars > self.capture_chars:
+            try:
+                os.makedirs(os.path.dirname(self.spill_path), exist_ok=True)
+                self.spill_file = open(self.spill_path, "w", encoding="utf-8")
+            except OSError:
+                logger.warning("Could not create command output spill file %s", self.spill_path, exc_info=True)
+                self.spill_path = None
+                self.journal.clear()
+                return
+            journal, self.journal = self.journal, []
+            self._write_spill("".join(journal))
+
+    def _write_spill(self, text: str) -> None:
+        try:
+            self.spill_file.write(text)
+        except OSError:
+            logger.warning("Failed writing command output spill file %s", self.spill_path, exc_info=True)
+
+    def close(self) -> str | None:
+        """Close the spill file; return its path if output was spilled."""
+        self.journal.clear()
+        if self.spill_file is None:
+            return None
+        try:
+            self.spill_file.close()
+        except OSError:
+            logger.warning("Failed closing command output spill file %s", self.spill_path, exc_info=True)
+        return self.spill_path
+
+    async def pump(self, name: str, stream: asyncio.StreamReader) -> None:
+        decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(locale.getpreferredencoding(False))(errors="replace"), translate=True)
+        pending = ""
+        while chunk := await stream.read(_READ_SIZE):
+            if self.limit_exceeded.is_set():
+                # Keep draining until the killed process closes the pipe.
+                continue
+            if self.max_output_bytes:
+                room = self.max_output_bytes - self.total_bytes
+                if len(chunk) > room:
+                    chunk = chunk[:room]
+                    self.limit_exceeded.set()
+            self.total_bytes += len(chunk)
+            text = decoder.decode(chunk)
+            self.record(name, text)
+            if self.on_output is not None:
+                pending += text
+                cut = pending.rfind("\n") + 1
+                if not cut and len(pending) > _MAX_PENDING_CHARS:
+                    cut = len(pending)
+                if cut:
+                    self._emit(name, pending[:cut])
+                    pending = pending[cut:]
+        text = decoder.decode(b"", final=True)
+        self.record(name, text)
+        if self.on_output is not None and pending + text:
+            self._emit(name, pending + text)
+
+    def _emit(self, name: str, text: str) -> None:
+        try:
+            self.on_output(name, text)
+        except Exception:
+            logger.debug("Command output callback failed", exc_info=True)
+
+
+def rewrite_spill_file(path: str, transform: Callable[[str], str]) -> None:
+    """Apply ``transform`` to a spill file in blocks of whole lines.
+
+    Blocks never split a line, so line-based rewrites such as path masking
+    see complete paths. Memory use is bounded by the block size.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(path, encoding="utf-8", errors="replace", newline="") as src, open(tmp_path, "w", encoding="utf-8", newline="") as dst:
+        while lines := src.readlines(_REWRITE_BLOCK_CHARS):
+            dst.write(transform("".join(lines)))
+    os.replace(tmp_path, path)
+
+
+def _kill(process: asyncio.subprocess.Process) -> None:
+    try:
+        if os.name != "nt":
+            # The command runs in its own session, so this also reaches its children.
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def _drain(pumps: list[asyncio.Task]) -> None:
+    _, still_running = await asyncio.wait(pumps, timeout=_DRAIN_GRACE_SECONDS)
+    for task in still_running:
+        task.cancel()
+    await asyncio.gather(*pumps, return_exceptions=True)
+
+
+async def run_command(
+    args: Sequence[str],
+    *,
+    executable: str | None = None,
+    timeout: float | None = None,
+    max_output_bytes: int = 0,
+    on_output: OutputCallback | None = None,
+    capture_chars: int = 0,
+    spill_path: str | None = None,
+) -> CommandResult:
+    """Run ``args`` and collect its output.
+
+    Args:
+        args: Program and arguments; no shell is involved unless ``args``
+            invokes one.
+        executable: Program to run in place of ``args[0]``, which is then
+            only passed as the process name (as with ``subprocess.Popen``).
+        timeout: Wall-clock limit in seconds, or None for no limit.
+        max_output_bytes: Combined stdout and stderr limit in bytes; the
+            command is killed once it is reached. 0 disables the limit.
+        on_output: Optional callback receiving output as it is produced,
+            in whole lines where possible.
+        capture_chars: Characters of each stream to keep in memory, split
+            between head and tail with a middle-truncation marker between
+            them. 0 keeps everything.
+        spill_path: File to write the complete output of both streams to,
+            in arrival order, once both streams together exceed
+            ``capture_chars``. Only used with ``capture_chars``.
+
+    Returns:
+        A :class:`CommandResult`. ``returncode`` is the process exit status
+        (negative for a signal on POSIX) even when the command was killed.
+
+    Raises:
+        OSError: If the program cannot be started.
+        asyncio.CancelledError: If the awaiting task is cancelled; the
+            command is killed before the error propagates.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        executable=executable,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=os.name != "nt",
+    )
+    capture = _OutputCapture(max_output_bytes, on_output, capture_chars, spill_path)
+    pumps = [
+        asyncio.create_task(capture.pump("stdout", process.stdout)),
+        asyncio.create_task(capture.pump("stderr", process.stderr)),
+    ]
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    timed_out = False
+    try:
+        reading = asyncio.gather(*pumps, return_exceptions=True)
+        limit_hit = asyncio.ensure_future(capture.limit_exceeded.wait())
+        try:
+            await asyncio.wait([reading, limit_hit], timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            limit_hit.cancel()
+        if not reading.done():
+            timed_out = not capture.limit_exceeded.is_set()
+            _kill(process)
+            await _drain(pumps)
+        # The pipes can close before the process exits; keep honouring the deadline.
+        remaining = None if deadline is None else max(deadline - loop.time(), 0.05)
+        try:
+            returncode = await asyncio.wait_for(process.wait(), remaining)
+        except TimeoutError:
+            timed_out = True
+            _kill(process)
+            returncode = await process.wait()
+    except asyncio.CancelledError:
+        _kill(process)
+        await _drain(pumps)
+        await process.wait()
+        capture.close()
+        raise
+
+    return CommandResult(
+        stdout=capture.buffers["stdout"].getvalue(),
+        stderr=capture.buffers["stderr"].getvalue(),
+        returncode=returncode,
+        timed_out=timed_out,
+        output_limit_exceeded=capture.limit_exceeded.is_set(),
+        spill_path=capture.close(),
+    )
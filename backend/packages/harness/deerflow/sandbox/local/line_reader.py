@@ -0,0 +1,148 @@
+"""Read a range of lines from a large text file without loading all of it.
+
+Line numbering follows text-mode iteration (``\\n``, ``\\r\\n`` and a lone
+``\\r`` each end a line), the same lines grep reports. The file is scanned
+in binary chunks; after each chunk the byte offset of the next line start
+is remembered in a sparse per-file index, so paging through a big file
+only re-scans from the nearest checkpoint instead of from the top.
+
+Indexes are cached per path and invalidated whenever the file's size or
+mtime changes.
+"""
+
+import bisect
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+_CHUNK_SIZE = 1 << 20
+_MAX_CACHED_FILES = 64
+_NEWLINE_RE = re.compile(rb"\r\n|\r|\n")
+
+
+@dataclass
+class _LineIndex:
+    size: int
+    mtime_ns: int
+    # Parallel, ascending lists: line ``lines[i]`` (1-based) starts at byte ``offsets[i]``.
+    lines: list[int] = field(default_factory=lambda: [1])
+    offsets: list[int] = field(default_factory=lambda: [0])
+
+    def nearest(self, line: int) -> tuple[int, int]:
+        i = bisect.bisect_right(self.lines, line) - 1
+        return self.lines[i], self.offsets[i]
+
+    def add(self, line: int, offset: int) -> None:
+        if line > self.lines[-1]:
+            self.lines.append(line)
+            self.offsets.append(offset)
+
+
+_cache: OrderedDict[str, _LineIndex] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _get_index(path: str, size: int, mtime_ns: int) -> _LineIndex:
+    with _cache_lock:
+        index = _cache.get(path)
+        if index is None or index.size != size or index.mtime_ns != mtime_ns:
+            index = _LineIndex(size=size, mtime_ns=mtime_ns)
+            _cache[path] = index
+            while len(_cache) > _MAX_CACHED_FILES:
+                _cache.popitem(last=False)
+        else:
+            _cache.move_to_end(path)
+        return index
+
+
+def _count_breaks(data: bytes) -> int:
+    crlf = data.count(b"\r\n")
+    return data.count(b"\n") + data.count(b"\r") - crlf
+
+
+def _locate(handle, index: _LineIndex, start_line: int, end_line: int) -> tuple[int | None, int | None, list[tuple[int, int]]]:
+    """Find the byte span of lines ``start_line..end_line``.
+
+    Returns ``(start_offset, end_offset, checkpoints)``. ``start_offset`` is
+    None when the file has fewer lines; ``end_offset`` is None when the range
+    runs to the end of the file. ``checkpoints`` are new (line, offset)
+    pairs for the index.
+    """
+    line, offset = index.nearest(start_line)
+    handle.seek(offset)
+    start_offset = offset if line == start_line else None
+    checkpoints: list[tuple[int, int]] = []
+    pending = b""
+
+    while True:
+        chunk = handle.read(_CHUNK_SIZE)
+        data = pending + chunk
+        base = offset - len(pending)
+        # A trailing \r may be the first half of \r\n; decide with the next chunk.
+        if chunk and data.endswith(b"\r"):
+            data, pending = data[:-1], b"\r"
+        else:
+            pending = b""
+        offset = base + len(data) + len(pending)
+        if not data and not chunk:
+            return start_offset, None, checkpoints
+
+        breaks = _count_breaks(data)
+        target = start_line if start_offset is None else end_line
+        if line + breaks < target or (start_offset is not None and line + breaks == end_line):
+            # Neither boundary falls inside this chunk: skip it at C speed.
+            line += breaks
+        else:
+            for match in _NEWLINE_RE.finditer(data):
+                if line == end_line and start_offset is not None:
+                    return start_offset, base + match.start(), checkpoints
+                line += 1
+                if line == start_line:
+                    start_offset = base + match.end()
+        if breaks:
+            checkpoints.append((line, base + max(data.rfind(b"\n"), data.rfind(b"\r")) + 1))
+        if not chunk:
+            return start_offset, None, checkpoints
+
+
+def read_line_range(path: str, start_line: int, end_line: int) -> str:
+    """Return lines ``start_line`` through ``end_line`` (1-based, inclusive) of *path*.
+
+    Lines are joined with ``\\n`` and the last line has no terminator, as
+    with ``"\\n".join(content.splitlines()[start_line - 1 : end_line])``.
+    Invalid UTF-8 is replaced rather than raising. Returns an empty string
+    when the file has fewer than ``start_line`` lines.
+    """
+    start_line = max(start_line, 1)
+    if end_line < start_line:
+        return ""
+
+    with open(path, "rb") as handle:
+        stat = os.fstat(handle.fileno())
+        index = _get_index(path, stat.st_size, stat.st_mtime_ns)
+        with _cache_lock:
+            checkpoint = index.nearest(start_line)
+        # Work on a snapshot so concurrent readers never see a half-updated index.
+        snapshot = _LineIndex(size=index.size, mtime_ns=index.mtime_ns, lines=[checkpoint[0]], offsets=[checkpoint[1]])
+        start_offset, end_offset, checkpoints = _locate(handle, snapshot, start_line, end_line)
+        with _cache_lock:
+            for line, offset in checkpoints:
+                index.add(line, offset)
+
+        if start_offset is None:
+            return ""
+        handle.seek(start_offset)
+        data = handle.read(end_offset - start_offset) if end_offset is not None else handle.read()
+
+    if end_offset is None:
+        # The range ran to end of file: drop the last line's terminator.
+        if data.endswith(b"\r\n"):
+            data = data[:-2]
+        elif data.endswith((b"\n", b"\r")):
+            data = data[:-1]
+    text = data.decode("utf-8", errors="replace")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
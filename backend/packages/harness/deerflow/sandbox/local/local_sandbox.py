@@ -1,14 +1,26 @@
+import asyncio
+import concurrent.futures
 import errno
 import ntpath
 import os
 import shutil
-import subprocess
+import tarfile
+from collections.abc import Callable
 from dataclasses import dataclass
 from pathlib import Path
+from typing import BinaryIO
 
+from deerflow.sandbox.exceptions import SandboxFileError
+from deerflow.sandbox.local.command_runner import OutputCallback, rewrite_spill_file, run_command
+from deerflow.sandbox.local.line_reader import read_line_range
 from deerflow.sandbox.local.list_dir import list_dir
+from deerflow.sandbox.path_mapper import PathMapper, PathMatch, get_path_mapper
 from deerflow.sandbox.sandbox import Sandbox
-from deerflow.sandbox.search import GrepMatch, find_glob_matches, find_grep_matches
+from deerflow.sandbox.search import GrepMatch, find_glob_matches, find_grep_matches, is_binary_file
+from deerflow.sandbox.search_index import WorkspaceSearchIndex
+
+# Runs commands for sync callers that are already on an event loop thread.
+_SYNC_EXEC_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=10, thread_name_prefix="local-sandbox-exec")
 
 
 @dataclass(frozen=True)
@@ -51,7 +63,13 @@ class LocalSandbox(Sandbox):
 
         return None
 
-    def __init__(self, id: str, path_mappings: list[PathMapping] | None = None):
+    def __init__(
+        self,
+        id: str,
+        path_mappings: list[PathMapping] | None = None,
+        command_timeout: int = 600,
+        max_output_bytes: int = 0,
+    ):
         """
         Initialize local sandbox with optional path mappings.
 
@@ -59,9 +77,33 @@ class LocalSandbox(Sandbox):
             id: Sandbox identifier
             path_mappings: List of path mappings with optional read-only flag.
                           Skills directory is read-only by default.
+            command_timeout: Wall-clock limit in seconds for each command.
+            max_output_bytes: Output limit in bytes for each command (0 = unlimited).
         """
         super().__init__(id)
         self.path_mappings = path_mappings or []
+        self.command_timeout = command_timeout
+        self.max_output_bytes = max_output_bytes
+        self._compiled_mappers: tuple[tuple[PathMapping, ...], tuple[PathMapper, PathMapper, PathMapper]] | None = None
+
+    def _path_mappers(self) -> tuple[PathMapper, PathMapper, PathMapper]:
+        """Return the compiled (command, output, read-only) mappers for the current mappings.
+
+        Compiled once per mapping set; ``path_mappings`` is a public attribute,
+        so the cache is keyed on its current contents.
+        """
+        key = tuple(self.path_mappings)
+        cached = self._compiled_mappers
+        if cached is None or cached[0] != key:
+            resolved = [(str(Path(m.local_path).resolve()), m) for m in key]
+            command = get_path_mapper(tuple((m.container_path, m.local_path) for m in key), segment_boundary=True)
+            output = get_path_mapper(
+                tuple((local, m.container_path) for local, m in resolved) + tuple((str(Path(m.local_path)), m.container_path) for m in key),
+                any_separator=True,
+            )
+            read_only = get_path_mapper(tuple((local, m.container_path, m.read_only) for local, m in resolved), any_separator=True)
+            cached = self._compiled_mappers = (key, (command, output, read_only))
+        return cached[1]
 
     def _is_read_only_path(self, resolved_path: str) -> bool:
         """Check if a resolved path is under a read-only mount.
@@ -70,23 +112,17 @@ class LocalSandbox(Sandbox):
         mapping (i.e. the one whose local_path is the longest prefix of the
         resolved path), similar to how ``_resolve_path`` handles container paths.
         """
-        resolved = str(Path(resolved_path).resolve())
-
-        best_mapping: PathMapping | None = None
-        best_prefix_len = -1
+        match = self._path_mappers()[2].match(str(Path(resolved_path).resolve()))
+        return bool(match and match.data)
 
-        for mapping in self.path_mappings:
-            local_resolved = str(Path(mapping.local_path).resolve())
-            if resolved == local_resolved or resolved.startswith(local_resolved + os.sep):
-                prefix_len = len(local_resolved)
-                if prefix_len > best_prefix_len:
-                    best_prefix_len = prefix_len
-                    best_mapping = mapping
-
-        if best_mapping is None:
-            return False
+    @staticmethod
+    def _join_local(match: PathMatch) -> str:
+        return str(Path(match.target) / match.relative) if match.relative else match.target
 
-        return best_mapping.read_only
+    @staticmethod
+    def _join_container(match: PathMatch) -> str:
+        relative = match.relative.replace("\\", "/")
+        return f"{match.target}/{relative}" if relative else match.target
 
     def _resolve_path(self, path: str) -> str:
         """
@@ -99,19 +135,10 @@ class LocalSandbox(Sandbox):
             Resolved local path
         """
         path_str = str(path)
-
-        # Try each mapping (longest prefix first for more specific matches)
-        for mapping in sorted(self.path_mappings, key=lambda m: len(m.container_path), reverse=True):
-            container_path = mapping.container_path
-            local_path = mapping.local_path
-            if path_str == container_path or path_str.startswith(container_path + "/"):
-                # Replace the container path prefix with local path
-                relative = path_str[len(container_path) :].lstrip("/")
-                resolved = str(Path(local_path) / relative) if relative else local_path
-                return resolved
-
+        # Longest container path prefix wins for more specific matches
+        match = self._path_mappers()[0].match(path_str)
         # No mapping found, return original path
-        return path_str
+        return self._join_local(match) if match else path_str
 
     def _reverse_resolve_path(self, path: str) -> str:
         """
@@ -125,18 +152,10 @@ class LocalSandbox(Sandbox):
         """
         normalized_path = path.replace("\\", "/")
         path_str = str(Path(normalized_path).resolve())
-
-        # Try each mapping (longest local path first for more specific matches)
-        for mapping in sorted(self.path_mappings, key=lambda m: len(m.local_path), reverse=True):
-            local_path_resolved = str(Path(mapping.local_path).resolve())
-            if path_str == local_path_resolved or path_str.startswith(local_path_resolved + "/"):
-                # Replace the local path prefix with container path
-                relative = path_str[len(local_path_resolved) :].lstrip("/")
-                resolved = f"{mapping.container_path}/{relative}" if relative else mapping.container_path
-                return resolved
-
+        # Longest local path prefix wins for more specific matches
+        match = self._path_mappers()[1].match(path_str)
         # No mapping found, return original path
-        return path_str
+        return self._join_container(match) if match else path_str
 
     def _reverse_resolve_paths_in_output(self, output: str) -> str:
         """
@@ -148,30 +167,8 @@ class LocalSandbox(Sandbox):
         Returns:
             Output with local paths resolved to container paths
         """
-        import re
-
-        # Sort mappings by local path length (longest first) for correct prefix matching
-        sorted_mappings = sorted(self.path_mappings, key=lambda m: len(m.local_path), reverse=True)
-
-        if not sorted_mappings:
-            return output
-
-        # Create pattern that matches absolute paths
-        # Match paths like /Users/... or other absolute paths
-        result = output
-        for mapping in sorted_mappings:
-            # Escape the local path for use in regex
-            escaped_local = re.escape(str(Path(mapping.local_path).resolve()))
-            # Match the local path followed by optional path components with either separator
-            pattern = re.compile(escaped_local + r"(?:[/\\][^\s\"';&|<>()]*)?")
-
-            def replace_match(match: re.Match) -> str:
-                matched_path = match.group(0)
-                return self._reverse_resolve_path(matched_path)
-
-            result = pattern.sub(replace_match, result)
-
-        return result
+        # One pass over the output for all mappings; paths may use either separator.
+        return self._path_mappers()[1].sub(output, self._join_container)
 
     def _resolve_paths_in_command(self, command: str) -> str:
         """
@@ -183,27 +180,9 @@ class LocalSandbox(Sandbox):
         Returns:
             Command with container paths resolved to local paths
         """
-        import re
-
-        # Sort mappings by length (longest first) for correct prefix matching
-        sorted_mappings = sorted(self.path_mappings, key=lambda m: len(m.container_path), reverse=True)
-
-        # Build regex pattern to match all container paths
-        # Match container path followed by optional path components
-        if not sorted_mappings:
-            return command
-
-        # Create pattern that matches any of the container paths.
-        # The lookahead (?=/|$|...) ensures we only match at a path-segment boundary,
-        # preventing /mnt/skills from matching inside /mnt/skills-extra.
-        patterns = [re.escape(m.container_path) + r"(?=/|$|[\s\"';&|<>()])(?:/[^\s\"';&|<>()]*)?" for m in sorted_mappings]
-        pattern = re.compile("|".join(f"({p})" for p in patterns))
-
-        def replace_match(match: re.Match) -> str:
-            matched_path = match.group(0)
-            return self._resolve_path(matched_path)
-
-        return pattern.sub(replace_match, command)
+        # Container paths only match at a path-segment boundary, preventing
+        # /mnt/skills from matching inside /mnt/skills-extra.
+        return self._path_mappers()[0].sub(command, self._join_local)
 
     @staticmethod
     def _get_shell() -> str:
@@ -231,39 +210,82 @@ class LocalSandbox(Sandbox):
 
         raise RuntimeError("No suitable shell executable found. Tried /bin/zsh, /bin/bash, /bin/sh, and `sh` on PATH.")
 
-    def execute_command(self, command: str) -> str:
-        # Resolve container paths in command before execution
-        resolved_command = self._resolve_paths_in_command(command)
+    def _command_args(self, resolved_command: str) -> tuple[list[str], str | None]:
+        """Return ``(args, executable)`` for running a command in the host shell."""
         shell = self._get_shell()
-
         if os.name == "nt":
             if self._is_powershell(shell):
-                args = [shell, "-NoProfile", "-Command", resolved_command]
-            elif self._is_cmd_shell(shell):
-                args = [shell, "/c", resolved_command]
-            else:
-                args = [shell, "-c", resolved_command]
-
-            result = subprocess.run(
-                args,
-                shell=False,
-                capture_output=True,
-                text=True,
-                timeout=600,
-            )
-        else:
-            result = subprocess.run(
-                resolved_command,
-                executable=shell,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=600,
-            )
+                return [shell, "-NoProfile", "-Command", resolved_command], None
+            if self._is_cmd_shell(shell):
+                return [shell, "/c", resolved_command], None
+            return [shell, "-c", resolved_command], None
+        # Same invocation as subprocess.run(..., shell=True, executable=shell).
+        return ["/bin/sh", "-c", resolved_command], shell
+
+    def execute_command(self, command: str, *, capture_chars: int = 0, spill_path: str | None = None, spill_transform: Callable[[str], str] | None = None) -> str:
+        coro = self.aexecute_command(command, capture_chars=capture_chars, spill_path=spill_path, spill_transform=spill_transform)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+        # Called from an event loop thread: run the command's loop elsewhere.
+        return _SYNC_EXEC_EXECUTOR.submit(asyncio.run, coro).result()
+
+    async def aexecute_command(
+        self,
+        command: str,
+        on_output: OutputCallback | None = None,
+        *,
+        capture_chars: int = 0,
+        spill_path: str | None = None,
+        spill_transform: Callable[[str], str] | None = None,
+    ) -> str:
+        """Execute a command without blocking the event loop.
+
+        Output is passed to ``on_output`` as it is produced, with local paths
+        mapped back to container paths. Cancelling the awaiting task kills
+        the command and its child processes.
+
+        With ``capture_chars``, only a head and tail window of each stream
+        is kept in memory; if the output does not fit, the complete output
+        is written to ``spill_path`` (see ``run_command``). The spilled log
+        is rewritten once, mapping local paths back and then applying
+        ``spill_transform``.
+        """
+        # Resolve container paths in command before execution
+        resolved_command = self._resolve_paths_in_command(command)
+        args, executable = self._command_args(resolved_command)
+
+        callback = None
+        if on_output is not None:
+
+            def callback(stream: str, text: str) -> None:
+                on_output(stream, self._reverse_resolve_paths_in_output(text))
+
+        result = await run_command(
+            args,
+            executable=executable,
+            timeout=self.command_timeout,
+            max_output_bytes=self.max_output_bytes,
+            on_output=callback,
+            capture_chars=capture_chars,
+            spill_path=spill_path,
+        )
+        if result.spill_path is not None:
+
+            def transform(text: str) -> str:
+                text = self._reverse_resolve_paths_in_output(text)
+                return spill_transform(text) if spill_transform is not None else text
+
+            await asyncio.to_thread(rewrite_spill_file, result.spill_path, transform)
         output = result.stdout
         if result.stderr:
             output += f"\nStd Error:\n{result.stderr}" if output else result.stderr
-        if result.returncode != 0:
+        if result.timed_out:
+            output += f"\nError: Command timed out after {self.command_timeout} seconds and was killed"
+        elif result.output_limit_exceeded:
+            output += f"\nError: Command output exceeded {self.max_output_bytes} bytes and the command was killed"
+        elif result.returncode != 0:
             output += f"\nExit Code: {result.returncode}"
 
         final_output = output if output else "(no output)"
@@ -285,6 +307,23 @@ class LocalSandbox(Sandbox):
             # Re-raise with the original path for clearer error messages, hiding internal resolved paths
             raise type(e)(e.errno, e.strerror, path) from None
 
+    def read_file_lines(self, path: str, start_line: int, end_line: int) -> str:
+        """Read a line range by streaming the file instead of loading it.
+
+        Invalid UTF-8 is replaced; binary files are rejected after sniffing
+        their first few KB.
+        """
+        resolved_path = self._resolve_path(path)
+        try:
+            if os.path.isdir(resolved_path):
+                raise IsADirectoryError(errno.EISDIR, "Is a directory", path)
+            if os.path.exists(resolved_path) and is_binary_file(Path(resolved_path)):
+                raise SandboxFileError("Cannot read binary file", path=path, operation="read")
+            return read_line_range(resolved_path, start_line, end_line)
+        except OSError as e:
+            # Re-raise with the original path for clearer error messages, hiding internal resolved paths
+            raise type(e)(e.errno, e.strerror, path) from None
+
     def write_file(self, path: str, content: str, append: bool = False) -> None:
         resolved_path = self._resolve_path(path)
         if self._is_read_only_path(resolved_path):
@@ -300,6 +339,36 @@ class LocalSandbox(Sandbox):
             # Re-raise with the original path for clearer error messages, hiding internal resolved paths
             raise type(e)(e.errno, e.strerror, path) from None
 
+    def replace_in_file(self, path: str, old_str: str, new_str: str, *, replace_all: bool = False) -> int:
+        """Patch the file in place, rewriting it only from the first replaced byte on."""
+        resolved_path = self._resolve_path(path)
+        try:
+            with open(resolved_path, "rb") as f:
+                data = f.read()
+            if b"\r" in data:
+                # Text-mode reads translate \r\n, which old_str may rely on.
+                return super().replace_in_file(path, old_str, new_str, replace_all=replace_all)
+            old = old_str.encode("utf-8")
+            start = data.find(old)
+            if start < 0:
+                return 0
+            if self._is_read_only_path(resolved_path):
+                raise OSError(errno.EROFS, "Read-only file system", path)
+            if replace_all:
+                replaced = data.count(old)
+                patched = data.replace(old, new_str.encode("utf-8"))
+            else:
+                replaced = 1
+                patched = data.replace(old, new_str.encode("utf-8"), 1)
+            with open(resolved_path, "r+b") as f:
+                f.seek(start)
+                f.write(patched[start:])
+                f.truncate()
+            return replaced
+        except OSError as e:
+            # Re-raise with the original path for clearer error messages, hiding internal resolved paths
+            raise type(e)(e.errno, e.strerror, path) from None
+
     def glob(self, path: str, pattern: str, *, include_dirs: bool = False, max_results: int = 200) -> tuple[list[str], bool]:
         resolved_path = Path(self._resolve_path(path))
         matches, truncated = find_glob_matches(resolved_path, pattern, include_dirs=include_dirs, max_results=max_results)
@@ -314,6 +383,7 @@ class LocalSandbox(Sandbox):
         literal: bool = False,
         case_sensitive: bool = False,
         max_results: int = 100,
+        search_index: WorkspaceSearchIndex | None = None,
     ) -> tuple[list[GrepMatch], bool]:
         resolved_path = Path(self._resolve_path(path))
         matches, truncated = find_grep_matches(
@@ -323,6 +393,7 @@ class LocalSandbox(Sandbox):
             literal=literal,
             case_sensitive=case_sensitive,
             max_results=max_results,
+            index=search_index,
         )
         return [
             GrepMatch(
@@ -346,3 +417,23 @@ class LocalSandbox(Sandbox):
         except OSError as e:
             # Re-raise with the original path for clearer error messages, hiding internal resolved paths
             raise type(e)(e.errno, e.strerror, path) from None
+
+    def put_archive(self, path: str, archive: BinaryIO) -> None:
+        """Extract the archive straight into the mapped host directory."""
+        resolved_path = self._resolve_path(path)
+        if self._is_read_only_path(resolved_path):
+            raise OSError(errno.EROFS, "Read-only file system", path)
+        try:
+            os.makedirs(resolved_path, exist_ok=True)
+            with tarfile.open(fileobj=archive, mode="r|*") as tar:
+                tar.extractall(resolved_path, filter="data")
+        except OSError as e:
+            raise type(e)(e.errno, e.strerror, path) from None
+
+    def get_archive(self, path: str, names: list[str], out: BinaryIO) -> list[str]:
+        resolved_path = self._resolve_path(path)
+        included = [name for name in self._relative_names(names) if os.path.lexists(os.path.join(resolved_path, name))]
+        with tarfile.open(fileobj=out, mode="w|gz") as tar:
+            for name in included:
+                tar.add(os.path.join(resolved_path, name), arcname=name)
+        return included
@@ -14,6 +14,22 @@ class LocalSandboxProvider(SandboxProvider):
     def __init__(self):
         """Initialize the local sandbox provider with path mappings."""
         self._path_mappings = self._setup_path_mappings()
+        self._command_limits = self._get_command_limits()
+
+    @staticmethod
+    def _get_command_limits() -> dict[str, int]:
+        """Read per-command timeout and output limits from the sandbox config."""
+        try:
+            from deerflow.config import get_app_config
+
+            sandbox_config = get_app_config().sandbox
+            return {
+                "command_timeout": sandbox_config.bash_command_timeout,
+                "max_output_bytes": sandbox_config.bash_command_max_output_bytes,
+            }
+        except Exception as e:
+            logger.warning("Could not read sandbox command limits, using defaults: %s", e)
+            return {}
 
     def _setup_path_mappings(self) -> list[PathMapping]:
         """
@@ -100,7 +116,7 @@ class LocalSandboxProvider(SandboxProvider):
     def acquire(self, thread_id: str | None = None) -> str:
         global _singleton
         if _singleton is None:
-            _singleton = LocalSandbox("local", path_mappings=self._path_mappings)
+            _singleton = LocalSandbox("local", path_mappings=self._path_mappings, **self._command_limits)
         return _singleton.id
 
     def get(self, sandbox_id: str) -> Sandbox | None:
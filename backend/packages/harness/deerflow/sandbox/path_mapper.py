@@ -0,0 +1,177 @@
+"""Precompiled mapping between virtual (sandbox) paths and host paths.
+
+Sandbox tools rewrite paths in both directions on every call: virtual paths
+in commands become host paths, and host paths in command output are masked
+back to virtual ones. A :class:`PathMapper` is built once per set of prefix
+mappings and reused. It has two parts:
+
+- a segment trie for single paths, which finds the longest mapped prefix
+  that ends on a segment boundary (``path == prefix`` or
+  ``path.startswith(prefix + "/")``)
+- one combined regex for text, which finds every mapped path in a block of
+  text in a single pass, preferring the longest prefix at each position
+
+Use :func:`get_path_mapper` to share compiled mappers between callers.
+"""
+
+import functools
+import re
+from collections.abc import Callable, Iterable
+from typing import Any, NamedTuple
+
+# Characters that end a path inside a shell command or its output.
+_TERMINATORS = r"\s\"';&|<>()"
+_ANY_SEPARATOR_RE = re.compile(r"[/\\]")
+# Trie key marking that a mapped prefix ends at this node.
+_END = None
+
+
+class PathMatch(NamedTuple):
+    """A path found by :class:`PathMapper`."""
+
+    text: str
+    """The whole matched path."""
+    source: str
+    """The mapped prefix it starts with."""
+    target: str
+    """What ``source`` maps to."""
+    relative: str
+    """The rest of the path after ``source``, without leading separators."""
+    data: Any = None
+    """Extra value attached to the mapping."""
+
+    def join(self) -> str:
+        """Return ``target`` with ``relative`` appended using ``/``."""
+        return f"{self.target}/{self.relative}" if self.relative else self.target
+
+
+class PathMapper:
+    """Maps path prefixes from one namespace to another.
+
+    Args:
+        mappings: ``(source, target)`` or ``(source, target, data)`` tuples.
+            When two mappings share a source, the first one wins.
+        any_separator: Treat ``/`` and ``\\`` as equivalent separators, both
+            in the sources and in the paths being matched (for host paths
+            that may be printed in either style).
+        segment_boundary: In text, only match a source that ends on a
+            segment boundary (followed by a separator, a path terminator or
+            the end of the text). Without it a source also matches as a
+            plain string prefix, e.g. ``/a/b`` inside ``/a/bc``.
+    """
+
+    def __init__(self, mappings: Iterable[tuple], *, any_separator: bool = False, segment_boundary: bool = False):
+        entries: list[tuple[str, str, Any]] = []
+        seen: set[str] = set()
+        for mapping in mappings:
+            source, target, *rest = mapping
+            if source in seen:
+                continue
+            seen.add(source)
+            entries.append((source, target, rest[0] if rest else None))
+        # Longest source first, so the combined regex prefers the most specific prefix.
+        entries.sort(key=lambda entry: len(entry[0]), reverse=True)
+        self._entries = entries
+        self._separators = "/\\" if any_separator else "/"
+        self._normalize: Callable[[str], str] = _to_forward_slashes if any_separator else str
+        self._split: Callable[[str], list[str]] = _ANY_SEPARATOR_RE.split if any_separator else (lambda path: path.split("/"))
+
+        self._trie: dict = {}
+        for index, (source, _, _) in enumerate(entries):
+            node = self._trie
+            for segment in self._split(source):
+                node = node.setdefault(segment, {})
+            node.setdefault(_END, index)
+
+        # The regex is generated from a character trie of the sources, so a
+        # shared prefix is matched once rather than once per source.
+        separator = r"[/\\]" if any_separator else "/"
+        self._by_source: dict[str, int] = {}
+        char_trie: dict = {}
+        for index, (source, _, _) in enumerate(entries):
+            key = self._normalize(source)
+            # An empty source matches every path in match() but nothing in text.
+            if not key or key in self._by_source:
+                continue
+            self._by_source[key] = index
+            node = char_trie
+            for char in key:
+                node = node.setdefault(char, {})
+            node[_END] = index
+        boundary = rf"(?={separator}|$|[{_TERMINATORS}])" if segment_boundary else ""
+        self._pattern = re.compile(rf"({_trie_regex(char_trie, separator)}){boundary}(?:{separator}[^{_TERMINATORS}]*)?") if self._by_source else None
+
+    def __bool__(self) -> bool:
+        return bool(self._entries)
+
+    def match(self, path: str) -> PathMatch | None:
+        """Return the longest mapped prefix of ``path`` on a segment boundary, if any."""
+        node = self._trie
+        best: tuple[int, int] | None = None
+        # Length of the prefix walked so far, counting one separator per segment.
+        consumed = -1
+        for segment in self._split(path):
+            node = node.get(segment)
+            if node is None:
+                break
+            consumed += len(segment) + 1
+            if _END in node:
+                best = (node[_END], consumed)
+        if best is None:
+            return None
+        index, prefix_len = best
+        source, target, data = self._entries[index]
+        return PathMatch(path, source, target, path[prefix_len:].lstrip(self._separators), data)
+
+    def sub(self, text: str, replace: Callable[[PathMatch], str] | None = None) -> str:
+        """Replace every mapped path in ``text`` with ``replace(match)``.
+
+        Without ``replace`` each path becomes :meth:`PathMatch.join`, which
+        skips building a :class:`PathMatch` per path.
+        """
+        if self._pattern is None:
+            return text
+        entries = self._entries
+        by_source = self._by_source
+        normalize = self._normalize
+        separators = self._separators
+
+        if replace is None:
+            targets = {key: entries[index][1] for key, index in by_source.items()}
+
+            def _join(match: re.Match) -> str:
+                matched, prefix = match.group(0, 1)
+                target = targets[normalize(prefix)]
+                relative = matched[len(prefix) :].lstrip(separators)
+                return f"{target}/{relative}" if relative else target
+
+            return self._pattern.sub(_join, text)
+
+        def _replace(match: re.Match) -> str:
+            matched, prefix = match.group(0, 1)
+            source, target, data = entries[by_source[normalize(prefix)]]
+            return replace(PathMatch(matched, source, target, matched[len(prefix) :].lstrip(separators), data))
+
+        return self._pattern.sub(_replace, text)
+
+
+def _to_forward_slashes(path: str) -> str:
+    return path.replace("\\", "/")
+
+
+def _trie_regex(node: dict, separator: str) -> str:
+    """Return a regex matching every path stored in a character trie, longest first."""
+    branches = [(separator if char == "/" else re.escape(char)) + _trie_regex(child, separator) for char, child in node.items() if char is not _END]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+    if _END in node:
+        # Optional and greedy: the longer source is tried before stopping here.
+        return f"(?:{body})?" if len(branches) == 1 else f"{body}?"
+    return body
+
+
+@functools.lru_cache(maxsize=256)
+def get_path_mapper(mappings: tuple[tuple, ...], *, any_separator: bool = False, segment_boundary: bool = False) -> PathMapper:
+    """Return a shared :class:`PathMapper` for ``mappings`` (which must be hashable)."""
+    return PathMapper(mappings, any_separator=any_separator, segment_boundary=segment_boundary)
@@ -1,10 +1,23 @@
+import asyncio
+import io
+import posixpath
+import tarfile
 from abc import ABC, abstractmethod
+from typing import BinaryIO
 
 from deerflow.sandbox.search import GrepMatch
 
+# How deep the default get_archive lists directories it archives.
+_ARCHIVE_LIST_DEPTH = 32
+
 
 class Sandbox(ABC):
-    """Abstract base class for sandbox environments"""
+    """Abstract base class for sandbox environments
+
+    Each operation also has an ``a``-prefixed async form for async tool
+    paths. The defaults run the sync method on a worker thread; sandboxes
+    with native async I/O override them so awaiting a call holds no thread.
+    """
 
     _id: str
 
@@ -39,6 +52,24 @@ class Sandbox(ABC):
         """
         pass
 
+    def read_file_lines(self, path: str, start_line: int, end_line: int) -> str:
+        """Read a range of lines from a text file.
+
+        The default implementation reads the whole file; sandboxes that can
+        read a range directly should override it.
+
+        Args:
+            path: The absolute path of the file to read.
+            start_line: First line to return (1-indexed, inclusive).
+            end_line: Last line to return (1-indexed, inclusive).
+
+        Returns:
+            The requested lines joined with newlines, or an empty string if
+            the file has fewer than ``start_line`` lines.
+        """
+        content = self.read_file(path)
+        return "\n".join(content.splitlines()[start_line - 1 : end_line])
+
     @abstractmethod
     def list_dir(self, path: str, max_depth=2) -> list[str]:
         """List the contents of a directory.
@@ -63,6 +94,45 @@ class Sandbox(ABC):
         """
         pass
 
+    def append_file(self, path: str, content: str) -> None:
+        """Append text to a file, creating it if it does not exist.
+
+        Sandboxes should append in place so only ``content`` is written; the
+        default delegates to :meth:`write_file` with ``append=True``.
+
+        Args:
+            path: The absolute path of the file to append to.
+            content: The text to append.
+        """
+        self.write_file(path, content, append=True)
+
+    def replace_in_file(self, path: str, old_str: str, new_str: str, *, replace_all: bool = False) -> int:
+        """Replace an exact substring in a file.
+
+        Sandboxes should patch the file where it lives so only the two
+        strings are transferred; the default reads the whole file and writes
+        it back.
+
+        Args:
+            path: The absolute path of the file to edit.
+            old_str: The substring to replace.
+            new_str: The replacement.
+            replace_all: Replace every occurrence instead of only the first.
+
+        Returns:
+            The number of occurrences replaced. The file is not written when
+            this is 0.
+        """
+        content = self.read_file(path)
+        if old_str not in content:
+            return 0
+        if replace_all:
+            replaced = content.count(old_str)
+            self.write_file(path, content.replace(old_str, new_str))
+            return replaced
+        self.write_file(path, content.replace(old_str, new_str, 1))
+        return 1
+
     @abstractmethod
     def glob(self, path: str, pattern: str, *, include_dirs: bool = False, max_results: int = 200) -> tuple[list[str], bool]:
         """Find paths that match a glob pattern under a root directory."""
@@ -91,3 +161,121 @@ class Sandbox(ABC):
             content: The binary content to write to the file.
         """
         pass
+
+    def put_archive(self, path: str, archive: BinaryIO) -> None:
+        """Extract a tar archive into a directory of the sandbox.
+
+        ``archive`` is read as a stream (plain or gzip-compressed), so memory
+        use does not grow with its size. Sandboxes should unpack it where the
+        files live in one transfer; the default writes each regular file with
+        :meth:`update_file`.
+
+        Args:
+            path: The absolute path of the directory to extract into.
+            archive: A binary file object holding the tar archive.
+        """
+        with tarfile.open(fileobj=archive, mode="r|*") as tar:
+            for member in tar:
+                if member.isfile() and self._relative_names([member.name]):
+                    self.update_file(posixpath.join(path, posixpath.normpath(member.name)), tar.extractfile(member).read())
+
+    @staticmethod
+    def _relative_names(names: list[str]) -> list[str]:
+        """Return the sorted, normalized ``names`` that stay inside their directory."""
+        normalized = {posixpath.normpath(name) for name in names}
+        return sorted(name for name in normalized if not name.startswith(("/", "..")) and name != ".")
+
+    def get_archive(self, path: str, names: list[str], out: BinaryIO) -> list[str]:
+        """Write a gzip-compressed tar of files under a sandbox directory to ``out``.
+
+        Entries are named relative to ``path``; directories are included
+        recursively. The archive is streamed into ``out`` so memory use does
+        not grow with its size.
+
+        Args:
+            path: The absolute path of the directory ``names`` are relative to.
+            names: Relative paths of the files or directories to include.
+            out: A binary file object to write the archive to.
+
+        Sandboxes should pack the files where they live and send them in one
+        transfer; the default reads each file with :meth:`read_file`, found
+        with :meth:`list_dir`, so it only round-trips text files.
+
+        Returns:
+            The entries of ``names`` that existed and were archived. Names
+            that are absolute or leave ``path`` are skipped.
+        """
+        included: list[str] = []
+        with tarfile.open(fileobj=out, mode="w|gz") as tar:
+            for name in self._relative_names(names):
+                root = posixpath.join(path, name)
+                files = [entry for entry in self.list_dir(root, max_depth=_ARCHIVE_LIST_DEPTH) if not entry.endswith("/")] or [root]
+                added = False
+                for file_path in files:
+                    try:
+                        data = self.read_file(file_path).encode("utf-8")
+                    except OSError:
+                        continue
+                    member = tarfile.TarInfo(posixpath.relpath(file_path, path))
+                    member.size = len(data)
+                    tar.addfile(member, io.BytesIO(data))
+                    added = True
+                if added:
+                    included.append(name)
+        return included
+
+    def close(self) -> None:
+        """Release client resources held by this object; the sandbox itself keeps running."""
+
+    async def aexecute_command(self, command: str) -> str:
+        """Async form of :meth:`execute_command`."""
+        return await asyncio.to_thread(self.execute_command, command)
+
+    async def aread_file(self, path: str) -> str:
+        """Async form of :meth:`read_file`."""
+        return await asyncio.to_thread(self.read_file, path)
+
+    async def aread_file_lines(self, path: str, start_line: int, end_line: int) -> str:
+        """Async form of :meth:`read_file_lines`."""
+        return await asyncio.to_thread(self.read_file_lines, path, start_line, end_line)
+
+    async def alist_dir(self, path: str, max_depth=2) -> list[str]:
+        """Async form of :meth:`list_dir`."""
+        return await asyncio.to_thread(self.list_dir, path, max_depth)
+
+    async def awrite_file(self, path: str, content: str, append: bool = False) -> None:
+        """Async form of :meth:`write_file`."""
+        await asyncio.to_thread(self.write_file, path, content, append)
+
+    async def aappend_file(self, path: str, content: str) -> None:
+        """Async form of :meth:`append_file`."""
+        await asyncio.to_thread(self.append_file, path, content)
+
+    async def areplace_in_file(self, path: str, old_str: str, new_str: str, *, replace_all: bool = False) -> int:
+        """Async form of :meth:`replace_in_file`."""
+        return await asyncio.to_thread(self.replace_in_file, path, old_str, new_str, replace_all=replace_all)
+
+    async def aglob(self, path: str, pattern: str, *, include_dirs: bool = False, max_results: int = 200) -> tuple[list[str], bool]:
+        """Async form of :meth:`glob`."""
+        return await asyncio.to_thread(self.glob, path, pattern, include_dirs=include_dirs, max_results=max_results)
+
+    async def aput_archive(self, path: str, archive: BinaryIO) -> None:
+        """Async form of :meth:`put_archive`."""
+        await asyncio.to_thread(self.put_archive, path, archive)
+
+    async def aget_archive(self, path: str, names: list[str], out: BinaryIO) -> list[str]:
+        """Async form of :meth:`get_archive`."""
+        return await asyncio.to_thread(self.get_archive, path, names, out)
+
+    async def agrep(
+        self,
+        path: str,
+        pattern: str,
+        *,
+        glob: str | None = None,
+        literal: bool = False,
+        case_sensitive: bool = False,
+        max_results: int = 100,
+    ) -> tuple[list[GrepMatch], bool]:
+        """Async form of :meth:`grep`."""
+        return await asyncio.to_thread(self.grep, path, pattern, glob=glob, literal=literal, case_sensitive=case_sensitive, max_results=max_results)
@@ -35,6 +35,28 @@ class SandboxProvider(ABC):
         """
         pass
 
+    @property
+    def outputs_on_host(self) -> bool:
+        """Whether sandboxes write thread data straight to the host's thread directories.
+
+        When False, files a sandbox creates may exist only inside it, and
+        callers that need them on the host copy them out of :meth:`find`.
+        """
+        return True
+
+    def find(self, thread_id: str) -> Sandbox | None:
+        """Return the thread's running sandbox without starting or reclaiming one.
+
+        Args:
+            thread_id: The thread whose sandbox to look up.
+
+        Callers close the returned sandbox when they are done with it.
+
+        Returns:
+            The sandbox, or None if the thread has none running (the default).
+        """
+        return None
+
 
 _default_sandbox_provider: SandboxProvider | None = None
 
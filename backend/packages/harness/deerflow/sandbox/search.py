@@ -1,9 +1,21 @@
 import fnmatch
+import functools
+import logging
 import os
 import re
+import shutil
+import subprocess
+import threading
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path, PurePosixPath
 
+from deerflow.sandbox.search_index import WorkspaceSearchIndex, may_contain, required_fragments
+
+logger = logging.getLogger(__name__)
+
 IGNORE_PATTERNS = [
     ".git",
     ".svn",
@@ -59,6 +71,8 @@ IGNORE_PATTERNS = [
 DEFAULT_MAX_FILE_SIZE_BYTES = 1_000_000
 DEFAULT_LINE_SUMMARY_LENGTH = 200
 
+_REGEX_META = frozenset(".^$*+?{}[]\\|()")
+
 
 @dataclass(frozen=True)
 class GrepMatch:
@@ -67,11 +81,16 @@ class GrepMatch:
     line: str
 
 
+# IGNORE_PATTERNS compiled once: plain names go into a set, wildcard patterns
+# into a single alternation regex. Matches fnmatch.fnmatch() semantics,
+# including os.path.normcase() on the candidate name.
+_IGNORE_NAMES = frozenset(os.path.normcase(p) for p in IGNORE_PATTERNS if not any(c in p for c in "*?["))
+_IGNORE_GLOB_RE = re.compile("|".join(fnmatch.translate(os.path.normcase(p)) for p in IGNORE_PATTERNS if any(c in p for c in "*?[")))
+
+
 def should_ignore_name(name: str) -> bool:
-    for pattern in IGNORE_PATTERNS:
-        if fnmatch.fnmatch(name, pattern):
-            return True
-    return False
+    name = os.path.normcase(name)
+    return name in _IGNORE_NAMES or _IGNORE_GLOB_RE.match(name) is not None
 
 
 def should_ignore_path(path: str) -> bool:
@@ -102,6 +121,78 @@ def is_binary_file(path: Path, sample_size: int = 8192) -> bool:
         return True
 
 
+# ---------------------------------------------------------------------------
+# Parallel traversal
+# ---------------------------------------------------------------------------
+#
+# Directory listings and file scans run on a shared thread pool; the calling
+# thread consumes their results in the exact order os.walk() would produce
+# them, so results (and where max_results truncates them) do not depend on
+# scheduling. os.scandir() and file reads release the GIL, which is where a
+# single-threaded walk spends most of its time on large trees.
+
+_SEARCH_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+# Files scanned ahead of the consumer. Bounded so an early max_results cutoff
+# does not leave thousands of wasted reads behind it.
+_SCAN_WINDOW = _SEARCH_WORKERS * 4
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=_SEARCH_WORKERS, thread_name_prefix="sandbox-search")
+    return _executor
+
+
+def _scan_directory(path: str) -> tuple[list[os.DirEntry], list[os.DirEntry]] | None:
+    """Split a directory's entries into (dirs, files) the way os.walk() does."""
+    try:
+        with os.scandir(path) as it:
+            entries = list(it)
+    except OSError:
+        return None
+
+    dirs: list[os.DirEntry] = []
+    files: list[os.DirEntry] = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        (dirs if is_dir else files).append(entry)
+    return dirs, files
+
+
+def _walk(root: Path) -> Iterator[tuple[str, list[os.DirEntry], list[os.DirEntry]]]:
+    """Top-down walk equivalent to ``os.walk(root)`` with ignored dirs pruned.
+
+    Subdirectory listings are prefetched on the search pool as soon as their
+    parent has been listed.
+    """
+    executor = _get_executor()
+    stack: list[tuple[str, Future]] = [(str(root), executor.submit(_scan_directory, str(root)))]
+    try:
+        while stack:
+            current_root, future = stack.pop()
+            listing = future.result()
+            if listing is None:
+                continue
+            dirs, files = listing
+            dirs = [entry for entry in dirs if not should_ignore_name(entry.name)]
+            yield current_root, dirs, files
+            # Like os.walk(followlinks=False): report symlinked dirs, don't descend.
+            children = [(entry.path, executor.submit(_scan_directory, entry.path)) for entry in dirs if not entry.is_symlink()]
+            stack.extend(reversed(children))
+    finally:
+        for _, future in stack:
+            future.cancel()
+
+
 def find_glob_matches(root: Path, pattern: str, *, include_dirs: bool = False, max_results: int = 200) -> tuple[list[str], bool]:
     matches: list[str] = []
     truncated = False
@@ -112,27 +203,26 @@ def find_glob_matches(root: Path, pattern: str, *, include_dirs: bool = False, m
     if not root.is_dir():
         raise NotADirectoryError(root)
 
-    for current_root, dirs, files in os.walk(root):
-        dirs[:] = [name for name in dirs if not should_ignore_name(name)]
-        # root is already resolved; os.walk builds current_root by joining under root,
+    for current_root, dirs, files in _walk(root):
+        # root is already resolved; the walk builds current_root by joining under root,
         # so relative_to() works without an extra stat()/resolve() per directory.
         rel_dir = Path(current_root).relative_to(root)
 
         if include_dirs:
-            for name in dirs:
-                rel_path = (rel_dir / name).as_posix()
+            for entry in dirs:
+                rel_path = (rel_dir / entry.name).as_posix()
                 if path_matches(pattern, rel_path):
-                    matches.append(str(Path(current_root) / name))
+                    matches.append(entry.path)
                     if len(matches) >= max_results:
                         truncated = True
                         return matches, truncated
 
-        for name in files:
-            if should_ignore_name(name):
+        for entry in files:
+            if should_ignore_name(entry.name):
                 continue
-            rel_path = (rel_dir / name).as_posix()
+            rel_path = (rel_dir / entry.name).as_posix()
             if path_matches(pattern, rel_path):
-                matches.append(str(Path(current_root) / name))
+                matches.append(entry.path)
                 if len(matches) >= max_results:
                     truncated = True
                     return matches, truncated
@@ -140,6 +230,259 @@ def find_glob_matches(root: Path, pattern: str, *, include_dirs: bool = False, m
     return matches, truncated
 
 
+# ---------------------------------------------------------------------------
+# Content scanning
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class _GrepSpec:
+    regex: re.Pattern[str]
+    # Whole-file regex used to jump straight to candidate lines, or None when
+    # the pattern could behave differently on a whole buffer than on a line.
+    prefilter: re.Pattern[str] | None
+    prefilter_is_literal: bool
+    # Lower-cased needle for case-insensitive ASCII literals. Python's
+    # IGNORECASE regexes have no fast literal scan, so these are located with
+    # str.find() on a lower-cased copy of the text instead.
+    folded_needle: str | None
+    max_file_size: int
+    max_line_chars: int
+    line_summary_length: int
+    limit: int
+    index: WorkspaceSearchIndex | None = None
+    # Lowercased literals every matching line contains; files whose index
+    # entry lacks one of them are skipped without being read.
+    fragments: tuple[bytes, ...] = ()
+
+
+def _build_prefilter(regex_source: str, flags: int, literal: bool) -> re.Pattern[str] | None:
+    """Compile a whole-buffer regex that finds every line the per-line regex would.
+
+    With MULTILINE, ``^``/``$`` match at the same positions in the buffer as
+    in the individual lines. Patterns that can see past a line boundary
+    (lookarounds, inline groups) or anchor to the string (``\\A``/``\\Z``)
+    are excluded; those are scanned line by line instead.
+    """
+    if not literal and ("(?" in regex_source or "\\A" in regex_source or "\\Z" in regex_source):
+        return None
+    return re.compile(regex_source, flags | re.MULTILINE)
+
+
+# Non-ASCII characters that Python's IGNORECASE treats as equal to an ASCII
+# letter, mapped to that letter so a lower-cased copy keeps them matchable.
+_ASCII_CASE_FOLDS = {"\u0130": "i", "\u0131": "i", "\u212a": "k", "\u017f": "s"}
+_CASE_FOLD_TABLE = str.maketrans(_ASCII_CASE_FOLDS)
+
+
+def _folded_needle(pattern: str, *, literal: bool, case_sensitive: bool) -> str | None:
+    if case_sensitive or not pattern or not pattern.isascii() or "\n" in pattern or "\r" in pattern:
+        return None
+    if not literal and any(c in _REGEX_META for c in pattern):
+        return None
+    return pattern.lower()
+
+
+def _decode_text(data: bytes) -> str | None:
+    """Decode file contents the same way open(..., errors="replace") does."""
+    if b"\0" in data[:8192]:
+        return None
+    text = data.decode("utf-8", errors="replace")
+    if "\r" in text:
+        # Universal newlines, as in text-mode iteration.
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def _scan_lines(text: str, spec: _GrepSpec) -> list[tuple[int, str]]:
+    results: list[tuple[int, str]] = []
+    lines = text.split("\n")
+    last = len(lines) - 1
+    for index, line in enumerate(lines):
+        if index < last:
+            line += "\n"
+        elif not line:
+            break
+        if len(line) > spec.max_line_chars:
+            continue
+        if spec.regex.search(line):
+            results.append((index + 1, truncate_line(line, spec.line_summary_length)))
+            if len(results) >= spec.limit:
+                break
+    return results
+
+
+def _scan_candidates(text: str, spec: _GrepSpec, find_next: Callable[[int], int]) -> list[tuple[int, str]]:
+    """Verify only the lines a whole-buffer search lands on.
+
+    ``find_next(pos)`` returns the offset of the next possible match at or
+    after ``pos`` (always a line start), or -1 when there is none.
+    """
+    results: list[tuple[int, str]] = []
+    pos = 0
+    line_number = 1
+    length = len(text)
+    while pos < length:
+        start = find_next(pos)
+        if start < 0:
+            break
+        line_start = text.rfind("\n", pos, start) + 1 or pos
+        line_number += text.count("\n", pos, line_start)
+        line_end = text.find("\n", start)
+        next_pos = length if line_end == -1 else line_end + 1
+        line = text[line_start:next_pos]
+        if len(line) <= spec.max_line_chars and spec.regex.search(line):
+            results.append((line_number, truncate_line(line, spec.line_summary_length)))
+            if len(results) >= spec.limit:
+                break
+        pos = next_pos
+        line_number += 1
+    return results
+
+
+def _pruned_by_index(entry: os.DirEntry, index: WorkspaceSearchIndex, fragments: tuple[bytes, ...]) -> bool:
+    """Return whether the index proves *entry* has no matching line.
+
+    Checked on the walking thread so that skipped files cost one stat()
+    and no work item on the search pool.
+    """
+    try:
+        stat = entry.stat()
+    except OSError:
+        return False
+    tokens = index.lookup(entry.path, stat.st_size, stat.st_mtime_ns)
+    return tokens is not None and (not tokens or not may_contain(tokens, fragments))
+
+
+def _grep_file(entry: os.DirEntry, spec: _GrepSpec) -> list[tuple[int, str]]:
+    try:
+        if entry.is_symlink():
+            return []
+        stat = entry.stat()
+        if stat.st_size > spec.max_file_size:
+            return []
+        tokens = None
+        if spec.index is not None:
+            tokens = spec.index.lookup(entry.path, stat.st_size, stat.st_mtime_ns)
+            # An empty entry marks a binary file.
+            if tokens is not None and (not tokens or not may_contain(tokens, spec.fragments)):
+                return []
+        with open(entry.path, "rb") as handle:
+            data = handle.read(spec.max_file_size + 1)
+    except OSError:
+        return []
+    if spec.index is not None and tokens is None:
+        spec.index.record(entry.path, stat.st_size, stat.st_mtime_ns, data)
+    text = _decode_text(data)
+    if not text:
+        return []
+
+    if spec.folded_needle is not None:
+        needle = spec.folded_needle
+        if text.isascii():
+            # ASCII text lower-cases without changing offsets, so candidate
+            # positions in the folded copy are positions in the text.
+            folded = text.lower()
+            return _scan_candidates(text, spec, lambda pos: folded.find(needle, pos))
+        if needle not in text.translate(_CASE_FOLD_TABLE).lower():
+            return []
+
+    if spec.prefilter is None:
+        return _scan_lines(text, spec)
+    # Regex prefilters run over the whole buffer, so only use them when no
+    # line is long enough to have been skipped for ReDoS safety.
+    if not spec.prefilter_is_literal and len(max(text.split("\n"), key=len)) >= spec.max_line_chars:
+        return _scan_lines(text, spec)
+
+    prefilter = spec.prefilter
+
+    def find_next(pos: int) -> int:
+        match = prefilter.search(text, pos)
+        return -1 if match is None else match.start()
+
+    return _scan_candidates(text, spec, find_next)
+
+
+# ---------------------------------------------------------------------------
+# Optional ripgrep prefilter
+# ---------------------------------------------------------------------------
+#
+# When an ``rg`` binary is available, it narrows grep down to files that
+# contain a match. It never produces results itself: the Python scanner
+# still verifies every line of every candidate in walk order, so output is
+# identical with or without ripgrep. rg is only consulted for patterns where
+# its match set is provably a superset of Python's: literals without line
+# breaks, and for case-insensitive search only ASCII literals (with Python's
+# extra Unicode case folds for i/k/s spelled out).
+
+_RG_TIMEOUT_SECONDS = 60
+_RG_CASE_FOLDS = {"i": "[iI\\x{130}\\x{131}]", "k": "[kK\\x{212A}]", "s": "[sS\\x{17F}]"}
+# Scan this many files in Python before paying for an rg pass over the whole
+# tree; searches for common terms usually fill max_results well before that.
+_RG_AFTER_FILES = 64
+
+
+@functools.lru_cache(maxsize=1)
+def _ripgrep_path() -> str | None:
+    return shutil.which("rg")
+
+
+def _ripgrep_pattern(pattern: str, *, literal: bool, case_sensitive: bool) -> str | None:
+    """Return an rg regex matching a superset of Python's lines, or None."""
+    if not literal and any(c in _REGEX_META for c in pattern):
+        return None
+    if not pattern or any(c in pattern for c in "\r\n\ufffd"):
+        return None
+    if not case_sensitive and not pattern.isascii():
+        return None
+
+    parts: list[str] = []
+    for char in pattern:
+        if not case_sensitive and char.lower() in _RG_CASE_FOLDS:
+            parts.append(_RG_CASE_FOLDS[char.lower()])
+        elif char.isalnum() or char in " _":
+            parts.append(char)
+        else:
+            parts.append(f"\\x{{{ord(char):X}}}")
+    return "".join(parts)
+
+
+def _ripgrep_candidates(root: Path, rg_pattern: str, *, case_sensitive: bool, max_file_size: int) -> set[str] | None:
+    """Return files under *root* that rg finds a match in, or None on failure."""
+    rg = _ripgrep_path()
+    if rg is None:
+        return None
+    command = [
+        rg,
+        "--files-with-matches",
+        "--null",
+        "--no-config",
+        "--no-ignore",
+        "--hidden",
+        "--no-follow",
+        "--text",
+        "--encoding",
+        "none",
+        "--max-filesize",
+        str(max_file_size),
+        "--ignore-case" if not case_sensitive else "--case-sensitive",
+    ]
+    for pattern in IGNORE_PATTERNS:
+        command.extend(["--glob", f"!{pattern}"])
+    command.extend(["--regexp", rg_pattern, "--", str(root)])
+
+    try:
+        result = subprocess.run(command, capture_output=True, timeout=_RG_TIMEOUT_SECONDS)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.debug("ripgrep prefilter unavailable, falling back to full scan: %s", e)
+        return None
+    # 0 = matches, 1 = no matches; anything else is an error.
+    if result.returncode not in (0, 1):
+        logger.debug("ripgrep exited with %d: %s", result.returncode, result.stderr[:200])
+        return None
+    return {os.fsdecode(path) for path in result.stdout.split(b"\0") if path}
+
+
 def find_grep_matches(
     root: Path,
     pattern: str,
@@ -150,7 +493,19 @@ def find_grep_matches(
     max_results: int = 100,
     max_file_size: int = DEFAULT_MAX_FILE_SIZE_BYTES,
     line_summary_length: int = DEFAULT_LINE_SUMMARY_LENGTH,
+    use_ripgrep: bool | None = None,
+    index: WorkspaceSearchIndex | None = None,
 ) -> tuple[list[GrepMatch], bool]:
+    """Search text files under *root* for lines matching *pattern*.
+
+    Args:
+        use_ripgrep: Use an ``rg`` binary to prefilter candidate files.
+            ``None`` (default) uses it when one is on ``PATH``. Results are
+            identical either way; only speed differs.
+        index: Workspace search index used to skip files that cannot match
+            and kept up to date with the files read. Ignored unless it
+            covers *root*. Results are identical either way.
+    """
     matches: list[GrepMatch] = []
     truncated = False
     root = root.resolve()
@@ -164,47 +519,77 @@ def find_grep_matches(
     flags = 0 if case_sensitive else re.IGNORECASE
     regex = re.compile(regex_source, flags)
 
-    # Skip lines longer than this to prevent ReDoS on minified / no-newline files.
-    _max_line_chars = line_summary_length * 10
+    if index is not None and not index.covers(root):
+        index = None
+    fragments = required_fragments(pattern, literal=literal) if index is not None else ()
+
+    spec = _GrepSpec(
+        regex=regex,
+        prefilter=_build_prefilter(regex_source, flags, literal),
+        prefilter_is_literal=literal or not any(c in _REGEX_META for c in pattern),
+        folded_needle=_folded_needle(pattern, literal=literal, case_sensitive=case_sensitive),
+        max_file_size=max_file_size,
+        # Skip lines longer than this to prevent ReDoS on minified / no-newline files.
+        max_line_chars=line_summary_length * 10,
+        line_summary_length=line_summary_length,
+        limit=max_results,
+        index=index,
+        fragments=fragments,
+    )
+
+    rg_pattern = None
+    # The index already prunes files when the pattern has literal fragments.
+    if use_ripgrep is not False and not fragments and _ripgrep_path() is not None:
+        rg_pattern = _ripgrep_pattern(pattern, literal=literal, case_sensitive=case_sensitive)
+    candidates: set[str] | None = None
+    scanned = 0
+
+    executor = _get_executor()
+    window: deque[tuple[str, Future]] = deque()
+
+    def drain_one() -> bool:
+        nonlocal scanned
+        path, future = window.popleft()
+        scanned += 1
+        for line_number, line in future.result():
+            matches.append(GrepMatch(path=path, line_number=line_number, line=line))
+            if len(matches) >= max_results:
+                return True
+        return False
 
-    for current_root, dirs, files in os.walk(root):
-        dirs[:] = [name for name in dirs if not should_ignore_name(name)]
-        rel_dir = Path(current_root).relative_to(root)
-
-        for name in files:
-            if should_ignore_name(name):
-                continue
-
-            candidate_path = Path(current_root) / name
-            rel_path = (rel_dir / name).as_posix()
-
-            if glob_pattern is not None and not path_matches(glob_pattern, rel_path):
-                continue
+    try:
+        for current_root, _dirs, files in _walk(root):
+            rel_dir = Path(current_root).relative_to(root)
 
-            try:
-                if candidate_path.is_symlink():
+            for entry in files:
+                if should_ignore_name(entry.name):
                     continue
-                file_path = candidate_path.resolve()
-                if not file_path.is_relative_to(root):
+                if glob_pattern is not None and not path_matches(glob_pattern, (rel_dir / entry.name).as_posix()):
                     continue
-                if file_path.stat().st_size > max_file_size or is_binary_file(file_path):
+
+                if rg_pattern is not None and candidates is None and scanned + len(window) >= _RG_AFTER_FILES:
+                    candidates = _ripgrep_candidates(root, rg_pattern, case_sensitive=case_sensitive, max_file_size=max_file_size)
+                    rg_pattern = None
+                if candidates is not None and entry.path not in candidates:
                     continue
-                with file_path.open(encoding="utf-8", errors="replace") as handle:
-                    for line_number, line in enumerate(handle, start=1):
-                        if len(line) > _max_line_chars:
-                            continue
-                        if regex.search(line):
-                            matches.append(
-                                GrepMatch(
-                                    path=str(file_path),
-                                    line_number=line_number,
-                                    line=truncate_line(line, line_summary_length),
-                                )
-                            )
-                            if len(matches) >= max_results:
-                                truncated = True
-                                return matches, truncated
-            except OSError:
-                continue
+                if fragments and _pruned_by_index(entry, index, fragments):
+                    continue
+
+                window.append((entry.path, executor.submit(_grep_file, entry, spec)))
+                # Ramp the read-ahead up gradually so a search that is
+                # satisfied by its first few files does not read hundreds.
+                if len(window) >= min(_SCAN_WINDOW, 4 + scanned) and drain_one():
+                    truncated = True
+                    return matches, truncated
+
+        while window:
+            if drain_one():
+                truncated = True
+                return matches, truncated
+    finally:
+        for _, future in window:
+            future.cancel()
+        if index is not None:
+            index.save()
 
     return matches, truncated
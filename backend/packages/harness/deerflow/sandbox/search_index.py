@@ -0,0 +1,379 @@
+"""Persistent per-thread index that lets grep skip files without reading them.
+
+Agents grep the same thread workspace many times in one run, and every call
+used to read every file again. :class:`WorkspaceSearchIndex` remembers, for
+each file it has seen, the set of distinct word tokens the file contains
+(ASCII-lowercased, with Python's non-ASCII case folds of i/k/s mapped back
+to ASCII). A grep pattern's required literal fragments are extracted up
+front; a file whose token set cannot contain every fragment cannot match
+and is skipped.
+
+Pruning is conservative by construction:
+
+- Entries are only trusted while the file's size and ``st_mtime_ns`` are
+  unchanged, and never for files modified within the last few seconds
+  (timestamps are too coarse to tell two quick writes apart).
+- Patterns whose required literals cannot be determined (alternation,
+  groups, backreferences, ...) are not pruned at all.
+
+Entries are filled in lazily by the searches themselves and by the file
+write tools, persisted to SQLite under the thread directory, and bounded
+in total size with least-recently-used eviction.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_INDEX_BYTES = 64 * 1024 * 1024
+
+_SCHEMA_VERSION = 1
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    tokens BLOB NOT NULL
+);
+"""
+
+# Files modified this recently may be modified again within the same
+# timestamp tick, so their entries are not stored ("racy" entries in git).
+_RACY_WINDOW_NS = 2_000_000_000
+
+# A single file's token set larger than this (minified bundles, data dumps)
+# is not worth keeping; such files are always scanned.
+_MAX_FILE_TOKEN_BYTES = 256 * 1024
+
+# Fragments shorter than this are too unselective to be worth a lookup.
+_MIN_FRAGMENT_LENGTH = 3
+_FRAGMENT_RE = re.compile(rf"[0-9A-Za-z_]{{{_MIN_FRAGMENT_LENGTH},}}")
+
+# UTF-8 encodings of the non-ASCII characters Python's IGNORECASE treats as
+# equal to an ASCII letter (see search._ASCII_CASE_FOLDS).
+_UTF8_ASCII_FOLDS = ((b"\xc4\xb0", b"i"), (b"\xc4\xb1", b"i"), (b"\xe2\x84\xaa", b"k"), (b"\xc5\xbf", b"s"))
+
+# Lowercases ASCII word characters and turns every other byte into a
+# separator, so bytes.split() yields exactly the \w runs of bytes regexes.
+_WORD_BYTES = b"0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz"
+_TOKENIZE_TABLE = bytes(byte if byte in _WORD_BYTES else 0x20 for byte in range(256)).lower()
+
+_BINARY_SNIFF_BYTES = 8192
+
+
+def file_tokens(data: bytes) -> bytes:
+    """Return the index entry for file contents *data*.
+
+    The entry is the file's distinct word tokens (at least three ASCII word
+    characters), lowercased and newline-separated. Binary files get an empty
+    entry: grep never reports matches in them.
+    """
+    if b"\0" in data[:_BINARY_SNIFF_BYTES]:
+        return b""
+    if b"\xc4" in data or b"\xc5" in data or b"\xe2" in data:
+        for encoded, ascii_char in _UTF8_ASCII_FOLDS:
+            data = data.replace(encoded, ascii_char)
+    tokens = {token for token in set(data.translate(_TOKENIZE_TABLE).split()) if len(token) >= _MIN_FRAGMENT_LENGTH}
+    return b"\n" + b"\n".join(tokens) + b"\n"
+
+
+def _split_literal_runs(pattern: str) -> list[str] | None:
+    """Return substrings every match of regex *pattern* must contain.
+
+    Deliberately conservative: anything that could make a character
+    optional or alternative ends the current run, and constructs that are
+    hard to reason about (groups, alternation, numeric escapes) return
+    ``None`` so the caller falls back to a full scan.
+    """
+    runs: list[str] = []
+    current: list[str] = []
+
+    def flush() -> None:
+        if current:
+            runs.append("".join(current))
+            current.clear()
+
+    i = 0
+    length = len(pattern)
+    while i < length:
+        char = pattern[i]
+        if char in "(|)":
+            return None
+        if char == "\\":
+            if i + 1 >= length:
+                return None
+            escaped = pattern[i + 1]
+            i += 2
+            if escaped.isdigit() or escaped in "xuUN":
+                return None
+            if escaped.isalnum():
+                # \d, \w, \b, \n, ... are classes, anchors or control chars.
+                flush()
+            else:
+                current.append(escaped)
+            continue
+        if char == "[":
+            flush()
+            i += 1
+            if i < length and pattern[i] == "^":
+                i += 1
+            if i < length and pattern[i] == "]":
+                i += 1
+            while i < length and pattern[i] != "]":
+                i += 2 if pattern[i] == "\\" else 1
+            i += 1
+            continue
+        if char in "*?" or (char == "{" and re.match(r"\{\d*,?\d*\}", pattern[i:])):
+            # The previous atom may be absent.
+            if current:
+                current.pop()
+            flush()
+            i = pattern.index("}", i) + 1 if char == "{" else i + 1
+            if i < length and pattern[i] in "?+":
+                i += 1
+            continue
+        if char == "+":
+            flush()
+            i += 1
+            if i < length and pattern[i] in "?+":
+                i += 1
+            continue
+        if char in ".^$":
+            flush()
+        else:
+            current.append(char)
+        i += 1
+    flush()
+    return runs
+
+
+def required_fragments(pattern: str, *, literal: bool) -> tuple[bytes, ...]:
+    """Return lowercased ASCII word fragments that any matching line contains.
+
+    An empty tuple means the pattern cannot be pruned with the index.
+    """
+    runs = [pattern] if literal else _split_literal_runs(pattern)
+    if not runs:
+        return ()
+    fragments = {fragment.lower().encode("ascii") for run in runs if "\n" not in run and "\r" not in run for fragment in _FRAGMENT_RE.findall(run)}
+    return tuple(sorted(fragments, key=lambda fragment: (-len(fragment), fragment)))
+
+
+class WorkspaceSearchIndex:
+    """Token index over the files of one thread's user-data directory.
+
+    All methods are thread-safe; grep workers consult and fill the index
+    concurrently.
+    """
+
+    def __init__(self, root: str | Path, db_path: str | Path | None = None, max_bytes: int = DEFAULT_MAX_INDEX_BYTES):
+        """Initialize the index.
+
+        Args:
+            root: Directory the index covers. Files outside it are ignored.
+            db_path: SQLite file to persist entries to, or ``None`` to keep
+                the index in memory only.
+            max_bytes: Upper bound on the total size of stored token sets.
+        """
+        self.root = Path(root).resolve()
+        self._root_prefix = str(self.root).rstrip(os.sep) + os.sep
+        self._db_path = Path(db_path) if db_path is not None else None
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[int, int, bytes]] = OrderedDict()
+        self._total_bytes = 0
+        self._dirty: set[str] = set()
+        self._loaded = False
+
+    # -- persistence -------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        assert self._db_path is not None
+        self._db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self._db_path, timeout=5)
+        if conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+            # Unknown or older layout: it is only a cache, so start over.
+            conn.execute("DROP TABLE IF EXISTS files")
+            conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def _ensure_loaded(self) -> None:
+        """Load persisted entries on first use. Caller holds ``_lock``."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if self._db_path is None or not self._db_path.exists():
+            return
+        try:
+            conn = self._connect()
+            try:
+                for path, size, mtime_ns, tokens in conn.execute("SELECT path, size, mtime_ns, tokens FROM files"):
+                    self._put(path, size, mtime_ns, bytes(tokens), dirty=False)
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning("Discarding unreadable search index %s: %s", self._db_path, e)
+            self._entries.clear()
+            self._total_bytes = 0
+            self._db_path.unlink(missing_ok=True)
+
+    def save(self) -> None:
+        """Write entries changed since the last save to disk."""
+        if self._db_path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            dirty, self._dirty = self._dirty, set()
+            upserts = [(path, *self._entries[path]) for path in dirty if path in self._entries]
+            deletes = [(path,) for path in dirty if path not in self._entries]
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany("DELETE FROM files WHERE path = ?", deletes)
+                    conn.executemany("INSERT OR REPLACE INTO files (path, size, mtime_ns, tokens) VALUES (?, ?, ?, ?)", upserts)
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning("Failed to save search index %s: %s", self._db_path, e)
+
+    # -- entries -----------------------------------------------------------
+
+    def covers(self, path: str | Path) -> bool:
+        """Return whether *path* (an absolute host path) is inside the indexed root."""
+        path = str(path)
+        return path == str(self.root) or path.startswith(self._root_prefix)
+
+    def _put(self, path: str, size: int, mtime_ns: int, tokens: bytes, *, dirty: bool = True) -> None:
+        self._drop(path)
+        if len(tokens) > _MAX_FILE_TOKEN_BYTES:
+            return
+        self._entries[path] = (size, mtime_ns, tokens)
+        self._total_bytes += len(tokens) + len(path)
+        if dirty:
+            self._dirty.add(path)
+        while self._total_bytes > self._max_bytes and self._entries:
+            evicted, (_, _, evicted_tokens) = self._entries.popitem(last=False)
+            self._total_bytes -= len(evicted_tokens) + len(evicted)
+            self._dirty.add(evicted)
+
+    def _drop(self, path: str) -> None:
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._total_bytes -= len(entry[2]) + len(path)
+            self._dirty.add(path)
+
+    def lookup(self, path: str, size: int, mtime_ns: int) -> bytes | None:
+        """Return the token set for *path* if the entry matches its current stat."""
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._entries.get(path)
+            if entry is None:
+                return None
+            if entry[0] != size or entry[1] != mtime_ns:
+                self._drop(path)
+                return None
+            self._entries.move_to_end(path)
+            return entry[2]
+
+    def record(self, path: str, size: int, mtime_ns: int, data: bytes) -> None:
+        """Index file contents *data* observed with the given stat values."""
+        if not self.covers(path) or mtime_ns > time.time_ns() - _RACY_WINDOW_NS:
+            return
+        tokens = file_tokens(data)
+        with self._lock:
+            self._ensure_loaded()
+            self._put(path, size, mtime_ns, tokens)
+
+    def record_write(self, path: str, data: bytes) -> None:
+        """Index a file whose full contents the caller has just written.
+
+        Unlike :meth:`record`, the entry is stored even though the file is
+        brand new: the caller knows exactly what it wrote, under the file
+        operation lock.
+        """
+        if not self.covers(path):
+            return
+        try:
+            stat = Path(path).stat()
+        except OSError:
+            self.discard(path)
+            return
+        if stat.st_size != len(data):
+            # Someone else changed the file in between; let the next search re-read it.
+            self.discard(path)
+            return
+        tokens = file_tokens(data)
+        with self._lock:
+            self._ensure_loaded()
+            self._put(path, stat.st_size, stat.st_mtime_ns, tokens)
+
+    def discard(self, path: str) -> None:
+        """Forget *path*; the next search re-reads it."""
+        with self._lock:
+            self._ensure_loaded()
+            self._drop(path)
+
+    def clear(self) -> None:
+        """Drop every entry, in memory and on disk."""
+        with self._lock:
+            self._ensure_loaded()
+            self._dirty.update(self._entries)
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """Approximate in-memory size of the stored token sets."""
+        with self._lock:
+            self._ensure_loaded()
+            return self._total_bytes
+
+
+def may_contain(tokens: bytes, fragments: tuple[bytes, ...]) -> bool:
+    """Return whether a file with token set *tokens* can contain every fragment."""
+    for fragment in fragments:
+        if fragment not in tokens:
+            return False
+    return True
+
+
+_indexes: OrderedDict[str, WorkspaceSearchIndex] = OrderedDict()
+_indexes_lock = threading.Lock()
+_MAX_OPEN_INDEXES = 32
+
+
+def get_thread_search_index(thread_id: str, root: str | Path, max_bytes: int = DEFAULT_MAX_INDEX_BYTES) -> WorkspaceSearchIndex:
+    """Return the shared index for a thread, creating it on first use.
+
+    Args:
+        thread_id: Thread whose workspace is indexed.
+        root: Host path of the thread's user-data directory.
+        max_bytes: Size bound for a newly created index.
+    """
+    from deerflow.config.paths import get_paths
+
+    with _indexes_lock:
+        index = _indexes.get(thread_id)
+        if index is None or index.root != Path(root).resolve():
+            index = WorkspaceSearchIndex(root, get_paths().search_index_file(thread_id), max_bytes=max_bytes)
+            _indexes[thread_id] = index
+            while len(_indexes) > _MAX_OPEN_INDEXES:
+                _indexes.popitem(last=False)
+        else:
+            _indexes.move_to_end(thread_id)
+        return index
@@ -1,6 +1,10 @@
+import asyncio
+import functools
+import os
 import posixpath
 import re
 import shlex
+import uuid
 from pathlib import Path
 
 from langchain.tools import ToolRuntime, tool
@@ -14,10 +18,14 @@ from deerflow.sandbox.exceptions import (
     SandboxNotFoundError,
     SandboxRuntimeError,
 )
-from deerflow.sandbox.file_operation_lock import get_file_operation_lock
+from deerflow.sandbox.file_operation_lock import acquire_lock_async, get_file_operation_lock
+from deerflow.sandbox.local.command_runner import OutputCallback
+from deerflow.sandbox.local.local_sandbox import LocalSandbox
+from deerflow.sandbox.path_mapper import PathMapper, PathMatch, get_path_mapper
 from deerflow.sandbox.sandbox import Sandbox
 from deerflow.sandbox.sandbox_provider import get_sandbox_provider
 from deerflow.sandbox.search import GrepMatch
+from deerflow.sandbox.search_index import WorkspaceSearchIndex, get_thread_search_index
 from deerflow.sandbox.security import LOCAL_HOST_BASH_DISABLED_MESSAGE, is_host_bash_allowed
 
 _ABSOLUTE_PATH_PATTERN = re.compile(r"(?<![:\w])(?<!:/)/(?:[^\s\"'`;&|<>()]+)")
@@ -336,6 +344,43 @@ def _resolve_local_read_path(path: str, thread_data: ThreadDataState) -> str:
     return _resolve_and_validate_user_data_path(path, thread_data)
 
 
+def _get_workspace_search_index(thread_data: ThreadDataState | None) -> WorkspaceSearchIndex | None:
+    """Return the thread's workspace search index, or None when it is disabled."""
+    if thread_data is None:
+        return None
+    try:
+        sandbox_cfg = get_app_config().sandbox
+        if getattr(sandbox_cfg, "search_index_enabled", False) is not True:
+            return None
+        max_bytes = sandbox_cfg.search_index_max_mb * 1024 * 1024
+    except Exception:
+        return None
+    thread_id = _extract_thread_id_from_thread_data(thread_data)
+    workspace_path = thread_data.get("workspace_path")
+    if thread_id is None or workspace_path is None:
+        return None
+    try:
+        return get_thread_search_index(thread_id, Path(workspace_path).parent, max_bytes=max_bytes)
+    except ValueError:
+        return None
+
+
+def _update_search_index_after_write(thread_data: ThreadDataState | None, path: str, content: str | None) -> None:
+    """Refresh the search index entry for a file a tool has just written.
+
+    Args:
+        content: The file's full new content, or None when only part of it is known (appends).
+    """
+    search_index = _get_workspace_search_index(thread_data)
+    if search_index is None:
+        return
+    if content is None:
+        search_index.discard(path)
+    else:
+        search_index.record_write(path, content.encode("utf-8"))
+    search_index.save()
+
+
 def _format_glob_results(root_path: str, matches: list[str], truncated: bool) -> str:
     if not matches:
         return f"No files matched under {root_path}"
@@ -362,10 +407,6 @@ def _format_grep_results(root_path: str, matches: list[GrepMatch], truncated: bo
     return "\n".join(lines)
 
 
-def _path_variants(path: str) -> set[str]:
-    return {path, path.replace("\\", "/"), path.replace("/", "\\")}
-
-
 def _path_separator_for_style(path: str) -> str:
     return "\\" if "\\" in path and "/" not in path else "/"
 
@@ -411,22 +452,15 @@ def replace_virtual_path(path: str, thread_data: ThreadDataState | None) -> str:
     if thread_data is None:
         return path
 
-    mappings = _thread_virtual_to_actual_mappings(thread_data)
-    if not mappings:
+    # Longest-prefix replacement with segment-boundary checks.
+    match = get_path_mapper(tuple(_thread_virtual_to_actual_mappings(thread_data).items())).match(path)
+    if match is None:
         return path
 
-    # Longest-prefix-first replacement with segment-boundary checks.
-    for virtual_base, actual_base in sorted(mappings.items(), key=lambda item: len(item[0]), reverse=True):
-        if path == virtual_base:
-            return actual_base
-        if path.startswith(f"{virtual_base}/"):
-            rest = path[len(virtual_base) :].lstrip("/")
-            result = _join_path_preserving_style(actual_base, rest)
-            if path.endswith("/") and not result.endswith(("/", "\\")):
-                result += _path_separator_for_style(actual_base)
-            return result
-
-    return path
+    result = _join_path_preserving_style(match.target, match.relative)
+    if path.endswith("/") and not result.endswith(("/", "\\")):
+        result += _path_separator_for_style(match.target)
+    return result
 
 
 def _thread_virtual_to_actual_mappings(thread_data: ThreadDataState) -> dict[str, str]:
@@ -459,78 +493,47 @@ def _thread_actual_to_virtual_mappings(thread_data: ThreadDataState) -> dict[str
     return {actual: virtual for virtual, actual in _thread_virtual_to_actual_mappings(thread_data).items()}
 
 
+@functools.lru_cache(maxsize=256)
+def _output_mask_mapper(host_to_virtual: tuple[tuple[str, str], ...]) -> PathMapper:
+    """Compile the host-to-virtual mapper used to mask output.
+
+    Each host base is matched both as given and fully resolved, with either
+    separator style.
+    """
+    mappings = []
+    for host, virtual in host_to_virtual:
+        mappings.append((str(Path(host)), virtual))
+        mappings.append((str(Path(host).resolve()), virtual))
+    return PathMapper(mappings, any_separator=True)
+
+
 def mask_local_paths_in_output(output: str, thread_data: ThreadDataState | None) -> str:
     """Mask host absolute paths from local sandbox output using virtual paths.
 
     Handles user-data paths (per-thread), skills paths, and ACP workspace paths (global).
+    All host bases are replaced in a single pass, longest base first.
     """
-    result = output
+    host_to_virtual: list[tuple[str, str]] = []
 
     # Mask skills host paths
     skills_host = _get_skills_host_path()
-    skills_container = _get_skills_container_path()
     if skills_host:
-        raw_base = str(Path(skills_host))
-        resolved_base = str(Path(skills_host).resolve())
-        for base in _path_variants(raw_base) | _path_variants(resolved_base):
-            escaped = re.escape(base).replace(r"\\", r"[/\\]")
-            pattern = re.compile(escaped + r"(?:[/\\][^\s\"';&|<>()]*)?")
-
-            def replace_skills(match: re.Match, _base: str = base) -> str:
-                matched_path = match.group(0)
-                if matched_path == _base:
-                    return skills_container
-                relative = matched_path[len(_base) :].lstrip("/\\")
-                return f"{skills_container}/{relative}" if relative else skills_container
-
-            result = pattern.sub(replace_skills, result)
+        host_to_virtual.append((skills_host, _get_skills_container_path()))
 
     # Mask ACP workspace host paths
-    _thread_id = _extract_thread_id_from_thread_data(thread_data)
-    acp_host = _get_acp_workspace_host_path(_thread_id)
+    acp_host = _get_acp_workspace_host_path(_extract_thread_id_from_thread_data(thread_data))
     if acp_host:
-        raw_base = str(Path(acp_host))
-        resolved_base = str(Path(acp_host).resolve())
-        for base in _path_variants(raw_base) | _path_variants(resolved_base):
-            escaped = re.escape(base).replace(r"\\", r"[/\\]")
-            pattern = re.compile(escaped + r"(?:[/\\][^\s\"';&|<>()]*)?")
-
-            def replace_acp(match: re.Match, _base: str = base) -> str:
-                matched_path = match.group(0)
-                if matched_path == _base:
-                    return _ACP_WORKSPACE_VIRTUAL_PATH
-                relative = matched_path[len(_base) :].lstrip("/\\")
-                return f"{_ACP_WORKSPACE_VIRTUAL_PATH}/{relative}" if relative else _ACP_WORKSPACE_VIRTUAL_PATH
-
-            result = pattern.sub(replace_acp, result)
+        host_to_virtual.append((acp_host, _ACP_WORKSPACE_VIRTUAL_PATH))
 
     # Custom mount host paths are masked by LocalSandbox._reverse_resolve_paths_in_output()
 
     # Mask user-data host paths
-    if thread_data is None:
-        return result
-
-    mappings = _thread_actual_to_virtual_mappings(thread_data)
-    if not mappings:
-        return result
-
-    for actual_base, virtual_base in sorted(mappings.items(), key=lambda item: len(item[0]), reverse=True):
-        raw_base = str(Path(actual_base))
-        resolved_base = str(Path(actual_base).resolve())
-        for base in _path_variants(raw_base) | _path_variants(resolved_base):
-            escaped_actual = re.escape(base).replace(r"\\", r"[/\\]")
-            pattern = re.compile(escaped_actual + r"(?:[/\\][^\s\"';&|<>()]*)?")
+    if thread_data is not None:
+        host_to_virtual.extend(_thread_actual_to_virtual_mappings(thread_data).items())
 
-            def replace_match(match: re.Match, _base: str = base, _virtual: str = virtual_base) -> str:
-                matched_path = match.group(0)
-                if matched_path == _base:
-                    return _virtual
-                relative = matched_path[len(_base) :].lstrip("/\\")
-                return f"{_virtual}/{relative}" if relative else _virtual
-
-            result = pattern.sub(replace_match, result)
-
-    return result
+    if not host_to_virtual:
+        return output
+    return _output_mask_mapper(tuple(host_to_virtual)).sub(output)
 
 
 def _reject_path_traversal(path: str) -> None:
@@ -658,38 +661,30 @@ def validate_local_bash_command_paths(command: str, thread_data: ThreadDataState
     if file_url_match:
         raise PermissionError(f"Unsafe file:// URL in command: {file_url_match.group()}. Use paths under {VIRTUAL_PATH_PREFIX}")
 
-    unsafe_paths: list[str] = []
-    allowed_paths = _get_mcp_allowed_paths()
+    allowed_roots = get_path_mapper(
+        tuple(
+            (root.rstrip("/"), root)
+            for root in (
+                # MCP filesystem server allowed paths
+                *_get_mcp_allowed_paths(),
+                VIRTUAL_PATH_PREFIX,
+                # Skills container path (resolved by tools.py before passing to sandbox)
+                _get_skills_container_path(),
+                _ACP_WORKSPACE_VIRTUAL_PATH,
+                # Custom mount container paths
+                *(mount.container_path for mount in _get_custom_mounts()),
+                *_LOCAL_BASH_SYSTEM_PATH_PREFIXES,
+            )
+        )
+    )
 
+    unsafe_paths: list[str] = []
     for absolute_path in _ABSOLUTE_PATH_PATTERN.findall(command):
-        # Check for MCP filesystem server allowed paths
-        if any(absolute_path.startswith(path) or absolute_path == path.rstrip("/") for path in allowed_paths):
-            _reject_path_traversal(absolute_path)
+        if allowed_roots.match(absolute_path) is None:
+            unsafe_paths.append(absolute_path)
             continue
-
-        if absolute_path == VIRTUAL_PATH_PREFIX or absolute_path.startswith(f"{VIRTUAL_PATH_PREFIX}/"):
-            _reject_path_traversal(absolute_path)
-            continue
-
-        # Allow skills container path (resolved by tools.py before passing to sandbox)
-        if _is_skills_path(absolute_path):
-            _reject_path_traversal(absolute_path)
-            continue
-
-        # Allow ACP workspace path (path-traversal check only)
-        if _is_acp_workspace_path(absolute_path):
-            _reject_path_traversal(absolute_path)
-            continue
-
-        # Allow custom mount container paths
-        if _is_custom_mount_path(absolute_path):
-            _reject_path_traversal(absolute_path)
-            continue
-
-        if any(absolute_path == prefix.rstrip("/") or absolute_path.startswith(prefix) for prefix in _LOCAL_BASH_SYSTEM_PATH_PREFIXES):
-            continue
-
-        unsafe_paths.append(absolute_path)
+        # Allowed roots get a path-traversal check only
+        _reject_path_traversal(absolute_path)
 
     if unsafe_paths:
         unsafe = ", ".join(sorted(dict.fromkeys(unsafe_paths)))
@@ -706,42 +701,33 @@ def replace_virtual_paths_in_command(command: str, thread_data: ThreadDataState
     Returns:
         The command with all virtual paths replaced.
     """
-    result = command
+    # Each virtual root maps to a resolver for the full matched path.
+    roots: list[tuple[str, str, str]] = []
 
     # Replace skills paths
     skills_container = _get_skills_container_path()
-    skills_host = _get_skills_host_path()
-    if skills_host and skills_container in result:
-        skills_pattern = re.compile(rf"{re.escape(skills_container)}(/[^\s\"';&|<>()]*)?")
-
-        def replace_skills_match(match: re.Match) -> str:
-            return _resolve_skills_path(match.group(0))
-
-        result = skills_pattern.sub(replace_skills_match, result)
+    if _get_skills_host_path():
+        roots.append((skills_container, skills_container, "skills"))
 
     # Replace ACP workspace paths
-    _thread_id = _extract_thread_id_from_thread_data(thread_data)
-    acp_host = _get_acp_workspace_host_path(_thread_id)
-    if acp_host and _ACP_WORKSPACE_VIRTUAL_PATH in result:
-        acp_pattern = re.compile(rf"{re.escape(_ACP_WORKSPACE_VIRTUAL_PATH)}(/[^\s\"';&|<>()]*)?")
-
-        def replace_acp_match(match: re.Match, _tid: str | None = _thread_id) -> str:
-            return _resolve_acp_workspace_path(match.group(0), _tid)
-
-        result = acp_pattern.sub(replace_acp_match, result)
+    thread_id = _extract_thread_id_from_thread_data(thread_data)
+    if _get_acp_workspace_host_path(thread_id):
+        roots.append((_ACP_WORKSPACE_VIRTUAL_PATH, _ACP_WORKSPACE_VIRTUAL_PATH, "acp"))
 
     # Custom mount paths are resolved by LocalSandbox._resolve_paths_in_command()
 
     # Replace user-data paths
-    if VIRTUAL_PATH_PREFIX in result and thread_data is not None:
-        pattern = re.compile(rf"{re.escape(VIRTUAL_PATH_PREFIX)}(/[^\s\"';&|<>()]*)?")
-
-        def replace_user_data_match(match: re.Match) -> str:
-            return replace_virtual_path(match.group(0), thread_data)
+    if thread_data is not None:
+        roots.append((VIRTUAL_PATH_PREFIX, VIRTUAL_PATH_PREFIX, "user-data"))
 
-        result = pattern.sub(replace_user_data_match, result)
+    def resolve(match: PathMatch) -> str:
+        if match.data == "skills":
+            return _resolve_skills_path(match.text)
+        if match.data == "acp":
+            return _resolve_acp_workspace_path(match.text, thread_id)
+        return replace_virtual_path(match.text, thread_data)
 
-    return result
+    return get_path_mapper(tuple(roots)).sub(command, resolve)
 
 
 def _apply_cwd_prefix(command: str, thread_data: ThreadDataState | None) -> str:
@@ -873,6 +859,20 @@ def ensure_sandbox_initialized(runtime: ToolRuntime[ContextT, ThreadState] | Non
     return sandbox
 
 
+async def _aensure_sandbox_initialized(runtime: ToolRuntime[ContextT, ThreadState] | None = None) -> Sandbox:
+    """Async variant of ``ensure_sandbox_initialized``.
+
+    Looking up an already acquired sandbox is an in-memory provider call and
+    runs inline; acquiring one (which may start a container) runs on a
+    worker thread.
+    """
+    sandbox_state = runtime.state.get("sandbox") if runtime is not None and runtime.state is not None else None
+    sandbox_id = sandbox_state.get("sandbox_id") if sandbox_state is not None else None
+    if sandbox_id is not None and get_sandbox_provider().get(sandbox_id) is not None:
+        return ensure_sandbox_initialized(runtime)
+    return await asyncio.to_thread(ensure_sandbox_initialized, runtime)
+
+
 def ensure_thread_directories_exist(runtime: ToolRuntime[ContextT, ThreadState] | None) -> None:
     """Ensure thread data directories (workspace, uploads, outputs) exist.
 
@@ -899,8 +899,6 @@ def ensure_thread_directories_exist(runtime: ToolRuntime[ContextT, ThreadState]
         return
 
     # Create the three directories
-    import os
-
     for key in ["workspace_path", "uploads_path", "outputs_path"]:
         path = thread_data.get(key)
         if path:
@@ -986,6 +984,101 @@ def _truncate_ls_output(output: str, max_chars: int) -> str:
     return f"{output[:kept]}{marker}"
 
 
+# Room for the middle-truncation marker and the stderr/exit-status lines, so
+# output captured within the bash_output_max_chars budget is not truncated a
+# second time without a spill file.
+_BASH_TRUNCATION_MARKER_ALLOWANCE = 128
+# Spilled output logs kept per thread; older ones are deleted.
+_BASH_SPILL_MAX_LOGS = 20
+
+
+def _bash_capture_options(thread_data: ThreadDataState | None, max_chars: int) -> dict:
+    """Keyword arguments bounding how much command output LocalSandbox keeps in memory.
+
+    Each stream keeps head and tail windows that fit the tool's output
+    budget; if the output does not fit, the complete output is spilled to a
+    log under the thread's outputs directory, with host paths masked.
+    """
+    if not max_chars:
+        return {}
+    options: dict = {"capture_chars": max(max_chars - _BASH_TRUNCATION_MARKER_ALLOWANCE, 1)}
+    outputs_path = thread_data.get("outputs_path") if thread_data else None
+    if outputs_path:
+        options["spill_path"] = str(Path(outputs_path) / "bash-output" / f"{uuid.uuid4().hex[:12]}.log")
+        options["spill_transform"] = lambda text: mask_local_paths_in_output(text, thread_data)
+    return options
+
+
+def _prune_bash_spill_logs(directory: Path, keep: int = _BASH_SPILL_MAX_LOGS) -> None:
+    """Delete all but the ``keep`` most recent spilled output logs in ``directory``."""
+    try:
+        logs = sorted(directory.glob("*.log"), key=lambda path: path.stat().st_mtime, reverse=True)
+    except OSError:
+        return
+    for stale in logs[keep:]:
+        stale.unlink(missing_ok=True)
+
+
+def _finish_bash_spill(output: str, capture_options: dict, thread_data: ThreadDataState | None) -> str:
+    """Point the agent at a spilled output log and prune old logs."""
+    spill_path = capture_options.get("spill_path")
+    if spill_path is None or not os.path.exists(spill_path):
+        return output
+    _prune_bash_spill_logs(Path(spill_path).parent)
+    virtual_path = f"{VIRTUAL_PATH_PREFIX}/outputs/bash-output/{Path(spill_path).name}"
+    return f"{output}\n[Output truncated. Full output ({os.path.getsize(spill_path)} bytes) saved to {virtual_path}; use read_file with start_line and end_line to page through it.]"
+
+
+def _get_bash_output_max_chars() -> int:
+    try:
+        from deerflow.config.app_config import get_app_config
+
+        sandbox_cfg = get_app_config().sandbox
+        return sandbox_cfg.bash_output_max_chars if sandbox_cfg else 20000
+    except Exception:
+        return 20000
+
+
+def _get_ls_output_max_chars() -> int:
+    try:
+        from deerflow.config.app_config import get_app_config
+
+        sandbox_cfg = get_app_config().sandbox
+        return sandbox_cfg.ls_output_max_chars if sandbox_cfg else 20000
+    except Exception:
+        return 20000
+
+
+def _get_read_file_output_max_chars() -> int:
+    try:
+        from deerflow.config.app_config import get_app_config
+
+        sandbox_cfg = get_app_config().sandbox
+        return sandbox_cfg.read_file_output_max_chars if sandbox_cfg else 50000
+    except Exception:
+        return 50000
+
+
+def _prepare_local_bash_command(command: str, thread_data: ThreadDataState | None) -> str:
+    """Validate a host bash command and map its virtual paths to host paths."""
+    validate_local_bash_command_paths(command, thread_data)
+    command = replace_virtual_paths_in_command(command, thread_data)
+    return _apply_cwd_prefix(command, thread_data)
+
+
+def _bash_output_streamer(runtime: ToolRuntime[ContextT, ThreadState], thread_data: ThreadDataState | None) -> OutputCallback | None:
+    """Return a callback forwarding live command output to the run's custom stream."""
+    writer = getattr(runtime, "stream_writer", None)
+    if writer is None:
+        return None
+    tool_call_id = getattr(runtime, "tool_call_id", None)
+
+    def on_output(stream: str, text: str) -> None:
+        writer({"type": "bash_output", "tool_call_id": tool_call_id, "stream": stream, "text": mask_local_paths_in_output(text, thread_data)})
+
+    return on_output
+
+
 @tool("bash", parse_docstring=True)
 def bash_tool(runtime: ToolRuntime[ContextT, ThreadState], description: str, command: str) -> str:
     """Execute a bash command in a Linux environment.
@@ -1006,27 +1099,44 @@ def bash_tool(runtime: ToolRuntime[ContextT, ThreadState], description: str, com
                 return f"Error: {LOCAL_HOST_BASH_DISABLED_MESSAGE}"
             ensure_thread_directories_exist(runtime)
             thread_data = get_thread_data(runtime)
-            validate_local_bash_command_paths(command, thread_data)
-            command = replace_virtual_paths_in_command(command, thread_data)
-            command = _apply_cwd_prefix(command, thread_data)
-            output = sandbox.execute_command(command)
-            try:
-                from deerflow.config.app_config import get_app_config
-
-                sandbox_cfg = get_app_config().sandbox
-                max_chars = sandbox_cfg.bash_output_max_chars if sandbox_cfg else 20000
-            except Exception:
-                max_chars = 20000
-            return _truncate_bash_output(mask_local_paths_in_output(output, thread_data), max_chars)
+            command = _prepare_local_bash_command(command, thread_data)
+            max_chars = _get_bash_output_max_chars()
+            capture_options = _bash_capture_options(thread_data, max_chars)
+            output = sandbox.execute_command(command, **capture_options)
+            return _finish_bash_spill(_truncate_bash_output(mask_local_paths_in_output(output, thread_data), max_chars), capture_options, thread_data)
         ensure_thread_directories_exist(runtime)
-        try:
-            from deerflow.config.app_config import get_app_config
+        return _truncate_bash_output(sandbox.execute_command(command), _get_bash_output_max_chars())
+    except SandboxError as e:
+        return f"Error: {e}"
+    except PermissionError as e:
+        return f"Error: {e}"
+    except Exception as e:
+        return f"Error: Unexpected error executing command: {_sanitize_error(e, runtime)}"
 
-            sandbox_cfg = get_app_config().sandbox
-            max_chars = sandbox_cfg.bash_output_max_chars if sandbox_cfg else 20000
-        except Exception:
-            max_chars = 20000
-        return _truncate_bash_output(sandbox.execute_command(command), max_chars)
+
+async def _abash_tool(runtime: ToolRuntime[ContextT, ThreadState], description: str, command: str) -> str:
+    """Async variant of ``bash_tool``.
+
+    On LocalSandbox the command runs on an asyncio subprocess: its output is
+    streamed to the run's custom stream as ``bash_output`` events while it
+    runs, and cancelling the run kills it. Other sandboxes are awaited
+    through ``Sandbox.aexecute_command``.
+    """
+    try:
+        sandbox = await _aensure_sandbox_initialized(runtime)
+        if not is_local_sandbox(runtime):
+            return _truncate_bash_output(await sandbox.aexecute_command(command), _get_bash_output_max_chars())
+        if not isinstance(sandbox, LocalSandbox):
+            return await asyncio.to_thread(bash_tool.func, runtime, description, command)
+        if not is_host_bash_allowed():
+            return f"Error: {LOCAL_HOST_BASH_DISABLED_MESSAGE}"
+        ensure_thread_directories_exist(runtime)
+        thread_data = get_thread_data(runtime)
+        command = _prepare_local_bash_command(command, thread_data)
+        max_chars = _get_bash_output_max_chars()
+        capture_options = _bash_capture_options(thread_data, max_chars)
+        output = await sandbox.aexecute_command(command, on_output=_bash_output_streamer(runtime, thread_data), **capture_options)
+        return await asyncio.to_thread(_finish_bash_spill, _truncate_bash_output(mask_local_paths_in_output(output, thread_data), max_chars), capture_options, thread_data)
     except SandboxError as e:
         return f"Error: {e}"
     except PermissionError as e:
@@ -1035,6 +1145,9 @@ def bash_tool(runtime: ToolRuntime[ContextT, ThreadState], description: str, com
         return f"Error: Unexpected error executing command: {_sanitize_error(e, runtime)}"
 
 
+bash_tool.coroutine = _abash_tool
+
+
 @tool("ls", parse_docstring=True)
 def ls_tool(runtime: ToolRuntime[ContextT, ThreadState], description: str, path: str) -> str:
     """List the contents of a directory up to 2 levels deep in tree format.
@@ -1060,15 +1173,7 @@ def ls_tool(runtime: ToolRuntime[ContextT, ThreadState], description: str, path:
         children = sandbox.list_dir(path)
         if not children:
             return "(empty)"
-        output = "\n".join(children)
-        try:
-            from deerflow.config.app_config import get_app_config
-
-            sandbox_cfg = get_app_config().sandbox
-            max_chars = sandbox_cfg.ls_output_max_chars if sandbox_cfg else 20000
-        except Exception:
-            max_chars = 20000
-        return _truncate_ls_output(output, max_chars)
+        return _truncate_ls_output("\n".join(children), _get_ls_output_max_chars())
     except SandboxError as e:
         return f"Error: {e}"
     except FileNotFoundError:
@@ -1079,6 +1184,29 @@ def ls_tool(runtime: ToolRuntime[ContextT, ThreadState], description: str, path:
         return f"Error: Unexpected error listing directory: {_sanitize_error(e, runtime)}"
 
 
+async def _als_tool(runtime: ToolRuntime[ContextT, ThreadState], description: str, path: str) -> str:
+    """Async variant of ``ls_tool``; LocalSandbox runs the sync tool on a worker thread."""
+    try:
+        sandbox = await _aensure_sandbox_initialized(runtime)
+        if is_local_sandbox(runtime):
+            return await asyncio.to_thread(ls_tool.func, runtime, description, path)
+        children = await sandbox.alist_dir(path)
+        if not children:
+            return "(empty)"
+        return _truncate_ls_output("\n".join(children), _get_ls_output_max_chars())
+    except SandboxError as e:
+        return f"Error: {e}"
+    except FileNotFoundError:
+        return f"Error: Directory not found: {path}"
+    except PermissionError:
+        return f"Error: Permission denied: {path}"
+    except Exception as e:
+        return f"Error: Unexpected error listing directory: {_sanitize_error(e, runtime)}"
+
+
+ls_tool.coroutine = _als_tool
+
+
 @tool("glob", parse_docstring=True)
 def glob_tool(
     runtime: ToolRuntime[ContextT, ThreadState],
@@ -1129,6 +1257,42 @@ def glob_tool(
         return f"Error: Unexpected error searching paths: {_sanitize_error(e, runtime)}"
 
 
+async def _aglob_tool(
+    runtime: ToolRuntime[ContextT, ThreadState],
+    description: str,
+    pattern: str,
+    path: str,
+    include_dirs: bool = False,
+    max_results: int = _DEFAULT_GLOB_MAX_RESULTS,
+) -> str:
+    """Async variant of ``glob_tool``; LocalSandbox runs the sync tool on a worker thread."""
+    try:
+        sandbox = await _aensure_sandbox_initialized(runtime)
+        if is_local_sandbox(runtime):
+            return await asyncio.to_thread(glob_tool.func, runtime, description, pattern, path, include_dirs, max_results)
+        effective_max_results = _resolve_max_results(
+            "glob",
+            max_results,
+            default=_DEFAULT_GLOB_MAX_RESULTS,
+            upper_bound=_MAX_GLOB_MAX_RESULTS,
+        )
+        matches, truncated = await sandbox.aglob(path, pattern, include_dirs=include_dirs, max_results=effective_max_results)
+        return _format_glob_results(path, matches, truncated)
+    except SandboxError as e:
+        return f"Error: {e}"
+    except FileNotFoundError:
+        return f"Error: Directory not found: {path}"
+    except NotADirectoryError:
+        return f"Error: Path is not a directory: {path}"
+    except PermissionError:
+        return f"Error: Permission denied: {path}"
+    except Exception as e:
+        return f"Error: Unexpected error searching paths: {_sanitize_error(e, runtime)}"
+
+
+glob_tool.coroutine = _aglob_tool
+
+
 @tool("grep", parse_docstring=True)
 def grep_tool(
     runtime: ToolRuntime[ContextT, ThreadState],
@@ -1162,11 +1326,15 @@ def grep_tool(
             upper_bound=_MAX_GREP_MAX_RESULTS,
         )
         thread_data = None
+        grep_kwargs = {}
         if is_local_sandbox(runtime):
             thread_data = get_thread_data(runtime)
             if thread_data is None:
                 raise SandboxRuntimeError("Thread data not available for local sandbox")
             path = _resolve_local_read_path(path, thread_data)
+            search_index = _get_workspace_search_index(thread_data)
+            if search_index is not None:
+                grep_kwargs["search_index"] = search_index
         matches, truncated = sandbox.grep(
             path,
             pattern,
@@ -1174,6 +1342,7 @@ def grep_tool(
             literal=literal,
             case_sensitive=case_sensitive,
             max_results=effective_max_results,
+            **grep_kwargs,
         )
         if thread_data is not None:
             matches = [
@@ -1199,6 +1368,53 @@ def grep_tool(
         return f"Error: Unexpected error searching file contents: {_sanitize_error(e, runtime)}"
 
 
+async def _agrep_tool(
+    runtime: ToolRuntime[ContextT, ThreadState],
+    description: str,
+    pattern: str,
+    path: str,
+    glob: str | None = None,
+    literal: bool = False,
+    case_sensitive: bool = False,
+    max_results: int = _DEFAULT_GREP_MAX_RESULTS,
+) -> str:
+    """Async variant of ``grep_tool``; LocalSandbox runs the sync tool on a worker thread."""
+    try:
+        sandbox = await _aensure_sandbox_initialized(runtime)
+        if is_local_sandbox(runtime):
+            return await asyncio.to_thread(grep_tool.func, runtime, description, pattern, path, glob, literal, case_sensitive, max_results)
+        effective_max_results = _resolve_max_results(
+            "grep",
+            max_results,
+            default=_DEFAULT_GREP_MAX_RESULTS,
+            upper_bound=_MAX_GREP_MAX_RESULTS,
+        )
+        matches, truncated = await sandbox.agrep(
+            path,
+            pattern,
+            glob=glob,
+            literal=literal,
+            case_sensitive=case_sensitive,
+            max_results=effective_max_results,
+        )
+        return _format_grep_results(path, matches, truncated)
+    except SandboxError as e:
+        return f"Error: {e}"
+    except FileNotFoundError:
+        return f"Error: Directory not found: {path}"
+    except NotADirectoryError:
+        return f"Error: Path is not a directory: {path}"
+    except re.error as e:
+        return f"Error: Invalid regex pattern: {e}"
+    except PermissionError:
+        return f"Error: Permission denied: {path}"
+    except Exception as e:
+        return f"Error: Unexpected error searching file contents: {_sanitize_error(e, runtime)}"
+
+
+grep_tool.coroutine = _agrep_tool
+
+
 @tool("read_file", parse_docstring=True)
 def read_file_tool(
     runtime: ToolRuntime[ContextT, ThreadState],
@@ -1229,19 +1445,14 @@ def read_file_tool(
             elif not _is_custom_mount_path(path):
                 path = _resolve_and_validate_user_data_path(path, thread_data)
             # Custom mount paths are resolved by LocalSandbox._resolve_path()
-        content = sandbox.read_file(path)
+        if start_line is not None and end_line is not None:
+            # Stream only the requested lines instead of loading the whole file.
+            content = sandbox.read_file_lines(path, start_line, end_line)
+        else:
+            content = sandbox.read_file(path)
         if not content:
             return "(empty)"
-        if start_line is not None and end_line is not None:
-            content = "\n".join(content.splitlines()[start_line - 1 : end_line])
-        try:
-            from deerflow.config.app_config import get_app_config
-
-            sandbox_cfg = get_app_config().sandbox
-            max_chars = sandbox_cfg.read_file_output_max_chars if sandbox_cfg else 50000
-        except Exception:
-            max_chars = 50000
-        return _truncate_read_file_output(content, max_chars)
+        return _truncate_read_file_output(content, _get_read_file_output_max_chars())
     except SandboxError as e:
         return f"Error: {e}"
     except FileNotFoundError:
@@ -1254,6 +1465,40 @@ def read_file_tool(
         return f"Error: Unexpected error reading file: {_sanitize_error(e, runtime)}"
 
 
+async def _aread_file_tool(
+    runtime: ToolRuntime[ContextT, ThreadState],
+    description: str,
+    path: str,
+    start_line: int | None = None,
+    end_line: int | None = None,
+) -> str:
+    """Async variant of ``read_file_tool``; LocalSandbox runs the sync tool on a worker thread."""
+    try:
+        sandbox = await _aensure_sandbox_initialized(runtime)
+        if is_local_sandbox(runtime):
+            return await asyncio.to_thread(read_file_tool.func, runtime, description, path, start_line, end_line)
+        if start_line is not None and end_line is not None:
+            content = await sandbox.aread_file_lines(path, start_line, end_line)
+        else:
+            content = await sandbox.aread_file(path)
+        if not content:
+            return "(empty)"
+        return _truncate_read_file_output(content, _get_read_file_output_max_chars())
+    except SandboxError as e:
+        return f"Error: {e}"
+    except FileNotFoundError:
+        return f"Error: File not found: {path}"
+    except PermissionError:
+        return f"Error: Permission denied reading file: {path}"
+    except IsADirectoryError:
+        return f"Error: Path is a directory, not a file: {path}"
+    except Exception as e:
+        return f"Error: Unexpected error reading file: {_sanitize_error(e, runtime)}"
+
+
+read_file_tool.coroutine = _aread_file_tool
+
+
 @tool("write_file", parse_docstring=True)
 def write_file_tool(
     runtime: ToolRuntime[ContextT, ThreadState],
@@ -1273,6 +1518,7 @@ def write_file_tool(
         sandbox = ensure_sandbox_initialized(runtime)
         ensure_thread_directories_exist(runtime)
         requested_path = path
+        thread_data = None
         if is_local_sandbox(runtime):
             thread_data = get_thread_data(runtime)
             validate_local_tool_path(path, thread_data)
@@ -1281,6 +1527,7 @@ def write_file_tool(
             # Custom mount paths are resolved by LocalSandbox._resolve_path()
         with get_file_operation_lock(sandbox, path):
             sandbox.write_file(path, content, append)
+            _update_search_index_after_write(thread_data, path, None if append else content)
         return "OK"
     except SandboxError as e:
         return f"Error: {e}"
@@ -1294,6 +1541,41 @@ def write_file_tool(
         return f"Error: Unexpected error writing file: {_sanitize_error(e, runtime)}"
 
 
+async def _awrite_file_tool(
+    runtime: ToolRuntime[ContextT, ThreadState],
+    description: str,
+    path: str,
+    content: str,
+    append: bool = False,
+) -> str:
+    """Async variant of ``write_file_tool``; LocalSandbox runs the sync tool on a worker thread."""
+    try:
+        sandbox = await _aensure_sandbox_initialized(runtime)
+        if is_local_sandbox(runtime):
+            return await asyncio.to_thread(write_file_tool.func, runtime, description, path, content, append)
+        # Shared with the sync tools (str_replace holds it across read and write).
+        lock = get_file_operation_lock(sandbox, path)
+        await acquire_lock_async(lock)
+        try:
+            await sandbox.awrite_file(path, content, append)
+        finally:
+            lock.release()
+        return "OK"
+    except SandboxError as e:
+        return f"Error: {e}"
+    except PermissionError:
+        return f"Error: Permission denied writing to file: {path}"
+    except IsADirectoryError:
+        return f"Error: Path is a directory, not a file: {path}"
+    except OSError as e:
+        return f"Error: Failed to write file '{path}': {_sanitize_error(e, runtime)}"
+    except Exception as e:
+        return f"Error: Unexpected error writing file: {_sanitize_error(e, runtime)}"
+
+
+write_file_tool.coroutine = _awrite_file_tool
+
+
 @tool("str_replace", parse_docstring=True)
 def str_replace_tool(
     runtime: ToolRuntime[ContextT, ThreadState],
@@ -1317,6 +1599,7 @@ def str_replace_tool(
         sandbox = ensure_sandbox_initialized(runtime)
         ensure_thread_directories_exist(runtime)
         requested_path = path
+        thread_data = None
         if is_local_sandbox(runtime):
             thread_data = get_thread_data(runtime)
             validate_local_tool_path(path, thread_data)
@@ -1324,16 +1607,9 @@ def str_replace_tool(
                 path = _resolve_and_validate_user_data_path(path, thread_data)
             # Custom mount paths are resolved by LocalSandbox._resolve_path()
         with get_file_operation_lock(sandbox, path):
-            content = sandbox.read_file(path)
-            if not content:
-                return "OK"
-            if old_str not in content:
+            if not sandbox.replace_in_file(path, old_str, new_str, replace_all=replace_all):
                 return f"Error: String to replace not found in file: {requested_path}"
-            if replace_all:
-                content = content.replace(old_str, new_str)
-            else:
-                content = content.replace(old_str, new_str, 1)
-            sandbox.write_file(path, content)
+            _update_search_index_after_write(thread_data, path, None)
         return "OK"
     except SandboxError as e:
         return f"Error: {e}"
@@ -1343,3 +1619,38 @@ def str_replace_tool(
         return f"Error: Permission denied accessing file: {requested_path}"
     except Exception as e:
         return f"Error: Unexpected error replacing string: {_sanitize_error(e, runtime)}"
+
+
+async def _astr_replace_tool(
+    runtime: ToolRuntime[ContextT, ThreadState],
+    description: str,
+    path: str,
+    old_str: str,
+    new_str: str,
+    replace_all: bool = False,
+) -> str:
+    """Async variant of ``str_replace_tool``; LocalSandbox runs the sync tool on a worker thread."""
+    try:
+        sandbox = await _aensure_sandbox_initialized(runtime)
+        if is_local_sandbox(runtime):
+            return await asyncio.to_thread(str_replace_tool.func, runtime, description, path, old_str, new_str, replace_all)
+        lock = get_file_operation_lock(sandbox, path)
+        await acquire_lock_async(lock)
+        try:
+            replaced = await sandbox.areplace_in_file(path, old_str, new_str, replace_all=replace_all)
+        finally:
+            lock.release()
+        if not replaced:
+            return f"Error: String to replace not found in file: {path}"
+        return "OK"
+    except SandboxError as e:
+        return f"Error: {e}"
+    except FileNotFoundError:
+        return f"Error: File not found: {path}"
+    except PermissionError:
+        return f"Error: Permission denied accessing file: {path}"
+    except Exception as e:
+        return f"Error: Unexpected error replacing string: {_sanitize_error(e, runtime)}"
+
+
+str_replace_tool.coroutine = _astr_replace_tool
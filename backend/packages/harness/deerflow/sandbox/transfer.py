@@ -0,0 +1,57 @@
+"""Bulk file transfer between the host and a sandbox as one tar stream.
+
+Copying files one request at a time costs a round trip (and, for remote
+sandboxes, a base64-encoded JSON body) per file. These helpers pack all of
+them into one tar archive and hand it to :meth:`Sandbox.put_archive` or
+:meth:`Sandbox.get_archive`, so a batch is one transfer each way.
+
+Archives are staged in an anonymous temporary file rather than in memory,
+so memory use stays flat however large the batch is.
+"""
+
+import tarfile
+import tempfile
+from collections.abc import Iterable
+from pathlib import Path
+
+from deerflow.sandbox.sandbox import Sandbox
+
+
+def upload_files(sandbox: Sandbox, path: str, files: Iterable[Path]) -> None:
+    """Copy host files into a sandbox directory in one archive.
+
+    Args:
+        sandbox: The sandbox to copy into.
+        path: The absolute sandbox directory the files are placed in, each
+            under its own name.
+        files: Host paths of the files to copy.
+    """
+    with tempfile.TemporaryFile() as staged:
+        # Uploads are mostly documents and images that are compressed already.
+        with tarfile.open(fileobj=staged, mode="w", format=tarfile.PAX_FORMAT) as tar:
+            for file in files:
+                tar.add(file, arcname=file.name)
+        staged.seek(0)
+        sandbox.put_archive(path, staged)
+
+
+def download_files(sandbox: Sandbox, path: str, names: list[str], dest_dir: Path) -> list[str]:
+    """Copy files out of a sandbox directory into a host directory in one archive.
+
+    Args:
+        sandbox: The sandbox to copy from.
+        path: The absolute sandbox directory ``names`` are relative to.
+        names: Relative paths of the files to copy; missing ones are skipped.
+        dest_dir: The host directory the files are extracted into, keeping
+            their relative paths.
+
+    Returns:
+        The entries of ``names`` that were copied.
+    """
+    with tempfile.TemporaryFile() as staged:
+        included = sandbox.get_archive(path, names, staged)
+        staged.seek(0)
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        with tarfile.open(fileobj=staged, mode="r|*") as tar:
+            tar.extractall(dest_dir, filter="data")
+    return included
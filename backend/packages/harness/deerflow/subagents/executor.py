@@ -4,8 +4,8 @@ import asyncio
 import logging
 import threading
 import uuid
-from concurrent.futures import Future, ThreadPoolExecutor
-from concurrent.futures import TimeoutError as FuturesTimeoutError
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
@@ -19,6 +19,7 @@ from langchain_core.runnables import RunnableConfig
 from deerflow.agents.thread_state import SandboxState, ThreadDataState, ThreadState
 from deerflow.models import create_chat_model
 from deerflow.subagents.config import SubagentConfig
+from deerflow.subagents.scheduler import get_subagent_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +35,54 @@ class SubagentStatus(Enum):
     TIMED_OUT = "timed_out"
 
 
+class _UpdateSignal:
+    """Version counter that wakes waiters on any thread or event loop when it is bumped."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._version = 0
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def notify(self) -> None:
+        with self._condition:
+            self._version += 1
+            waiters, self._waiters = self._waiters, []
+            self._condition.notify_all()
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve_future, future)
+            except RuntimeError:
+                pass  # The waiter's event loop has been closed.
+
+    def wait(self, since: int, timeout: float) -> bool:
+        with self._condition:
+            return self._condition.wait_for(lambda: self._version != since, timeout)
+
+    async def wait_async(self, since: int, timeout: float) -> bool:
+        loop = asyncio.get_running_loop()
+        with self._condition:
+            if self._version != since:
+                return True
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait([waiter[1]], timeout=timeout)
+        finally:
+            with self._condition:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        return self._version != since
+
+
+def _resolve_future(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
 @dataclass
 class SubagentResult:
     """Result of a subagent execution.
@@ -58,28 +107,61 @@ class SubagentResult:
     completed_at: datetime | None = None
     ai_messages: list[dict[str, Any]] | None = None
     cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+    _updates: _UpdateSignal = field(default_factory=_UpdateSignal, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         """Initialize mutable defaults."""
         if self.ai_messages is None:
             self.ai_messages = []
 
+    @property
+    def update_version(self) -> int:
+        """Incremented by :meth:`mark_updated`; read it before inspecting the result."""
+        return self._updates.version
+
+    def mark_updated(self) -> None:
+        """Wake everyone waiting for this result to change (status or new messages)."""
+        self._updates.notify()
+
+    def wait_for_update(self, since: int, timeout: float) -> bool:
+        """Block until :attr:`update_version` differs from ``since``.
+
+        Returns:
+            False if ``timeout`` seconds passed without an update.
+        """
+        return self._updates.wait(since, timeout)
+
+    async def await_update(self, since: int, timeout: float) -> bool:
+        """Async form of :meth:`wait_for_update`; works from any event loop."""
+        return await self._updates.wait_async(since, timeout)
+
 
 # Global storage for background task results
 _background_tasks: dict[str, SubagentResult] = {}
 _background_tasks_lock = threading.Lock()
 
-# Thread pool for background task scheduling and orchestration
-_scheduler_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="subagent-scheduler-")
+# Cancels the asyncio task of each running background subagent, keyed by task ID.
+_background_cancels: dict[str, Callable[[], None]] = {}
 
-# Thread pool for actual subagent execution (with timeout support)
-# Larger pool to avoid blocking when scheduler submits execution tasks
-_execution_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="subagent-exec-")
+# Event loop for background subagents started without a running loop.
+_fallback_loop: asyncio.AbstractEventLoop | None = None
+_fallback_loop_lock = threading.Lock()
 
 # Dedicated pool for sync execute() calls made from an already-running event loop.
 _isolated_loop_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="subagent-isolated-")
 
 
+def _get_fallback_loop() -> asyncio.AbstractEventLoop:
+    """Return the background event loop thread, starting it on first use."""
+    global _fallback_loop
+    with _fallback_loop_lock:
+        if _fallback_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="subagent-loop", daemon=True).start()
+            _fallback_loop = loop
+        return _fallback_loop
+
+
 def _filter_tools(
     all_tools: list[BaseTool],
     allowed: list[str] | None,
@@ -257,6 +339,11 @@ class SubagentExecutor:
                         result.completed_at = datetime.now()
                 return result
 
+            # IDs of the AI messages captured so far. Each values chunk repeats
+            # the whole history, so a message is only converted and stored the
+            # first time its ID is seen; per-chunk cost does not grow with the run.
+            captured_ids = {message["id"] for message in result.ai_messages if message.get("id")}
+
             async for chunk in agent.astream(state, config=run_config, context=context, stream_mode="values"):  # type: ignore[arg-type]
                 # Cooperative cancellation: check if parent requested stop.
                 # Note: cancellation is only detected at astream iteration boundaries,
@@ -278,20 +365,20 @@ class SubagentExecutor:
                 if messages:
                     last_message = messages[-1]
                     # Check if this is a new AI message
-                    if isinstance(last_message, AIMessage):
+                    if isinstance(last_message, AIMessage) and last_message.id not in captured_ids:
                         # Convert message to dict for serialization
                         message_dict = last_message.model_dump()
-                        # Only add if it's not already in the list (avoid duplicates)
-                        # Check by comparing message IDs if available, otherwise compare full dict
-                        message_id = message_dict.get("id")
-                        is_duplicate = False
-                        if message_id:
-                            is_duplicate = any(msg.get("id") == message_id for msg in result.ai_messages)
+                        # Messages without an ID (not assigned by the graph) fall
+                        # back to comparing the full dict
+                        if last_message.id:
+                            captured_ids.add(last_message.id)
+                            is_duplicate = False
                         else:
                             is_duplicate = message_dict in result.ai_messages
 
                         if not is_duplicate:
                             result.ai_messages.append(message_dict)
+                            result.mark_updated()
                             logger.info(f"[trace={self.trace_id}] Subagent {self.config.name} captured AI message #{len(result.ai_messages)}")
 
             logger.info(f"[trace={self.trace_id}] Subagent {self.config.name} completed async execution")
@@ -374,6 +461,8 @@ class SubagentExecutor:
             result.status = SubagentStatus.FAILED
             result.error = str(e)
             result.completed_at = datetime.now()
+        finally:
+            result.mark_updated()
 
         return result
 
@@ -460,11 +549,18 @@ class SubagentExecutor:
             result.status = SubagentStatus.FAILED
             result.error = str(e)
             result.completed_at = datetime.now()
+            result.mark_updated()
             return result
 
     def execute_async(self, task: str, task_id: str | None = None) -> str:
         """Start a task execution in the background.
 
+        The subagent runs as an asyncio task on the caller's event loop, or on
+        a shared background loop when there is none. It waits for a slot from
+        the :class:`~deerflow.subagents.scheduler.SubagentScheduler` (status
+        ``PENDING`` meanwhile), and is cancelled if it runs longer than
+        ``timeout_seconds``.
+
         Args:
             task: The task description for the subagent.
             task_id: Optional task ID to use. If not provided, a random UUID will be generated.
@@ -488,66 +584,86 @@ class SubagentExecutor:
         with _background_tasks_lock:
             _background_tasks[task_id] = result
 
-        # Submit to scheduler pool
-        def run_task():
-            with _background_tasks_lock:
-                _background_tasks[task_id].status = SubagentStatus.RUNNING
-                _background_tasks[task_id].started_at = datetime.now()
-                result_holder = _background_tasks[task_id]
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
 
-            try:
-                # Submit execution to execution pool with timeout
-                # Pass result_holder so execute() can update it in real-time
-                execution_future: Future = _execution_pool.submit(self.execute, task, result_holder)
+        with _background_tasks_lock:
+            if loop is not None:
+                background = loop.create_task(self._run_background(task, result), name=f"subagent-{task_id}")
+                _background_cancels[task_id] = lambda: loop.call_soon_threadsafe(background.cancel)
+            else:
+                background = asyncio.run_coroutine_threadsafe(self._run_background(task, result), _get_fallback_loop())
+                _background_cancels[task_id] = background.cancel
+        background.add_done_callback(lambda _: _forget_background_run(task_id))
+        return task_id
+
+    async def _run_background(self, task: str, result: SubagentResult) -> None:
+        """Wait for a scheduler slot, then run ``task`` into ``result`` under the timeout."""
+        try:
+            async with get_subagent_scheduler().slot(self.thread_id):
+                with _background_tasks_lock:
+                    if result.status != SubagentStatus.PENDING:
+                        return
+                    result.status = SubagentStatus.RUNNING
+                    result.started_at = datetime.now()
+                result.mark_updated()
                 try:
-                    # Wait for execution with timeout
-                    exec_result = execution_future.result(timeout=self.config.timeout_seconds)
-                    with _background_tasks_lock:
-                        _background_tasks[task_id].status = exec_result.status
-                        _background_tasks[task_id].result = exec_result.result
-                        _background_tasks[task_id].error = exec_result.error
-                        _background_tasks[task_id].completed_at = datetime.now()
-                        _background_tasks[task_id].ai_messages = exec_result.ai_messages
-                except FuturesTimeoutError:
+                    async with asyncio.timeout(self.config.timeout_seconds):
+                        await self._aexecute(task, result)
+                except TimeoutError:
                     logger.error(f"[trace={self.trace_id}] Subagent {self.config.name} execution timed out after {self.config.timeout_seconds}s")
                     with _background_tasks_lock:
-                        if _background_tasks[task_id].status == SubagentStatus.RUNNING:
-                            _background_tasks[task_id].status = SubagentStatus.TIMED_OUT
-                            _background_tasks[task_id].error = f"Execution timed out after {self.config.timeout_seconds} seconds"
-                            _background_tasks[task_id].completed_at = datetime.now()
-                    # Signal cooperative cancellation and cancel the future
-                    result_holder.cancel_event.set()
-                    execution_future.cancel()
-            except Exception as e:
-                logger.exception(f"[trace={self.trace_id}] Subagent {self.config.name} async execution failed")
-                with _background_tasks_lock:
-                    _background_tasks[task_id].status = SubagentStatus.FAILED
-                    _background_tasks[task_id].error = str(e)
-                    _background_tasks[task_id].completed_at = datetime.now()
+                        if result.status == SubagentStatus.RUNNING:
+                            result.status = SubagentStatus.TIMED_OUT
+                            result.error = f"Execution timed out after {self.config.timeout_seconds} seconds"
+                            result.completed_at = datetime.now()
+        except asyncio.CancelledError:
+            logger.info(f"[trace={self.trace_id}] Subagent {self.config.name} task {result.task_id} cancelled")
+            with _background_tasks_lock:
+                if result.status in (SubagentStatus.PENDING, SubagentStatus.RUNNING):
+                    result.status = SubagentStatus.CANCELLED
+                    result.error = "Cancelled by user"
+                    result.completed_at = datetime.now()
+            raise
+        except Exception as e:
+            logger.exception(f"[trace={self.trace_id}] Subagent {self.config.name} async execution failed")
+            with _background_tasks_lock:
+                result.status = SubagentStatus.FAILED
+                result.error = str(e)
+                result.completed_at = datetime.now()
+        finally:
+            result.mark_updated()
 
-        _scheduler_pool.submit(run_task)
-        return task_id
+
+def _forget_background_run(task_id: str) -> None:
+    with _background_tasks_lock:
+        _background_cancels.pop(task_id, None)
 
 
 MAX_CONCURRENT_SUBAGENTS = 3
 
 
 def request_cancel_background_task(task_id: str) -> None:
-    """Signal a running background task to stop.
+    """Stop a background task, queued or running.
 
-    Sets the cancel_event on the task, which is checked cooperatively
-    by ``_aexecute`` during ``agent.astream()`` iteration.  This allows
-    subagent threads — which cannot be force-killed via ``Future.cancel()``
-    — to stop at the next iteration boundary.
+    Cancels the task's asyncio task, which interrupts it wherever it is
+    awaiting (a model call, a tool, or the scheduler queue). Also sets the
+    cancel_event, which ``_aexecute`` checks at ``agent.astream()``
+    iteration boundaries, for results driven by :meth:`SubagentExecutor.execute`.
 
     Args:
         task_id: The task ID to cancel.
     """
     with _background_tasks_lock:
         result = _background_tasks.get(task_id)
+        cancel = _background_cancels.get(task_id)
         if result is not None:
             result.cancel_event.set()
             logger.info("Requested cancellation for background task %s", task_id)
+    if cancel is not None:
+        cancel()
 
 
 def get_background_task_result(task_id: str) -> SubagentResult | None:
@@ -563,6 +679,23 @@ def get_background_task_result(task_id: str) -> SubagentResult | None:
         return _background_tasks.get(task_id)
 
 
+async def wait_for_background_task_update(task_id: str, since: int, timeout: float) -> bool:
+    """Wait until a background task changes status or captures a new message.
+
+    Args:
+        task_id: The task ID returned by execute_async.
+        since: The task's ``update_version`` when the caller last inspected it.
+        timeout: Seconds to wait at most.
+
+    Returns:
+        True if the task changed (or is gone), False on timeout.
+    """
+    result = get_background_task_result(task_id)
+    if result is None:
+        return True
+    return await result.await_update(since, timeout)
+
+
 def list_background_tasks() -> list[SubagentResult]:
     """List all background tasks.
 
@@ -0,0 +1,174 @@
+"""Admission control for background subagents.
+
+Background subagents run as asyncio tasks (see
+:meth:`SubagentExecutor.execute_async`). :class:`SubagentScheduler` decides
+when each may start. It enforces a process-wide limit and a per-thread
+limit, so one conversation that fans out many tasks cannot starve the
+others. Waiters are admitted first-in, first-out, skipping only waiters
+whose thread is at its own limit.
+
+Admission is guarded by a lock rather than an ``asyncio.Semaphore``.
+Subagents started from different event loops (the server's loop and the
+fallback loop for sync callers) therefore share the same limits.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from deerflow.utils.stats import percentile
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Waiter:
+    thread_id: str | None
+    loop: asyncio.AbstractEventLoop
+    future: asyncio.Future
+    admitted: bool = False
+
+
+class SubagentScheduler:
+    """Limits how many background subagents run at once.
+
+    Args:
+        max_concurrent: Subagents running at once across the process.
+        max_concurrent_per_thread: Subagents running at once for one thread.
+            Subagents without a thread only count against ``max_concurrent``.
+        window: Number of recent queue waits kept for :meth:`stats`.
+    """
+
+    def __init__(self, max_concurrent: int, max_concurrent_per_thread: int, window: int = 256):
+        self.max_concurrent = max_concurrent
+        self.max_concurrent_per_thread = max_concurrent_per_thread
+        self._lock = threading.Lock()
+        self._waiters: deque[_Waiter] = deque()
+        self._running = 0
+        self._running_by_thread: dict[str, int] = {}
+        self._waits: deque[float] = deque(maxlen=window)
+        self._admitted_total = 0
+
+    @asynccontextmanager
+    async def slot(self, thread_id: str | None) -> AsyncIterator[float]:
+        """Wait for a slot for a subagent of ``thread_id`` and hold it for the block.
+
+        Yields:
+            The seconds spent queued.
+        """
+        queued_at = time.monotonic()
+        await self._acquire(thread_id)
+        waited = time.monotonic() - queued_at
+        with self._lock:
+            self._waits.append(waited)
+        if waited >= 1:
+            logger.info(f"Subagent for thread {thread_id} waited {waited:.1f}s for a slot")
+        try:
+            yield waited
+        finally:
+            self._release(thread_id)
+
+    def stats(self) -> dict:
+        """Current load and recent queue waits.
+
+        Returns:
+            ``{"max_concurrent", "max_concurrent_per_thread", "running",
+            "queued", "admitted_total", "wait": {"count", "p50_ms", "p95_ms",
+            "max_ms"}}``.
+        """
+        with self._lock:
+            waits = sorted(self._waits)
+            stats = {
+                "max_concurrent": self.max_concurrent,
+                "max_concurrent_per_thread": self.max_concurrent_per_thread,
+                "running": self._running,
+                "queued": len(self._waiters),
+                "admitted_total": self._admitted_total,
+            }
+        stats["wait"] = {"count": len(waits)}
+        if waits:
+            stats["wait"].update({"p50_ms": percentile(waits, 0.50) * 1000, "p95_ms": percentile(waits, 0.95) * 1000, "max_ms": waits[-1] * 1000})
+        return stats
+
+    async def _acquire(self, thread_id: str | None) -> None:
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(thread_id, loop, loop.create_future())
+        with self._lock:
+            self._waiters.append(waiter)
+            self._admit_locked()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.admitted:
+                    # Admitted just as the caller was cancelled; hand the slot on.
+                    self._release_locked(thread_id)
+                else:
+                    self._waiters.remove(waiter)
+            raise
+
+    def _release(self, thread_id: str | None) -> None:
+        with self._lock:
+            self._release_locked(thread_id)
+
+    def _release_locked(self, thread_id: str | None) -> None:
+        self._running -= 1
+        if thread_id is not None:
+            remaining = self._running_by_thread[thread_id] - 1
+            if remaining:
+                self._running_by_thread[thread_id] = remaining
+            else:
+                del self._running_by_thread[thread_id]
+        self._admit_locked()
+
+    def _admit_locked(self) -> None:
+        """Admit queued waiters in order while there is capacity."""
+        for waiter in list(self._waiters):
+            if self._running >= self.max_concurrent:
+                return
+            if waiter.thread_id is not None and self._running_by_thread.get(waiter.thread_id, 0) >= self.max_concurrent_per_thread:
+                continue
+            self._waiters.remove(waiter)
+            try:
+                waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+            except RuntimeError:
+                continue  # The waiter's event loop has been closed.
+            waiter.admitted = True
+            self._running += 1
+            self._admitted_total += 1
+            if waiter.thread_id is not None:
+                self._running_by_thread[waiter.thread_id] = self._running_by_thread.get(waiter.thread_id, 0) + 1
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+_scheduler: SubagentScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_subagent_scheduler() -> SubagentScheduler:
+    """Return the process-wide scheduler, sized from the ``subagents`` config."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            from deerflow.config.subagents_config import get_subagents_app_config
+
+            config = get_subagents_app_config()
+            _scheduler = SubagentScheduler(config.max_concurrent, config.max_concurrent_per_thread)
+            logger.info(f"Subagent scheduler: max_concurrent={config.max_concurrent}, max_concurrent_per_thread={config.max_concurrent_per_thread}")
+        return _scheduler
+
+
+def reset_subagent_scheduler() -> None:
+    """Drop the scheduler so the next call re-reads the config (for tests)."""
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = None
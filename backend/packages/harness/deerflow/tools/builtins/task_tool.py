@@ -14,10 +14,14 @@ from deerflow.agents.lead_agent.prompt import get_skills_prompt_section
 from deerflow.agents.thread_state import ThreadState
 from deerflow.sandbox.security import LOCAL_BASH_SUBAGENT_DISABLED_MESSAGE, is_host_bash_allowed
 from deerflow.subagents import SubagentExecutor, get_available_subagent_names, get_subagent_config
-from deerflow.subagents.executor import SubagentStatus, cleanup_background_task, get_background_task_result, request_cancel_background_task
+from deerflow.subagents.executor import SubagentStatus, cleanup_background_task, get_background_task_result, request_cancel_background_task, wait_for_background_task_update
 
 logger = logging.getLogger(__name__)
 
+# The executor wakes the tool on every status change and captured message;
+# this interval is only the safety-net re-check when nothing is reported.
+_SAFETY_POLL_SECONDS = 5
+
 
 @tool("task", parse_docstring=True)
 async def task_tool(
@@ -125,12 +129,12 @@ async def task_tool(
     # Use tool_call_id as task_id for better traceability
     task_id = executor.execute_async(prompt, task_id=tool_call_id)
 
-    # Poll for task completion in backend (removes need for LLM to poll)
+    # Wait for task completion in backend (removes need for LLM to poll)
     poll_count = 0
     last_status = None
     last_message_count = 0  # Track how many AI messages we've already sent
-    # Polling timeout: execution timeout + 60s buffer, checked every 5s
-    max_poll_count = (config.timeout_seconds + 60) // 5
+    # Safety-net timeout: execution timeout + 60s buffer, in quiet 5s intervals
+    max_poll_count = (config.timeout_seconds + 60) // _SAFETY_POLL_SECONDS
 
     logger.info(f"[trace={trace_id}] Started background task {task_id} (subagent={subagent_type}, timeout={config.timeout_seconds}s, polling_limit={max_poll_count} polls)")
 
@@ -148,6 +152,9 @@ async def task_tool(
                 cleanup_background_task(task_id)
                 return f"Error: Task {task_id} disappeared from background tasks"
 
+            # Read before inspecting, so a change made meanwhile wakes the wait below.
+            seen_version = result.update_version
+
             # Log status changes for debugging
             if result.status != last_status:
                 logger.info(f"[trace={trace_id}] Task {task_id} status: {result.status.value}")
@@ -193,26 +200,29 @@ async def task_tool(
                 cleanup_background_task(task_id)
                 return f"Task timed out. Error: {result.error}"
 
-            # Still running, wait before next poll
-            await asyncio.sleep(5)
-            poll_count += 1
+            # Still queued or running: wait for the next status change or
+            # message, re-checking every 5s in case a notification is missed.
+            updated = await wait_for_background_task_update(task_id, seen_version, _SAFETY_POLL_SECONDS)
+            # Time spent queued for a scheduler slot does not count towards
+            # the execution timeout, so it does not count here either.
+            if not updated and result.status != SubagentStatus.PENDING:
+                poll_count += 1
 
-            # Polling timeout as a safety net (in case thread pool timeout doesn't work)
-            # Set to execution timeout + 60s buffer, in 5s poll intervals
+            # Safety-net timeout (in case the executor timeout doesn't work):
+            # execution timeout + 60s buffer of 5s intervals without any update.
             # This catches edge cases where the background task gets stuck
             # Note: We don't call cleanup_background_task here because the task may
             # still be running in the background. The cleanup will happen when the
             # executor completes and sets a terminal status.
             if poll_count > max_poll_count:
                 timeout_minutes = config.timeout_seconds // 60
-                logger.error(f"[trace={trace_id}] Task {task_id} polling timed out after {poll_count} polls (should have been caught by thread pool timeout)")
+                logger.error(f"[trace={trace_id}] Task {task_id} polling timed out after {poll_count} polls (should have been caught by executor timeout)")
                 writer({"type": "task_timed_out", "task_id": task_id})
                 return f"Task polling timed out after {timeout_minutes} minutes. This may indicate the background task is stuck. Status: {result.status.value}"
     except asyncio.CancelledError:
-        # Signal the background subagent thread to stop cooperatively.
-        # Without this, the thread (running in ThreadPoolExecutor with its
-        # own event loop via asyncio.run) would continue executing even
-        # after the parent task is cancelled.
+        # Cancel the background subagent task. It runs independently of this
+        # tool call, so without this it would keep executing after the
+        # parent run is cancelled.
         request_cancel_background_task(task_id)
 
         async def cleanup_when_done() -> None:
@@ -224,6 +234,7 @@ async def task_tool(
                 if result is None:
                     return
 
+                seen_version = result.update_version
                 if result.status in {SubagentStatus.COMPLETED, SubagentStatus.FAILED, SubagentStatus.CANCELLED, SubagentStatus.TIMED_OUT} or getattr(result, "completed_at", None) is not None:
                     cleanup_background_task(task_id)
                     return
@@ -232,8 +243,8 @@ async def task_tool(
                     logger.warning(f"[trace={trace_id}] Deferred cleanup for task {task_id} timed out after {cleanup_poll_count} polls")
                     return
 
-                await asyncio.sleep(5)
-                cleanup_poll_count += 1
+                if not await wait_for_background_task_update(task_id, seen_version, _SAFETY_POLL_SECONDS):
+                    cleanup_poll_count += 1
 
         def log_cleanup_failure(cleanup_task: asyncio.Task[None]) -> None:
             if cleanup_task.cancelled():
@@ -51,6 +51,12 @@ class DeferredToolRegistry:
             )
         )
 
+    def copy(self) -> "DeferredToolRegistry":
+        """Return a registry with the same entries that can be promoted independently."""
+        registry = DeferredToolRegistry()
+        registry._entries = list(self._entries)
+        return registry
+
     def promote(self, names: set[str]) -> None:
         """Remove tools from the deferred registry so they pass through the filter.
 
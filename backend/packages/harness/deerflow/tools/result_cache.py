@@ -0,0 +1,390 @@
+"""Cache for results of idempotent tools.
+
+Agents repeat identical read-only calls (the same search query, the same
+issue lookup) within a run and across threads. Tools marked with
+``cache_ttl_seconds`` (on their ``tools`` entry in config.yaml, or per server
+in extensions_config.json) are wrapped by :func:`cached_tool`, which looks
+results up in a :class:`ToolResultCache` before calling the tool:
+
+- Results are keyed by tool name, the tool's config and its normalized
+  arguments (keys sorted, ``None`` values dropped, injected arguments such as
+  the tool runtime ignored).
+- An in-process LRU tier answers repeats within a process; a sqlite tier
+  (``{base_dir}/tool_cache.db``) shares results between the gateway and
+  LangGraph processes and keeps them across restarts. Results that cannot be
+  stored as JSON stay in memory only. Async calls use the sqlite tier from
+  a worker thread.
+- Concurrent identical calls are coalesced: one runs the tool and the others
+  wait for its result. Failed calls are never cached.
+
+Hit rates per tool are available from :meth:`ToolResultCache.stats`.
+"""
+
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from langchain_core.tools import BaseTool, StructuredTool
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    tool TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+# Expired sqlite rows are deleted once every this many stores.
+_PURGE_EVERY = 256
+
+
+@dataclass
+class _ToolStats:
+    memory_hits: int = 0
+    sqlite_hits: int = 0
+    coalesced: int = 0
+    misses: int = 0
+    errors: int = 0
+
+    @property
+    def calls(self) -> int:
+        return self.memory_hits + self.sqlite_hits + self.coalesced + self.misses
+
+    def as_dict(self) -> dict[str, Any]:
+        calls = self.calls
+        saved = calls - self.misses
+        return {**asdict(self), "calls": calls, "hit_rate": saved / calls if calls else None}
+
+
+def cache_key(tool_name: str, scope: str, arguments: dict[str, Any]) -> str:
+    """Key for a call: tool name, tool config scope and normalized arguments."""
+    normalized = {name: value for name, value in arguments.items() if value is not None}
+    payload = json.dumps([tool_name, scope, normalized], sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _encode(value: Any) -> str | None:
+    try:
+        if isinstance(value, tuple):
+            return json.dumps({"tuple": True, "value": list(value)})
+        return json.dumps({"tuple": False, "value": value})
+    except (TypeError, ValueError):
+        return None
+
+
+def _decode(text: str) -> Any:
+    data = json.loads(text)
+    return tuple(data["value"]) if data["tuple"] else data["value"]
+
+
+class ToolResultCache:
+    """Tool results with a TTL, in memory and optionally in sqlite, with single-flight calls."""
+
+    def __init__(self, memory_max_entries: int = 1024, sqlite_path: Path | None = None):
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._memory_max_entries = memory_max_entries
+        self._in_flight: dict[str, Future] = {}
+        self._stats: dict[str, _ToolStats] = {}
+        self._sqlite_path = sqlite_path
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+        self._stores = 0
+
+    # ── Calls ──
+
+    def call(self, tool_name: str, key: str, ttl: float, fn: Callable[[], Any]) -> Any:
+        """Return the cached result for ``key``, or call ``fn`` once and cache its result."""
+        found, value, future = self._begin(tool_name, key)
+        if found:
+            return value
+        if future is not None:
+            return future.result()
+        return self._finish(tool_name, key, ttl, fn)
+
+    async def acall(self, tool_name: str, key: str, ttl: float, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async :meth:`call`; waiters on other threads or loops share the same result.
+
+        The sqlite tier is read and written in a worker thread, off the event loop.
+        """
+        found, value = self._lookup_memory(tool_name, key)
+        if not found and self._sqlite_path is not None:
+            found, value = await asyncio.to_thread(self._lookup_sqlite, tool_name, key)
+        if found:
+            return value
+        found, value, future = self._join_or_lead(tool_name, key)
+        if found:
+            return value
+        if future is not None:
+            return await asyncio.wrap_future(future)
+        leader = self._in_flight[key]
+        try:
+            value = await fn()
+        except BaseException as e:
+            self._fail(tool_name, key, leader, e)
+            raise
+        expires_at = time.time() + ttl
+        self._remember(key, expires_at, value)
+        # Waiters are answered before the sqlite write, which cannot strand them if this task is cancelled.
+        self._release(key, value, leader)
+        if self._sqlite_path is not None:
+            await asyncio.to_thread(self._put_sqlite, tool_name, key, expires_at, value)
+        return value
+
+    def _begin(self, tool_name: str, key: str) -> tuple[bool, Any, Future | None]:
+        """Look ``key`` up; on a miss, join the in-flight call or become its leader."""
+        found, value = self._lookup_memory(tool_name, key)
+        if found:
+            return True, value, None
+        found, value = self._lookup_sqlite(tool_name, key)
+        if found:
+            return True, value, None
+        return self._join_or_lead(tool_name, key)
+
+    def _join_or_lead(self, tool_name: str, key: str) -> tuple[bool, Any, Future | None]:
+        with self._lock:
+            stats = self._stats.setdefault(tool_name, _ToolStats())
+            # The leader stores to memory before leaving _in_flight, so check again here.
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] > time.time():
+                stats.memory_hits += 1
+                return True, entry[1], None
+            future = self._in_flight.get(key)
+            if future is not None:
+                stats.coalesced += 1
+                return False, None, future
+            stats.misses += 1
+            self._in_flight[key] = Future()
+            return False, None, None
+
+    def _finish(self, tool_name: str, key: str, ttl: float, fn: Callable[[], Any]) -> Any:
+        leader = self._in_flight[key]
+        try:
+            value = fn()
+        except BaseException as e:
+            self._fail(tool_name, key, leader, e)
+            raise
+        self._store(tool_name, key, ttl, value, leader)
+        return value
+
+    def _fail(self, tool_name: str, key: str, leader: Future, error: BaseException) -> None:
+        with self._lock:
+            self._stats[tool_name].errors += 1
+            self._in_flight.pop(key, None)
+        if isinstance(error, asyncio.CancelledError):
+            # Callers waiting on this call were not cancelled themselves.
+            error = RuntimeError(f"The shared call to {tool_name} was cancelled")
+        leader.set_exception(error)
+
+    def _store(self, tool_name: str, key: str, ttl: float, value: Any, leader: Future) -> None:
+        expires_at = time.time() + ttl
+        self._remember(key, expires_at, value)
+        self._put_sqlite(tool_name, key, expires_at, value)
+        self._release(key, value, leader)
+
+    def _release(self, key: str, value: Any, leader: Future) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+        leader.set_result(value)
+
+    # ── Memory tier ──
+
+    def _lookup_memory(self, tool_name: str, key: str) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return False, None
+            if entry[0] <= time.time():
+                del self._memory[key]
+                return False, None
+            self._memory.move_to_end(key)
+            self._stats.setdefault(tool_name, _ToolStats()).memory_hits += 1
+            return True, entry[1]
+
+    def _remember(self, key: str, expires_at: float, value: Any) -> None:
+        if self._memory_max_entries <= 0:
+            return
+        with self._lock:
+            self._memory[key] = (expires_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self._memory_max_entries:
+                self._memory.popitem(last=False)
+
+    # ── Sqlite tier ──
+
+    def _connection(self) -> sqlite3.Connection | None:
+        if self._db is None and self._sqlite_path is not None:
+            try:
+                self._sqlite_path.parent.mkdir(parents=True, exist_ok=True)
+                db = sqlite3.connect(self._sqlite_path, timeout=5, isolation_level=None, check_same_thread=False)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.executescript(_SCHEMA)
+                self._db = db
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Tool result cache: sqlite tier {self._sqlite_path} unavailable, using memory only: {e}")
+                self._sqlite_path = None
+        return self._db
+
+    def _lookup_sqlite(self, tool_name: str, key: str) -> tuple[bool, Any]:
+        if self._sqlite_path is None:
+            return False, None
+        with self._db_lock:
+            db = self._connection()
+            if db is None:
+                return False, None
+            try:
+                row = db.execute("SELECT value, expires_at FROM results WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"Tool result cache: sqlite lookup failed: {e}")
+                return False, None
+        if row is None or row[1] <= time.time():
+            return False, None
+        value = _decode(row[0])
+        self._remember(key, row[1], value)
+        with self._lock:
+            self._stats.setdefault(tool_name, _ToolStats()).sqlite_hits += 1
+        return True, value
+
+    def _put_sqlite(self, tool_name: str, key: str, expires_at: float, value: Any) -> None:
+        if self._sqlite_path is None:
+            return
+        encoded = _encode(value)
+        if encoded is None:
+            return
+        with self._db_lock:
+            db = self._connection()
+            if db is None:
+                return
+            try:
+                db.execute("INSERT OR REPLACE INTO results (key, tool, value, expires_at) VALUES (?, ?, ?, ?)", (key, tool_name, encoded, expires_at))
+                self._stores += 1
+                if self._stores % _PURGE_EVERY == 0:
+                    db.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+            except sqlite3.Error as e:
+                logger.warning(f"Tool result cache: sqlite store failed: {e}")
+
+    # ── Metrics and lifecycle ──
+
+    def stats(self) -> dict[str, Any]:
+        """Hit rates overall and per tool.
+
+        ``hit_rate`` counts memory hits, sqlite hits and coalesced calls as
+        hits; it is None before the first call.
+        """
+        with self._lock:
+            per_tool = {name: stats.as_dict() for name, stats in self._stats.items()}
+            total = _ToolStats()
+            for stats in self._stats.values():
+                for field in ("memory_hits", "sqlite_hits", "coalesced", "misses", "errors"):
+                    setattr(total, field, getattr(total, field) + getattr(stats, field))
+            return {**total.as_dict(), "memory_entries": len(self._memory), "in_flight": len(self._in_flight), "tools": per_tool}
+
+    def clear(self) -> None:
+        """Drop every cached result, in memory and in sqlite."""
+        with self._lock:
+            self._memory.clear()
+        with self._db_lock:
+            db = self._connection()
+            if db is not None:
+                db.execute("DELETE FROM results")
+
+    def close(self) -> None:
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+def _argument_names(tool: BaseTool) -> set[str] | None:
+    """Names of the arguments the model passes (injected ones excluded), or None if unknown."""
+    try:
+        schema = tool.tool_call_schema
+        if isinstance(schema, dict):
+            return set(schema.get("properties", {}))
+        return set(schema.model_fields)
+    except Exception:
+        return None
+
+
+def cached_tool(tool: BaseTool, ttl_seconds: float, scope: str = "", cache: ToolResultCache | None = None) -> BaseTool:
+    """Return a copy of ``tool`` whose results are cached for ``ttl_seconds``.
+
+    Args:
+        tool: The tool to wrap; only ``StructuredTool`` instances are supported.
+        ttl_seconds: How long a result is served from the cache.
+        scope: Identifies the tool's configuration, so a changed config does
+            not serve results produced under the old one.
+        cache: Cache to use; defaults to the process-wide one at call time.
+    """
+    if not isinstance(tool, StructuredTool):
+        logger.warning(f"Tool '{tool.name}' is not a StructuredTool; its results are not cached")
+        return tool
+
+    names = _argument_names(tool)
+    tool_name = tool.name
+
+    def key_for(args: tuple, kwargs: dict[str, Any]) -> str:
+        arguments = {name: value for name, value in kwargs.items() if names is None or name in names}
+        if args:
+            arguments["__args__"] = list(args)
+        return cache_key(tool_name, scope, arguments)
+
+    updates: dict[str, Any] = {}
+    if tool.func is not None:
+        func = tool.func
+
+        @functools.wraps(func)
+        def cached_func(*args: Any, **kwargs: Any) -> Any:
+            return (cache or get_tool_result_cache()).call(tool_name, key_for(args, kwargs), ttl_seconds, lambda: func(*args, **kwargs))
+
+        updates["func"] = cached_func
+    if tool.coroutine is not None:
+        coroutine = tool.coroutine
+
+        @functools.wraps(coroutine)
+        async def cached_coroutine(*args: Any, **kwargs: Any) -> Any:
+            return await (cache or get_tool_result_cache()).acall(tool_name, key_for(args, kwargs), ttl_seconds, lambda: coroutine(*args, **kwargs))
+
+        updates["coroutine"] = cached_coroutine
+    return tool.model_copy(update=updates)
+
+
+_cache: ToolResultCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_tool_result_cache() -> ToolResultCache:
+    """Return the process-wide tool result cache, built from the ``tool_cache`` config."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            from deerflow.config.paths import get_paths
+            from deerflow.config.tool_cache_config import get_tool_cache_config
+
+            config = get_tool_cache_config()
+            sqlite_path = (Path(config.sqlite_path) if config.sqlite_path else get_paths().tool_cache_file) if config.sqlite else None
+            _cache = ToolResultCache(config.memory_max_entries, sqlite_path)
+        return _cache
+
+
+def reset_tool_result_cache() -> None:
+    """Close and drop the process-wide cache (for tests and config reloads)."""
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+        _cache = None
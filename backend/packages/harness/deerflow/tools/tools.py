@@ -1,4 +1,9 @@
+import hashlib
+import json
 import logging
+import threading
+import time
+from dataclasses import dataclass
 
 from langchain.tools import BaseTool
 
@@ -6,7 +11,7 @@ from deerflow.config import get_app_config
 from deerflow.reflection import resolve_variable
 from deerflow.sandbox.security import is_host_bash_allowed
 from deerflow.tools.builtins import ask_clarification_tool, present_file_tool, task_tool, view_image_tool
-from deerflow.tools.builtins.tool_search import reset_deferred_registry
+from deerflow.tools.builtins.tool_search import DeferredToolRegistry, reset_deferred_registry, set_deferred_registry
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +48,9 @@ def get_available_tools(
     Note: MCP tools should be initialized at application startup using
     `initialize_mcp_tools()` from deerflow.mcp module.
 
+    Tool lists are cached by :class:`ToolRegistry` until the app config,
+    the extensions config, the MCP tools or the ACP agents change.
+
     Args:
         groups: Optional list of tool groups to filter by.
         include_mcp: Whether to include tools from MCP servers (default: True).
@@ -52,86 +60,288 @@ def get_available_tools(
     Returns:
         List of available tools.
     """
-    config = get_app_config()
-    tool_configs = [tool for tool in config.tools if groups is None or tool.group in groups]
-
-    # Do not expose host bash by default when LocalSandboxProvider is active.
-    if not is_host_bash_allowed(config):
-        tool_configs = [tool for tool in tool_configs if not _is_host_bash_tool(tool)]
-
-    loaded_tools = [resolve_variable(tool.use, BaseTool) for tool in tool_configs]
-
-    # Conditionally add tools based on config
-    builtin_tools = BUILTIN_TOOLS.copy()
-    skill_evolution_config = getattr(config, "skill_evolution", None)
-    if getattr(skill_evolution_config, "enabled", False):
-        from deerflow.tools.skill_manage_tool import skill_manage_tool
-
-        builtin_tools.append(skill_manage_tool)
-
-    # Add subagent tools only if enabled via runtime parameter
-    if subagent_enabled:
-        builtin_tools.extend(SUBAGENT_TOOLS)
-        logger.info("Including subagent tools (task)")
-
-    # If no model_name specified, use the first model (default)
-    if model_name is None and config.models:
-        model_name = config.models[0].name
-
-    # Add view_image_tool only if the model supports vision
-    model_config = config.get_model_config(model_name) if model_name else None
-    if model_config is not None and model_config.supports_vision:
-        builtin_tools.append(view_image_tool)
-        logger.info(f"Including view_image_tool for model '{model_name}' (supports_vision=True)")
-
-    # Get cached MCP tools if enabled
-    # NOTE: We use ExtensionsConfig.from_file() instead of config.extensions
-    # to always read the latest configuration from disk. This ensures that changes
-    # made through the Gateway API (which runs in a separate process) are immediately
-    # reflected when loading MCP tools.
-    mcp_tools = []
-    # Reset deferred registry upfront to prevent stale state from previous calls
-    reset_deferred_registry()
-    if include_mcp:
+    return get_tool_registry().get_tools(groups=groups, include_mcp=include_mcp, model_name=model_name, subagent_enabled=subagent_enabled)
+
+
+@dataclass
+class _ToolList:
+    tools: list[BaseTool]
+    # Registry of deferred MCP tools when tool search is enabled. Each caller
+    # gets a copy, since tool_search promotes entries out of it during a run.
+    deferred: DeferredToolRegistry | None
+    # MCP tools the list was built from, to notice a re-initialized MCP cache.
+    mcp_tools: list[BaseTool] | None
+
+
+class ToolRegistry:
+    """Resolves configured tools once and caches the filtered tool lists.
+
+    Lists are keyed by ``(groups, include_mcp, model_name, subagent_enabled)``
+    and belong to one config version. The version changes when the app config
+    object is replaced (``get_app_config()`` reloads it when the file changes),
+    when the extensions config file changes, or when the ACP agents are
+    reloaded; every cached list and resolved tool is then dropped. A list that
+    includes MCP tools is also rebuilt when the MCP tools cache is
+    re-initialized.
+
+    The lock only guards the cache itself. Lists are built and MCP tools are
+    read (which may lazily initialize them) outside it, so a slow MCP server
+    does not hold up callers whose list is cached or needs no MCP tools.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sources: tuple | None = None
+        self._version = 0
+        self._resolved: dict[str, BaseTool] = {}
+        self._lists: dict[tuple, _ToolList] = {}
+        self._hits = 0
+        self._misses = 0
+        self._last_miss_seconds: float | None = None
+        self._total_miss_seconds = 0.0
+
+    def get_tools(
+        self,
+        groups: list[str] | None = None,
+        include_mcp: bool = True,
+        model_name: str | None = None,
+        subagent_enabled: bool = False,
+    ) -> list[BaseTool]:
+        """Return the tools for these arguments; see :func:`get_available_tools`."""
+        config = get_app_config()
+        key = (None if groups is None else tuple(groups), include_mcp, model_name, subagent_enabled)
+        with self._lock:
+            self._check_sources(config)
+            version = self._version
+            cached = self._lists.get(key)
+        if cached is not None and not self._mcp_changed(cached):
+            with self._lock:
+                self._hits += 1
+            entry = cached
+        else:
+            started = time.perf_counter()
+            entry = self._build(config, version, groups, include_mcp, model_name, subagent_enabled)
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                # Keep a list another caller built meanwhile, and drop ours if
+                # the config changed while it was being built.
+                current = self._lists.get(key)
+                if self._version == version:
+                    if current is None or current is cached:
+                        self._lists[key] = entry
+                    else:
+                        entry = current
+                self._misses += 1
+                self._last_miss_seconds = elapsed
+                self._total_miss_seconds += elapsed
+            logger.info(f"Built tool list for groups={groups}, model={model_name}, subagent_enabled={subagent_enabled} in {elapsed * 1000:.1f}ms (config version {version})")
+
+        # Reset deferred registry upfront to prevent stale state from previous calls
+        reset_deferred_registry()
+        if entry.deferred is not None:
+            set_deferred_registry(entry.deferred.copy())
+        return list(entry.tools)
+
+    def stats(self) -> dict:
+        """Cache effectiveness and the cost of a miss.
+
+        Returns:
+            ``{"version", "cached_lists", "hits", "misses", "last_miss_ms",
+            "avg_miss_ms"}``; the miss timings are None before the first miss.
+        """
+        with self._lock:
+            return {
+                "version": self._version,
+                "cached_lists": len(self._lists),
+                "hits": self._hits,
+                "misses": self._misses,
+                "last_miss_ms": None if self._last_miss_seconds is None else self._last_miss_seconds * 1000,
+                "avg_miss_ms": self._total_miss_seconds / self._misses * 1000 if self._misses else None,
+            }
+
+    def invalidate(self) -> None:
+        """Drop every cached list and resolved tool."""
+        with self._lock:
+            self._invalidate_locked()
+
+    def _invalidate_locked(self) -> None:
+        self._sources = None
+        self._resolved.clear()
+        self._lists.clear()
+        self._version += 1
+
+    def _check_sources(self, config) -> None:
+        from deerflow.config.acp_config import get_acp_agents
+
+        sources = (config, _extensions_config_version(), get_acp_agents())
+        current = self._sources
+        if current is not None and current[0] is sources[0] and current[1] == sources[1] and current[2] is sources[2]:
+            return
+        if current is not None:
+            logger.info("App, extensions or ACP config changed; dropping cached tool lists")
+            self._invalidate_locked()
+        # Holds the config objects, so they cannot be replaced by others at the same address.
+        self._sources = sources
+
+    def _mcp_changed(self, entry: _ToolList) -> bool:
+        if entry.mcp_tools is None:
+            return False
         try:
-            from deerflow.config.extensions_config import ExtensionsConfig
             from deerflow.mcp.cache import get_cached_mcp_tools
 
-            extensions_config = ExtensionsConfig.from_file()
-            if extensions_config.get_enabled_mcp_servers():
-                mcp_tools = get_cached_mcp_tools()
-                if mcp_tools:
-                    logger.info(f"Using {len(mcp_tools)} cached MCP tool(s)")
-
-                    # When tool_search is enabled, register MCP tools in the
-                    # deferred registry and add tool_search to builtin tools.
-                    if config.tool_search.enabled:
-                        from deerflow.tools.builtins.tool_search import DeferredToolRegistry, set_deferred_registry
-                        from deerflow.tools.builtins.tool_search import tool_search as tool_search_tool
-
-                        registry = DeferredToolRegistry()
-                        for t in mcp_tools:
-                            registry.register(t)
-                        set_deferred_registry(registry)
-                        builtin_tools.append(tool_search_tool)
-                        logger.info(f"Tool search active: {len(mcp_tools)} tools deferred")
-        except ImportError:
-            logger.warning("MCP module not available. Install 'langchain-mcp-adapters' package to enable MCP tools.")
+            current = get_cached_mcp_tools()
+        except Exception:
+            return False
+        return len(current) != len(entry.mcp_tools) or any(a is not b for a, b in zip(current, entry.mcp_tools))
+
+    def _resolve(self, use: str, version: int) -> BaseTool:
+        with self._lock:
+            tool = self._resolved.get(use)
+        if tool is None:
+            tool = resolve_variable(use, BaseTool)
+            with self._lock:
+                if self._version == version:
+                    tool = self._resolved.setdefault(use, tool)
+        return tool
+
+    def _build(self, config, version: int, groups: list[str] | None, include_mcp: bool, model_name: str | None, subagent_enabled: bool) -> _ToolList:
+        tool_configs = [tool for tool in config.tools if groups is None or tool.group in groups]
+
+        # Do not expose host bash by default when LocalSandboxProvider is active.
+        if not is_host_bash_allowed(config):
+            tool_configs = [tool for tool in tool_configs if not _is_host_bash_tool(tool)]
+
+        loaded_tools = [_with_result_cache(self._resolve(tool.use, version), getattr(tool, "cache_ttl_seconds", None), _tool_config_scope(tool)) for tool in tool_configs]
+
+        # Conditionally add tools based on config
+        builtin_tools = BUILTIN_TOOLS.copy()
+        skill_evolution_config = getattr(config, "skill_evolution", None)
+        if getattr(skill_evolution_config, "enabled", False):
+            from deerflow.tools.skill_manage_tool import skill_manage_tool
+
+            builtin_tools.append(skill_manage_tool)
+
+        # Add subagent tools only if enabled via runtime parameter
+        if subagent_enabled:
+            builtin_tools.extend(SUBAGENT_TOOLS)
+            logger.info("Including subagent tools (task)")
+
+        # If no model_name specified, use the first model (default)
+        if model_name is None and config.models:
+            model_name = config.models[0].name
+
+        # Add view_image_tool only if the model supports vision
+        model_config = config.get_model_config(model_name) if model_name else None
+        if model_config is not None and model_config.supports_vision:
+            builtin_tools.append(view_image_tool)
+            logger.info(f"Including view_image_tool for model '{model_name}' (supports_vision=True)")
+
+        # Get cached MCP tools if enabled
+        # NOTE: We use ExtensionsConfig.from_file() instead of config.extensions
+        # to always read the latest configuration from disk. This ensures that changes
+        # made through the Gateway API (which runs in a separate process) are immediately
+        # reflected when loading MCP tools.
+        mcp_tools = []
+        mcp_source = None
+        deferred = None
+        if include_mcp:
+            try:
+                from deerflow.config.extensions_config import ExtensionsConfig
+                from deerflow.mcp.cache import get_cached_mcp_tools
+
+                extensions_config = ExtensionsConfig.from_file()
+                if extensions_config.get_enabled_mcp_servers():
+                    mcp_tools = get_cached_mcp_tools()
+                    mcp_source = list(mcp_tools)
+                    mcp_tools = _with_mcp_result_cache(mcp_tools, extensions_config)
+                    if mcp_tools:
+                        logger.info(f"Using {len(mcp_tools)} cached MCP tool(s)")
+
+                        # When tool_search is enabled, register MCP tools in the
+                        # deferred registry and add tool_search to builtin tools.
+                        if config.tool_search.enabled:
+                            from deerflow.tools.builtins.tool_search import tool_search as tool_search_tool
+
+                            deferred = DeferredToolRegistry()
+                            for t in mcp_tools:
+                                deferred.register(t)
+                            builtin_tools.append(tool_search_tool)
+                            logger.info(f"Tool search active: {len(mcp_tools)} tools deferred")
+            except ImportError:
+                logger.warning("MCP module not available. Install 'langchain-mcp-adapters' package to enable MCP tools.")
+            except Exception as e:
+                logger.error(f"Failed to get cached MCP tools: {e}")
+
+        # Add invoke_acp_agent tool if any ACP agents are configured
+        acp_tools: list[BaseTool] = []
+        try:
+            from deerflow.config.acp_config import get_acp_agents
+            from deerflow.tools.builtins.invoke_acp_agent_tool import build_invoke_acp_agent_tool
+
+            acp_agents = get_acp_agents()
+            if acp_agents:
+                acp_tools.append(build_invoke_acp_agent_tool(acp_agents))
+                logger.info(f"Including invoke_acp_agent tool ({len(acp_agents)} agent(s): {list(acp_agents.keys())})")
         except Exception as e:
-            logger.error(f"Failed to get cached MCP tools: {e}")
+            logger.warning(f"Failed to load ACP tool: {e}")
+
+        logger.info(f"Total tools loaded: {len(loaded_tools)}, built-in tools: {len(builtin_tools)}, MCP tools: {len(mcp_tools)}, ACP tools: {len(acp_tools)}")
+        return _ToolList(tools=loaded_tools + builtin_tools + mcp_tools + acp_tools, deferred=deferred, mcp_tools=mcp_source)
+
+
+def _with_result_cache(tool: BaseTool, ttl_seconds: float | None, scope: str) -> BaseTool:
+    """Wrap ``tool`` in the result cache when it has a TTL and the cache is enabled."""
+    if not ttl_seconds:
+        return tool
+    from deerflow.config.tool_cache_config import get_tool_cache_config
+
+    if not get_tool_cache_config().enabled:
+        return tool
+    from deerflow.tools.result_cache import cached_tool
+
+    return cached_tool(tool, ttl_seconds, scope=scope)
+
+
+def _tool_config_scope(tool_config) -> str:
+    """Hash of a config.yaml tool entry, so changed settings do not reuse cached results."""
+    dump = getattr(tool_config, "model_dump", None)
+    payload = json.dumps(dump(mode="json", exclude={"cache_ttl_seconds"}) if dump else repr(tool_config), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _with_mcp_result_cache(mcp_tools: list[BaseTool], extensions_config) -> list[BaseTool]:
+    """Wrap MCP tools listed in their server's ``cache_ttl_seconds`` in the result cache."""
+    from deerflow.mcp.discovery import server_cache_key
+
+    ttls: dict[str, tuple[float, str]] = {}
+    for server_name, server in extensions_config.get_enabled_mcp_servers().items():
+        for tool_name, ttl in (getattr(server, "cache_ttl_seconds", None) or {}).items():
+            ttls[f"{server_name}_{tool_name}"] = (ttl, server_cache_key(server))
+    if not ttls:
+        return mcp_tools
+    return [_with_result_cache(tool, *ttls[tool.name]) if tool.name in ttls else tool for tool in mcp_tools]
+
+
+def _extensions_config_version() -> tuple | None:
+    """Path and mtime of the extensions config file, or None without one."""
+    from deerflow.config.extensions_config import ExtensionsConfig
 
-    # Add invoke_acp_agent tool if any ACP agents are configured
-    acp_tools: list[BaseTool] = []
     try:
-        from deerflow.config.acp_config import get_acp_agents
-        from deerflow.tools.builtins.invoke_acp_agent_tool import build_invoke_acp_agent_tool
+        path = ExtensionsConfig.resolve_config_path()
+        return (path, path.stat().st_mtime_ns) if path is not None else None
+    except OSError:
+        return None
+
+
+_registry = ToolRegistry()
+
+
+def get_tool_registry() -> ToolRegistry:
+    """Return the process-wide tool registry."""
+    return _registry
 
-        acp_agents = get_acp_agents()
-        if acp_agents:
-            acp_tools.append(build_invoke_acp_agent_tool(acp_agents))
-            logger.info(f"Including invoke_acp_agent tool ({len(acp_agents)} agent(s): {list(acp_agents.keys())})")
-    except Exception as e:
-        logger.warning(f"Failed to load ACP tool: {e}")
 
-    logger.info(f"Total tools loaded: {len(loaded_tools)}, built-in tools: {len(builtin_tools)}, MCP tools: {len(mcp_tools)}, ACP tools: {len(acp_tools)}")
-    return loaded_tools + builtin_tools + mcp_tools + acp_tools
+def reset_tool_registry() -> None:
+    """Replace the registry with an empty one (for tests)."""
+    global _registry
+    _registry = ToolRegistry()
@@ -0,0 +1,6 @@
+"""Small statistics helpers for latency reporting."""
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Return the nearest-rank ``fraction`` percentile (0-1) of a non-empty, ascending list."""
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
@@ -0,0 +1,44 @@
+"""Minimal MCP server for session pool tests and benchmarks.
+
+Run ``python fake_mcp_server.py`` to serve over stdio, or
+``python fake_mcp_server.py --http PORT`` to serve streamable HTTP at
+``http://127.0.0.1:PORT/mcp``.
+"""
+
+import argparse
+import asyncio
+import os
+
+from mcp.server.fastmcp import FastMCP
+
+mcp = FastMCP("fake", log_level="WARNING")
+
+
+@mcp.tool()
+def echo(text: str) -> str:
+    """Return the text unchanged."""
+    return text
+
+
+@mcp.tool()
+def pid() -> int:
+    """Return the server's process ID."""
+    return os.getpid()
+
+
+@mcp.tool()
+async def sleep(seconds: float) -> str:
+    """Sleep, then return."""
+    await asyncio.sleep(seconds)
+    return "done"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--http", type=int, metavar="PORT")
+    args = parser.parse_args()
+    if args.http:
+        mcp.settings.port = args.http
+        mcp.run(transport="streamable-http")
+    else:
+        mcp.run()
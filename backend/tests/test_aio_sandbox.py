@@ -157,8 +157,8 @@ class TestConcurrentFileWrites:
 
             return snapshot
 
-        def write_back(*, file, content, **kwargs):
-            storage["content"] = content
+        def write_back(*, file, content, append=False, **kwargs):
+            storage["content"] = storage["content"] + content if append else content
             return SimpleNamespace(data=SimpleNamespace())
 
         sandbox.read_file = overlapping_read_file
@@ -181,3 +181,130 @@ class TestConcurrentFileWrites:
             thread.join()
 
         assert storage["content"] in {"seed\nA\nB\n", "seed\nB\nA\n"}
+
+    def test_path_locks_are_dropped_after_use(self, sandbox):
+        import asyncio
+
+        with sandbox._path_lock("/tmp/a.txt"):
+            assert set(sandbox._path_locks) == {"/tmp/a.txt"}
+        for i in range(100):
+            with sandbox._path_lock(f"/tmp/file{i}.txt"):
+                pass
+
+        async def hold(path: str, delay: float):
+            async with sandbox._apath_lock(path):
+                await asyncio.sleep(delay)
+
+        async def run():
+            waiter = asyncio.create_task(hold("/tmp/a.txt", 0))
+            await asyncio.gather(hold("/tmp/a.txt", 0.05), hold("/tmp/b.txt", 0.01))
+            await waiter
+            cancelled = asyncio.create_task(hold("/tmp/c.txt", 10))
+            await asyncio.sleep(0.01)
+            cancelled.cancel()
+            await asyncio.gather(cancelled, return_exceptions=True)
+
+        asyncio.run(run())
+        assert sandbox._path_locks == {}
+
+
+class TestShellSessionPool:
+    """Verify commands run on independent sessions and writes lock per path."""
+
+    @pytest.fixture()
+    def pooled(self):
+        with patch("deerflow.community.aio_sandbox.aio_sandbox.AioSandboxClient"):
+            from deerflow.community.aio_sandbox.aio_sandbox import AioSandbox
+
+            return AioSandbox(id="pooled", base_url="http://localhost:8080", shell_sessions=3)
+
+    def test_sequential_commands_reuse_default_session(self, pooled):
+        calls = []
+        pooled._client.shell.exec_command = lambda command, **kwargs: calls.append(kwargs) or SimpleNamespace(data=SimpleNamespace(output="ok"))
+
+        pooled.execute_command("cd /tmp")
+        pooled.execute_command("pwd")
+        pooled.list_dir("/tmp")
+
+        assert calls == [{}, {}, {}]
+
+    def test_concurrent_commands_use_distinct_sessions(self, pooled):
+        active: dict[str | None, int] = {}
+        seen: set[str | None] = set()
+        overlap = []
+        state_lock = threading.Lock()
+        barrier = threading.Barrier(3)
+
+        def exec_command(command, **kwargs):
+            session = kwargs.get("id")
+            with state_lock:
+                active[session] = active.get(session, 0) + 1
+                overlap.append(active[session] > 1)
+                seen.add(session)
+            import time
+
+            time.sleep(0.05)
+            with state_lock:
+                active[session] -= 1
+            return SimpleNamespace(data=SimpleNamespace(output=command))
+
+        pooled._client.shell.exec_command = exec_command
+
+        def worker(index):
+            barrier.wait()
+            for _ in range(3):
+                pooled.execute_command(f"cmd-{index}")
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert not any(overlap), "a session received concurrent commands"
+        assert len(seen) == 3
+
+    def test_long_command_does_not_block_other_commands_or_writes(self, pooled):
+        release = threading.Event()
+
+        def exec_command(command, **kwargs):
+            if command == "long":
+                release.wait(5)
+            return SimpleNamespace(data=SimpleNamespace(output=command))
+
+        pooled._client.shell.exec_command = exec_command
+        pooled._client.file.write_file = MagicMock()
+        long_thread = threading.Thread(target=pooled.execute_command, args=("long",))
+        long_thread.start()
+        try:
+            assert pooled.execute_command("short") == "short"
+            pooled.write_file("/tmp/a.txt", "x")
+            pooled._client.file.write_file.assert_called_once_with(file="/tmp/a.txt", content="x")
+        finally:
+            release.set()
+            long_thread.join()
+
+    def test_writes_to_different_paths_run_in_parallel(self, pooled):
+        barrier = threading.Barrier(2, timeout=2)
+
+        def write_file(*, file, content, **kwargs):
+            # Both writers must be inside write_file at once to pass the barrier.
+            barrier.wait()
+            return SimpleNamespace(data=SimpleNamespace())
+
+        pooled._client.file.write_file = write_file
+        errors = []
+
+        def writer(path):
+            try:
+                pooled.write_file(path, "x")
+            except Exception as e:  # pragma: no cover - surfaced below
+                errors.append(e)
+
+        threads = [threading.Thread(target=writer, args=(f"/tmp/{name}",)) for name in ("a", "b")]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert errors == []
@@ -0,0 +1,211 @@
+"""Native async API of AioSandbox against a local stub of the sandbox HTTP API."""
+
+import asyncio
+import fnmatch
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from deerflow.community.aio_sandbox.aio_sandbox import AioSandbox
+from deerflow.sandbox import tools
+from deerflow.sandbox.sandbox import Sandbox
+
+
+class _StubSandboxAPI(BaseHTTPRequestHandler):
+    """Serves the shell and file endpoints from an in-memory file table."""
+
+    files: dict[str, str] = {}
+    exec_sessions: list[str | None] = []
+    corrupt_sessions: set[str | None] = set()
+
+    def do_POST(self) -> None:  # noqa: N802
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        cls = type(self)
+        if self.path == "/v1/shell/exec":
+            session = body.get("id")
+            cls.exec_sessions.append(session)
+            output = "'ErrorObservation' object has no attribute 'exit_code'" if session in cls.corrupt_sessions else f"ran {body['command']}"
+            data = {"session_id": session or "default", "command": body["command"], "status": "completed", "output": output, "exit_code": 0}
+        elif self.path == "/v1/file/read":
+            content = cls.files[body["file"]]
+            if body.get("start_line") is not None:
+                lines = content.splitlines(keepends=True)
+                content = "".join(lines[body["start_line"] : body.get("end_line")])
+            data = {"content": content, "file": body["file"]}
+        elif self.path == "/v1/file/write":
+            cls.files[body["file"]] = cls.files.get(body["file"], "") + body["content"] if body.get("append") else body["content"]
+            data = {"file": body["file"], "bytes_written": len(body["content"])}
+        elif self.path == "/v1/file/find":
+            data = {"path": body["path"], "files": sorted(path for path in cls.files if fnmatch.fnmatch(path, f"{body['path']}/{body['glob']}"))}
+        else:
+            self.send_error(404)
+            return
+        payload = json.dumps({"success": True, "data": data}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture()
+def stub_sandbox():
+    _StubSandboxAPI.files = {"/mnt/user-data/workspace/notes.txt": "one\ntwo\nthree\n"}
+    _StubSandboxAPI.exec_sessions = []
+    _StubSandboxAPI.corrupt_sessions = set()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubSandboxAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield AioSandbox(id="stub", base_url=f"http://127.0.0.1:{server.server_address[1]}", shell_sessions=2)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_aexecute_command_runs_concurrently_on_pooled_sessions(stub_sandbox) -> None:
+    async def scenario():
+        return await asyncio.gather(*(stub_sandbox.aexecute_command(f"echo {i}") for i in range(6)))
+
+    assert asyncio.run(scenario()) == [f"ran echo {i}" for i in range(6)]
+    assert set(_StubSandboxAPI.exec_sessions) <= {session.id for session in stub_sandbox._sessions}
+
+
+def test_aexecute_command_retries_corrupted_session(stub_sandbox) -> None:
+    _StubSandboxAPI.corrupt_sessions = {None}
+
+    assert asyncio.run(stub_sandbox.aexecute_command("ls")) == "ran ls"
+    assert stub_sandbox._sessions[0].id is not None
+
+
+def test_async_file_operations(stub_sandbox) -> None:
+    path = "/mnt/user-data/workspace/notes.txt"
+
+    async def scenario():
+        await stub_sandbox.awrite_file(path, "four\n", append=True)
+        return (
+            await stub_sandbox.aread_file(path),
+            await stub_sandbox.aread_file_lines(path, 2, 3),
+            await stub_sandbox.aglob("/mnt/user-data/workspace", "*.txt"),
+            await stub_sandbox.aread_file("/mnt/user-data/workspace/missing.txt"),
+        )
+
+    content, lines, globbed, missing = asyncio.run(scenario())
+
+    assert content == "one\ntwo\nthree\nfour\n"
+    assert lines == "two\nthree"
+    assert globbed == ([path], False)
+    assert missing.startswith("Error:")
+    assert stub_sandbox.read_file(path) == content
+
+
+def test_async_client_is_shared_within_an_event_loop(stub_sandbox) -> None:
+    async def clients():
+        return stub_sandbox._async_client(), stub_sandbox._async_client()
+
+    first, second = asyncio.run(clients())
+    other, _ = asyncio.run(clients())
+
+    assert first is second
+    assert other is not first
+
+
+def test_close_closes_the_clients_of_running_loops(stub_sandbox) -> None:
+    async def scenario():
+        stub_sandbox._async_client()
+        ((_, http_client),) = stub_sandbox._async_clients.values()
+        await asyncio.to_thread(stub_sandbox.close)
+        await asyncio.sleep(0)
+        return http_client
+
+    http_client = asyncio.run(scenario())
+
+    assert http_client.is_closed
+    assert stub_sandbox._http_client.is_closed
+    assert len(stub_sandbox._async_clients) == 0
+
+
+def test_base_sandbox_async_defaults_run_sync_methods_on_a_thread() -> None:
+    class _SyncOnly(Sandbox):
+        def execute_command(self, command):
+            return threading.current_thread().name
+
+        def read_file(self, path):
+            return f"read {path}"
+
+        def read_file_lines(self, path, start_line, end_line):
+            return f"{start_line}-{end_line}"
+
+        def list_dir(self, path, max_depth=2):
+            return [path]
+
+        def write_file(self, path, content, append=False):
+            self.written = (path, content, append)
+
+        def glob(self, path, pattern, *, include_dirs=False, max_results=200):
+            return [pattern], False
+
+        def grep(self, path, pattern, *, glob=None, literal=False, case_sensitive=False, max_results=100):
+            return [], False
+
+        def update_file(self, path, content):
+            pass
+
+    sandbox = _SyncOnly("sync")
+
+    async def scenario():
+        await sandbox.awrite_file("/a", "x", append=True)
+        return (
+            await sandbox.aexecute_command("ls"),
+            await sandbox.aread_file("/a"),
+            await sandbox.aread_file_lines("/a", 1, 2),
+            await sandbox.alist_dir("/d"),
+            await sandbox.aglob("/d", "*.py"),
+            await sandbox.agrep("/d", "x"),
+        )
+
+    thread_name, *results = asyncio.run(scenario())
+
+    assert thread_name != threading.main_thread().name
+    assert results == ["read /a", "1-2", ["/d"], (["*.py"], False), ([], False)]
+    assert sandbox.written == ("/a", "x", True)
+
+
+def test_async_tools_await_non_local_sandbox(monkeypatch) -> None:
+    runtime = SimpleNamespace(state={"sandbox": {"sandbox_id": "aio-1"}}, context={})
+    written: list[tuple] = []
+
+    async def aread_file(path):
+        return f"content of {path}"
+
+    async def awrite_file(path, content, append=False):
+        written.append((path, content, append))
+
+    async def alist_dir(path, max_depth=2):
+        return [path, f"{path}/a.py"]
+
+    sandbox = SimpleNamespace(id="aio-1", aread_file=aread_file, awrite_file=awrite_file, alist_dir=alist_dir)
+
+    async def aensure_sandbox_initialized(runtime):
+        return sandbox
+
+    monkeypatch.setattr(tools, "_aensure_sandbox_initialized", aensure_sandbox_initialized)
+
+    async def scenario():
+        return (
+            await tools.read_file_tool.coroutine(runtime=runtime, description="d", path="/mnt/user-data/workspace/a.py"),
+            await tools.write_file_tool.coroutine(runtime=runtime, description="d", path="/mnt/user-data/workspace/b.py", content="x"),
+            await tools.ls_tool.coroutine(runtime=runtime, description="d", path="/mnt/user-data/workspace"),
+        )
+
+    assert asyncio.run(scenario()) == (
+        "content of /mnt/user-data/workspace/a.py",
+        "OK",
+        "/mnt/user-data/workspace\n/mnt/user-data/workspace/a.py",
+    )
+    assert written == [("/mnt/user-data/workspace/b.py", "x", False)]
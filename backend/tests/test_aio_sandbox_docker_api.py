@@ -0,0 +1,260 @@
+"""DockerApiBackend against an in-memory fake Docker daemon on a unix socket."""
+
+import importlib
+import json
+import platform
+import re
+import shutil
+import socketserver
+import tempfile
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from deerflow.community.aio_sandbox import docker_api_backend
+from deerflow.community.aio_sandbox.docker_api_backend import DockerApiBackend, find_docker_socket
+
+aio_mod = importlib.import_module("deerflow.community.aio_sandbox.aio_sandbox_provider")
+
+IMAGE = "sandbox:latest"
+
+
+class _FakeDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Just enough of the Engine API for the backend: containers, rename, list, pull."""
+
+    daemon_threads = True
+
+    def __init__(self, path: str):
+        self.containers: dict[str, dict] = {}  # name -> {"Id", "Running", "Port", "Body"}
+        self.images = {IMAGE}
+        self.connections = 0
+        self.requests: list[tuple[str, str]] = []
+        self.lock = threading.Lock()
+        super().__init__(path, _FakeDaemonHandler)
+
+    def find(self, ref: str) -> tuple[str, dict] | None:
+        for name, container in self.containers.items():
+            if ref in (name, container["Id"]):
+                return name, container
+        return None
+
+
+class _FakeDaemonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _FakeDaemon
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def address_string(self) -> str:
+        return "unix"
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def _reply(self, status: int, payload=None) -> None:
+        body = b"" if payload is None else (payload if isinstance(payload, bytes) else json.dumps(payload).encode())
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self, method: str) -> None:
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        server = self.server
+        with server.lock:
+            server.requests.append((method, url.path))
+            parts = url.path.strip("/").split("/")
+            if url.path == "/_ping":
+                return self._reply(200, b"OK")
+            if method == "POST" and url.path == "/images/create":
+                server.images.add(query["fromImage"])
+                return self._reply(200, b'{"status":"Pulling"}\n{"status":"Downloaded"}\n')
+            if method == "POST" and url.path == "/containers/create":
+                if body["Image"] not in server.images:
+                    return self._reply(404, {"message": f"No such image: {body['Image']}"})
+                name = query["name"]
+                if name in server.containers:
+                    return self._reply(409, {"message": f'Conflict. The container name "/{name}" is already in use by container "{server.containers[name]["Id"]}"'})
+                port = int(body["HostConfig"]["PortBindings"]["8080/tcp"][0]["HostPort"])
+                server.containers[name] = {"Id": uuid.uuid4().hex, "Running": False, "Port": port, "Body": body}
+                return self._reply(201, {"Id": server.containers[name]["Id"]})
+            if method == "GET" and url.path == "/containers/json":
+                filters = json.loads(query.get("filters", "{}"))
+                pattern = re.compile(filters.get("name", [""])[0])
+                listed = [{"Id": c["Id"], "Names": [f"/{name}"], "State": "running"} for name, c in server.containers.items() if c["Running"] and pattern.search(f"/{name}")]
+                return self._reply(200, listed)
+            if parts[0] != "containers" or (found := server.find(parts[1])) is None:
+                return self._reply(404, {"message": "No such container"})
+            name, container = found
+            action = parts[2] if len(parts) > 2 else None
+            if method == "GET" and action == "json":
+                ports = {"8080/tcp": [{"HostIp": "0.0.0.0", "HostPort": str(container["Port"])}]} if container["Running"] else {}
+                return self._reply(200, {"Id": container["Id"], "Name": f"/{name}", "State": {"Running": container["Running"]}, "NetworkSettings": {"Ports": ports}})
+            if method == "POST" and action == "start":
+                if any(c["Running"] and c["Port"] == container["Port"] for c in server.containers.values()):
+                    return self._reply(500, {"message": f"Bind for 0.0.0.0:{container['Port']} failed: port is already allocated"})
+                container["Running"] = True
+                return self._reply(204)
+            if method == "POST" and action == "stop" or method == "DELETE" and action is None:
+                del server.containers[name]  # AutoRemove
+                return self._reply(204)
+            if method == "POST" and action == "rename":
+                server.containers[query["name"]] = server.containers.pop(name)
+                return self._reply(204)
+            return self._reply(404, {"message": "page not found"})
+
+    def do_GET(self) -> None:  # noqa: N802
+        self._route("GET")
+
+    def do_POST(self) -> None:  # noqa: N802
+        self._route("POST")
+
+    def do_DELETE(self) -> None:  # noqa: N802
+        self._route("DELETE")
+
+
+@pytest.fixture()
+def daemon():
+    # Unix socket paths are limited to ~100 bytes, so stay out of tmp_path.
+    directory = tempfile.mkdtemp(prefix="dkr")
+    server = _FakeDaemon(str(Path(directory) / "docker.sock"))
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True).start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture()
+def backend(daemon, monkeypatch):
+    monkeypatch.setattr(docker_api_backend, "wait_for_sandbox_ready", lambda url, timeout=30: True)
+    backend = DockerApiBackend(
+        socket_path=daemon.server_address,
+        image=IMAGE,
+        base_port=18080,
+        container_prefix="deer-flow-sandbox",
+        config_mounts=[],
+        environment={"TZ": "UTC"},
+    )
+    yield backend
+    backend.close()
+
+
+def test_lifecycle_runs_over_one_persistent_connection(backend, daemon) -> None:
+    info = backend.create("thread-1", "abcd1234", extra_mounts=[("/host/workspace", "/mnt/user-data/workspace", False)])
+
+    assert info.container_name == "deer-flow-sandbox-abcd1234"
+    body = daemon.containers[info.container_name]["Body"]
+    assert body["Env"] == ["TZ=UTC"]
+    assert body["HostConfig"]["AutoRemove"] is True
+    assert body["HostConfig"]["Mounts"] == [{"Type": "bind", "Source": "/host/workspace", "Target": "/mnt/user-data/workspace", "ReadOnly": False}]
+
+    assert backend.is_alive(info)
+    discovered = backend.discover("abcd1234")
+    assert discovered.sandbox_url == info.sandbox_url
+    backend.destroy(info)
+    assert not backend.is_alive(info)
+    assert backend.discover("abcd1234") is None
+    assert daemon.connections == 1
+
+
+def test_create_pulls_missing_image(backend, daemon) -> None:
+    daemon.images.clear()
+
+    backend.create("thread-1", "abcd1234")
+
+    assert ("POST", "/images/create") in daemon.requests
+    assert daemon.containers["deer-flow-sandbox-abcd1234"]["Running"]
+
+
+def test_create_retries_next_port_and_removes_failed_container(backend, daemon) -> None:
+    daemon.containers["someone-else"] = {"Id": "other", "Running": True, "Port": 18080, "Body": {}}
+
+    info = backend.create("thread-1", "abcd1234")
+
+    assert info.sandbox_url.endswith(":18081")
+    assert set(daemon.containers) == {"someone-else", "deer-flow-sandbox-abcd1234"}
+
+
+def test_create_adopts_container_started_by_another_process(backend, daemon) -> None:
+    first = backend.create("thread-1", "abcd1234")
+
+    second = backend.create("thread-1", "abcd1234")
+
+    assert second.sandbox_url == first.sandbox_url
+    assert len(daemon.containers) == 1
+
+
+def test_alive_sandboxes_is_one_list_call(backend, daemon) -> None:
+    infos = [backend.create(f"thread-{i}", f"sandbox{i}") for i in range(3)]
+    backend.destroy(infos[1])
+    daemon.requests.clear()
+
+    assert backend.alive_sandboxes(infos) == {"sandbox0", "sandbox2"}
+    assert daemon.requests == [("GET", "/containers/json")]
+
+
+def test_adopt_renames_container(backend, daemon, monkeypatch) -> None:
+    monkeypatch.setattr(platform, "system", lambda: "Linux")
+    info = backend.create(None, "prewarm-1")
+
+    adopted = backend.adopt(info, "abcd1234")
+
+    assert adopted.container_name == "deer-flow-sandbox-abcd1234"
+    assert backend.discover("abcd1234").sandbox_url == info.sandbox_url
+
+
+def test_find_docker_socket_honours_docker_host(daemon, monkeypatch) -> None:
+    monkeypatch.setenv("DOCKER_HOST", f"unix://{daemon.server_address}")
+    assert find_docker_socket() == daemon.server_address
+
+    monkeypatch.setenv("DOCKER_HOST", "tcp://10.0.0.1:2375")
+    assert find_docker_socket() is None
+
+
+def test_provider_prefers_engine_api_when_socket_answers(daemon, monkeypatch) -> None:
+    provider = aio_mod.AioSandboxProvider.__new__(aio_mod.AioSandboxProvider)
+    provider._config = {"image": IMAGE, "port": 18080, "container_prefix": "deer-flow-sandbox", "mounts": [], "environment": {}, "provisioner_url": "", "docker_api": True}
+    monkeypatch.setattr(aio_mod, "find_docker_socket", lambda: daemon.server_address)
+
+    backend = provider._create_backend()
+
+    assert isinstance(backend, DockerApiBackend)
+    backend.close()
+
+    provider._config["docker_api"] = False
+    assert type(provider._create_backend()) is aio_mod.LocalContainerBackend
+
+
+def test_provider_drops_exited_warm_pool_containers(backend) -> None:
+    infos = [backend.create(f"thread-{i}", f"sandbox{i}") for i in range(2)]
+    provider = aio_mod.AioSandboxProvider.__new__(aio_mod.AioSandboxProvider)
+    provider._lock = threading.Lock()
+    provider._backend = backend
+    provider._warm_pool = {info.sandbox_id: (info, 0.0) for info in infos}
+    backend._stop_container(infos[0].container_id)  # Exited outside the provider.
+
+    provider._prune_dead_warm_pool()
+
+    assert set(provider._warm_pool) == {"sandbox1"}
+
+
+def test_port_conflict_error_matches_cli_wording(backend, daemon) -> None:
+    daemon.containers["blocker"] = {"Id": "b", "Running": True, "Port": 18090, "Body": {}}
+
+    with pytest.raises(RuntimeError, match="port is already allocated"):
+        backend._start_container("deer-flow-sandbox-x", 18090)
+    assert "deer-flow-sandbox-x" not in daemon.containers
@@ -1,4 +1,8 @@
-from deerflow.community.aio_sandbox.local_backend import _format_container_mount
+import platform
+import subprocess
+
+from deerflow.community.aio_sandbox.local_backend import LocalContainerBackend, _format_container_mount
+from deerflow.community.aio_sandbox.sandbox_info import SandboxInfo
 
 
 def test_format_container_mount_uses_mount_syntax_for_docker_windows_paths():
@@ -26,3 +30,31 @@ def test_format_container_mount_keeps_volume_syntax_for_apple_container():
         "-v",
         "/host/path:/mnt/path:ro",
     ]
+
+
+def _backend(runtime: str) -> LocalContainerBackend:
+    backend = LocalContainerBackend.__new__(LocalContainerBackend)
+    backend._runtime = runtime
+    backend._container_prefix = "deer-flow-sandbox"
+    return backend
+
+
+def test_adopt_renames_prewarmed_container_to_thread_name(monkeypatch):
+    calls = []
+    monkeypatch.setattr(platform, "system", lambda: "Linux")
+    monkeypatch.setattr(subprocess, "run", lambda cmd, **kwargs: calls.append(cmd))
+    info = SandboxInfo(sandbox_id="prewarm-1", sandbox_url="http://localhost:8081", container_name="deer-flow-sandbox-prewarm-1", container_id="c1")
+
+    adopted = _backend("docker").adopt(info, "abcd1234")
+
+    assert calls == [["docker", "rename", "deer-flow-sandbox-prewarm-1", "deer-flow-sandbox-abcd1234"]]
+    assert (adopted.sandbox_id, adopted.sandbox_url, adopted.container_name, adopted.container_id) == ("abcd1234", "http://localhost:8081", "deer-flow-sandbox-abcd1234", "c1")
+
+
+def test_adopt_is_unsupported_for_apple_container(monkeypatch):
+    monkeypatch.setattr(subprocess, "run", lambda cmd, **kwargs: (_ for _ in ()).throw(AssertionError("no rename expected")))
+    backend = _backend("container")
+    info = SandboxInfo(sandbox_id="prewarm-1", sandbox_url="http://localhost:8081", container_name="deer-flow-sandbox-prewarm-1")
+
+    assert backend.supports_prewarm is False
+    assert backend.adopt(info, "abcd1234") is None
@@ -0,0 +1,305 @@
+"""Prewarm pool sizing and the provider's handover of prewarmed sandboxes, with a fake backend."""
+
+import importlib
+import threading
+import time
+
+import pytest
+
+from deerflow.community.aio_sandbox.backend import SandboxBackend
+from deerflow.community.aio_sandbox.prewarm import AcquireLatencyStats, PrewarmPool
+from deerflow.community.aio_sandbox.sandbox_info import SandboxInfo
+from deerflow.config.paths import Paths
+
+aio_mod = importlib.import_module("deerflow.community.aio_sandbox.aio_sandbox_provider")
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            pytest.fail("condition not reached in time")
+        time.sleep(0.01)
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+# ── PrewarmPool ──────────────────────────────────────────────────────────────
+
+
+def test_pool_fills_to_minimum_and_refills_after_take() -> None:
+    counter = iter(range(100))
+    pool = PrewarmPool(lambda: next(counter), lambda item: None, min_ready=2, max_ready=2)
+    pool.start()
+    try:
+        _wait_for(lambda: pool.ready_count == 2)
+        assert pool.take() == 0
+        _wait_for(lambda: pool.ready_count == 2)
+        assert [pool.take(), pool.take()] == [1, 2]
+    finally:
+        pool.stop()
+
+
+def test_pool_sizes_target_from_recent_take_rate() -> None:
+    clock = _FakeClock()
+    lock = threading.Lock()
+
+    def create() -> object:
+        with lock:
+            clock.now += 10  # Each create takes 10 simulated seconds.
+        return object()
+
+    pool = PrewarmPool(create, lambda item: None, min_ready=1, max_ready=3, rate_window=100, clock=clock)
+    pool.start()
+    try:
+        _wait_for(lambda: pool.ready_count == 1)
+        assert pool.target() == 1
+
+        # 20 takes per 100 s while a create takes 10 s -> 2 needed in flight.
+        for _ in range(20):
+            pool.take()
+        assert pool.target() == 2
+        _wait_for(lambda: pool.ready_count == 2)
+
+        for _ in range(100):
+            pool.take()
+        assert pool.target() == 3
+        _wait_for(lambda: pool.ready_count == 3)
+
+        with lock:
+            clock.now += 1000
+        assert pool.target() == 1
+    finally:
+        pool.stop()
+
+
+def test_pool_respects_capacity() -> None:
+    pool = PrewarmPool(object, lambda item: None, min_ready=3, max_ready=3, has_capacity=lambda size: size < 1, recheck_interval=0.01)
+    pool.start()
+    try:
+        _wait_for(lambda: pool.ready_count == 1)
+        time.sleep(0.05)
+        assert pool.ready_count == 1
+    finally:
+        pool.stop()
+
+
+def test_pool_stop_destroys_ready_items() -> None:
+    destroyed = []
+    counter = iter(range(100))
+    pool = PrewarmPool(lambda: next(counter), destroyed.append, min_ready=2, max_ready=2)
+    pool.start()
+    _wait_for(lambda: pool.ready_count == 2)
+
+    pool.stop()
+
+    assert sorted(destroyed) == [0, 1]
+    assert pool.take() is None
+
+
+def test_acquire_latency_stats_reports_percentiles_per_kind() -> None:
+    stats = AcquireLatencyStats(window=10)
+    for seconds in [0.1, 0.2, 0.3, 0.4, 5.0]:
+        stats.record("cold", seconds)
+    stats.record("prewarmed", 0.02)
+
+    snapshot = stats.snapshot()
+
+    assert snapshot["cold"] == {"count": 5, "p50_ms": 300.0, "p95_ms": 5000.0}
+    assert snapshot["prewarmed"]["count"] == 1
+    assert snapshot["prewarmed"]["p50_ms"] == pytest.approx(20.0)
+
+
+# ── Provider handover ────────────────────────────────────────────────────────
+
+
+class _FakeBackend(SandboxBackend):
+    """Containers keyed by name; ``adopt`` renames them like ``docker rename``."""
+
+    def __init__(self, supports_prewarm: bool = True, adopt_ok: bool = True):
+        self._supports_prewarm = supports_prewarm
+        self._adopt_ok = adopt_ok
+        self.containers: dict[str, SandboxInfo] = {}
+        self.created: list[tuple[str | None, str, list]] = []
+        self.destroyed: list[str] = []
+        self._lock = threading.Lock()
+
+    @property
+    def supports_prewarm(self) -> bool:
+        return self._supports_prewarm
+
+    def create(self, thread_id, sandbox_id, extra_mounts=None) -> SandboxInfo:
+        info = SandboxInfo(sandbox_id=sandbox_id, sandbox_url=f"http://fake/{sandbox_id}", container_name=sandbox_id)
+        with self._lock:
+            self.created.append((thread_id, sandbox_id, extra_mounts or []))
+            self.containers[sandbox_id] = info
+        return info
+
+    def destroy(self, info: SandboxInfo) -> None:
+        with self._lock:
+            self.destroyed.append(info.container_name)
+            self.containers.pop(info.container_name, None)
+
+    def is_alive(self, info: SandboxInfo) -> bool:
+        return info.container_name in self.containers
+
+    def discover(self, sandbox_id: str) -> SandboxInfo | None:
+        info = self.containers.get(sandbox_id)
+        return SandboxInfo(sandbox_id=sandbox_id, sandbox_url=info.sandbox_url, container_name=sandbox_id) if info else None
+
+    def adopt(self, info: SandboxInfo, sandbox_id: str) -> SandboxInfo | None:
+        if not self._adopt_ok:
+            return None
+        with self._lock:
+            self.containers[sandbox_id] = self.containers.pop(info.container_name)
+        return SandboxInfo(sandbox_id=sandbox_id, sandbox_url=info.sandbox_url, container_name=sandbox_id)
+
+
+@pytest.fixture()
+def make_provider(tmp_path, monkeypatch):
+    providers = []
+    monkeypatch.setattr(aio_mod, "get_paths", lambda: Paths(base_dir=tmp_path))
+    monkeypatch.setattr(aio_mod, "wait_for_sandbox_ready", lambda url, timeout=60: True)
+    monkeypatch.setattr(aio_mod.AioSandboxProvider, "_register_signal_handlers", lambda self: None)
+    monkeypatch.setattr(aio_mod.AioSandboxProvider, "_get_skills_mount", staticmethod(lambda: None))
+
+    def make(backend: _FakeBackend, **config):
+        monkeypatch.setattr(aio_mod.AioSandboxProvider, "_create_backend", lambda self: backend)
+        monkeypatch.setattr(
+            aio_mod.AioSandboxProvider,
+            "_load_config",
+            lambda self: {"idle_timeout": 0, "replicas": 3, "shell_sessions": 1, "prewarm_min": 1, "prewarm_max": 1, **config},
+        )
+        provider = aio_mod.AioSandboxProvider()
+        providers.append(provider)
+        return provider
+
+    yield make
+    for provider in providers:
+        provider.shutdown()
+
+
+def _mount_source(mounts, container_path: str) -> str:
+    return next(host for host, path, _ in mounts if path == container_path)
+
+
+def test_new_thread_takes_prewarmed_sandbox_and_its_directories(make_provider, tmp_path) -> None:
+    backend = _FakeBackend()
+    provider = make_provider(backend)
+    _wait_for(lambda: provider._prewarm_pool.ready_count == 1)
+    _, slot_id, slot_mounts = backend.created[0]
+    # Something the container wrote through its mount before the handover.
+    workspace_source = _mount_source(slot_mounts, "/mnt/user-data/workspace")
+    (tmp_path / "sandbox-pool" / slot_id / "user-data" / "workspace" / "warm.txt").write_text("ok")
+
+    sandbox_id = provider.acquire("thread-1")
+
+    assert sandbox_id == provider._deterministic_sandbox_id("thread-1")
+    assert provider.get(sandbox_id) is not None
+    assert backend.discover(sandbox_id) is not None
+    assert (tmp_path / "threads" / "thread-1" / "user-data" / "workspace" / "warm.txt").read_text() == "ok"
+    assert not (tmp_path / "sandbox-pool" / slot_id).exists()
+    assert workspace_source.startswith(str(tmp_path / "sandbox-pool"))
+    assert all(thread_id is None for thread_id, _, _ in backend.created)
+    assert set(provider.acquire_latency_stats()) == {"prewarmed"}
+    # The pool refills in the background for the next new thread.
+    _wait_for(lambda: provider._prewarm_pool.ready_count == 1)
+
+
+def test_thread_with_existing_data_gets_a_cold_sandbox(make_provider, tmp_path) -> None:
+    backend = _FakeBackend()
+    provider = make_provider(backend)
+    _wait_for(lambda: provider._prewarm_pool.ready_count == 1)
+    uploads = tmp_path / "threads" / "thread-2" / "user-data" / "uploads"
+    uploads.mkdir(parents=True)
+    (uploads / "report.pdf").write_bytes(b"%PDF")
+
+    sandbox_id = provider.acquire("thread-2")
+
+    assert backend.created[-1][:2] == ("thread-2", sandbox_id)
+    assert provider._prewarm_pool.ready_count == 1
+    assert set(provider.acquire_latency_stats()) == {"cold"}
+
+
+def test_failed_adopt_falls_back_to_cold_create(make_provider, tmp_path) -> None:
+    backend = _FakeBackend(adopt_ok=False)
+    provider = make_provider(backend)
+    _wait_for(lambda: provider._prewarm_pool.ready_count == 1)
+    slot_id = backend.created[0][1]
+
+    sandbox_id = provider.acquire("thread-3")
+
+    assert slot_id in backend.destroyed
+    assert backend.created[-1][:2] == ("thread-3", sandbox_id)
+    assert (tmp_path / "threads" / "thread-3" / "user-data" / "outputs").is_dir()
+    assert set(provider.acquire_latency_stats()) == {"cold"}
+
+
+def test_prewarm_is_off_for_backends_that_cannot_adopt(make_provider) -> None:
+    backend = _FakeBackend(supports_prewarm=False)
+    provider = make_provider(backend)
+
+    provider.acquire("thread-4")
+
+    assert provider._prewarm_pool is None
+    assert [thread_id for thread_id, _, _ in backend.created] == ["thread-4"]
+
+
+def test_shutdown_destroys_prewarmed_containers(make_provider, tmp_path) -> None:
+    backend = _FakeBackend()
+    provider = make_provider(backend, prewarm_min=2, prewarm_max=2)
+    _wait_for(lambda: provider._prewarm_pool.ready_count == 2)
+
+    provider.shutdown()
+
+    assert backend.containers == {}
+    assert list((tmp_path / "sandbox-pool").iterdir()) == []
+
+
+class _PoolingBackend(_FakeBackend):
+    """Keeps its own pool, like the provisioner's idle Pods that mount only user-data."""
+
+    def __init__(self, slots: list[str]):
+        super().__init__(supports_prewarm=False)
+        self.slots = slots
+
+    def claim_pooled(self, thread_id, sandbox_id):
+        if not self.slots:
+            return None
+        return self.create(None, sandbox_id), self.slots.pop()
+
+
+def test_new_thread_claims_from_the_backend_pool(make_provider, tmp_path) -> None:
+    slot_workspace = tmp_path / "sandbox-pool" / "pool-1" / "user-data" / "workspace"
+    slot_workspace.mkdir(parents=True)
+    (slot_workspace / "warm.txt").write_text("ok")
+    backend = _PoolingBackend(["pool-1"])
+    provider = make_provider(backend)
+
+    sandbox_id = provider.acquire("thread-5")
+
+    assert provider._prewarm_pool is None
+    assert backend.created == [(None, sandbox_id, [])]
+    thread_dir = tmp_path / "threads" / "thread-5"
+    assert (thread_dir / "user-data" / "workspace" / "warm.txt").read_text() == "ok"
+    assert (thread_dir / "acp-workspace").is_dir()
+    assert not (tmp_path / "sandbox-pool" / "pool-1").exists()
+    assert set(provider.acquire_latency_stats()) == {"prewarmed"}
+
+
+def test_backend_pool_slot_not_visible_falls_back_to_cold_create(make_provider, tmp_path) -> None:
+    backend = _PoolingBackend(["pool-elsewhere"])
+    provider = make_provider(backend)
+
+    sandbox_id = provider.acquire("thread-6")
+
+    assert backend.destroyed == [sandbox_id]
+    assert backend.created[-1][:2] == ("thread-6", sandbox_id)
+    assert (tmp_path / "threads" / "thread-6" / "user-data" / "outputs").is_dir()
+    assert set(provider.acquire_latency_stats()) == {"cold"}
@@ -0,0 +1,140 @@
+"""AioSandbox in-container patch and append against a local stub of the sandbox HTTP API."""
+
+import asyncio
+import json
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from agent_sandbox.core.api_error import ApiError
+
+from deerflow.community.aio_sandbox.aio_sandbox import AioSandbox
+
+
+class _StubSandboxAPI(BaseHTTPRequestHandler):
+    """Runs ``/v1/code/execute`` code with the local interpreter and records request sizes."""
+
+    requests: list[tuple[str, int]] = []
+
+    def do_POST(self) -> None:  # noqa: N802
+        raw = self.rfile.read(int(self.headers["Content-Length"]))
+        body = json.loads(raw)
+        type(self).requests.append((self.path, len(raw)))
+        if self.path != "/v1/code/execute":
+            self.send_error(404)
+            return
+        proc = subprocess.run([sys.executable, "-c", body["code"]], capture_output=True, text=True, timeout=body.get("timeout") or 60)
+        payload = json.dumps(
+            {
+                "success": True,
+                "data": {"language": "python", "status": "ok", "code": body["code"], "stdout": proc.stdout, "stderr": proc.stderr, "exit_code": proc.returncode},
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture()
+def stub_sandbox():
+    _StubSandboxAPI.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubSandboxAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield AioSandbox(id="stub", base_url=f"http://127.0.0.1:{server.server_address[1]}")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_replace_in_file_sends_only_the_strings(stub_sandbox, tmp_path) -> None:
+    path = tmp_path / "big.py"
+    path.write_text("TODO = 1\n" + "x = 0\n" * 200_000 + "TODO = 2\r\n", encoding="utf-8", newline="")
+
+    assert stub_sandbox.replace_in_file(str(path), "TODO", "DONE") == 1
+    assert stub_sandbox.replace_in_file(str(path), "TODO", "DONE", replace_all=True) == 1
+    assert stub_sandbox.replace_in_file(str(path), "TODO", "DONE") == 0
+
+    content = path.read_bytes()
+    assert content.startswith(b"DONE = 1\n") and content.endswith(b"DONE = 2\r\n")
+    assert [request_path for request_path, _ in _StubSandboxAPI.requests] == ["/v1/code/execute"] * 3
+    # The script and the strings, not the 1.2 MB file.
+    assert max(size for _, size in _StubSandboxAPI.requests) < 10_000
+
+
+def test_replace_in_file_missing_or_directory_raises(stub_sandbox, tmp_path) -> None:
+    with pytest.raises(FileNotFoundError):
+        stub_sandbox.replace_in_file(str(tmp_path / "missing.txt"), "a", "b")
+    with pytest.raises(IsADirectoryError):
+        stub_sandbox.replace_in_file(str(tmp_path), "a", "b")
+
+
+def test_areplace_in_file_matches_sync(stub_sandbox, tmp_path) -> None:
+    path = tmp_path / "app.py"
+    path.write_text("a a a\n", encoding="utf-8")
+
+    assert asyncio.run(stub_sandbox.areplace_in_file(str(path), "a", "b", replace_all=True)) == 3
+    assert path.read_text(encoding="utf-8") == "b b b\n"
+
+
+def test_replace_in_file_falls_back_to_rewrite_without_code_execution(stub_sandbox, monkeypatch) -> None:
+    written = {}
+    attempts = []
+
+    def missing(**kwargs):
+        attempts.append(kwargs)
+        raise ApiError(status_code=404, body="Not Found")
+
+    monkeypatch.setattr(stub_sandbox._client.code, "execute_code", missing)
+    monkeypatch.setattr(stub_sandbox._client.file, "read_file", lambda **kwargs: SimpleNamespace(data=SimpleNamespace(content="alpha beta alpha\n")))
+    monkeypatch.setattr(stub_sandbox._client.file, "write_file", lambda **kwargs: written.update(kwargs))
+
+    assert stub_sandbox.replace_in_file("/mnt/user-data/workspace/a.txt", "alpha", "omega") == 1
+    assert written == {"file": "/mnt/user-data/workspace/a.txt", "content": "omega beta alpha\n"}
+    # The missing endpoint is remembered; later edits go straight to the rewrite.
+    assert stub_sandbox.replace_in_file("/mnt/user-data/workspace/a.txt", "beta", "gamma") == 1
+    assert len(attempts) == 1
+
+
+@pytest.mark.parametrize("error", [httpx.ReadTimeout("timed out"), ApiError(status_code=500, body="boom"), RuntimeError("no result in code execution output")])
+def test_replace_in_file_does_not_rewrite_after_other_failures(stub_sandbox, monkeypatch, error) -> None:
+    def fail(**kwargs):
+        raise error
+
+    async def afail(**kwargs):
+        raise error
+
+    def no_rewrite(**kwargs):
+        pytest.fail("the edit may have run; the file must not be rewritten")
+
+    monkeypatch.setattr(stub_sandbox._client.code, "execute_code", fail)
+    monkeypatch.setattr(stub_sandbox._client.file, "read_file", no_rewrite)
+    async_client = SimpleNamespace(code=SimpleNamespace(execute_code=afail), file=SimpleNamespace(read_file=no_rewrite))
+    monkeypatch.setattr(stub_sandbox, "_async_client", lambda: async_client)
+
+    # A lost response can follow an applied edit; "foo" -> "foo bar" must not be applied twice.
+    with pytest.raises(type(error)):
+        stub_sandbox.replace_in_file("/mnt/user-data/workspace/a.txt", "foo", "foo bar")
+    with pytest.raises(type(error)):
+        asyncio.run(stub_sandbox.areplace_in_file("/mnt/user-data/workspace/a.txt", "foo", "foo bar"))
+    assert stub_sandbox._code_api_missing is False
+
+
+def test_append_uses_file_api_append_mode(stub_sandbox, monkeypatch) -> None:
+    calls = []
+    monkeypatch.setattr(stub_sandbox._client.file, "write_file", lambda **kwargs: calls.append(kwargs))
+    monkeypatch.setattr(stub_sandbox._client.file, "read_file", lambda **kwargs: pytest.fail("append must not read the file"))
+
+    stub_sandbox.write_file("/tmp/run.log", "one\n", append=True)
+    stub_sandbox.append_file("/tmp/run.log", "two\n")
+
+    assert calls == [{"file": "/tmp/run.log", "content": "one\n", "append": True}, {"file": "/tmp/run.log", "content": "two\n", "append": True}]
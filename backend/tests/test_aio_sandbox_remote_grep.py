@@ -0,0 +1,134 @@
+"""AioSandbox.grep against a local stub of the sandbox HTTP API."""
+
+import json
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from deerflow.community.aio_sandbox.aio_sandbox import AioSandbox
+from deerflow.sandbox.search import GrepMatch, find_grep_matches
+
+
+class _StubSandboxAPI(BaseHTTPRequestHandler):
+    """Serves ``POST /v1/code/execute`` by running the code with the local interpreter."""
+
+    requests: list[str] = []
+
+    def do_POST(self) -> None:  # noqa: N802
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        type(self).requests.append(self.path)
+        if self.path != "/v1/code/execute":
+            self.send_error(404)
+            return
+        proc = subprocess.run([sys.executable, "-c", body["code"]], capture_output=True, text=True, timeout=body.get("timeout") or 60)
+        payload = json.dumps(
+            {
+                "success": True,
+                "data": {"language": "python", "status": "ok", "code": body["code"], "stdout": proc.stdout, "stderr": proc.stderr, "exit_code": proc.returncode},
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture()
+def stub_sandbox():
+    _StubSandboxAPI.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubSandboxAPI)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield AioSandbox(id="stub", base_url=f"http://127.0.0.1:{server.server_address[1]}")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture()
+def workspace(tmp_path):
+    root = tmp_path.resolve() / "workspace"
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / "node_modules" / "lib").mkdir(parents=True)
+    (root / "src" / "app.py").write_text("import os\n# TODO: first\nvalue = 1\n", encoding="utf-8")
+    (root / "src" / "pkg" / "util.py").write_text("def f():\n    return 'todo later'\r\n", encoding="utf-8")
+    (root / "src" / "notes.md").write_text("TODO in markdown\n" + "x" * 3000 + " TODO long line\n", encoding="utf-8")
+    (root / "src" / "debug.log").write_text("TODO in ignored file\n", encoding="utf-8")
+    (root / "node_modules" / "lib" / "index.js").write_text("// TODO ignored dir\n", encoding="utf-8")
+    (root / "blob.bin").write_bytes(b"TODO\0binary")
+    (root / "many.txt").write_text("".join(f"TODO {i}\n" for i in range(20)), encoding="utf-8")
+    (root / "link.py").symlink_to(root / "src" / "app.py")
+    return root
+
+
+@pytest.mark.parametrize(
+    ("pattern", "kwargs"),
+    [
+        ("TODO", {}),
+        ("TODO", {"case_sensitive": True}),
+        ("todo", {"glob": "**/*.py"}),
+        ("TODO", {"max_results": 5}),
+        ("return '", {"literal": True}),
+        (r"^def \w+", {}),
+    ],
+)
+def test_remote_grep_matches_local_search(stub_sandbox, workspace, pattern, kwargs) -> None:
+    expected = find_grep_matches(
+        workspace,
+        pattern,
+        glob_pattern=kwargs.get("glob"),
+        literal=kwargs.get("literal", False),
+        case_sensitive=kwargs.get("case_sensitive", False),
+        max_results=kwargs.get("max_results", 100),
+        use_ripgrep=False,
+    )
+
+    assert stub_sandbox.grep(str(workspace), pattern, **kwargs) == expected
+    # One request for the whole search.
+    assert _StubSandboxAPI.requests == ["/v1/code/execute"]
+
+
+def test_remote_grep_reports_truncation(stub_sandbox, workspace) -> None:
+    matches, truncated = stub_sandbox.grep(str(workspace), "TODO", glob="many.txt", max_results=3)
+
+    assert [match.line for match in matches] == ["TODO 0", "TODO 1", "TODO 2"]
+    assert truncated is True
+
+
+def test_remote_grep_missing_root_raises(stub_sandbox, tmp_path) -> None:
+    with pytest.raises(FileNotFoundError):
+        stub_sandbox.grep(str(tmp_path / "missing"), "x")
+    with pytest.raises(NotADirectoryError):
+        (tmp_path / "file.txt").write_text("x\n", encoding="utf-8")
+        stub_sandbox.grep(str(tmp_path / "file.txt"), "x")
+
+
+def test_grep_falls_back_to_per_file_search_when_code_execution_fails(stub_sandbox, monkeypatch) -> None:
+    def fail(**kwargs):
+        raise RuntimeError("404 Not Found")
+
+    monkeypatch.setattr(stub_sandbox._client.code, "execute_code", fail)
+    monkeypatch.setattr(
+        stub_sandbox._client.file,
+        "list_path",
+        lambda **kwargs: SimpleNamespace(data=SimpleNamespace(files=[SimpleNamespace(path="/mnt/user-data/workspace/app.py", is_directory=False)])),
+    )
+    monkeypatch.setattr(
+        stub_sandbox._client.file,
+        "search_in_file",
+        lambda **kwargs: SimpleNamespace(data=SimpleNamespace(line_numbers=[7], matches=["TODO = True"])),
+    )
+
+    matches, truncated = stub_sandbox.grep("/mnt/user-data/workspace", "TODO")
+
+    assert matches == [GrepMatch(path="/mnt/user-data/workspace/app.py", line_number=7, line="TODO = True")]
+    assert truncated is False
@@ -0,0 +1,319 @@
+"""Environment snapshots against a local stub of the sandbox HTTP API, and the provider's evict/restore flow."""
+
+import email.parser
+import email.policy
+import importlib
+import json
+import subprocess
+import sys
+import tarfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from deerflow.community.aio_sandbox.aio_sandbox import AioSandbox
+from deerflow.community.aio_sandbox.backend import SandboxBackend
+from deerflow.community.aio_sandbox.sandbox_info import SandboxInfo
+from deerflow.community.aio_sandbox.snapshot import POINTER_FILE, EnvironmentSnapshots
+from deerflow.config.paths import Paths
+
+aio_mod = importlib.import_module("deerflow.community.aio_sandbox.aio_sandbox_provider")
+
+
+class _StubSandboxAPI(BaseHTTPRequestHandler):
+    """Code execution, file download and multipart upload against the local filesystem."""
+
+    requests: list[str] = []
+
+    def _reply(self, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:  # noqa: N802
+        url = urlparse(self.path)
+        type(self).requests.append(url.path)
+        data = Path(parse_qs(url.query)["path"][0]).read_bytes()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self) -> None:  # noqa: N802
+        raw = self.rfile.read(int(self.headers["Content-Length"]))
+        type(self).requests.append(self.path)
+        if self.path == "/v1/code/execute":
+            body = json.loads(raw)
+            proc = subprocess.run([sys.executable, "-c", body["code"]], capture_output=True, text=True, timeout=60)
+            data = {"language": "python", "status": "ok", "code": body["code"], "stdout": proc.stdout, "stderr": proc.stderr, "exit_code": proc.returncode}
+            return self._reply({"success": True, "data": data})
+        if self.path == "/v1/file/upload":
+            message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + raw)
+            fields = {part.get_param("name", header="content-disposition"): part.get_content() for part in message.iter_parts()}
+            content = fields["file"] if isinstance(fields["file"], bytes) else fields["file"].encode()
+            Path(fields["path"]).write_bytes(content)
+            return self._reply({"success": True, "data": {"file_path": fields["path"], "file_size": len(content), "success": True}})
+        self.send_error(404)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture()
+def stub_sandbox():
+    _StubSandboxAPI.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubSandboxAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield AioSandbox(id="stub", base_url=f"http://127.0.0.1:{server.server_address[1]}")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture()
+def environment(tmp_path) -> Path:
+    env = tmp_path / "env"
+    (env / "site-packages" / "pkg").mkdir(parents=True)
+    (env / "site-packages" / "pkg" / "__init__.py").write_text("VERSION = 1\n")
+    (env / "cache.bin").write_bytes(bytes(range(256)) * 64)
+    return env
+
+
+def _leftover_archives() -> list[Path]:
+    return [*Path("/tmp").glob("deerflow-snapshot-*.tar.gz"), *Path("/tmp").glob("deerflow-restore-*.tar.gz")]
+
+
+def test_save_and_restore_roundtrip(stub_sandbox, environment, tmp_path) -> None:
+    snapshot_dir = tmp_path / "snapshots"
+    before = set(_leftover_archives())
+    snapshots = EnvironmentSnapshots([str(environment), str(tmp_path / "missing")], max_bytes=10 * 1024 * 1024)
+
+    pointer = snapshots.save(stub_sandbox, snapshot_dir)
+
+    assert pointer["paths"] == [str(environment)]
+    blob = snapshot_dir / f"{pointer['sha256']}.tar.gz"
+    assert blob.stat().st_size == pointer["size"]
+    assert json.loads((snapshot_dir / POINTER_FILE).read_text())["sha256"] == pointer["sha256"]
+    with tarfile.open(blob) as tar:
+        assert str(environment / "cache.bin").lstrip("/") in tar.getnames()
+
+    (environment / "site-packages" / "pkg" / "__init__.py").unlink()
+    (environment / "cache.bin").write_bytes(b"changed")
+
+    assert snapshots.restore(stub_sandbox, snapshot_dir)["sha256"] == pointer["sha256"]
+    assert (environment / "site-packages" / "pkg" / "__init__.py").read_text() == "VERSION = 1\n"
+    assert (environment / "cache.bin").read_bytes() == bytes(range(256)) * 64
+    assert set(_leftover_archives()) == before
+
+
+def test_unchanged_environment_is_not_downloaded_again(stub_sandbox, environment, tmp_path) -> None:
+    snapshot_dir = tmp_path / "snapshots"
+    snapshots = EnvironmentSnapshots([str(environment)], max_bytes=10 * 1024 * 1024)
+
+    first = snapshots.save(stub_sandbox, snapshot_dir)
+    second = snapshots.save(stub_sandbox, snapshot_dir)
+
+    assert second["sha256"] == first["sha256"]
+    assert _StubSandboxAPI.requests.count("/v1/file/download") == 1
+
+    (environment / "new.txt").write_text("x")
+    third = snapshots.save(stub_sandbox, snapshot_dir)
+
+    assert third["sha256"] != first["sha256"]
+    assert sorted(p.name for p in snapshot_dir.glob("*.tar.gz")) == [f"{third['sha256']}.tar.gz"]
+
+
+def test_environment_over_the_cap_is_not_saved_or_restored(stub_sandbox, environment, tmp_path) -> None:
+    snapshot_dir = tmp_path / "snapshots"
+    before = set(_leftover_archives())
+
+    assert EnvironmentSnapshots([str(environment)], max_bytes=100).save(stub_sandbox, snapshot_dir) is None
+    assert not (snapshot_dir / POINTER_FILE).exists()
+    assert set(_leftover_archives()) == before
+
+    EnvironmentSnapshots([str(environment)], max_bytes=10 * 1024 * 1024).save(stub_sandbox, snapshot_dir)
+    assert EnvironmentSnapshots([str(environment)], max_bytes=100).restore(stub_sandbox, snapshot_dir) is None
+
+
+def test_restore_without_snapshot_is_a_no_op(stub_sandbox, tmp_path) -> None:
+    assert EnvironmentSnapshots(["/nonexistent"], max_bytes=1024).restore(stub_sandbox, tmp_path / "snapshots") is None
+    assert _StubSandboxAPI.requests == []
+
+
+# ── Provider ─────────────────────────────────────────────────────────────────
+
+
+class _FakeBackend(SandboxBackend):
+    def __init__(self):
+        self.containers: dict[str, SandboxInfo] = {}
+        self.destroyed: list[str] = []
+
+    def create(self, thread_id, sandbox_id, extra_mounts=None) -> SandboxInfo:
+        self.containers[sandbox_id] = SandboxInfo(sandbox_id=sandbox_id, sandbox_url=f"http://fake/{sandbox_id}", container_name=sandbox_id)
+        return self.containers[sandbox_id]
+
+    def destroy(self, info: SandboxInfo) -> None:
+        self.destroyed.append(info.sandbox_id)
+        self.containers.pop(info.sandbox_id, None)
+
+    def is_alive(self, info: SandboxInfo) -> bool:
+        return info.sandbox_id in self.containers
+
+    def discover(self, sandbox_id: str) -> SandboxInfo | None:
+        return self.containers.get(sandbox_id)
+
+
+class _RecordingSnapshots:
+    """Stands in for EnvironmentSnapshots; checks the container is still up when saving."""
+
+    def __init__(self, backend: _FakeBackend):
+        self._backend = backend
+        self.saved: list[tuple[str, Path]] = []
+        self.restored: list[tuple[str, Path]] = []
+
+    def save(self, sandbox, snapshot_dir: Path) -> dict:
+        assert sandbox.id in self._backend.containers
+        self.saved.append((sandbox.id, snapshot_dir))
+        return {"sha256": "0" * 64, "size": 1}
+
+    def restore(self, sandbox, snapshot_dir: Path) -> dict | None:
+        self.restored.append((sandbox.id, snapshot_dir))
+        return {"sha256": "0" * 64, "size": 1} if self.saved else None
+
+
+@pytest.fixture()
+def provider(tmp_path, monkeypatch):
+    backend = _FakeBackend()
+    monkeypatch.setattr(aio_mod, "get_paths", lambda: Paths(base_dir=tmp_path))
+    monkeypatch.setattr(aio_mod, "wait_for_sandbox_ready", lambda url, timeout=60: True)
+    monkeypatch.setattr(aio_mod.AioSandboxProvider, "_register_signal_handlers", lambda self: None)
+    monkeypatch.setattr(aio_mod.AioSandboxProvider, "_get_skills_mount", staticmethod(lambda: None))
+    monkeypatch.setattr(aio_mod.AioSandboxProvider, "_create_backend", lambda self: backend)
+    monkeypatch.setattr(
+        aio_mod.AioSandboxProvider,
+        "_load_config",
+        lambda self: {"idle_timeout": 0, "replicas": 1, "shell_sessions": 1, "snapshot_paths": ["/home/gem/.local"], "snapshot_max_mb": 1},
+    )
+    provider = aio_mod.AioSandboxProvider()
+    provider._snapshots = _RecordingSnapshots(backend)
+    yield provider, backend
+    provider.shutdown()
+
+
+def test_idle_eviction_snapshots_and_next_acquire_restores(provider, tmp_path) -> None:
+    provider, backend = provider
+    sandbox_id = provider.acquire("thread-1")
+    snapshot_dir = tmp_path / "threads" / "thread-1" / "snapshots"
+    assert provider._snapshots.restored == [(sandbox_id, snapshot_dir)]
+    assert "restore" not in provider.acquire_latency_stats()
+
+    provider.release(sandbox_id)
+    provider._cleanup_idle_sandboxes(-1)
+
+    assert provider._snapshots.saved == [(sandbox_id, snapshot_dir)]
+    assert backend.destroyed == [sandbox_id]
+    assert provider._sandbox_threads == {}
+
+    assert provider.acquire("thread-1") == sandbox_id
+    assert provider.acquire_latency_stats()["restore"]["count"] == 1
+
+
+def test_active_idle_sandbox_is_snapshotted_before_destroy(provider, tmp_path) -> None:
+    provider, backend = provider
+    sandbox_id = provider.acquire("thread-1")
+
+    provider._cleanup_idle_sandboxes(-1)
+
+    assert [saved for saved, _ in provider._snapshots.saved] == [sandbox_id]
+    assert backend.destroyed == [sandbox_id]
+
+
+def _wait_for_evictions(provider) -> None:
+    if provider._eviction_executor is not None:
+        provider._eviction_executor.shutdown(wait=True)
+        provider._eviction_executor = None
+
+
+def test_warm_pool_eviction_for_capacity_snapshots_the_evicted_thread(provider, tmp_path) -> None:
+    provider, backend = provider
+    first = provider.acquire("thread-1")
+    provider.release(first)
+
+    provider.acquire("thread-2")
+    _wait_for_evictions(provider)
+
+    assert provider._snapshots.saved == [(first, tmp_path / "threads" / "thread-1" / "snapshots")]
+    assert backend.destroyed == [first]
+    assert first not in provider._sandbox_threads
+
+
+def test_capacity_eviction_snapshot_does_not_delay_acquire(provider) -> None:
+    provider, backend = provider
+    first = provider.acquire("thread-1")
+    provider.release(first)
+    snapshot_started = threading.Event()
+    finish_snapshot = threading.Event()
+    save = provider._snapshots.save
+
+    def slow_save(sandbox, snapshot_dir):
+        snapshot_started.set()
+        finish_snapshot.wait(5)
+        return save(sandbox, snapshot_dir)
+
+    provider._snapshots.save = slow_save
+
+    start = time.monotonic()
+    second = provider.acquire("thread-2")
+    assert time.monotonic() - start < 1
+    assert snapshot_started.wait(1)
+    assert first in backend.containers
+
+    # The evicted thread's next acquire waits for its snapshot, then restores it.
+    reacquired = []
+    waiter = threading.Thread(target=lambda: reacquired.append(provider.acquire("thread-1")))
+    waiter.start()
+    time.sleep(0.1)
+    assert reacquired == []
+    finish_snapshot.set()
+    waiter.join(5)
+    _wait_for_evictions(provider)
+
+    # A new container was started and restored rather than the dying one reused.
+    assert backend.destroyed == [first]
+    assert reacquired == [first] and first in backend.containers
+    assert provider._snapshots.restored[-1][0] == first
+    assert second in backend.containers
+
+
+def test_explicit_destroy_does_not_snapshot(provider) -> None:
+    provider, _ = provider
+    sandbox_id = provider.acquire("thread-1")
+
+    provider.destroy(sandbox_id)
+
+    assert provider._snapshots.saved == []
+
+
+def test_dropped_sandboxes_close_their_clients(provider) -> None:
+    provider, _ = provider
+    released = provider.get(provider.acquire("thread-1"))
+    provider.release(released.id)
+    assert released._http_client.is_closed
+
+    destroyed = provider.get(provider.acquire("thread-1"))
+    found = provider.find("thread-1")
+    assert found is not destroyed and found.id == destroyed.id
+    found.close()
+    assert not destroyed._http_client.is_closed
+
+    provider.destroy(destroyed.id)
+    assert destroyed._http_client.is_closed
@@ -0,0 +1,151 @@
+import asyncio
+import os
+import random
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from deerflow.config.paths import Paths
+from deerflow.sandbox.local.command_runner import _HeadTailBuffer, run_command
+from deerflow.sandbox.local.local_sandbox import LocalSandbox
+from deerflow.sandbox.tools import bash_tool
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="POSIX shell commands")
+
+
+@pytest.mark.parametrize("limit", [1, 2, 7, 100])
+def test_head_tail_buffer_keeps_both_ends(limit) -> None:
+    rng = random.Random(limit)
+    text = "".join(rng.choice("abc\n") for _ in range(500))
+    buffer = _HeadTailBuffer(limit)
+    pos = 0
+    while pos < len(text):
+        step = rng.randrange(1, 40)
+        buffer.append(text[pos : pos + step])
+        pos += step
+
+    head_len = limit // 2
+    tail_len = limit - head_len
+    skipped = len(text) - limit
+    assert buffer.getvalue() == f"{text[:head_len]}\n... [middle truncated: {skipped} chars skipped] ...\n{text[-tail_len:]}"
+
+
+def test_head_tail_buffer_without_overflow_is_verbatim() -> None:
+    buffer = _HeadTailBuffer(10)
+    assert buffer.append("abcd") is False
+    assert buffer.append("efghij") is False
+    assert buffer.getvalue() == "abcdefghij"
+    assert buffer.append("k") is True
+
+
+def test_run_command_spills_complete_output_in_arrival_order(tmp_path) -> None:
+    spill_path = tmp_path / "logs" / "out.log"
+    script = "for i in $(seq 1 2000); do echo out $i; done; echo err line >&2; sleep 0.3; echo after"
+
+    result = asyncio.run(run_command(["/bin/sh", "-c", script], timeout=30, capture_chars=200, spill_path=str(spill_path)))
+
+    assert result.spill_path == str(spill_path)
+    assert result.stdout.startswith("out 1\nout 2\n")
+    assert "[middle truncated:" in result.stdout
+    assert result.stdout.endswith("out 2000\nafter\n")
+    assert result.stderr == "err line\n"
+    assert spill_path.read_text(encoding="utf-8") == "".join(f"out {i}\n" for i in range(1, 2001)) + "err line\nafter\n"
+
+
+def test_run_command_does_not_spill_output_that_fits(tmp_path) -> None:
+    spill_path = tmp_path / "out.log"
+
+    result = asyncio.run(run_command(["/bin/sh", "-c", "echo small"], timeout=30, capture_chars=200, spill_path=str(spill_path)))
+
+    assert result.stdout == "small\n"
+    assert result.spill_path is None
+    assert not spill_path.exists()
+
+
+def _thread_runtime(base_dir, thread_id: str = "thread-bash"):
+    paths = Paths(base_dir)
+    paths.ensure_thread_dirs(thread_id)
+    return SimpleNamespace(
+        state={
+            "sandbox": {"sandbox_id": "local"},
+            "thread_data": {
+                "workspace_path": str(paths.sandbox_work_dir(thread_id)),
+                "uploads_path": str(paths.sandbox_uploads_dir(thread_id)),
+                "outputs_path": str(paths.sandbox_outputs_dir(thread_id)),
+            },
+        },
+        context={"thread_id": thread_id},
+    ), paths
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_bash_tool_spills_large_output_to_outputs_dir(tmp_path, monkeypatch, use_async) -> None:
+    runtime, paths = _thread_runtime(tmp_path)
+    config = SimpleNamespace(sandbox=SimpleNamespace(bash_output_max_chars=1000), get_tool_config=lambda name: None)
+    monkeypatch.setattr("deerflow.config.app_config.get_app_config", lambda: config)
+    monkeypatch.setattr("deerflow.sandbox.tools.ensure_sandbox_initialized", lambda runtime: LocalSandbox(id="local"))
+    monkeypatch.setattr("deerflow.sandbox.tools.get_sandbox_provider", lambda: SimpleNamespace(get=lambda sandbox_id: None))
+    monkeypatch.setattr("deerflow.sandbox.tools.is_host_bash_allowed", lambda: True)
+    command = "for i in $(seq 1 3000); do echo /mnt/user-data/workspace/file$i.txt; done"
+
+    with patch("deerflow.config.paths.get_paths", return_value=paths):
+        if use_async:
+            result = asyncio.run(bash_tool.coroutine(runtime=runtime, description="d", command=command))
+        else:
+            result = bash_tool.func(runtime=runtime, description="d", command=command)
+
+    assert len(result) < 1300
+    assert result.startswith("/mnt/user-data/workspace/file1.txt\n")
+    assert "/mnt/user-data/workspace/file3000.txt\n" in result
+    notice = result.rsplit("\n", 1)[-1]
+    assert notice.startswith("[Output truncated. Full output (")
+    virtual_path = notice.split(" saved to ", 1)[1].split(";", 1)[0]
+    assert virtual_path.startswith("/mnt/user-data/outputs/bash-output/")
+
+    spill = paths.sandbox_outputs_dir("thread-bash") / "bash-output" / virtual_path.rsplit("/", 1)[1]
+    assert spill.read_text(encoding="utf-8") == "".join(f"/mnt/user-data/workspace/file{i}.txt\n" for i in range(1, 3001))
+    assert str(tmp_path) not in spill.read_text(encoding="utf-8")
+
+
+def test_run_command_spills_when_streams_together_overflow(tmp_path) -> None:
+    spill_path = tmp_path / "out.log"
+    script = "printf 'o%.0s' $(seq 1 150); printf 'e%.0s' $(seq 1 150) >&2"
+
+    result = asyncio.run(run_command(["/bin/sh", "-c", script], timeout=30, capture_chars=200, spill_path=str(spill_path)))
+
+    # Each stream fits its own window, but both together do not.
+    assert result.stdout == "o" * 150 and result.stderr == "e" * 150
+    assert result.spill_path == str(spill_path)
+    assert sorted(spill_path.read_text(encoding="utf-8")) == sorted("o" * 150 + "e" * 150)
+
+
+def test_bash_tool_rewrites_spill_once_and_prunes_old_logs(tmp_path, monkeypatch) -> None:
+    from deerflow.sandbox import tools as sandbox_tools
+    from deerflow.sandbox.local import local_sandbox
+
+    runtime, paths = _thread_runtime(tmp_path)
+    config = SimpleNamespace(sandbox=SimpleNamespace(bash_output_max_chars=1000), get_tool_config=lambda name: None)
+    monkeypatch.setattr("deerflow.config.app_config.get_app_config", lambda: config)
+    monkeypatch.setattr("deerflow.sandbox.tools.ensure_sandbox_initialized", lambda runtime: LocalSandbox(id="local"))
+    monkeypatch.setattr("deerflow.sandbox.tools.get_sandbox_provider", lambda: SimpleNamespace(get=lambda sandbox_id: None))
+    monkeypatch.setattr("deerflow.sandbox.tools.is_host_bash_allowed", lambda: True)
+    rewrites = []
+    rewrite = local_sandbox.rewrite_spill_file
+    monkeypatch.setattr(local_sandbox, "rewrite_spill_file", lambda path, transform: (rewrites.append(path), rewrite(path, transform)))
+
+    log_dir = paths.sandbox_outputs_dir("thread-bash") / "bash-output"
+    log_dir.mkdir(parents=True)
+    for i in range(sandbox_tools._BASH_SPILL_MAX_LOGS + 5):
+        old = log_dir / f"old{i}.log"
+        old.write_text("old")
+        os.utime(old, (1000 + i, 1000 + i))
+
+    with patch("deerflow.config.paths.get_paths", return_value=paths):
+        bash_tool.func(runtime=runtime, description="d", command="seq 1 3000")
+
+    assert len(rewrites) == 1
+    logs = {path.name for path in log_dir.glob("*.log")}
+    assert len(logs) == sandbox_tools._BASH_SPILL_MAX_LOGS
+    assert rewrites[0].rsplit("/", 1)[1] in logs
+    assert "old0.log" not in logs and f"old{sandbox_tools._BASH_SPILL_MAX_LOGS + 4}.log" in logs
@@ -247,6 +247,93 @@ class TestResolveAttachments:
         assert len(result) == 1
         assert result[0].filename == "data.csv"
 
+    def test_pulls_outputs_missing_on_host_from_sandbox_in_one_archive(self, tmp_path):
+        """Outputs only present inside a non-local sandbox are copied out before resolving."""
+        from app.channels.manager import _resolve_attachments
+        from deerflow.sandbox.local.local_sandbox import LocalSandbox, PathMapping
+
+        thread_id = "t1"
+        outputs_dir = tmp_path / "host-outputs"
+        outputs_dir.mkdir()
+        (outputs_dir / "present.txt").write_text("on host")
+        container_outputs = tmp_path / "container-outputs"
+        (container_outputs / "charts").mkdir(parents=True)
+        (container_outputs / "charts" / "chart.png").write_bytes(b"\x89PNG")
+        (container_outputs / "report.md").write_text("# Report")
+
+        sandbox = LocalSandbox("aio-1", path_mappings=[PathMapping(container_path="/mnt/user-data/outputs", local_path=str(container_outputs))])
+        sandbox.get_archive = MagicMock(wraps=sandbox.get_archive)
+        sandbox.close = MagicMock()
+        provider = MagicMock()
+        provider.outputs_on_host = False
+        provider.find.return_value = sandbox
+
+        mock_paths = MagicMock()
+        mock_paths.sandbox_outputs_dir.return_value = outputs_dir
+        mock_paths.resolve_virtual_path.side_effect = lambda tid, vpath: outputs_dir / vpath.removeprefix("/mnt/user-data/outputs/")
+
+        artifacts = ["/mnt/user-data/outputs/present.txt", "/mnt/user-data/outputs/charts/chart.png", "/mnt/user-data/outputs/report.md", "/mnt/user-data/outputs/gone.txt"]
+        with (
+            patch("deerflow.config.paths.get_paths", return_value=mock_paths),
+            patch("deerflow.sandbox.sandbox_provider.get_sandbox_provider", return_value=provider),
+        ):
+            result = _resolve_attachments(thread_id, artifacts)
+
+        assert [a.filename for a in result] == ["present.txt", "chart.png", "report.md"]
+        assert (outputs_dir / "charts" / "chart.png").read_bytes() == b"\x89PNG"
+        sandbox.get_archive.assert_called_once()
+        assert sorted(sandbox.get_archive.call_args.args[1]) == ["charts/chart.png", "gone.txt", "report.md"]
+        provider.find.assert_called_once_with(thread_id)
+        provider.acquire.assert_not_called()
+        sandbox.close.assert_called_once_with()
+
+    def test_does_not_pull_when_outputs_are_on_host_or_no_sandbox_runs(self, tmp_path):
+        from app.channels.manager import _resolve_attachments
+
+        outputs_dir = tmp_path / "outputs"
+        outputs_dir.mkdir()
+        mock_paths = MagicMock()
+        mock_paths.sandbox_outputs_dir.return_value = outputs_dir
+        mock_paths.resolve_virtual_path.side_effect = lambda tid, vpath: outputs_dir / vpath.removeprefix("/mnt/user-data/outputs/")
+        mounted = MagicMock(outputs_on_host=True)
+        remote = MagicMock(outputs_on_host=False)
+        remote.find.return_value = None
+
+        for provider in (mounted, remote):
+            with (
+                patch("deerflow.config.paths.get_paths", return_value=mock_paths),
+                patch("deerflow.sandbox.sandbox_provider.get_sandbox_provider", return_value=provider),
+            ):
+                assert _resolve_attachments("t1", ["/mnt/user-data/outputs/missing.txt"]) == []
+            provider.acquire.assert_not_called()
+        mounted.find.assert_not_called()
+        remote.find.assert_called_once_with("t1")
+
+    def test_async_delivery_pulls_in_a_worker_thread_only_for_unmounted_outputs(self, tmp_path):
+        import threading
+
+        from app.channels.manager import _aprepare_artifact_delivery
+
+        outputs_dir = tmp_path / "outputs"
+        outputs_dir.mkdir()
+        mock_paths = MagicMock()
+        mock_paths.sandbox_outputs_dir.return_value = outputs_dir
+        mock_paths.resolve_virtual_path.side_effect = lambda tid, vpath: outputs_dir / vpath.removeprefix("/mnt/user-data/outputs/")
+        pull_threads: list[threading.Thread] = []
+
+        async def deliver(provider):
+            with (
+                patch("deerflow.config.paths.get_paths", return_value=mock_paths),
+                patch("deerflow.sandbox.sandbox_provider.get_sandbox_provider", return_value=provider),
+                patch("app.channels.manager._pull_outputs_from_sandbox", side_effect=lambda *args: pull_threads.append(threading.current_thread())),
+            ):
+                return await _aprepare_artifact_delivery("t1", "done", ["/mnt/user-data/outputs/missing.txt"])
+
+        assert asyncio.run(deliver(MagicMock(outputs_on_host=True)))[1] == []
+        assert pull_threads == []
+        asyncio.run(deliver(MagicMock(outputs_on_host=False)))
+        assert len(pull_threads) == 1 and pull_threads[0] is not threading.main_thread()
+
 
 # ---------------------------------------------------------------------------
 # Channel base class _on_outbound with attachments
@@ -95,10 +95,38 @@ def test_feishu_receive_file_replaces_placeholders_in_order():
         )
 
         channel._receive_single_file = AsyncMock(side_effect=["/mnt/user-data/uploads/a.png", "/mnt/user-data/uploads/b.pdf"])
+        channel._sync_to_sandbox = AsyncMock(return_value=True)
 
         result = await channel.receive_file(msg, "thread_1")
 
         assert result.text == "before /mnt/user-data/uploads/a.png middle /mnt/user-data/uploads/b.pdf after"
+        # Both resources reach the sandbox in one sync.
+        channel._sync_to_sandbox.assert_awaited_once_with("thread_1", ["/mnt/user-data/uploads/a.png", "/mnt/user-data/uploads/b.pdf"])
+
+    _run(go())
+
+
+def test_feishu_receive_file_marks_resources_failed_when_sandbox_sync_fails():
+    async def go():
+        bus = MessageBus()
+        channel = FeishuChannel(bus, {"app_id": "test", "app_secret": "test"})
+
+        msg = InboundMessage(
+            channel_name="feishu",
+            chat_id="chat_1",
+            user_id="user_1",
+            text="[image] and [file]",
+            thread_ts="msg_1",
+            files=[{"image_key": "img_key"}, {"file_key": "file_key"}],
+        )
+
+        channel._receive_single_file = AsyncMock(side_effect=["/mnt/user-data/uploads/a.png", "Failed to obtain the [file]"])
+        channel._sync_to_sandbox = AsyncMock(return_value=False)
+
+        result = await channel.receive_file(msg, "thread_1")
+
+        assert result.text == "Failed to obtain the [image] and Failed to obtain the [file]"
+        channel._sync_to_sandbox.assert_awaited_once_with("thread_1", ["/mnt/user-data/uploads/a.png"])
 
     _run(go())
 
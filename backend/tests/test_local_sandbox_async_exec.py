@@ -0,0 +1,141 @@
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from deerflow.sandbox import tools
+from deerflow.sandbox.local.command_runner import run_command
+from deerflow.sandbox.local.local_sandbox import LocalSandbox, PathMapping
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="POSIX shell commands")
+
+
+def _sh(script: str) -> list[str]:
+    return ["/bin/sh", "-c", script]
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def test_run_command_streams_lines_while_running() -> None:
+    seen: list[tuple[str, str, float]] = []
+    start = time.monotonic()
+
+    result = asyncio.run(run_command(_sh("echo one; echo err >&2; sleep 0.5; printf 'two\\r\\nthree'; exit 3"), timeout=10, on_output=lambda stream, text: seen.append((stream, text, time.monotonic() - start))))
+
+    assert result.stdout == "one\ntwo\nthree"
+    assert result.stderr == "err\n"
+    assert result.returncode == 3
+    assert [(stream, text) for stream, text, _ in seen] == [("stdout", "one\n"), ("stderr", "err\n"), ("stdout", "two\n"), ("stdout", "three")]
+    # The first line arrived before the command finished.
+    assert seen[0][2] < 0.4
+
+
+def test_run_command_timeout_kills_process_group(tmp_path) -> None:
+    pid_file = tmp_path / "child.pid"
+    start = time.monotonic()
+
+    result = asyncio.run(run_command(_sh(f"sleep 30 & echo $! > {pid_file}; echo started; wait"), timeout=0.5))
+
+    assert time.monotonic() - start < 5
+    assert result.timed_out is True
+    assert result.stdout == "started\n"
+    child = int(pid_file.read_text())
+    for _ in range(50):
+        if not _pid_alive(child):
+            break
+        time.sleep(0.05)
+    assert not _pid_alive(child)
+
+
+def test_run_command_enforces_output_limit() -> None:
+    result = asyncio.run(run_command(_sh("yes"), timeout=10, max_output_bytes=10_000))
+
+    assert result.output_limit_exceeded is True
+    assert result.timed_out is False
+    assert len(result.stdout) == 10_000
+
+
+def test_cancelling_the_awaiting_task_kills_the_command(tmp_path) -> None:
+    pid_file = tmp_path / "shell.pid"
+
+    async def scenario() -> None:
+        task = asyncio.create_task(run_command(_sh(f"echo $$ > {pid_file}; sleep 30"), timeout=60))
+        while not pid_file.exists() or not pid_file.read_text().strip():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+
+    assert not _pid_alive(int(pid_file.read_text()))
+
+
+def test_execute_command_reports_limits_and_exit_code() -> None:
+    sandbox = LocalSandbox("t", command_timeout=1, max_output_bytes=1000)
+
+    assert sandbox.execute_command("echo hi; exit 2") == "hi\n\nExit Code: 2"
+    assert sandbox.execute_command("echo partial; sleep 30").endswith("partial\n\nError: Command timed out after 1 seconds and was killed")
+    assert sandbox.execute_command("yes").endswith("Error: Command output exceeded 1000 bytes and the command was killed")
+    assert sandbox.execute_command("true") == "(no output)"
+
+
+def test_execute_command_works_from_event_loop_thread() -> None:
+    async def scenario() -> str:
+        return LocalSandbox("t").execute_command("echo inside")
+
+    assert asyncio.run(scenario()) == "inside\n"
+
+
+def test_aexecute_command_streams_container_paths(tmp_path) -> None:
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "notes.txt").write_text("hello\n", encoding="utf-8")
+    sandbox = LocalSandbox("t", path_mappings=[PathMapping(container_path="/mnt/data", local_path=str(data))])
+    seen: list[str] = []
+
+    output = asyncio.run(sandbox.aexecute_command("ls /mnt/data/notes.txt; cat /mnt/data/notes.txt", on_output=lambda stream, text: seen.append(text)))
+
+    assert output == "/mnt/data/notes.txt\nhello\n"
+    assert "".join(seen) == output
+
+
+def test_async_bash_tool_streams_output_to_run(monkeypatch) -> None:
+    events: list[dict] = []
+    runtime = SimpleNamespace(state={"sandbox": {"sandbox_id": "local"}, "thread_data": {}}, context={}, stream_writer=events.append, tool_call_id="call-1")
+    monkeypatch.setattr(tools, "_aensure_sandbox_initialized", _returning(LocalSandbox("local")))
+    monkeypatch.setattr(tools, "is_host_bash_allowed", lambda: True)
+    monkeypatch.setattr(tools, "_prepare_local_bash_command", lambda command, thread_data: command)
+
+    result = asyncio.run(tools.bash_tool.coroutine(runtime=runtime, description="d", command=f"{sys.executable} -c \"print('a'); print('b')\""))
+
+    assert result == "a\nb\n"
+    assert "".join(event["text"] for event in events) == "a\nb\n"
+    assert {(event["type"], event["tool_call_id"], event["stream"]) for event in events} == {("bash_output", "call-1", "stdout")}
+
+
+def test_async_bash_tool_awaits_non_local_sandbox(monkeypatch) -> None:
+    runtime = SimpleNamespace(state={"sandbox": {"sandbox_id": "aio-1"}}, context={})
+
+    async def aexecute_command(command: str) -> str:
+        return f"ran {command}"
+
+    monkeypatch.setattr(tools, "_aensure_sandbox_initialized", _returning(SimpleNamespace(aexecute_command=aexecute_command)))
+
+    assert asyncio.run(tools.bash_tool.coroutine(runtime=runtime, description="d", command="ls")) == "ran ls"
+
+
+def _returning(sandbox):
+    async def aensure_sandbox_initialized(runtime):
+        return sandbox
+
+    return aensure_sandbox_initialized
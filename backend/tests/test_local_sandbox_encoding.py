@@ -1,7 +1,7 @@
 import builtins
-from types import SimpleNamespace
 
 import deerflow.sandbox.local.local_sandbox as local_sandbox
+from deerflow.sandbox.local.command_runner import CommandResult
 from deerflow.sandbox.local.local_sandbox import LocalSandbox
 
 
@@ -81,13 +81,13 @@ def test_get_shell_uses_cmd_as_last_windows_fallback(monkeypatch):
 def test_execute_command_uses_powershell_command_mode_on_windows(monkeypatch):
     calls: list[tuple[object, dict]] = []
 
-    def fake_run(*args, **kwargs):
-        calls.append((args[0], kwargs))
-        return SimpleNamespace(stdout="ok", stderr="", returncode=0)
+    async def fake_run(args, **kwargs):
+        calls.append((args, kwargs))
+        return CommandResult(stdout="ok", stderr="", returncode=0)
 
     monkeypatch.setattr(local_sandbox.os, "name", "nt")
     monkeypatch.setattr(LocalSandbox, "_get_shell", staticmethod(lambda: r"C:\Windows\System32\WindowsPowerShell\v1.0\powershell.exe"))
-    monkeypatch.setattr(local_sandbox.subprocess, "run", fake_run)
+    monkeypatch.setattr(local_sandbox, "run_command", fake_run)
 
     output = LocalSandbox("t").execute_command("Write-Output hello")
 
@@ -101,10 +101,12 @@ def test_execute_command_uses_powershell_command_mode_on_windows(monkeypatch):
                 "Write-Output hello",
             ],
             {
-                "shell": False,
-                "capture_output": True,
-                "text": True,
+                "executable": None,
                 "timeout": 600,
+                "max_output_bytes": 0,
+                "on_output": None,
+                "capture_chars": 0,
+                "spill_path": None,
             },
         )
     ]
@@ -113,13 +115,13 @@ def test_execute_command_uses_powershell_command_mode_on_windows(monkeypatch):
 def test_execute_command_uses_posix_shell_command_mode_on_windows(monkeypatch):
     calls: list[tuple[object, dict]] = []
 
-    def fake_run(*args, **kwargs):
-        calls.append((args[0], kwargs))
-        return SimpleNamespace(stdout="ok", stderr="", returncode=0)
+    async def fake_run(args, **kwargs):
+        calls.append((args, kwargs))
+        return CommandResult(stdout="ok", stderr="", returncode=0)
 
     monkeypatch.setattr(local_sandbox.os, "name", "nt")
     monkeypatch.setattr(LocalSandbox, "_get_shell", staticmethod(lambda: r"C:\Program Files\Git\bin\sh.exe"))
-    monkeypatch.setattr(local_sandbox.subprocess, "run", fake_run)
+    monkeypatch.setattr(local_sandbox, "run_command", fake_run)
 
     output = LocalSandbox("t").execute_command("echo hello")
 
@@ -128,10 +130,12 @@ def test_execute_command_uses_posix_shell_command_mode_on_windows(monkeypatch):
         (
             [r"C:\Program Files\Git\bin\sh.exe", "-c", "echo hello"],
             {
-                "shell": False,
-                "capture_output": True,
-                "text": True,
+                "executable": None,
                 "timeout": 600,
+                "max_output_bytes": 0,
+                "on_output": None,
+                "capture_chars": 0,
+                "spill_path": None,
             },
         )
     ]
@@ -140,13 +144,13 @@ def test_execute_command_uses_posix_shell_command_mode_on_windows(monkeypatch):
 def test_execute_command_uses_cmd_command_mode_on_windows(monkeypatch):
     calls: list[tuple[object, dict]] = []
 
-    def fake_run(*args, **kwargs):
-        calls.append((args[0], kwargs))
-        return SimpleNamespace(stdout="ok", stderr="", returncode=0)
+    async def fake_run(args, **kwargs):
+        calls.append((args, kwargs))
+        return CommandResult(stdout="ok", stderr="", returncode=0)
 
     monkeypatch.setattr(local_sandbox.os, "name", "nt")
     monkeypatch.setattr(LocalSandbox, "_get_shell", staticmethod(lambda: r"C:\Windows\System32\cmd.exe"))
-    monkeypatch.setattr(local_sandbox.subprocess, "run", fake_run)
+    monkeypatch.setattr(local_sandbox, "run_command", fake_run)
 
     output = LocalSandbox("t").execute_command("echo hello")
 
@@ -155,10 +159,12 @@ def test_execute_command_uses_cmd_command_mode_on_windows(monkeypatch):
         (
             [r"C:\Windows\System32\cmd.exe", "/c", "echo hello"],
             {
-                "shell": False,
-                "capture_output": True,
-                "text": True,
+                "executable": None,
                 "timeout": 600,
+                "max_output_bytes": 0,
+                "on_output": None,
+                "capture_chars": 0,
+                "spill_path": None,
             },
         )
     ]
@@ -0,0 +1,122 @@
+import os
+import random
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from deerflow.community.aio_sandbox.aio_sandbox import AioSandbox
+from deerflow.sandbox.exceptions import SandboxFileError
+from deerflow.sandbox.local import line_reader
+from deerflow.sandbox.local.line_reader import read_line_range
+from deerflow.sandbox.local.local_sandbox import LocalSandbox
+from deerflow.sandbox.tools import read_file_tool
+
+
+def _reference(data: bytes, start_line: int, end_line: int) -> str:
+    # Text-mode reading: universal newlines, undecodable bytes replaced.
+    text = data.decode("utf-8", errors="replace").replace("\r\n", "\n").replace("\r", "\n")
+    lines = text.split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    return "\n".join(lines[max(start_line, 1) - 1 : end_line])
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache(monkeypatch):
+    monkeypatch.setattr(line_reader, "_cache", line_reader.OrderedDict())
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(line_reader, "_CHUNK_SIZE", 7)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"one line without newline",
+        b"a\nb\nc\n",
+        b"a\r\nb\r\n\r\nc",
+        b"lone\rcarriage\rreturns\r",
+        b"mixed\r\n\n\r\rend",
+        "naïve café\nstraße\n".encode(),
+        b"caf\xe9 latin-1\n\xff\xfe broken\n",
+        b"\n\n\n",
+    ],
+)
+@pytest.mark.usefixtures("small_chunks")
+def test_read_line_range_matches_text_mode_reading(tmp_path, data) -> None:
+    path = tmp_path / "file.txt"
+    path.write_bytes(data)
+
+    for start_line, end_line in [(1, 1), (1, 2), (2, 3), (3, 3), (1, 100), (4, 10), (10, 20), (2, 1), (0, 2)]:
+        assert read_line_range(str(path), start_line, end_line) == _reference(data, start_line, end_line), (start_line, end_line)
+
+
+@pytest.mark.usefixtures("small_chunks")
+def test_random_ranges_reuse_checkpoints(tmp_path) -> None:
+    rng = random.Random(7)
+    data = b"".join(f"line {n} {'x' * rng.randrange(30)}".encode() + rng.choice([b"\n", b"\r\n", b"\r"]) for n in range(500))
+    path = tmp_path / "big.txt"
+    path.write_bytes(data)
+
+    for _ in range(100):
+        start_line = rng.randrange(1, 520)
+        end_line = start_line + rng.randrange(0, 40)
+        assert read_line_range(str(path), start_line, end_line) == _reference(data, start_line, end_line)
+    assert len(line_reader._cache[str(path)].lines) > 10
+
+
+def test_index_is_invalidated_when_file_changes(tmp_path, small_chunks) -> None:
+    path = tmp_path / "file.txt"
+    path.write_text("".join(f"old {n}\n" for n in range(50)), encoding="utf-8")
+    assert read_line_range(str(path), 40, 40) == "old 39"
+
+    path.write_text("".join(f"new line {n}\n" for n in range(60)), encoding="utf-8")
+    os.utime(path, ns=(1, 1))
+
+    assert read_line_range(str(path), 40, 41) == "new line 39\nnew line 40"
+
+
+def test_local_sandbox_read_file_lines(tmp_path) -> None:
+    (tmp_path / "notes.txt").write_text("a\nb\nc\n", encoding="utf-8")
+    (tmp_path / "image.bin").write_bytes(b"\x89PNG\x00\x01")
+    sandbox = LocalSandbox(id="local", path_mappings=[])
+
+    assert sandbox.read_file_lines(str(tmp_path / "notes.txt"), 2, 3) == "b\nc"
+    with pytest.raises(SandboxFileError, match="binary"):
+        sandbox.read_file_lines(str(tmp_path / "image.bin"), 1, 1)
+    with pytest.raises(FileNotFoundError):
+        sandbox.read_file_lines(str(tmp_path / "missing.txt"), 1, 1)
+    with pytest.raises(IsADirectoryError):
+        sandbox.read_file_lines(str(tmp_path), 1, 1)
+
+
+def test_read_file_tool_uses_line_range_reader(tmp_path, monkeypatch) -> None:
+    sandbox = MagicMock()
+    sandbox.read_file_lines.return_value = "line 2"
+    monkeypatch.setattr("deerflow.sandbox.tools.ensure_sandbox_initialized", lambda runtime: sandbox)
+    monkeypatch.setattr("deerflow.sandbox.tools.ensure_thread_directories_exist", lambda runtime: None)
+    monkeypatch.setattr("deerflow.sandbox.tools.is_local_sandbox", lambda runtime: False)
+    runtime = SimpleNamespace(state={}, context={})
+
+    assert read_file_tool.func(runtime=runtime, description="d", path="/mnt/user-data/workspace/a.txt", start_line=2, end_line=2) == "line 2"
+    sandbox.read_file_lines.assert_called_once_with("/mnt/user-data/workspace/a.txt", 2, 2)
+    sandbox.read_file.assert_not_called()
+
+    sandbox.read_file_lines.return_value = ""
+    assert read_file_tool.func(runtime=runtime, description="d", path="/mnt/user-data/workspace/a.txt", start_line=9, end_line=10) == "(empty)"
+
+    sandbox.read_file_lines.side_effect = SandboxFileError("Cannot read binary file", path="/mnt/user-data/workspace/a.bin", operation="read")
+    assert read_file_tool.func(runtime=runtime, description="d", path="/mnt/user-data/workspace/a.bin", start_line=1, end_line=5).startswith("Error: Cannot read binary file")
+
+
+def test_aio_sandbox_reads_range_server_side() -> None:
+    sandbox = AioSandbox.__new__(AioSandbox)
+    sandbox._client = MagicMock()
+    sandbox._client.file.read_file.return_value = SimpleNamespace(data=SimpleNamespace(content="b\nc\n"))
+
+    assert sandbox.read_file_lines("/mnt/user-data/workspace/a.txt", 2, 3) == "b\nc"
+    sandbox._client.file.read_file.assert_called_once_with(file="/mnt/user-data/workspace/a.txt", start_line=1, end_line=3)
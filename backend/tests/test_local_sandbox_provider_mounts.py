@@ -4,6 +4,7 @@ from unittest.mock import patch
 
 import pytest
 
+import deerflow.sandbox.local.local_sandbox as local_sandbox_module
 from deerflow.sandbox.local.local_sandbox import LocalSandbox, PathMapping
 from deerflow.sandbox.local.local_sandbox_provider import LocalSandboxProvider
 
@@ -241,16 +242,15 @@ class TestMultipleMounts:
             ],
         )
 
-        # Mock subprocess to capture the resolved command
+        # Mock the command runner to capture the resolved command
         captured = {}
-        original_run = __import__("subprocess").run
+        original_run = local_sandbox_module.run_command
 
-        def mock_run(*args, **kwargs):
-            if len(args) > 0:
-                captured["command"] = args[0]
-            return original_run(*args, **kwargs)
+        async def mock_run(args, **kwargs):
+            captured["command"] = args[-1]
+            return await original_run(args, **kwargs)
 
-        monkeypatch.setattr("deerflow.sandbox.local.local_sandbox.subprocess.run", mock_run)
+        monkeypatch.setattr("deerflow.sandbox.local.local_sandbox.run_command", mock_run)
         monkeypatch.setattr("deerflow.sandbox.local.local_sandbox.LocalSandbox._get_shell", lambda self: "/bin/sh")
 
         sandbox.execute_command("cat /mnt/data/test.txt")
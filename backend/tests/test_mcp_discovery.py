@@ -0,0 +1,185 @@
+"""Tests for parallel MCP tool discovery and the on-disk schema cache."""
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from mcp.types import Tool as MCPTool
+
+from deerflow.config.extensions_config import McpServerConfig
+from deerflow.mcp.discovery import DiscoveryTarget, MCPSchemaCache, discover_tools, get_mcp_discovery_stats, server_cache_key
+
+FAKE_SERVER = str(Path(__file__).with_name("fake_mcp_server.py"))
+
+
+def _tool(name: str) -> MCPTool:
+    return MCPTool(name=name, description=f"{name} tool", inputSchema={"type": "object", "properties": {}})
+
+
+def _target(tools: list[MCPTool] | Exception, delay: float = 0.0, timeout: float = 5.0, key: str = "k1") -> DiscoveryTarget:
+    async def list_tools():
+        await asyncio.sleep(delay)
+        if isinstance(tools, Exception):
+            raise tools
+        return tools
+
+    return DiscoveryTarget(key, timeout, list_tools)
+
+
+@pytest.fixture()
+def cache(tmp_path):
+    return MCPSchemaCache(tmp_path / "mcp-tools")
+
+
+def test_live_discovery_is_cached_for_the_next_start(cache):
+    found = asyncio.run(discover_tools({"github": _target([_tool("search")])}, cache))
+
+    assert [tool.name for tool in found["github"]] == ["search"]
+    assert get_mcp_discovery_stats()["github"]["source"] == "live"
+
+    found = asyncio.run(discover_tools({"github": _target(RuntimeError("server is down"))}, MCPSchemaCache(cache.directory)))
+    assert [tool.name for tool in found["github"]] == ["search"]
+    assert get_mcp_discovery_stats()["github"]["source"] == "cache"
+
+
+def test_cached_tools_are_served_while_revalidating(cache):
+    cache.save("github", "k1", [_tool("search")])
+    changes = []
+
+    async def run():
+        start = time.monotonic()
+        found = await discover_tools({"github": _target([_tool("search"), _tool("issue")], delay=0.3)}, cache, on_change=lambda name, tools: changes.append((name, [t.name for t in tools])))
+        served_in = time.monotonic() - start
+        await asyncio.sleep(0.6)
+        return found, served_in
+
+    found, served_in = asyncio.run(run())
+    assert [tool.name for tool in found["github"]] == ["search"]
+    assert served_in < 0.2
+    assert changes == [("github", ["search", "issue"])]
+    assert [tool.name for tool in cache.load("github", "k1")] == ["search", "issue"]
+    stats = get_mcp_discovery_stats()["github"]
+    assert stats["changed"] is True and stats["revalidation_ms"] >= 300
+
+
+def test_revalidation_during_discovery_returns_the_new_definitions(cache):
+    cache.save("github", "k1", [_tool("search")])
+    changes = []
+    targets = {"github": _target([_tool("search"), _tool("issue")], delay=0.05), "slack": _target([_tool("post")], delay=0.3)}
+
+    found = asyncio.run(discover_tools(targets, cache, on_change=lambda name, tools: changes.append(name)))
+
+    assert [tool.name for tool in found["github"]] == ["search", "issue"]
+    assert [tool.name for tool in found["slack"]] == ["post"]
+    assert changes == ["github"]
+
+
+def test_get_mcp_tools_keeps_tools_revalidated_during_discovery(tmp_path, monkeypatch):
+    from deerflow.mcp.session_pool import close_mcp_session_pool
+    from deerflow.mcp.tools import get_mcp_tools
+
+    extensions = tmp_path / "extensions_config.json"
+    servers = {name: {"type": "stdio", "command": sys.executable, "args": [FAKE_SERVER]} for name in ("github", "slack")}
+    extensions.write_text(json.dumps({"mcpServers": servers, "skills": {}}))
+    monkeypatch.setenv("DEER_FLOW_EXTENSIONS_CONFIG_PATH", str(extensions))
+    monkeypatch.setenv("DEER_FLOW_HOME", str(tmp_path))
+    cache = MCPSchemaCache(tmp_path / "mcp-tools")
+    cache.save("github", server_cache_key(McpServerConfig(**servers["github"])), [_tool("search")])
+
+    async def list_tools(server_name):
+        await asyncio.sleep(0.05 if server_name == "github" else 0.3)
+        return [_tool("search"), _tool("issue")] if server_name == "github" else [_tool("post")]
+
+    monkeypatch.setattr("deerflow.mcp.session_pool.MCPSessionPool.list_tools", lambda self, server_name: list_tools(server_name))
+    notified = []
+    try:
+        names = {tool.name for tool in asyncio.run(get_mcp_tools(notified.append))}
+    finally:
+        asyncio.run(close_mcp_session_pool())
+
+    assert names == {"github_search", "github_issue", "slack_post"}
+    assert notified == []
+
+
+def test_slow_and_failing_servers_are_left_out(cache):
+    targets = {
+        "ok": _target([_tool("a")]),
+        "slow": _target([_tool("b")], delay=5, timeout=0.1),
+        "broken": _target(ConnectionError("refused")),
+    }
+
+    start = time.monotonic()
+    found = asyncio.run(discover_tools(targets, cache))
+
+    assert time.monotonic() - start < 1
+    assert list(found) == ["ok"]
+    stats = get_mcp_discovery_stats()
+    assert stats["slow"]["source"] == "failed" and "within 0.1s" in stats["slow"]["error"]
+    assert stats["broken"]["error"] == "refused"
+    assert cache.load("slow", "k1") is None
+
+
+def test_cache_key_follows_server_config(cache):
+    base = McpServerConfig(command="npx", args=["-y", "@example/server"])
+    assert server_cache_key(base) == server_cache_key(base.model_copy(update={"description": "x", "keepalive_seconds": 5}))
+    changed = base.model_copy(update={"args": ["-y", "@example/server@2"]})
+    assert server_cache_key(base) != server_cache_key(changed)
+
+    cache.save("github", server_cache_key(base), [_tool("search")])
+    assert cache.load("github", server_cache_key(changed)) is None
+    cache.save("github", server_cache_key(changed), [_tool("search")])
+    assert len(list(cache.directory.glob("*.json"))) == 1
+
+
+def test_get_mcp_tools_skips_unresponsive_server(tmp_path, monkeypatch):
+    from deerflow.mcp.session_pool import close_mcp_session_pool
+    from deerflow.mcp.tools import get_mcp_tools
+
+    extensions = tmp_path / "extensions_config.json"
+    servers = {
+        "fake": {"type": "stdio", "command": sys.executable, "args": [FAKE_SERVER]},
+        "hung": {"type": "stdio", "command": sys.executable, "args": ["-c", "import time; time.sleep(60)"], "discovery_timeout_seconds": 0.5},
+    }
+    extensions.write_text(json.dumps({"mcpServers": servers, "skills": {}}))
+    monkeypatch.setenv("DEER_FLOW_EXTENSIONS_CONFIG_PATH", str(extensions))
+    monkeypatch.setenv("DEER_FLOW_HOME", str(tmp_path))
+    try:
+        names = {tool.name for tool in asyncio.run(get_mcp_tools())}
+        assert {"fake_echo", "fake_pid", "fake_sleep"} == names
+        stats = get_mcp_discovery_stats()
+        assert stats["fake"]["source"] == "live" and stats["hung"]["source"] == "failed"
+
+        names = {tool.name for tool in asyncio.run(get_mcp_tools())}
+        assert "fake_echo" in names
+        assert get_mcp_discovery_stats()["fake"]["source"] == "cache"
+    finally:
+        asyncio.run(close_mcp_session_pool())
+
+
+def test_revalidated_tools_replace_cached_list(monkeypatch):
+    from deerflow.mcp import cache as mcp_cache
+
+    callbacks = []
+
+    async def fake_get_mcp_tools(on_tools_changed=None):
+        callbacks.append(on_tools_changed)
+        return ["old"]
+
+    monkeypatch.setattr("deerflow.mcp.tools.get_mcp_tools", fake_get_mcp_tools)
+    mcp_cache.reset_mcp_tools_cache()
+    try:
+        assert asyncio.run(mcp_cache.initialize_mcp_tools()) == ["old"]
+        callbacks[-1](["new"])
+        assert mcp_cache.get_cached_mcp_tools() == ["new"]
+
+        # A callback from before a reset must not overwrite the next initialization.
+        stale = callbacks[-1]
+        mcp_cache.reset_mcp_tools_cache()
+        asyncio.run(mcp_cache.initialize_mcp_tools())
+        stale(["stale"])
+        assert mcp_cache.get_cached_mcp_tools() == ["old"]
+    finally:
+        mcp_cache.reset_mcp_tools_cache()
@@ -0,0 +1,67 @@
+"""Tests for the background event loop that runs MCP work."""
+
+import asyncio
+import threading
+
+import pytest
+
+from deerflow.mcp.loop import MCPEventLoop
+
+
+@pytest.fixture()
+def mcp_loop():
+    loop = MCPEventLoop(name="mcp-loop-test")
+    yield loop
+    loop.close()
+
+
+def test_run_from_sync_and_async_callers_shares_one_loop(mcp_loop):
+    async def current_loop():
+        return asyncio.get_running_loop(), threading.current_thread().name
+
+    from_sync = mcp_loop.run(current_loop())
+
+    async def from_other_loop():
+        return await mcp_loop.run_async(current_loop()), mcp_loop.run(current_loop())
+
+    awaited, blocking = asyncio.run(from_other_loop())
+    assert from_sync == awaited == blocking == (mcp_loop.loop, "mcp-loop-test")
+
+
+def test_run_on_loop_thread_raises_instead_of_deadlocking(mcp_loop):
+    async def nested():
+        async def inner():
+            return 1
+
+        with pytest.raises(RuntimeError, match="run_async"):
+            mcp_loop.run(inner())
+        return await mcp_loop.run_async(inner())
+
+    assert mcp_loop.run(nested()) == 1
+
+
+def test_run_timeout_cancels_the_coroutine(mcp_loop):
+    cancelled = threading.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(TimeoutError):
+        mcp_loop.run(slow(), timeout=0.05)
+    assert cancelled.wait(2)
+
+
+def test_close_then_restart(mcp_loop):
+    first = mcp_loop.loop
+    mcp_loop.close()
+    assert first.is_closed()
+
+    async def answer():
+        return 42
+
+    assert mcp_loop.run(answer()) == 42
+    assert mcp_loop.loop is not first
@@ -0,0 +1,167 @@
+"""Tests for the persistent MCP session pool, against a real MCP server over stdio and HTTP."""
+
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import httpx
+import pytest
+from mcp.shared.exceptions import McpError
+
+from deerflow.mcp.session_pool import MCPSessionPool, PooledServer, _connection_lost, _PooledSession
+
+FAKE_SERVER = str(Path(__file__).with_name("fake_mcp_server.py"))
+STDIO = {"transport": "stdio", "command": sys.executable, "args": [FAKE_SERVER]}
+
+
+def _wait_until(predicate, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.05)
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # A killed child that has not been reaped yet still answers signal 0.
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().split()[2] != "Z"
+    except OSError:
+        return True
+
+
+async def _call(pool: MCPSessionPool, tool: str, **arguments):
+    result = await pool.call_tool("fake", tool, arguments)
+    assert not result.isError, result
+    return result.content[0].text
+
+
+@pytest.fixture()
+def pool():
+    pool = MCPSessionPool()
+    yield pool
+    pool.close()
+
+
+@pytest.fixture(scope="module")
+def http_server():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen([sys.executable, FAKE_SERVER, "--http", str(port)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 20
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline or process.poll() is not None:
+                    pytest.skip("fake MCP HTTP server did not start")
+                time.sleep(0.1)
+        yield {"transport": "streamable_http", "url": f"http://127.0.0.1:{port}/mcp"}
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def test_stdio_calls_reuse_one_server_process(pool):
+    async def run():
+        await pool.configure({"fake": PooledServer(STDIO)})
+        pids = {await _call(pool, "pid") for _ in range(5)}
+        assert await _call(pool, "echo", text="hi") == "hi"
+        return pids
+
+    assert len(asyncio.run(run())) == 1
+    stats = pool.stats()["fake"]
+    assert (stats["connects"], stats["calls"], stats["errors"], stats["sessions_open"]) == (1, 6, 0, 1)
+
+
+def test_reconnects_after_server_dies(pool):
+    asyncio.run(pool.configure({"fake": PooledServer(STDIO, keepalive_seconds=0.1)}))
+    first = int(asyncio.run(_call(pool, "pid")))
+    os.kill(first, signal.SIGKILL)
+
+    _wait_until(lambda: pool.stats()["fake"]["connects"] == 2)
+    second = int(asyncio.run(_call(pool, "pid")))
+    assert second != first
+
+
+def test_concurrent_calls_are_capped(pool):
+    async def run():
+        await pool.configure({"fake": PooledServer(STDIO, sessions=2, max_concurrent_calls=2)})
+        await _call(pool, "pid")
+        start = time.monotonic()
+        await asyncio.gather(*(_call(pool, "sleep", seconds=0.2) for _ in range(6)))
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.55
+    stats = pool.stats()["fake"]
+    assert stats["peak_in_flight"] == 2
+    assert stats["sessions_open"] == 2
+
+
+def test_read_timeout_applies_and_keeps_the_session(pool):
+    async def run():
+        await pool.configure({"fake": PooledServer(STDIO)})
+        first = await _call(pool, "pid")
+        with pytest.raises(McpError):
+            # The adapter's tools call the pool through a _PooledSession.
+            await _PooledSession(pool, "fake").call_tool("sleep", {"seconds": 5}, read_timeout_seconds=timedelta(seconds=0.2))
+        return first, await _call(pool, "pid")
+
+    start = time.monotonic()
+    first, second = asyncio.run(run())
+    assert time.monotonic() - start < 3
+    assert first == second
+    assert pool.stats()["fake"]["connects"] == 1
+
+
+def test_timeouts_do_not_count_as_lost_connections():
+    assert _connection_lost(ConnectionResetError()) is True
+    assert _connection_lost(TimeoutError()) is False
+    assert _connection_lost(httpx.ReadTimeout("slow")) is False
+    assert _connection_lost(httpx.ConnectError("refused")) is True
+
+
+def test_reconfigure_and_close_stop_server_processes(pool):
+    asyncio.run(pool.configure({"fake": PooledServer(STDIO)}))
+    first = int(asyncio.run(_call(pool, "pid")))
+
+    # A changed config replaces the session (and its process).
+    asyncio.run(pool.configure({"fake": PooledServer(STDIO, max_concurrent_calls=1)}))
+    _wait_until(lambda: not _alive(first))
+    second = int(asyncio.run(_call(pool, "pid")))
+
+    pool.close()
+    _wait_until(lambda: not _alive(second))
+    assert pool.stats() == {}
+
+
+def test_http_tools_from_any_event_loop(pool, http_server):
+    asyncio.run(pool.configure({"fake": PooledServer(http_server)}))
+    tools = {tool.name: tool for tool in asyncio.run(pool.load_tools())}
+    assert {"fake_echo", "fake_pid", "fake_sleep"} <= set(tools)
+
+    # Each asyncio.run is a new loop; all of them share the pooled session.
+    for i in range(3):
+        content = asyncio.run(tools["fake_echo"].ainvoke({"text": f"call {i}"}))
+        assert content[0]["text"] == f"call {i}"
+    stats = pool.stats()["fake"]
+    assert (stats["connects"], stats["calls"]) == (1, 3)
+
+
+def test_unknown_server_raises(pool):
+    with pytest.raises(ConnectionError, match="not in the session pool"):
+        asyncio.run(pool.call_tool("missing", "echo", {"text": "x"}))
@@ -1,10 +1,14 @@
 import asyncio
-from unittest.mock import AsyncMock, MagicMock, patch
+import os
+import threading
+from unittest.mock import AsyncMock, patch
 
 import pytest
 from langchain_core.tools import StructuredTool
+from mcp.types import Tool as MCPTool
 from pydantic import BaseModel, Field
 
+from deerflow.config.extensions_config import ExtensionsConfig, McpServerConfig
 from deerflow.mcp.tools import _make_sync_tool_wrapper, get_mcp_tools
 
 
@@ -12,7 +16,10 @@ class MockArgs(BaseModel):
     x: int = Field(..., description="test param")
 
 
-def test_mcp_tool_sync_wrapper_generation():
+MCP_TOOL = MCPTool(name="test_tool", inputSchema={"type": "object", "properties": {"x": {"type": "integer"}}})
+
+
+def test_mcp_tool_sync_wrapper_generation(tmp_path):
     """Test that get_mcp_tools correctly adds a sync func to async-only tools."""
 
     async def mock_coro(x: int):
@@ -26,13 +33,11 @@ def test_mcp_tool_sync_wrapper_generation():
         coroutine=mock_coro,
     )
 
-    mock_client_instance = MagicMock()
-    # Use AsyncMock for get_tools as it's awaited (Fix for Comment 5)
-    mock_client_instance.get_tools = AsyncMock(return_value=[mock_tool])
-
     with (
-        patch("langchain_mcp_adapters.client.MultiServerMCPClient", return_value=mock_client_instance),
-        patch("deerflow.config.extensions_config.ExtensionsConfig.from_file"),
+        patch.dict(os.environ, {"DEER_FLOW_HOME": str(tmp_path)}),
+        patch("deerflow.mcp.tools.list_tools_per_call", new_callable=AsyncMock, return_value=[MCP_TOOL]),
+        patch("langchain_mcp_adapters.tools.convert_mcp_tool_to_langchain_tool", return_value=mock_tool),
+        patch("deerflow.config.extensions_config.ExtensionsConfig.from_file", return_value=ExtensionsConfig(mcpServers={"test-server": McpServerConfig(sessions=0)})),
         patch("deerflow.mcp.tools.build_servers_config", return_value={"test-server": {}}),
         patch("deerflow.mcp.tools.get_initial_oauth_headers", new_callable=AsyncMock, return_value={}),
     ):
@@ -83,3 +88,48 @@ def test_mcp_tool_sync_wrapper_exception_logging():
         mock_log_error.assert_called_once()
         # Verify the tool name is in the log message
         assert "error_tool" in mock_log_error.call_args[0][0]
+
+
+def test_mcp_tool_sync_wrapper_runs_on_mcp_loop():
+    """Sync calls run on the shared MCP event loop, not a throwaway loop per call."""
+
+    async def where():
+        return threading.current_thread().name, asyncio.get_running_loop()
+
+    sync_func = _make_sync_tool_wrapper(where, "where_tool")
+    first = sync_func()
+    second = asyncio.run(asyncio.to_thread(sync_func))
+    assert first == second
+    assert first[0] == "mcp-loop"
+
+
+def test_per_call_server_tools_respect_max_concurrent_calls(tmp_path):
+    """Tools of servers without pooled sessions are limited per server."""
+    running = 0
+    peak = 0
+
+    async def slow_coro(x: int):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        return x
+
+    slow_tool = StructuredTool(name="slow_tool", description="slow", args_schema=MockArgs, func=None, coroutine=slow_coro)
+
+    with (
+        patch.dict(os.environ, {"DEER_FLOW_HOME": str(tmp_path)}),
+        patch("deerflow.mcp.tools.list_tools_per_call", new_callable=AsyncMock, return_value=[MCP_TOOL]),
+        patch("langchain_mcp_adapters.tools.convert_mcp_tool_to_langchain_tool", return_value=slow_tool),
+        patch("deerflow.config.extensions_config.ExtensionsConfig.from_file", return_value=ExtensionsConfig(mcpServers={"test-server": McpServerConfig(sessions=0, max_concurrent_calls=2)})),
+        patch("deerflow.mcp.tools.build_servers_config", return_value={"test-server": {}}),
+        patch("deerflow.mcp.tools.get_initial_oauth_headers", new_callable=AsyncMock, return_value={}),
+    ):
+
+        async def run():
+            (tool,) = await get_mcp_tools()
+            return await asyncio.gather(*(tool.ainvoke({"x": i}) for i in range(6)))
+
+        assert asyncio.run(run()) == [0, 1, 2, 3, 4, 5]
+    assert peak == 2
@@ -0,0 +1,192 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from deerflow.agents.memory.dedup import FactDedupIndex, compact_facts, compact_memory_file, normalize_fact_content
+from deerflow.agents.memory.updater import MemoryUpdater, compact_memory_data
+from deerflow.config.memory_config import MemoryConfig
+
+
+def _fact(fact_id: str, content: str, confidence: float = 0.8) -> dict:
+    return {"id": fact_id, "content": content, "category": "preference", "confidence": confidence}
+
+
+def test_normalize_fact_content_drops_case_punctuation_and_filler() -> None:
+    assert normalize_fact_content("The user prefers Python!") == "prefers python"
+
+
+def test_index_finds_paraphrased_duplicate() -> None:
+    index = FactDedupIndex()
+    index.add("fact_1", "User prefers Python for scripting")
+
+    match = index.find_duplicate("The user prefers Python for scripting.")
+
+    assert match is not None
+    assert match[0] == "fact_1"
+    assert match[1] == pytest.approx(1.0)
+
+
+def test_index_keeps_distinct_facts_apart() -> None:
+    index = FactDedupIndex()
+    index.add("fact_1", "User prefers dark mode in editors")
+    index.add("fact_2", "User lives in Beijing")
+
+    assert index.find_duplicate("User prefers light mode in editors") is None
+    assert index.find_duplicate("User lives in Shanghai") is None
+
+
+def test_index_remove_and_replace() -> None:
+    index = FactDedupIndex()
+    index.add("fact_1", "User prefers Python for scripting")
+    index.add("fact_1", "User lives in Beijing")
+
+    assert len(index) == 1
+    assert index.find_duplicate("User prefers Python for scripting") is None
+
+    index.remove("fact_1")
+    assert "fact_1" not in index
+    assert index.find_duplicate("User lives in Beijing") is None
+
+
+def test_index_ignores_content_without_tokens() -> None:
+    index = FactDedupIndex()
+    index.add("fact_1", "...")
+
+    assert len(index) == 0
+    assert index.find_duplicate("...") is None
+
+
+def test_index_rejects_invalid_threshold() -> None:
+    with pytest.raises(ValueError):
+        FactDedupIndex(threshold=0)
+
+
+def test_compact_facts_keeps_first_and_merges_confidence() -> None:
+    facts = [
+        _fact("fact_1", "User prefers Python for scripting", confidence=0.7),
+        _fact("fact_2", "User lives in Beijing"),
+        _fact("fact_3", "the user prefers python for scripting", confidence=0.95),
+    ]
+
+    compacted, merged = compact_facts(facts)
+
+    assert merged == 1
+    assert [f["id"] for f in compacted] == ["fact_1", "fact_2"]
+    assert compacted[0]["confidence"] == 0.95
+    assert compacted[0]["content"] == "the user prefers python for scripting"
+    # Input is left untouched
+    assert facts[0]["confidence"] == 0.7
+
+
+def test_compact_facts_keeps_categories_apart() -> None:
+    facts = [_fact("fact_1", "User uses Python 3.11"), {**_fact("fact_2", "User uses Python 3.12"), "category": "correction"}]
+
+    compacted, merged = compact_facts(facts)
+
+    assert merged == 0
+    assert [f["id"] for f in compacted] == ["fact_1", "fact_2"]
+
+
+def test_compact_memory_file_rewrites_in_place(tmp_path) -> None:
+    path = tmp_path / "memory.json"
+    path.write_text(json.dumps({"facts": [_fact("fact_1", "User likes tea"), _fact("fact_2", "The user likes tea.")]}), encoding="utf-8")
+
+    assert compact_memory_file(path, dry_run=True) == (2, 1)
+    assert len(json.loads(path.read_text(encoding="utf-8"))["facts"]) == 2
+
+    assert compact_memory_file(path) == (2, 1)
+    assert [f["id"] for f in json.loads(path.read_text(encoding="utf-8"))["facts"]] == ["fact_1"]
+
+
+def test_apply_updates_merges_near_duplicate_new_fact() -> None:
+    updater = MemoryUpdater()
+    current_memory = {
+        "user": {},
+        "history": {},
+        "facts": [_fact("fact_existing", "User prefers Python for scripting", confidence=0.75)],
+    }
+    update_data = {
+        "newFacts": [
+            {"content": "The user prefers Python for scripting.", "category": "preference", "confidence": 0.9},
+            {"content": "User lives in Beijing", "category": "context", "confidence": 0.9},
+            {"content": "The user lives in Beijing!", "category": "context", "confidence": 0.9},
+        ]
+    }
+
+    with patch("deerflow.agents.memory.updater.get_memory_config", return_value=MemoryConfig()):
+        result = updater._apply_updates(current_memory, update_data, thread_id="thread-1")
+
+    contents = [f["content"] for f in result["facts"]]
+    assert contents == ["The user prefers Python for scripting.", "The user lives in Beijing!"]
+    assert result["facts"][0]["id"] == "fact_existing"
+    assert result["facts"][0]["confidence"] == 0.9
+    assert result["facts"][0]["source"] == "thread-1"
+
+
+def _apply(existing: list[dict], new_facts: list[dict]) -> list[dict]:
+    with patch("deerflow.agents.memory.updater.get_memory_config", return_value=MemoryConfig()):
+        return MemoryUpdater()._apply_updates({"user": {}, "history": {}, "facts": existing}, {"newFacts": new_facts}, thread_id="thread-2")["facts"]
+
+
+def test_apply_updates_newer_version_replaces_near_duplicate() -> None:
+    existing = [{**_fact("fact_py", "User uses Python 3.11", confidence=0.9), "createdAt": "2026-01-01T00:00:00Z", "source": "thread-1"}]
+
+    facts = _apply(existing, [{"content": "User uses Python 3.12", "category": "preference", "confidence": 0.8}])
+
+    assert len(facts) == 1
+    assert facts[0]["id"] == "fact_py"
+    assert facts[0]["content"] == "User uses Python 3.12"
+    assert facts[0]["createdAt"] != "2026-01-01T00:00:00Z"
+    assert facts[0]["source"] == "thread-2"
+    assert facts[0]["confidence"] == 0.9
+
+
+def test_apply_updates_negation_replaces_near_duplicate() -> None:
+    existing = [_fact("fact_work", "User is working on the DeerFlow memory subsystem refactor")]
+
+    facts = _apply(existing, [{"content": "User is no longer working on the DeerFlow memory subsystem refactor", "category": "preference", "confidence": 0.9}])
+
+    assert [f["content"] for f in facts] == ["User is no longer working on the DeerFlow memory subsystem refactor"]
+
+
+def test_apply_updates_does_not_merge_across_categories() -> None:
+    existing = [_fact("fact_pref", "User uses Python 3.11")]
+
+    facts = _apply(
+        existing,
+        [{"content": "User uses Python 3.12", "category": "correction", "confidence": 0.95, "sourceError": "Assumed Python 3.11"}],
+    )
+
+    assert [(f["category"], f["content"]) for f in facts] == [("preference", "User uses Python 3.11"), ("correction", "User uses Python 3.12")]
+    assert facts[1]["sourceError"] == "Assumed Python 3.11"
+
+
+def test_merge_carries_newer_source_error() -> None:
+    existing = [{**_fact("fact_fix", "Use uv run pytest for backend tests"), "category": "correction", "sourceError": "Ran pytest directly"}]
+
+    facts = _apply(existing, [{"content": "Use uv run pytest for the backend tests", "category": "correction", "confidence": 0.95}])
+
+    assert len(facts) == 1
+    assert facts[0]["content"] == "Use uv run pytest for the backend tests"
+    assert "sourceError" not in facts[0]
+
+
+def test_compact_memory_data_saves_only_when_merged() -> None:
+    memory = {"facts": [_fact("fact_1", "User likes tea"), _fact("fact_2", "The user likes tea.")]}
+
+    with (
+        patch("deerflow.agents.memory.updater.get_memory_data", return_value=memory),
+        patch("deerflow.agents.memory.updater.get_memory_config", return_value=MemoryConfig()),
+        patch("deerflow.agents.memory.updater._save_memory_to_file", return_value=True) as save,
+    ):
+        result, merged = compact_memory_data()
+        assert merged == 1
+        assert [f["id"] for f in result["facts"]] == ["fact_1"]
+        save.assert_called_once()
+
+        save.reset_mock()
+        memory["facts"] = [_fact("fact_1", "User likes tea")]
+        _, merged = compact_memory_data()
+        assert merged == 0
+        save.assert_not_called()
@@ -0,0 +1,177 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from deerflow.agents.memory.sqlite_queue import MAX_CLAIM_ATTEMPTS, SqliteMemoryUpdateQueue
+from deerflow.config.memory_config import MemoryConfig
+
+
+@pytest.fixture(autouse=True)
+def _memory_config():
+    config = MemoryConfig(queue_backend="sqlite", debounce_seconds=30)
+    with (
+        patch("deerflow.agents.memory.queue.get_memory_config", return_value=config),
+        patch("deerflow.agents.memory.sqlite_queue.get_memory_config", return_value=config),
+    ):
+        yield config
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "memory_queue.db"
+
+
+def _make_queue(db_path, **kwargs) -> SqliteMemoryUpdateQueue:
+    queue = SqliteMemoryUpdateQueue(db_path=db_path, **kwargs)
+    # Tests drive processing explicitly; never let a background timer fire.
+    queue._start_timer = MagicMock()
+    return queue
+
+
+def _conversation(text: str = "hi") -> list:
+    return [HumanMessage(content=text), AIMessage(content=f"reply to {text}")]
+
+
+def test_backlog_survives_restart(db_path) -> None:
+    first = _make_queue(db_path)
+    first.add(thread_id="thread-1", messages=_conversation("remember me"), agent_name="lead_agent")
+
+    restarted = _make_queue(db_path)
+    assert restarted.pending_count == 1
+
+    claimed = restarted._claim_next(force=True)
+    assert claimed is not None
+    _, context = claimed
+    assert context.thread_id == "thread-1"
+    assert context.agent_name == "lead_agent"
+    assert [m.content for m in context.messages] == ["remember me", "reply to remember me"]
+    assert isinstance(context.messages[0], HumanMessage)
+
+
+def test_restart_schedules_existing_backlog(db_path) -> None:
+    _make_queue(db_path).add(thread_id="thread-1", messages=_conversation())
+
+    with patch.object(SqliteMemoryUpdateQueue, "_start_timer") as start_timer:
+        SqliteMemoryUpdateQueue(db_path=db_path)
+
+    start_timer.assert_called_once()
+
+
+def test_add_replaces_pending_update_and_merges_flags(db_path) -> None:
+    queue = _make_queue(db_path)
+    queue.add(thread_id="thread-1", messages=_conversation("first"), correction_detected=True)
+    queue.add(thread_id="thread-1", messages=_conversation("second"), reinforcement_detected=True)
+
+    assert queue.pending_count == 1
+    _, context = queue._claim_next(force=True)
+    assert context.messages[0].content == "second"
+    assert context.correction_detected is True
+    assert context.reinforcement_detected is True
+
+
+def test_debounce_deadline_is_respected_unless_forced(db_path) -> None:
+    queue = _make_queue(db_path)
+    queue.add(thread_id="thread-1", messages=_conversation())
+
+    assert queue._claim_next() is None
+    assert queue._claim_next(force=True) is not None
+
+
+def test_claimed_update_is_not_handed_to_another_worker(db_path) -> None:
+    worker_a = _make_queue(db_path)
+    worker_b = _make_queue(db_path)
+    worker_a.add(thread_id="thread-1", messages=_conversation())
+
+    assert worker_a._claim_next(force=True) is not None
+    assert worker_b._claim_next(force=True) is None
+
+
+def test_expired_lease_is_reclaimed(db_path) -> None:
+    crashed = _make_queue(db_path, lease_seconds=-1)
+    crashed.add(thread_id="thread-1", messages=_conversation())
+    assert crashed._claim_next(force=True) is not None
+
+    survivor = _make_queue(db_path)
+    claimed = survivor._claim_next(force=True)
+    assert claimed is not None
+    survivor._ack(claimed[0])
+    assert survivor.pending_count == 0
+
+
+def test_same_memory_file_is_not_leased_to_two_workers(db_path) -> None:
+    worker_a = _make_queue(db_path)
+    worker_b = _make_queue(db_path)
+    worker_a.add(thread_id="thread-1", messages=_conversation(), agent_name="research")
+    worker_a.add(thread_id="thread-2", messages=_conversation(), agent_name="research")
+    worker_a.add(thread_id="thread-3", messages=_conversation(), agent_name=None)
+
+    assert worker_a._claim_next(force=True)[1].thread_id == "thread-1"
+    # thread-2 writes the same agent memory file, so worker B must skip it.
+    assert worker_b._claim_next(force=True)[1].thread_id == "thread-3"
+    assert worker_b._claim_next(force=True) is None
+
+
+def test_ack_ignores_rows_leased_by_someone_else(db_path) -> None:
+    stale = _make_queue(db_path, lease_seconds=-1)
+    stale.add(thread_id="thread-1", messages=_conversation())
+    stale_id, _ = stale._claim_next(force=True)
+
+    current = _make_queue(db_path)
+    current_id, _ = current._claim_next(force=True)
+    assert current_id == stale_id
+
+    stale._ack(stale_id)
+    assert current.pending_count == 1
+
+
+def test_poison_update_is_dropped_after_max_attempts(db_path) -> None:
+    queue = _make_queue(db_path, lease_seconds=-1)
+    queue.add(thread_id="thread-1", messages=_conversation())
+
+    for _ in range(MAX_CLAIM_ATTEMPTS):
+        assert queue._claim_next(force=True) is not None
+
+    assert queue._claim_next(force=True) is None
+    assert queue.pending_count == 0
+
+
+def test_flush_processes_and_acknowledges_updates(db_path) -> None:
+    queue = _make_queue(db_path)
+    queue.add(thread_id="thread-1", messages=_conversation(), agent_name="lead_agent", correction_detected=True)
+    mock_updater = MagicMock()
+    mock_updater.update_memory.return_value = True
+
+    with patch("deerflow.agents.memory.updater.MemoryUpdater", return_value=mock_updater):
+        queue.flush()
+
+    mock_updater.update_memory.assert_called_once()
+    kwargs = mock_updater.update_memory.call_args.kwargs
+    assert kwargs["thread_id"] == "thread-1"
+    assert kwargs["agent_name"] == "lead_agent"
+    assert kwargs["correction_detected"] is True
+    assert queue.pending_count == 0
+
+
+def test_failed_update_is_still_acknowledged(db_path) -> None:
+    queue = _make_queue(db_path)
+    queue.add(thread_id="thread-1", messages=_conversation())
+    mock_updater = MagicMock()
+    mock_updater.update_memory.side_effect = RuntimeError("llm down")
+
+    with patch("deerflow.agents.memory.updater.MemoryUpdater", return_value=mock_updater):
+        queue.flush()
+
+    assert queue.pending_count == 0
+
+
+def test_get_memory_queue_selects_sqlite_backend(tmp_path, _memory_config) -> None:
+    from deerflow.agents.memory import queue as queue_module
+
+    _memory_config.queue_path = str(tmp_path / "q.db")
+    with (
+        patch.object(queue_module, "_memory_queue", None),
+        patch("deerflow.agents.memory.sqlite_queue.get_memory_config", return_value=_memory_config),
+    ):
+        assert isinstance(queue_module.get_memory_queue(), SqliteMemoryUpdateQueue)
+    assert (tmp_path / "q.db").exists()
@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+from deerflow.sandbox.local.local_sandbox import LocalSandbox, PathMapping
+from deerflow.sandbox.path_mapper import PathMapper, get_path_mapper
+
+
+def _reference_match(mappings: list[tuple[str, str]], path: str) -> tuple[str, str] | None:
+    for source, target in sorted(mappings, key=lambda item: len(item[0]), reverse=True):
+        if path == source or path.startswith(f"{source}/"):
+            return target, path[len(source) :].lstrip("/")
+    return None
+
+
+def test_match_agrees_with_longest_prefix_scan() -> None:
+    rng = random.Random(7)
+    segments = ["a", "ab", "b", "data", "x"]
+    mappings = [("/" + "/".join(rng.choice(segments) for _ in range(rng.randrange(1, 4))), f"/t{i}") for i in range(20)]
+    mappings = list(dict(reversed(mappings)).items())
+    mapper = PathMapper(mappings)
+
+    for _ in range(2000):
+        path = "/" + "/".join(rng.choice(segments) for _ in range(rng.randrange(0, 6)))
+        if rng.random() < 0.2:
+            path += "/"
+        match = mapper.match(path)
+        assert (None if match is None else (match.target, match.relative)) == _reference_match(mappings, path)
+
+
+def test_match_any_separator_accepts_both_styles() -> None:
+    mapper = PathMapper([("/host/data", "/mnt/data")], any_separator=True)
+
+    assert mapper.match("\\host\\data\\sub\\f.txt").relative == "sub\\f.txt"
+    assert mapper.match("/host/data").join() == "/mnt/data"
+    assert mapper.match("/host/database") is None
+
+
+def test_sub_prefers_longest_prefix_in_one_pass() -> None:
+    mapper = PathMapper([("/mnt/data", "/host/d"), ("/mnt/data/deep", "/other")], segment_boundary=True)
+
+    text = "cat /mnt/data/a.txt /mnt/data/deep/b.txt /mnt/data-extra/c; ls /mnt/data"
+    result = mapper.sub(text, lambda match: match.join())
+
+    assert result == "cat /host/d/a.txt /other/b.txt /mnt/data-extra/c; ls /host/d"
+
+
+def test_sub_without_boundary_matches_string_prefix() -> None:
+    mapper = PathMapper([("/tmp/ws", "/mnt/ws")], any_separator=True)
+
+    assert mapper.sub("see /tmp/ws, /tmp/ws\\a\\b and /tmp/ws/c", lambda match: match.join()) == "see /mnt/ws, /mnt/ws/a\\b and /mnt/ws/c"
+
+
+def test_empty_mapper_returns_input() -> None:
+    mapper = PathMapper([])
+
+    assert not mapper
+    assert mapper.match("/a") is None
+    assert mapper.sub("/a /b", lambda match: "x") == "/a /b"
+
+
+def test_get_path_mapper_is_shared_per_mapping_set() -> None:
+    mappings = (("/mnt/a", "/host/a"),)
+
+    assert get_path_mapper(mappings) is get_path_mapper(mappings)
+    assert get_path_mapper(mappings) is not get_path_mapper(mappings, segment_boundary=True)
+
+
+@pytest.mark.parametrize("read_only", [False, True])
+def test_local_sandbox_recompiles_when_mappings_change(tmp_path, read_only) -> None:
+    first = tmp_path / "first"
+    second = tmp_path / "second"
+    sandbox = LocalSandbox("t", path_mappings=[PathMapping(container_path="/mnt/data", local_path=str(first))])
+    assert sandbox._resolve_path("/mnt/data/x") == str(first / "x")
+
+    sandbox.path_mappings = [PathMapping(container_path="/mnt/data", local_path=str(second), read_only=read_only)]
+
+    assert sandbox._resolve_path("/mnt/data/x") == str(second / "x")
+    assert sandbox._reverse_resolve_paths_in_output(f"{second.resolve()}/x") == "/mnt/data/x"
+    assert sandbox._is_read_only_path(str(second / "x")) is read_only
@@ -0,0 +1,392 @@
+"""Provisioner Pod pool, watch-based readiness and batch listing against a fake Kubernetes API."""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import uvicorn
+from fastapi.testclient import TestClient
+from kubernetes import client as k8s_client
+
+from deerflow.community.aio_sandbox.remote_backend import RemoteSandboxBackend
+from deerflow.community.aio_sandbox.sandbox_info import SandboxInfo
+
+NAMESPACE = "deer-flow"
+
+
+def _load_provisioner_module():
+    """Load docker/provisioner/app.py as an importable test module."""
+    repo_root = Path(__file__).resolve().parents[2]
+    module_path = repo_root / "docker" / "provisioner" / "app.py"
+    spec = importlib.util.spec_from_file_location("provisioner_app_pool_test", module_path)
+    assert spec is not None
+    assert spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            pytest.fail("condition not reached in time")
+        time.sleep(0.01)
+
+
+def _matches(labels: dict, selector: str | None) -> bool:
+    for term in filter(None, (selector or "").split(",")):
+        key, _, value = term.partition("=")
+        if labels.get(key) != value:
+            return False
+    return True
+
+
+class _FakeKubernetes(ThreadingHTTPServer):
+    """Pods and Services of one namespace, with watch streams and a fake kubelet.
+
+    A created Pod turns Running and Ready after ``ready_delay`` seconds.
+    Patches that carry a stale ``metadata.resourceVersion`` fail with 409,
+    as on a real API server.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, ready_delay: float = 0.05):
+        self.ready_delay = ready_delay
+        self.pods: dict[str, dict] = {}
+        self.services: dict[str, dict] = {}
+        self.requests: list[tuple[str, str]] = []
+        self.lock = threading.Lock()
+        self._version = 0
+        self._events: list[tuple[int, str, dict]] = []
+        self._watchers: list[queue.Queue] = []
+        self._node_port = 30000
+        super().__init__(("127.0.0.1", 0), _FakeKubernetesHandler)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def bump(self, event_type: str, pod: dict) -> None:
+        """Record a Pod change (lock held) and push it to every watch."""
+        self._version += 1
+        pod["metadata"]["resourceVersion"] = str(self._version)
+        event = (self._version, event_type, json.loads(json.dumps(pod)))
+        self._events.append(event)
+        for watcher in self._watchers:
+            watcher.put(event)
+
+    def add_pod(self, pod: dict) -> None:
+        pod.setdefault("status", {})["phase"] = "Pending"
+        self.pods[pod["metadata"]["name"]] = pod
+        self.bump("ADDED", pod)
+        threading.Timer(self.ready_delay, self._kubelet_start, [pod["metadata"]["name"]]).start()
+
+    def _kubelet_start(self, name: str) -> None:
+        with self.lock:
+            pod = self.pods.get(name)
+            if pod is None:
+                return
+            pod["status"] = {"phase": "Running", "conditions": [{"type": "Ready", "status": "True"}]}
+            self.bump("MODIFIED", pod)
+
+    def watch(self, since: int) -> queue.Queue:
+        watcher: queue.Queue = queue.Queue()
+        with self.lock:
+            for event in self._events:
+                if event[0] > since:
+                    watcher.put(event)
+            self._watchers.append(watcher)
+        return watcher
+
+    def watching(self) -> bool:
+        with self.lock:
+            return bool(self._watchers)
+
+    def close_watches(self) -> None:
+        with self.lock:
+            for watcher in self._watchers:
+                watcher.put(None)
+            self._watchers.clear()
+
+
+class _FakeKubernetesHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _FakeKubernetes
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def _reply(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _status(self, code: int, reason: str) -> None:
+        self._reply(code, {"kind": "Status", "apiVersion": "v1", "status": "Failure", "reason": reason, "message": reason, "code": code})
+
+    def _stream_watch(self, since: int) -> None:
+        # The stream stays open until the fake shuts down (timeoutSeconds is
+        # ignored), so a watch never reconnects and re-lists during a test.
+        watcher = self.server.watch(since)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            while (event := watcher.get()) is not None:
+                line = json.dumps({"type": event[1], "object": event[2]}).encode() + b"\n"
+                self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except OSError:
+            pass
+
+    def _route(self, method: str) -> None:
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        parts = url.path.strip("/").split("/")  # api v1 namespaces <ns> <kind> [<name>]
+        kind, name = parts[4], parts[5] if len(parts) > 5 else None
+        server = self.server
+        if query.get("watch", "").lower() == "true":
+            server.requests.append(("WATCH", url.path))
+            return self._stream_watch(int(query.get("resourceVersion") or 0))
+        with server.lock:
+            server.requests.append((method, url.path))
+            store = server.pods if kind == "pods" else server.services
+            if name is None and method == "GET":
+                items = [obj for obj in store.values() if _matches(obj["metadata"].get("labels") or {}, query.get("labelSelector"))]
+                return self._reply(200, {"kind": "List", "apiVersion": "v1", "metadata": {"resourceVersion": str(server._version)}, "items": items})
+            if name is None and method == "POST":
+                name = body["metadata"]["name"]
+                if name in store:
+                    return self._status(409, "AlreadyExists")
+                if kind == "pods":
+                    server.add_pod(body)
+                else:
+                    server._node_port += 1
+                    body["spec"]["ports"][0]["nodePort"] = server._node_port
+                    store[name] = body
+                return self._reply(201, body)
+            if name not in store:
+                return self._status(404, "NotFound")
+            if method == "GET":
+                return self._reply(200, store[name])
+            if method == "DELETE":
+                obj = store.pop(name)
+                if kind == "pods":
+                    server.bump("DELETED", obj)
+                return self._reply(200, obj)
+            if method == "PATCH":
+                pod = store[name]
+                expected = body["metadata"].get("resourceVersion")
+                if expected is not None and expected != pod["metadata"]["resourceVersion"]:
+                    return self._status(409, "Conflict")
+                for field in ("labels", "annotations"):
+                    pod["metadata"].setdefault(field, {}).update(body["metadata"].get(field) or {})
+                server.bump("MODIFIED", pod)
+                return self._reply(200, pod)
+            return self._status(405, "MethodNotAllowed")
+
+    def do_GET(self) -> None:  # noqa: N802
+        self._route("GET")
+
+    def do_POST(self) -> None:  # noqa: N802
+        self._route("POST")
+
+    def do_PATCH(self) -> None:  # noqa: N802
+        self._route("PATCH")
+
+    def do_DELETE(self) -> None:  # noqa: N802
+        self._route("DELETE")
+
+
+@pytest.fixture()
+def kube():
+    server = _FakeKubernetes()
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True).start()
+    try:
+        yield server
+    finally:
+        server.close_watches()
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture()
+def provisioner(kube):
+    """The provisioner module wired to the fake API, with its watch cache running."""
+    module = _load_provisioner_module()
+    module.THREADS_HOST_PATH = "/data/.deer-flow/threads"
+    module.core_v1 = k8s_client.CoreV1Api(k8s_client.ApiClient(k8s_client.Configuration(host=kube.url)))
+    module.pod_cache = module.PodCache()
+    module.pod_cache.start()
+    # start() returns once the Pods are listed; wait for the watch request too, so it never lands in a test's request log.
+    _wait_for(kube.watching)
+    yield module
+    if module.pod_pool is not None:
+        module.pod_pool.stop()
+    module.pod_cache.stop()
+
+
+def _start_pool(module, size: int):
+    module.pod_pool = module.PodPool(module.pod_cache, size)
+    module.pod_pool.start()
+    _wait_for(lambda: sum(module._is_pod_ready(pod) for pod in module.pod_cache.idle_pool_pods()) == size)
+    return module.pod_pool
+
+
+def test_pool_pods_are_unselected_and_mount_their_slot(provisioner, kube) -> None:
+    _start_pool(provisioner, 2)
+
+    pods = list(kube.pods.values())
+    assert len(pods) == 2
+    for pod in pods:
+        labels = pod["metadata"]["labels"]
+        assert "sandbox-id" not in labels and labels["deer-flow.io/pool"] == "idle"
+        user_data = next(v for v in pod["spec"]["volumes"] if v["name"] == "user-data")
+        assert user_data["hostPath"]["path"] == f"/data/.deer-flow/sandbox-pool/{labels['deer-flow.io/pool-slot']}/user-data"
+
+
+def test_claim_hands_out_a_ready_pod_and_the_pool_refills(provisioner, kube) -> None:
+    _start_pool(provisioner, 1)
+    client = TestClient(provisioner.app)
+
+    resp = client.post("/api/sandboxes/claim", json={"sandbox_id": "sb1", "thread_id": "t1", "wait_ready": True})
+
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["ready"] is True and data["status"] == "Running"
+    pod = kube.pods[f"sandbox-{data['pool_slot']}"]
+    assert pod["metadata"]["labels"]["sandbox-id"] == "sb1"
+    assert pod["metadata"]["annotations"]["deer-flow.io/thread-id"] == "t1"
+    service = kube.services["sandbox-sb1-svc"]
+    assert service["spec"]["selector"] == {"sandbox-id": "sb1"}
+    assert data["sandbox_url"].endswith(f":{service['spec']['ports'][0]['nodePort']}")
+    _wait_for(lambda: len(provisioner.pod_cache.idle_pool_pods()) == 1)
+
+    assert client.get("/api/sandboxes/sb1").json()["ready"] is True
+
+
+def test_claim_with_stale_view_loses_to_the_first_claimer(provisioner, kube) -> None:
+    pool = provisioner.PodPool(provisioner.pod_cache, 1)
+    pool._fill()
+    _wait_for(lambda: any(provisioner._is_pod_ready(pod) for pod in provisioner.pod_cache.idle_pool_pods()))
+    stale = provisioner.pod_cache.idle_pool_pods()[0]
+
+    assert pool.claim("sb1", "t1") is not None
+    # Another replica still sees the Pod as idle.
+    provisioner.pod_cache.apply("MODIFIED", stale)
+
+    assert pool.claim("sb2", "t2") is None
+    assert kube.pods[stale.metadata.name]["metadata"]["labels"]["sandbox-id"] == "sb1"
+
+
+def test_claim_retries_when_the_pod_changed_but_is_still_idle(provisioner, kube) -> None:
+    kube.ready_delay = 0.3
+    pool = provisioner.PodPool(provisioner.pod_cache, 1)
+    pool._fill()
+    _wait_for(lambda: len(provisioner.pod_cache.idle_pool_pods()) == 1)
+    pending = provisioner.pod_cache.idle_pool_pods()[0]
+    _wait_for(lambda: provisioner._is_pod_ready(provisioner.pod_cache.idle_pool_pods()[0]))
+    provisioner.pod_cache.apply("MODIFIED", pending)  # Cache has not seen it become Ready.
+
+    claimed = pool.claim("sb1", "t1")
+
+    assert claimed.metadata.labels["sandbox-id"] == "sb1"
+
+
+def test_claim_is_404_without_a_pool(provisioner) -> None:
+    resp = TestClient(provisioner.app).post("/api/sandboxes/claim", json={"sandbox_id": "sb1", "thread_id": "t1"})
+
+    assert resp.status_code == 404
+
+
+def test_create_waits_for_readiness_from_the_watch(provisioner, kube) -> None:
+    kube.ready_delay = 0.3
+    kube.requests.clear()
+
+    started = time.monotonic()
+    resp = TestClient(provisioner.app).post("/api/sandboxes", json={"sandbox_id": "sb1", "thread_id": "t1", "wait_ready": True})
+
+    assert resp.json()["ready"] is True
+    assert time.monotonic() - started >= 0.3
+    # No Pod reads: readiness came from the watch stream.
+    assert not [path for method, path in kube.requests if method == "GET" and "/pods" in path]
+
+
+def test_list_is_one_service_call(provisioner, kube) -> None:
+    client = TestClient(provisioner.app)
+    for i in range(3):
+        client.post("/api/sandboxes", json={"sandbox_id": f"sb{i}", "thread_id": f"t{i}", "wait_ready": True})
+    kube.requests.clear()
+
+    data = client.get("/api/sandboxes").json()
+
+    assert data["count"] == 3
+    assert all(sandbox["status"] == "Running" for sandbox in data["sandboxes"])
+    assert kube.requests == [("GET", f"/api/v1/namespaces/{NAMESPACE}/services")]
+
+
+def test_destroy_removes_the_claimed_pool_pod(provisioner, kube) -> None:
+    _start_pool(provisioner, 1)
+    provisioner.pod_pool.stop()
+    client = TestClient(provisioner.app)
+    slot = client.post("/api/sandboxes/claim", json={"sandbox_id": "sb1", "thread_id": "t1"}).json()["pool_slot"]
+
+    assert client.delete("/api/sandboxes/sb1").json()["ok"] is True
+
+    assert f"sandbox-{slot}" not in kube.pods
+    assert kube.services == {}
+    _wait_for(lambda: provisioner.pod_cache.find("sb1") is None)
+
+
+# ── RemoteSandboxBackend against the provisioner ─────────────────────────────
+
+
+@pytest.fixture()
+def remote_backend(provisioner):
+    server = uvicorn.Server(uvicorn.Config(provisioner.app, host="127.0.0.1", port=0, lifespan="off", ws="none", log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    _wait_for(lambda: server.started)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    yield RemoteSandboxBackend(f"http://127.0.0.1:{port}")
+    server.should_exit = True
+    thread.join(timeout=5)
+
+
+def test_remote_backend_claims_pool_pods_until_empty(provisioner, remote_backend, kube) -> None:
+    _start_pool(provisioner, 1)
+    provisioner.pod_pool.stop()  # No refill, so the second claim finds the pool empty.
+
+    info, slot_id = remote_backend.claim_pooled("t1", "sb1")
+
+    assert info.sandbox_id == "sb1"
+    assert kube.pods[f"sandbox-{slot_id}"]["metadata"]["labels"]["sandbox-id"] == "sb1"
+    assert remote_backend.claim_pooled("t2", "sb2") is None
+
+
+def test_remote_backend_checks_liveness_in_one_call(provisioner, remote_backend, kube) -> None:
+    infos = [remote_backend.create(f"t{i}", f"sb{i}") for i in range(3)]
+    remote_backend.destroy(infos[1])
+    kube.requests.clear()
+
+    alive = remote_backend.alive_sandboxes(infos + [SandboxInfo(sandbox_id="gone", sandbox_url="")])
+
+    assert alive == {"sb0", "sb2"}
+    assert kube.requests == [("GET", f"/api/v1/namespaces/{NAMESPACE}/services")]
@@ -0,0 +1,94 @@
+"""In-place append and exact-string patch on LocalSandbox and through str_replace."""
+
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from deerflow.sandbox.local.local_sandbox import LocalSandbox, PathMapping
+from deerflow.sandbox.tools import str_replace_tool
+
+
+def test_replace_in_file_patches_first_occurrence_in_place(tmp_path) -> None:
+    path = tmp_path / "app.py"
+    path.write_text("alpha = 1\nalpha = 2\n", encoding="utf-8")
+    inode = os.stat(path).st_ino
+
+    assert LocalSandbox("t").replace_in_file(str(path), "alpha", "omega") == 1
+
+    assert path.read_text(encoding="utf-8") == "omega = 1\nalpha = 2\n"
+    assert os.stat(path).st_ino == inode
+
+
+def test_replace_in_file_replace_all_counts_and_handles_shorter_and_unicode_text(tmp_path) -> None:
+    path = tmp_path / "notes.md"
+    path.write_text("— long word —\n— long word —\ntail\n", encoding="utf-8")
+
+    assert LocalSandbox("t").replace_in_file(str(path), "long word", "x", replace_all=True) == 2
+
+    assert path.read_text(encoding="utf-8") == "— x —\n— x —\ntail\n"
+
+
+def test_replace_in_file_leaves_file_untouched_when_not_found(tmp_path) -> None:
+    path = tmp_path / "app.py"
+    path.write_text("alpha\n", encoding="utf-8")
+    os.utime(path, (1, 1))
+
+    assert LocalSandbox("t").replace_in_file(str(path), "missing", "x") == 0
+
+    assert os.stat(path).st_mtime == 1
+
+
+def test_replace_in_file_keeps_text_mode_semantics_for_crlf_files(tmp_path) -> None:
+    path = tmp_path / "win.txt"
+    path.write_bytes(b"one\r\ntwo\r\n")
+
+    assert LocalSandbox("t").replace_in_file(str(path), "one\ntwo", "three") == 1
+
+    assert path.read_text(encoding="utf-8") == "three\n"
+
+
+def test_replace_in_file_errors_use_virtual_path(tmp_path) -> None:
+    (tmp_path / "ro").mkdir()
+    (tmp_path / "ro" / "file.txt").write_text("alpha\n", encoding="utf-8")
+    sandbox = LocalSandbox("t", path_mappings=[PathMapping(container_path="/mnt/ro", local_path=str(tmp_path / "ro"), read_only=True)])
+
+    with pytest.raises(FileNotFoundError, match="/mnt/ro/missing.txt"):
+        sandbox.replace_in_file("/mnt/ro/missing.txt", "a", "b")
+    with pytest.raises(OSError, match="Read-only"):
+        sandbox.replace_in_file("/mnt/ro/file.txt", "alpha", "beta")
+    assert sandbox.replace_in_file("/mnt/ro/file.txt", "missing", "beta") == 0
+
+
+def test_append_file_appends_in_place(tmp_path) -> None:
+    path = tmp_path / "log" / "run.log"
+    sandbox = LocalSandbox("t")
+
+    sandbox.append_file(str(path), "first\n")
+    sandbox.append_file(str(path), "second\n")
+
+    assert path.read_text(encoding="utf-8") == "first\nsecond\n"
+
+
+def test_str_replace_tool_uses_sandbox_patch(monkeypatch) -> None:
+    calls = []
+
+    class PatchingSandbox:
+        id = "sandbox-1"
+
+        def replace_in_file(self, path, old_str, new_str, *, replace_all=False):
+            calls.append((path, old_str, new_str, replace_all))
+            return 0 if old_str == "missing" else 1
+
+        def read_file(self, path):
+            raise AssertionError("str_replace must not read the whole file")
+
+    runtime = SimpleNamespace(state={}, context={"thread_id": "thread-1"}, config={})
+    monkeypatch.setattr("deerflow.sandbox.tools.ensure_sandbox_initialized", lambda runtime: PatchingSandbox())
+    monkeypatch.setattr("deerflow.sandbox.tools.ensure_thread_directories_exist", lambda runtime: None)
+    monkeypatch.setattr("deerflow.sandbox.tools.is_local_sandbox", lambda runtime: False)
+    path = "/mnt/user-data/workspace/app.py"
+
+    assert str_replace_tool.func(runtime=runtime, description="d", path=path, old_str="a", new_str="b", replace_all=True) == "OK"
+    assert str_replace_tool.func(runtime=runtime, description="d", path=path, old_str="missing", new_str="b") == f"Error: String to replace not found in file: {path}"
+    assert calls == [(path, "a", "b", True), (path, "missing", "b", False)]
@@ -0,0 +1,194 @@
+"""Equivalence tests for the parallel search engine in deerflow.sandbox.search.
+
+The reference implementation below is the original single-threaded
+os.walk + line-by-line scanner. The engine must return exactly the same
+matches, in the same order, with the same truncation, whichever backend runs.
+"""
+
+import fnmatch
+import os
+import re
+import shutil
+from pathlib import Path
+
+import pytest
+
+from deerflow.sandbox import search
+from deerflow.sandbox.search import (
+    IGNORE_PATTERNS,
+    GrepMatch,
+    find_glob_matches,
+    find_grep_matches,
+    is_binary_file,
+    path_matches,
+    should_ignore_name,
+    truncate_line,
+)
+
+
+def _reference_should_ignore_name(name: str) -> bool:
+    return any(fnmatch.fnmatch(name, pattern) for pattern in IGNORE_PATTERNS)
+
+
+def _reference_grep(root: Path, pattern: str, *, glob_pattern=None, literal=False, case_sensitive=False, max_results=100, max_file_size=1_000_000, line_summary_length=200):
+    matches = []
+    root = root.resolve()
+    regex = re.compile(re.escape(pattern) if literal else pattern, 0 if case_sensitive else re.IGNORECASE)
+    max_line_chars = line_summary_length * 10
+    for current_root, dirs, files in os.walk(root):
+        dirs[:] = [name for name in dirs if not _reference_should_ignore_name(name)]
+        rel_dir = Path(current_root).relative_to(root)
+        for name in files:
+            if _reference_should_ignore_name(name):
+                continue
+            candidate_path = Path(current_root) / name
+            if glob_pattern is not None and not path_matches(glob_pattern, (rel_dir / name).as_posix()):
+                continue
+            try:
+                if candidate_path.is_symlink():
+                    continue
+                file_path = candidate_path.resolve()
+                if file_path.stat().st_size > max_file_size or is_binary_file(file_path):
+                    continue
+                with file_path.open(encoding="utf-8", errors="replace") as handle:
+                    for line_number, line in enumerate(handle, start=1):
+                        if len(line) > max_line_chars:
+                            continue
+                        if regex.search(line):
+                            matches.append(GrepMatch(str(file_path), line_number, truncate_line(line, line_summary_length)))
+                            if len(matches) >= max_results:
+                                return matches, True
+            except OSError:
+                continue
+    return matches, False
+
+
+def _reference_glob(root: Path, pattern: str, *, include_dirs=False, max_results=200):
+    matches = []
+    root = root.resolve()
+    for current_root, dirs, files in os.walk(root):
+        dirs[:] = [name for name in dirs if not _reference_should_ignore_name(name)]
+        rel_dir = Path(current_root).relative_to(root)
+        names = (dirs if include_dirs else []) + [name for name in files if not _reference_should_ignore_name(name)]
+        for name in names:
+            if path_matches(pattern, (rel_dir / name).as_posix()):
+                matches.append(str(Path(current_root) / name))
+                if len(matches) >= max_results:
+                    return matches, True
+    return matches, False
+
+
+@pytest.fixture
+def corpus(tmp_path) -> Path:
+    root = tmp_path / "corpus"
+    for pkg in range(4):
+        pkg_dir = root / f"pkg{pkg}" / "sub"
+        pkg_dir.mkdir(parents=True)
+        for i in range(6):
+            lines = [f"def func_{pkg}_{i}_{n}():  # TODO item {n}" if n % 7 == 0 else f"    value = {n} * {i}  # Kelvin K strasse STRAßE" for n in range(40)]
+            (pkg_dir / f"mod{i}.py").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        (root / f"pkg{pkg}" / "README.md").write_text("TODO: document\nIstanbul İstanbul ıstanbul\n", encoding="utf-8")
+    (root / "crlf.txt").write_bytes(b"first TODO\r\nsecond\r\nthird todo\rfourth\r\n")
+    (root / "latin1.txt").write_bytes(b"caf\xe9 TODO\n\xff\xfe broken\n")
+    (root / "binary.bin").write_bytes(b"TODO\x00\x01\x02")
+    (root / "long.txt").write_text("x" * 5000 + " TODO\nshort TODO\n", encoding="utf-8")
+    (root / "no_newline.txt").write_text("ends without newline TODO", encoding="utf-8")
+    (root / "empty.txt").write_text("", encoding="utf-8")
+    (root / "node_modules" / "dep").mkdir(parents=True)
+    (root / "node_modules" / "dep" / "index.js").write_text("TODO ignored\n", encoding="utf-8")
+    (root / "app.log").write_text("TODO ignored log\n", encoding="utf-8")
+    (root / "big.txt").write_text("TODO\n" * 50, encoding="utf-8")
+    return root
+
+
+GREP_CASES = [
+    ("TODO", {}),
+    ("todo", {}),
+    ("todo", {"case_sensitive": True}),
+    ("TODO", {"literal": True}),
+    ("func_1_.*\\(", {}),
+    ("^def", {}),
+    ("^\\s+value", {}),
+    ("\\)$", {}),
+    ("item 7$", {}),
+    ("(?<=# )TODO", {}),
+    ("\\ATODO", {}),
+    ("TODO\\Z", {}),
+    ("o\\s+f", {}),
+    ("istanbul", {}),
+    ("k", {"literal": True}),
+    ("strasse", {}),
+    ("caf", {}),
+    ("�", {}),
+    ("TODO", {"glob_pattern": "**/*.py"}),
+    ("TODO", {"max_results": 5}),
+    ("TODO", {"max_results": 1}),
+    ("value", {"max_results": 37}),
+    ("x*", {"max_results": 500}),
+    ("a.b", {"literal": True}),
+    ("TODO", {"max_file_size": 100}),
+]
+
+
+@pytest.mark.parametrize(("pattern", "kwargs"), GREP_CASES)
+def test_grep_matches_reference_without_ripgrep(corpus, pattern, kwargs) -> None:
+    assert find_grep_matches(corpus, pattern, use_ripgrep=False, **kwargs) == _reference_grep(corpus, pattern, **kwargs)
+
+
+@pytest.mark.skipif(shutil.which("rg") is None, reason="ripgrep not installed")
+@pytest.mark.parametrize(("pattern", "kwargs"), GREP_CASES)
+def test_grep_matches_reference_with_ripgrep(corpus, pattern, kwargs, monkeypatch) -> None:
+    # Consult rg from the first file so the small corpus exercises the prefilter.
+    monkeypatch.setattr(search, "_RG_AFTER_FILES", 0)
+    assert find_grep_matches(corpus, pattern, use_ripgrep=True, **kwargs) == _reference_grep(corpus, pattern, **kwargs)
+
+
+@pytest.mark.parametrize(
+    ("pattern", "kwargs"),
+    [("**/*.py", {}), ("*.txt", {}), ("**/sub", {"include_dirs": True}), ("**/*", {"max_results": 7}), ("pkg*/README.md", {})],
+)
+def test_glob_matches_reference(corpus, pattern, kwargs) -> None:
+    assert find_glob_matches(corpus, pattern, **kwargs) == _reference_glob(corpus, pattern, **kwargs)
+
+
+@pytest.mark.parametrize("name", ["node_modules", ".git", "pkg.egg-info", "notes.swp", "x~", "app.log", "src", "main.py", "logs", "log", "Build"])
+def test_compiled_ignore_matcher_agrees_with_fnmatch(name) -> None:
+    assert should_ignore_name(name) == _reference_should_ignore_name(name)
+
+
+def test_ripgrep_pattern_only_for_provably_safe_patterns() -> None:
+    assert search._ripgrep_pattern("TODO", literal=False, case_sensitive=True) == "TODO"
+    assert search._ripgrep_pattern("a.b", literal=True, case_sensitive=True) == "a\\x{2E}b"
+    assert search._ripgrep_pattern("kiss", literal=True, case_sensitive=False) == "[kK\\x{212A}][iI\\x{130}\\x{131}][sS\\x{17F}][sS\\x{17F}]"
+    # Regex syntax, line breaks and non-ASCII case-insensitive literals are left to Python.
+    assert search._ripgrep_pattern("a.b", literal=False, case_sensitive=True) is None
+    assert search._ripgrep_pattern("a\nb", literal=True, case_sensitive=True) is None
+    assert search._ripgrep_pattern("straße", literal=True, case_sensitive=False) is None
+    assert search._ripgrep_pattern("straße", literal=True, case_sensitive=True) == "straße"
+
+
+def test_grep_falls_back_to_full_scan_when_ripgrep_fails(corpus, monkeypatch) -> None:
+    monkeypatch.setattr(search, "_RG_AFTER_FILES", 0)
+    monkeypatch.setattr(search, "_ripgrep_path", lambda: "rg")
+    monkeypatch.setattr(search, "_ripgrep_candidates", lambda *args, **kwargs: None)
+
+    assert find_grep_matches(corpus, "TODO", use_ripgrep=True) == _reference_grep(corpus, "TODO")
+
+
+def test_grep_only_scans_ripgrep_candidates_after_warmup(corpus, monkeypatch) -> None:
+    monkeypatch.setattr(search, "_RG_AFTER_FILES", 0)
+    monkeypatch.setattr(search, "_ripgrep_path", lambda: "rg")
+    monkeypatch.setattr(search, "_ripgrep_candidates", lambda *args, **kwargs: {str(corpus.resolve() / "crlf.txt")})
+
+    matches, truncated = find_grep_matches(corpus, "TODO", use_ripgrep=True)
+
+    assert {m.path for m in matches} == {str(corpus.resolve() / "crlf.txt")}
+    assert truncated is False
+
+
+def test_grep_skips_ripgrep_when_disabled(corpus, monkeypatch) -> None:
+    monkeypatch.setattr(search, "_RG_AFTER_FILES", 0)
+    monkeypatch.setattr(search, "_ripgrep_path", lambda: "rg")
+    monkeypatch.setattr(search, "_ripgrep_candidates", lambda *args, **kwargs: pytest.fail("ripgrep should not run"))
+
+    assert find_grep_matches(corpus, "TODO", use_ripgrep=False) == _reference_grep(corpus, "TODO")
@@ -0,0 +1,198 @@
+import os
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from deerflow.config.paths import Paths
+from deerflow.sandbox import search_index
+from deerflow.sandbox.local.local_sandbox import LocalSandbox
+from deerflow.sandbox.search import find_grep_matches
+from deerflow.sandbox.search_index import WorkspaceSearchIndex, file_tokens, may_contain, required_fragments
+from deerflow.sandbox.tools import grep_tool, str_replace_tool, write_file_tool
+
+# Old enough that index entries are trusted (outside the racy window).
+_OLD_MTIME = time.time() - 3600
+
+
+def _age(*paths) -> None:
+    for path in paths:
+        os.utime(path, (_OLD_MTIME, _OLD_MTIME))
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    root = tmp_path / "user-data"
+    src = root / "workspace" / "src"
+    src.mkdir(parents=True)
+    for i in range(10):
+        body = "".join(f"def handler_{i}_{n}(request):\n    return Response({n})\n" for n in range(20))
+        (src / f"mod{i}.py").write_text(body, encoding="utf-8")
+    (src / "marker.py").write_text("# FIXME: rare marker\nSTRAßE = 'ſtrasse'\n", encoding="utf-8")
+    (src / "kelvin.txt").write_text("temperature 300K\n", encoding="utf-8")
+    (src / "data.bin").write_bytes(b"FIXME\0\1\2")
+    _age(*root.rglob("*"))
+    return root
+
+
+@pytest.mark.parametrize(
+    ("pattern", "literal", "expected"),
+    [
+        ("FIXME", True, (b"fixme",)),
+        ("a.b", True, ()),
+        ("handler_1_.*Response", False, (b"handler_1_", b"response")),
+        ("colou?r", False, (b"colo",)),
+        ("abc+def", False, (b"abc", b"def")),
+        ("x{2,3}yyyz", False, (b"yyyz",)),
+        ("\\bfoo\\.bar\\b", False, (b"bar", b"foo")),
+        ("[abc]def", False, (b"def",)),
+        ("(foo|bar)baz", False, ()),
+        ("\\x41BCDEF", False, ()),
+        ("st(?=rasse)", False, ()),
+        ("café crème", True, (b"caf",)),
+    ],
+)
+def test_required_fragments(pattern, literal, expected) -> None:
+    assert required_fragments(pattern, literal=literal) == expected
+
+
+def test_file_tokens_fold_non_ascii_case_variants() -> None:
+    tokens = file_tokens("300Kelvin ſtrasse İstanbul".encode())
+
+    assert may_contain(tokens, (b"kelvin", b"strasse", b"istanbul"))
+    assert file_tokens(b"FIXME\0binary") == b""
+
+
+@pytest.mark.parametrize(
+    ("pattern", "kwargs"),
+    [
+        ("FIXME", {}),
+        ("fixme", {"case_sensitive": True}),
+        ("strasse", {}),
+        ("STRAßE", {"literal": True, "case_sensitive": True}),
+        ("kelvin|300k", {}),
+        ("300k", {}),
+        ("handler_3_1\\d", {}),
+        ("Response\\(1[0-9]\\)", {"case_sensitive": True}),
+        ("return", {"max_results": 7}),
+        ("nothing_matches_this", {}),
+    ],
+)
+def test_grep_with_index_matches_plain_grep_cold_and_warm(workspace, pattern, kwargs) -> None:
+    index = WorkspaceSearchIndex(workspace, workspace.parent / "index.db")
+    expected = find_grep_matches(workspace, pattern, use_ripgrep=False, **kwargs)
+
+    assert find_grep_matches(workspace, pattern, use_ripgrep=False, index=index, **kwargs) == expected
+    assert len(index) > 0
+    assert find_grep_matches(workspace, pattern, use_ripgrep=False, index=index, **kwargs) == expected
+
+
+def test_warm_index_skips_files_without_reading_them(workspace) -> None:
+    index = WorkspaceSearchIndex(workspace)
+    find_grep_matches(workspace, "FIXME", index=index)
+
+    # Rewrite a file behind the index's back, keeping size and mtime.
+    mod0 = workspace / "workspace" / "src" / "mod0.py"
+    content = mod0.read_text(encoding="utf-8")
+    mod0.write_text(content.replace("Response", "FIXME___"), encoding="utf-8")
+    _age(mod0)
+
+    matches, _ = find_grep_matches(workspace, "FIXME", index=index)
+
+    assert {m.path for m in matches} == {str(workspace.resolve() / "workspace" / "src" / "marker.py")}
+
+
+def test_changed_file_is_reindexed(workspace) -> None:
+    index = WorkspaceSearchIndex(workspace)
+    find_grep_matches(workspace, "FIXME", index=index)
+
+    mod0 = workspace / "workspace" / "src" / "mod0.py"
+    mod0.write_text("# FIXME: new marker\n", encoding="utf-8")
+    _age(mod0)
+
+    matches, _ = find_grep_matches(workspace, "FIXME", index=index)
+
+    assert str(mod0.resolve()) in {m.path for m in matches}
+
+
+def test_recently_modified_files_are_not_indexed(workspace) -> None:
+    index = WorkspaceSearchIndex(workspace)
+    (workspace / "workspace" / "fresh.py").write_text("FIXME fresh\n", encoding="utf-8")
+
+    find_grep_matches(workspace, "FIXME", index=index)
+
+    assert len(index) == 13
+
+
+def test_index_persists_and_ignores_files_outside_root(workspace, tmp_path) -> None:
+    db_path = tmp_path / "index.db"
+    index = WorkspaceSearchIndex(workspace / "workspace", db_path)
+    find_grep_matches(workspace / "workspace", "FIXME", index=index)
+    find_grep_matches(workspace.parent, "FIXME", use_ripgrep=False, index=index)
+
+    reloaded = WorkspaceSearchIndex(workspace / "workspace", db_path)
+
+    assert len(reloaded) == 13
+    marker = workspace.resolve() / "workspace" / "src" / "marker.py"
+    stat = marker.stat()
+    assert may_contain(reloaded.lookup(str(marker), stat.st_size, stat.st_mtime_ns), (b"fixme",))
+
+
+def test_index_is_bounded_and_evicts_least_recently_used(workspace) -> None:
+    index = WorkspaceSearchIndex(workspace, max_bytes=2000)
+
+    find_grep_matches(workspace, "FIXME", index=index)
+
+    assert 0 < len(index) < 13
+    assert index.size_bytes <= 2000
+
+
+def test_corrupt_index_file_is_rebuilt(workspace, tmp_path) -> None:
+    db_path = tmp_path / "index.db"
+    db_path.write_bytes(b"not a database")
+    index = WorkspaceSearchIndex(workspace, db_path)
+
+    assert find_grep_matches(workspace, "FIXME", index=index) == find_grep_matches(workspace, "FIXME")
+    index.save()
+    assert len(WorkspaceSearchIndex(workspace, db_path)) == 13
+
+
+def _thread_runtime(base_dir, thread_id: str = "thread-idx"):
+    paths = Paths(base_dir)
+    paths.ensure_thread_dirs(thread_id)
+    return SimpleNamespace(
+        state={
+            "sandbox": {"sandbox_id": "local"},
+            "thread_data": {
+                "workspace_path": str(paths.sandbox_work_dir(thread_id)),
+                "uploads_path": str(paths.sandbox_uploads_dir(thread_id)),
+                "outputs_path": str(paths.sandbox_outputs_dir(thread_id)),
+            },
+        },
+        context={"thread_id": thread_id},
+    ), paths
+
+
+def test_file_tools_keep_thread_index_current(tmp_path, monkeypatch) -> None:
+    runtime, paths = _thread_runtime(tmp_path)
+    config = SimpleNamespace(sandbox=SimpleNamespace(search_index_enabled=True, search_index_max_mb=1), get_tool_config=lambda name: None)
+    monkeypatch.setattr("deerflow.sandbox.tools.get_app_config", lambda: config)
+    monkeypatch.setattr("deerflow.sandbox.tools.ensure_sandbox_initialized", lambda runtime: LocalSandbox(id="local"))
+    monkeypatch.setattr(search_index, "_indexes", search_index.OrderedDict())
+
+    with patch("deerflow.config.paths.get_paths", return_value=paths):
+        assert write_file_tool.func(runtime=runtime, description="d", path="/mnt/user-data/workspace/app.py", content="alpha = 1\n") == "OK"
+        index = search_index.get_thread_search_index("thread-idx", paths.sandbox_user_data_dir("thread-idx"))
+        assert len(index) == 1
+
+        assert str_replace_tool.func(runtime=runtime, description="d", path="/mnt/user-data/workspace/app.py", old_str="alpha", new_str="omega") == "OK"
+        result = grep_tool.func(runtime=runtime, description="d", pattern="omega", path="/mnt/user-data/workspace")
+        assert "/mnt/user-data/workspace/app.py:1: omega = 1" in result
+        assert "alpha" not in grep_tool.func(runtime=runtime, description="d", pattern="alpha", path="/mnt/user-data/workspace")
+
+        assert write_file_tool.func(runtime=runtime, description="d", path="/mnt/user-data/workspace/app.py", content="beta = 2\n", append=True) == "OK"
+        assert len(index) == 0
+        assert "beta = 2" in grep_tool.func(runtime=runtime, description="d", pattern="beta", path="/mnt/user-data/workspace")
+
+    assert paths.search_index_file("thread-idx").exists()
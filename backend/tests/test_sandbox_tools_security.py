@@ -5,6 +5,7 @@ from unittest.mock import patch
 
 import pytest
 
+from deerflow.sandbox.sandbox import Sandbox
 from deerflow.sandbox.tools import (
     VIRTUAL_PATH_PREFIX,
     _apply_cwd_prefix,
@@ -804,6 +805,9 @@ def test_get_custom_mount_for_path_boundary_no_false_prefix_match() -> None:
 
 def test_str_replace_parallel_updates_should_preserve_both_edits(monkeypatch) -> None:
     class SharedSandbox:
+        # The tool patches through Sandbox.replace_in_file; use its read-and-write default.
+        replace_in_file = Sandbox.replace_in_file
+
         def __init__(self) -> None:
             self.content = "alpha\nbeta\n"
             self._active_reads = 0
@@ -868,6 +872,9 @@ def test_str_replace_parallel_updates_should_preserve_both_edits(monkeypatch) ->
 
 def test_str_replace_parallel_updates_in_isolated_sandboxes_should_not_share_path_lock(monkeypatch) -> None:
     class IsolatedSandbox:
+        # The tool patches through Sandbox.replace_in_file; use its read-and-write default.
+        replace_in_file = Sandbox.replace_in_file
+
         def __init__(self, sandbox_id: str, shared_state: dict[str, object]) -> None:
             self.id = sandbox_id
             self.content = "alpha\nbeta\n"
@@ -948,6 +955,9 @@ def test_str_replace_parallel_updates_in_isolated_sandboxes_should_not_share_pat
 
 def test_str_replace_and_append_on_same_path_should_preserve_both_updates(monkeypatch) -> None:
     class SharedSandbox:
+        # The tool patches through Sandbox.replace_in_file; use its read-and-write default.
+        replace_in_file = Sandbox.replace_in_file
+
         def __init__(self) -> None:
             self.id = "sandbox-1"
             self.content = "alpha\n"
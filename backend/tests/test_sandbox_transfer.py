@@ -0,0 +1,228 @@
+"""Bulk tar-stream transfers: AioSandbox against a local stub of the sandbox HTTP API, LocalSandbox, and the default fallback."""
+
+import email.parser
+import email.policy
+import io
+import json
+import subprocess
+import sys
+import tarfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from deerflow.community.aio_sandbox.aio_sandbox import AioSandbox
+from deerflow.sandbox.local.local_sandbox import LocalSandbox, PathMapping
+from deerflow.sandbox.sandbox import Sandbox
+from deerflow.sandbox.transfer import download_files, upload_files
+
+
+class _StubSandboxAPI(BaseHTTPRequestHandler):
+    """Code execution, file download and multipart upload against the local filesystem."""
+
+    requests: list[str] = []
+
+    def _reply(self, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:  # noqa: N802
+        url = urlparse(self.path)
+        type(self).requests.append(url.path)
+        data = Path(parse_qs(url.query)["path"][0]).read_bytes()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self) -> None:  # noqa: N802
+        raw = self.rfile.read(int(self.headers["Content-Length"]))
+        type(self).requests.append(self.path)
+        if self.path == "/v1/code/execute":
+            body = json.loads(raw)
+            proc = subprocess.run([sys.executable, "-c", body["code"]], capture_output=True, text=True, timeout=60)
+            data = {"language": "python", "status": "ok", "code": body["code"], "stdout": proc.stdout, "stderr": proc.stderr, "exit_code": proc.returncode}
+            return self._reply({"success": True, "data": data})
+        if self.path == "/v1/file/upload":
+            message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + raw)
+            fields = {part.get_param("name", header="content-disposition"): part.get_content() for part in message.iter_parts()}
+            content = fields["file"] if isinstance(fields["file"], bytes) else fields["file"].encode()
+            Path(fields["path"]).write_bytes(content)
+            return self._reply({"success": True, "data": {"file_path": fields["path"], "file_size": len(content), "success": True}})
+        self.send_error(404)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture()
+def stub_sandbox():
+    _StubSandboxAPI.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubSandboxAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield AioSandbox(id="stub", base_url=f"http://127.0.0.1:{server.server_address[1]}")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture()
+def host_files(tmp_path) -> list[Path]:
+    source = tmp_path / "host"
+    source.mkdir()
+    files = []
+    for i in range(5):
+        files.append(source / f"file-{i}.bin")
+        files[-1].write_bytes(bytes([i]) * (1024 * (i + 1)))
+    return files
+
+
+def _staged_archives() -> set[Path]:
+    return {*Path("/tmp").glob("deerflow-put-*.tar"), *Path("/tmp").glob("deerflow-get-*.tar.gz")}
+
+
+def test_upload_files_is_one_upload_and_one_unpack(stub_sandbox, host_files, tmp_path) -> None:
+    before = _staged_archives()
+    dest = tmp_path / "sandbox" / "uploads"
+
+    upload_files(stub_sandbox, str(dest), host_files)
+
+    assert _StubSandboxAPI.requests == ["/v1/file/upload", "/v1/code/execute"]
+    for file in host_files:
+        assert (dest / file.name).read_bytes() == file.read_bytes()
+    assert _staged_archives() == before
+
+
+def test_download_files_is_one_pack_and_one_download(stub_sandbox, tmp_path) -> None:
+    before = _staged_archives()
+    outputs = tmp_path / "sandbox" / "outputs"
+    (outputs / "charts").mkdir(parents=True)
+    (outputs / "charts" / "chart.png").write_bytes(b"\x89PNG" * 100)
+    (outputs / "report.md").write_text("# Report")
+    (tmp_path / "sandbox" / "secret.txt").write_text("not an output")
+    dest = tmp_path / "host-outputs"
+
+    copied = download_files(stub_sandbox, str(outputs), ["report.md", "charts/chart.png", "missing.txt", "../secret.txt", "/etc/passwd"], dest)
+
+    assert copied == ["charts/chart.png", "report.md"]
+    assert (dest / "charts" / "chart.png").read_bytes() == b"\x89PNG" * 100
+    assert (dest / "report.md").read_text() == "# Report"
+    assert sorted(p.name for p in dest.rglob("*") if p.is_file()) == ["chart.png", "report.md"]
+    # Pack, download, then remove the staged archive.
+    assert _StubSandboxAPI.requests == ["/v1/code/execute", "/v1/file/download", "/v1/code/execute"]
+    assert _staged_archives() == before
+
+
+def test_aio_put_archive_rejects_members_leaving_the_directory(stub_sandbox, tmp_path) -> None:
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode="w") as tar:
+        info = tarfile.TarInfo("../escaped.txt")
+        info.size = 1
+        tar.addfile(info, io.BytesIO(b"x"))
+    archive.seek(0)
+
+    with pytest.raises(RuntimeError):
+        stub_sandbox.put_archive(str(tmp_path / "dest"), archive)
+    assert not (tmp_path / "escaped.txt").exists()
+
+
+def test_local_sandbox_archives_through_path_mappings(host_files, tmp_path) -> None:
+    uploads = tmp_path / "thread" / "uploads"
+    sandbox = LocalSandbox(
+        "local",
+        path_mappings=[
+            PathMapping(container_path="/mnt/user-data/uploads", local_path=str(uploads)),
+            PathMapping(container_path="/mnt/skills", local_path=str(tmp_path / "skills"), read_only=True),
+        ],
+    )
+
+    upload_files(sandbox, "/mnt/user-data/uploads", host_files)
+    copied = download_files(sandbox, "/mnt/user-data/uploads", [host_files[0].name, host_files[1].name], tmp_path / "back")
+
+    assert sorted(p.name for p in uploads.iterdir()) == sorted(f.name for f in host_files)
+    assert copied == sorted([host_files[0].name, host_files[1].name])
+    assert (tmp_path / "back" / host_files[1].name).read_bytes() == host_files[1].read_bytes()
+    with pytest.raises(OSError, match="Read-only"):
+        upload_files(sandbox, "/mnt/skills", host_files)
+
+
+class _WriteOnly(Sandbox):
+    """Implements only what the default put_archive needs."""
+
+    def __init__(self):
+        super().__init__("write-only")
+        self.files: dict[str, bytes] = {}
+
+    def execute_command(self, command):
+        raise NotImplementedError
+
+    def read_file(self, path):
+        raise NotImplementedError
+
+    def list_dir(self, path, max_depth=2):
+        raise NotImplementedError
+
+    def write_file(self, path, content, append=False):
+        raise NotImplementedError
+
+    def glob(self, path, pattern, *, include_dirs=False, max_results=200):
+        raise NotImplementedError
+
+    def grep(self, path, pattern, *, glob=None, literal=False, case_sensitive=False, max_results=100):
+        raise NotImplementedError
+
+    def update_file(self, path, content):
+        self.files[path] = content
+
+
+def test_default_put_archive_writes_each_file(host_files) -> None:
+    sandbox = _WriteOnly()
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode="w:gz") as tar:
+        tar.add(host_files[0], arcname="nested/a.bin")
+        info = tarfile.TarInfo("../outside.bin")
+        info.size = 1
+        tar.addfile(info, io.BytesIO(b"x"))
+    archive.seek(0)
+
+    sandbox.put_archive("/mnt/user-data/uploads", archive)
+
+    assert sandbox.files == {"/mnt/user-data/uploads/nested/a.bin": host_files[0].read_bytes()}
+
+
+class _TextFiles(_WriteOnly):
+    """In-memory text files, listed and read the way the default get_archive needs."""
+
+    def __init__(self, files: dict[str, str]):
+        super().__init__()
+        self.text = files
+
+    def read_file(self, path):
+        if path not in self.text:
+            raise FileNotFoundError(path)
+        return self.text[path]
+
+    def list_dir(self, path, max_depth=2):
+        prefix = path.rstrip("/") + "/"
+        return sorted(name for name in self.text if name.startswith(prefix))
+
+
+def test_default_get_archive_reads_each_file() -> None:
+    sandbox = _TextFiles({"/mnt/user-data/outputs/report.md": "# Report", "/mnt/user-data/outputs/charts/a.csv": "x,y", "/mnt/user-data/secret.txt": "no"})
+    out = io.BytesIO()
+
+    included = sandbox.get_archive("/mnt/user-data/outputs", ["report.md", "charts", "missing.txt", "../secret.txt"], out)
+
+    assert included == ["charts", "report.md"]
+    out.seek(0)
+    with tarfile.open(fileobj=out, mode="r:gz") as tar:
+        assert {member.name: tar.extractfile(member).read() for member in tar} == {"report.md": b"# Report", "charts/a.csv": b"x,y"}
@@ -14,13 +14,18 @@ the real implementation in isolation.
 """
 
 import asyncio
+import importlib
 import sys
 import threading
+import time
 from datetime import datetime
 from unittest.mock import MagicMock, patch
 
 import pytest
 
+# Imported at collection time, before the fixture below swaps in mocked modules.
+task_tool_module = importlib.import_module("deerflow.tools.builtins.task_tool")
+
 # Module names that need to be mocked to break circular imports
 _MOCKED_MODULE_NAMES = [
     "deerflow.agents",
@@ -116,6 +121,13 @@ class MockAIMessage:
         return msg
 
 
+async def _wait_until(condition, timeout=5.0):
+    """Poll *condition* on the running loop until it holds."""
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
 async def async_iterator(items):
     """Helper to create an async iterator from a list."""
     for item in items:
@@ -267,6 +279,28 @@ class TestAsyncExecutionPath:
 
         assert len(result.ai_messages) == 1
 
+    @pytest.mark.anyio
+    async def test_aexecute_converts_each_message_once(self, classes, base_config, mock_agent, msg):
+        """Every values chunk repeats the history; each AI message is still dumped once."""
+        SubagentExecutor = classes["SubagentExecutor"]
+        AIMessage = classes["AIMessage"]
+
+        history = [msg.human("Task")]
+        chunks = []
+        for i in range(50):
+            history = [*history, msg.ai(f"Step {i}", f"msg-{i}")]
+            chunks.extend([{"messages": history}, {"messages": history}])
+        mock_agent.astream = lambda *args, **kwargs: async_iterator(chunks)
+
+        executor = SubagentExecutor(config=base_config, tools=[], thread_id="test-thread")
+        original_dump = AIMessage.model_dump
+        with patch.object(executor, "_create_agent", return_value=mock_agent), patch.object(AIMessage, "model_dump", autospec=True, side_effect=original_dump) as dump:
+            result = await executor._aexecute("Task")
+
+        assert [m["id"] for m in result.ai_messages] == [f"msg-{i}" for i in range(50)]
+        assert dump.call_count == 50
+        assert result.result == "Step 49"
+
     @pytest.mark.anyio
     async def test_aexecute_handles_list_content(self, classes, base_config, mock_agent, msg):
         """Test handling of list-type content in AIMessage."""
@@ -932,15 +966,8 @@ class TestCooperativeCancellation:
         """Test that requesting cancellation on a nonexistent task does not raise."""
         executor_module.request_cancel_background_task("nonexistent-task")
 
-    def test_timeout_does_not_overwrite_cancelled(self, executor_module, classes, base_config, msg):
-        """Test that the real timeout handler does not overwrite CANCELLED status.
-
-        This exercises the actual execute_async → run_task → FuturesTimeoutError
-        code path in executor.py.  We make execute() block so the timeout fires
-        deterministically, pre-set the task to CANCELLED, and verify the RUNNING
-        guard preserves it.  Uses threading.Event for synchronisation instead of
-        wall-clock sleeps.
-        """
+    def test_timeout_does_not_overwrite_cancelled(self, executor_module, classes, base_config):
+        """The timeout handler leaves a status that is already CANCELLED alone."""
         SubagentExecutor = classes["SubagentExecutor"]
         SubagentStatus = classes["SubagentStatus"]
 
@@ -949,78 +976,32 @@ class TestCooperativeCancellation:
             description="Test agent",
             system_prompt="You are a test agent.",
             max_turns=10,
-            timeout_seconds=0.05,  # 50ms – just enough for the future to time out
+            timeout_seconds=0.2,
         )
+        entered = threading.Event()
 
-        # Synchronisation primitives
-        execute_entered = threading.Event()  # signals that execute() has started
-        execute_release = threading.Event()  # lets execute() return
-        run_task_done = threading.Event()  # signals that run_task() has finished
-
-        # A blocking execute() replacement so we control the timing exactly
-        def blocking_execute(task, result_holder=None):
-            # Cooperative cancellation: honour cancel_event like real _aexecute
-            if result_holder and result_holder.cancel_event.is_set():
-                result_holder.status = SubagentStatus.CANCELLED
-                result_holder.error = "Cancelled by user"
-                result_holder.completed_at = datetime.now()
-                execute_entered.set()
-                return result_holder
-            execute_entered.set()
-            execute_release.wait(timeout=5)
-            # Return a minimal completed result (will be ignored because timeout fires first)
-            from deerflow.subagents.executor import SubagentResult as _R
-
-            return _R(task_id="x", trace_id="t", status=SubagentStatus.COMPLETED, result="late")
+        async def blocking_aexecute(task, result_holder=None):
+            entered.set()
+            await asyncio.Event().wait()
 
-        executor = SubagentExecutor(
-            config=short_config,
-            tools=[],
-            thread_id="test-thread",
-            trace_id="test-trace",
-        )
-
-        # Wrap _scheduler_pool.submit so we know when run_task finishes
-        original_scheduler_submit = executor_module._scheduler_pool.submit
-
-        def tracked_submit(fn, *args, **kwargs):
-            def wrapper():
-                try:
-                    fn(*args, **kwargs)
-                finally:
-                    run_task_done.set()
-
-            return original_scheduler_submit(wrapper)
-
-        with patch.object(executor, "execute", blocking_execute), patch.object(executor_module._scheduler_pool, "submit", tracked_submit):
+        executor = SubagentExecutor(config=short_config, tools=[], thread_id="test-thread", trace_id="test-trace")
+        with patch.object(executor, "_aexecute", blocking_aexecute):
+            # No running loop here, so the task runs on the background loop.
             task_id = executor.execute_async("Task")
+            assert entered.wait(timeout=3)
 
-            # Wait until execute() is entered (i.e. it's running in _execution_pool)
-            assert execute_entered.wait(timeout=3), "execute() was never called"
-
-            # Set CANCELLED on the result before the timeout handler runs.
-            # The 50ms timeout will fire while execute() is blocked.
             with executor_module._background_tasks_lock:
                 executor_module._background_tasks[task_id].status = SubagentStatus.CANCELLED
                 executor_module._background_tasks[task_id].error = "Cancelled by user"
                 executor_module._background_tasks[task_id].completed_at = datetime.now()
 
-            # Wait for run_task to finish — the FuturesTimeoutError handler has
-            # now executed and (should have) left CANCELLED intact.
-            assert run_task_done.wait(timeout=5), "run_task() did not finish"
-
-            # Only NOW release the blocked execute() so the thread pool worker
-            # can be reclaimed.  This MUST come after run_task_done to avoid a
-            # race where execute() returns before the timeout fires.
-            execute_release.set()
+            deadline = time.monotonic() + 5
+            while task_id in executor_module._background_cancels and time.monotonic() < deadline:
+                time.sleep(0.01)
 
         result = executor_module._background_tasks.get(task_id)
-        assert result is not None
-        # The RUNNING guard in the FuturesTimeoutError handler must have
-        # preserved CANCELLED instead of overwriting with TIMED_OUT.
         assert result.status.value == SubagentStatus.CANCELLED.value
         assert result.error == "Cancelled by user"
-        assert result.completed_at is not None
 
     def test_cleanup_removes_cancelled_task(self, executor_module, classes):
         """Test that cleanup removes a CANCELLED task (terminal state)."""
@@ -1040,3 +1021,236 @@ class TestCooperativeCancellation:
         executor_module.cleanup_background_task(task_id)
 
         assert task_id not in executor_module._background_tasks
+
+
+# -----------------------------------------------------------------------------
+# Background Execution Tests
+# -----------------------------------------------------------------------------
+
+
+class TestBackgroundExecution:
+    """execute_async runs subagents as asyncio tasks through the scheduler."""
+
+    @pytest.fixture
+    def executor_module(self, _setup_executor_classes):
+        from deerflow.subagents import executor, scheduler
+
+        scheduler.reset_subagent_scheduler()
+        yield executor
+        scheduler.reset_subagent_scheduler()
+
+    def _executor(self, classes, timeout_seconds=60, thread_id="thread-1"):
+        config = classes["SubagentConfig"](name="test-agent", description="Test agent", system_prompt="You are a test agent.", max_turns=10, timeout_seconds=timeout_seconds)
+        return classes["SubagentExecutor"](config=config, tools=[], thread_id=thread_id, trace_id="test-trace")
+
+    @pytest.mark.anyio
+    async def test_runs_on_the_callers_event_loop(self, executor_module, classes):
+        SubagentStatus = classes["SubagentStatus"]
+        executor = self._executor(classes)
+        seen = {}
+
+        async def fake_aexecute(task, result_holder=None):
+            seen["loop"] = asyncio.get_running_loop()
+            seen["thread"] = threading.current_thread()
+            result_holder.status = SubagentStatus.COMPLETED
+            result_holder.result = "done"
+            return result_holder
+
+        with patch.object(executor, "_aexecute", fake_aexecute):
+            task_id = executor.execute_async("Task")
+            await _wait_until(lambda: executor_module._background_tasks[task_id].status == SubagentStatus.COMPLETED)
+
+        assert seen == {"loop": asyncio.get_running_loop(), "thread": threading.current_thread()}
+        assert executor_module._background_tasks[task_id].started_at is not None
+
+    @pytest.mark.anyio
+    async def test_timeout_cancels_the_running_subagent(self, executor_module, classes):
+        SubagentStatus = classes["SubagentStatus"]
+        executor = self._executor(classes, timeout_seconds=0.1)
+        interrupted = asyncio.Event()
+
+        async def slow_aexecute(task, result_holder=None):
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                interrupted.set()
+                raise
+
+        with patch.object(executor, "_aexecute", slow_aexecute):
+            task_id = executor.execute_async("Task")
+            await asyncio.wait_for(interrupted.wait(), timeout=3)
+            await _wait_until(lambda: task_id not in executor_module._background_cancels)
+
+        result = executor_module._background_tasks[task_id]
+        assert result.status.value == SubagentStatus.TIMED_OUT.value
+        assert "timed out" in result.error
+
+    @pytest.mark.anyio
+    async def test_request_cancel_interrupts_a_running_subagent(self, executor_module, classes):
+        SubagentStatus = classes["SubagentStatus"]
+        executor = self._executor(classes)
+        entered = asyncio.Event()
+
+        async def blocking_aexecute(task, result_holder=None):
+            entered.set()
+            await asyncio.sleep(60)
+
+        with patch.object(executor, "_aexecute", blocking_aexecute):
+            task_id = executor.execute_async("Task")
+            await asyncio.wait_for(entered.wait(), timeout=3)
+            executor_module.request_cancel_background_task(task_id)
+            await _wait_until(lambda: task_id not in executor_module._background_cancels)
+
+        assert executor_module._background_tasks[task_id].status.value == SubagentStatus.CANCELLED.value
+        assert get_scheduler_stats()["running"] == 0
+
+    @pytest.mark.anyio
+    async def test_per_thread_limit_queues_and_cancel_removes_from_queue(self, executor_module, classes):
+        from deerflow.config.subagents_config import SubagentsAppConfig
+
+        SubagentStatus = classes["SubagentStatus"]
+        release = asyncio.Event()
+        running = []
+
+        async def gated_aexecute(task, result_holder=None):
+            running.append(task)
+            await release.wait()
+            result_holder.status = SubagentStatus.COMPLETED
+            return result_holder
+
+        with patch("deerflow.config.subagents_config.get_subagents_app_config", return_value=SubagentsAppConfig(max_concurrent=8, max_concurrent_per_thread=1)):
+            executors = [self._executor(classes) for _ in range(3)]
+            with patch.object(classes["SubagentExecutor"], "_aexecute", lambda self, task, result_holder=None: gated_aexecute(task, result_holder)):
+                task_ids = [executor.execute_async(f"Task {i}") for i, executor in enumerate(executors)]
+                await _wait_until(lambda: len(running) == 1)
+                await asyncio.sleep(0.05)
+
+                assert running == ["Task 0"]
+                assert [executor_module._background_tasks[t].status.value for t in task_ids] == ["running", "pending", "pending"]
+                assert get_scheduler_stats()["queued"] == 2
+
+                executor_module.request_cancel_background_task(task_ids[1])
+                await _wait_until(lambda: executor_module._background_tasks[task_ids[1]].status == SubagentStatus.CANCELLED)
+                release.set()
+                await _wait_until(lambda: all(t not in executor_module._background_cancels for t in task_ids))
+
+        assert running == ["Task 0", "Task 2"]
+        assert get_scheduler_stats()["admitted_total"] == 2
+
+    def test_without_running_loop_uses_background_loop(self, executor_module, classes):
+        SubagentStatus = classes["SubagentStatus"]
+        executor = self._executor(classes)
+        done = threading.Event()
+        seen = {}
+
+        async def fake_aexecute(task, result_holder=None):
+            seen["thread"] = threading.current_thread().name
+            result_holder.status = SubagentStatus.COMPLETED
+            done.set()
+            return result_holder
+
+        with patch.object(executor, "_aexecute", fake_aexecute):
+            task_id = executor.execute_async("Task")
+            assert done.wait(timeout=3)
+
+        assert seen["thread"] == "subagent-loop"
+        assert executor_module._background_tasks[task_id].status.value == SubagentStatus.COMPLETED.value
+
+
+# -----------------------------------------------------------------------------
+# Completion Notification Tests
+# -----------------------------------------------------------------------------
+
+
+class TestCompletionNotification:
+    """Waiters wake on result updates instead of polling."""
+
+    @pytest.fixture
+    def executor_module(self, _setup_executor_classes):
+        from deerflow.subagents import executor, scheduler
+
+        scheduler.reset_subagent_scheduler()
+        yield executor
+        scheduler.reset_subagent_scheduler()
+
+    def _result(self, classes):
+        return classes["SubagentResult"](task_id="t", trace_id="trace", status=classes["SubagentStatus"].RUNNING)
+
+    @pytest.mark.anyio
+    async def test_await_update_wakes_on_update_from_another_thread(self, classes):
+        result = self._result(classes)
+        since = result.update_version
+        threading.Timer(0.05, result.mark_updated).start()
+
+        start = time.monotonic()
+        assert await result.await_update(since, timeout=5) is True
+        assert time.monotonic() - start < 1
+
+    @pytest.mark.anyio
+    async def test_await_update_times_out_and_sees_missed_updates(self, classes):
+        result = self._result(classes)
+        since = result.update_version
+
+        assert await result.await_update(since, timeout=0.05) is False
+        result.mark_updated()
+        # An update made before waiting starts is not lost.
+        assert await result.await_update(since, timeout=5) is True
+
+    def test_sync_wait_for_update(self, classes):
+        result = self._result(classes)
+        since = result.update_version
+        threading.Timer(0.05, result.mark_updated).start()
+
+        assert result.wait_for_update(since, timeout=5) is True
+        assert result.wait_for_update(result.update_version, timeout=0.05) is False
+
+    @pytest.mark.anyio
+    async def test_task_tool_returns_as_soon_as_a_trivial_subagent_finishes(self, executor_module, classes, monkeypatch):
+        """End to end: execute_async through task_tool, previously at least one 5s poll."""
+        SubagentStatus = classes["SubagentStatus"]
+        config = classes["SubagentConfig"](name="general-purpose", description="General helper", system_prompt="Base system prompt", max_turns=5, timeout_seconds=30)
+        events = []
+
+        async def trivial_aexecute(self, task, result_holder=None):
+            await asyncio.sleep(0.05)
+            result_holder.ai_messages.append({"id": "m1", "content": "working"})
+            result_holder.mark_updated()
+            await asyncio.sleep(0.2)
+            result_holder.status = SubagentStatus.COMPLETED
+            result_holder.result = "done"
+            return result_holder
+
+        for name in ("SubagentStatus", "cleanup_background_task", "get_background_task_result", "request_cancel_background_task", "wait_for_background_task_update"):
+            monkeypatch.setattr(task_tool_module, name, getattr(executor_module, name))
+        monkeypatch.setattr(task_tool_module, "SubagentExecutor", classes["SubagentExecutor"])
+        monkeypatch.setattr(task_tool_module, "get_subagent_config", lambda _: config)
+        monkeypatch.setattr(task_tool_module, "get_available_subagent_names", lambda: ["general-purpose"])
+        monkeypatch.setattr(task_tool_module, "get_skills_prompt_section", lambda: "")
+        monkeypatch.setattr(task_tool_module, "get_stream_writer", lambda: lambda event: events.append((time.monotonic(), event)))
+        monkeypatch.setattr("deerflow.tools.get_available_tools", lambda **kwargs: [])
+        monkeypatch.setattr(classes["SubagentExecutor"], "_aexecute", trivial_aexecute)
+
+        start = time.monotonic()
+        output = await task_tool_module.task_tool.coroutine(
+            runtime=None,
+            description="quick task",
+            prompt="do it",
+            subagent_type="general-purpose",
+            tool_call_id="tc-latency",
+        )
+        elapsed = time.monotonic() - start
+
+        assert output == "Task Succeeded. Result: done"
+        assert elapsed < 1.5
+        progress_at = next(at for at, event in events if event["type"] == "task_running")
+        completed_at = next(at for at, event in events if event["type"] == "task_completed")
+        # Progress is delivered when the message is captured, not at the end.
+        assert progress_at - start < 0.2
+        assert completed_at - progress_at >= 0.15
+        assert executor_module.get_background_task_result("tc-latency") is None
+
+
+def get_scheduler_stats():
+    from deerflow.subagents.scheduler import get_subagent_scheduler
+
+    return get_subagent_scheduler().stats()
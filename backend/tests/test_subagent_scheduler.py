@@ -0,0 +1,118 @@
+"""Tests for SubagentScheduler admission control."""
+
+import asyncio
+import threading
+
+import pytest
+
+from deerflow.subagents.scheduler import SubagentScheduler
+
+
+async def _hold(scheduler: SubagentScheduler, thread_id: str | None, name: str, order: list[str], release: asyncio.Event) -> None:
+    async with scheduler.slot(thread_id):
+        order.append(name)
+        await release.wait()
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.anyio
+async def test_global_limit_admits_in_fifo_order():
+    scheduler = SubagentScheduler(max_concurrent=2, max_concurrent_per_thread=10)
+    order: list[str] = []
+    release = asyncio.Event()
+
+    tasks = [asyncio.create_task(_hold(scheduler, f"t{i}", f"s{i}", order, release)) for i in range(5)]
+    await _settle()
+
+    assert order == ["s0", "s1"]
+    assert scheduler.stats()["running"] == 2
+    assert scheduler.stats()["queued"] == 3
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert order == ["s0", "s1", "s2", "s3", "s4"]
+    stats = scheduler.stats()
+    assert (stats["running"], stats["queued"], stats["admitted_total"]) == (0, 0, 5)
+    assert stats["wait"]["count"] == 5
+    assert stats["wait"]["max_ms"] >= stats["wait"]["p50_ms"] >= 0
+
+
+@pytest.mark.anyio
+async def test_per_thread_limit_does_not_block_other_threads():
+    scheduler = SubagentScheduler(max_concurrent=4, max_concurrent_per_thread=1)
+    order: list[str] = []
+    release = asyncio.Event()
+
+    busy = [asyncio.create_task(_hold(scheduler, "busy", f"busy{i}", order, release)) for i in range(3)]
+    await _settle()
+    other = asyncio.create_task(_hold(scheduler, "other", "other", order, release))
+    await _settle()
+
+    # The second "busy" waiter is skipped; the later "other" waiter runs.
+    assert order == ["busy0", "other"]
+
+    release.set()
+    await asyncio.gather(*busy, other)
+    assert order == ["busy0", "other", "busy1", "busy2"]
+
+
+@pytest.mark.anyio
+async def test_cancelling_releases_or_dequeues():
+    scheduler = SubagentScheduler(max_concurrent=1, max_concurrent_per_thread=1)
+    order: list[str] = []
+    release = asyncio.Event()
+
+    running = asyncio.create_task(_hold(scheduler, "t", "running", order, release))
+    queued = asyncio.create_task(_hold(scheduler, "t", "queued", order, release))
+    last = asyncio.create_task(_hold(scheduler, "t", "last", order, release))
+    await _settle()
+
+    queued.cancel()
+    await _settle()
+    assert scheduler.stats()["queued"] == 1
+
+    running.cancel()
+    await _settle()
+    assert order == ["running", "last"]
+
+    release.set()
+    await last
+    assert scheduler.stats()["running"] == 0
+    assert scheduler.stats()["admitted_total"] == 2
+
+
+def test_limits_are_shared_across_event_loops():
+    scheduler = SubagentScheduler(max_concurrent=1, max_concurrent_per_thread=1)
+    admitted = threading.Event()
+    release_first = threading.Event()
+    peak = []
+
+    async def first():
+        async with scheduler.slot(None):
+            admitted.set()
+            await asyncio.to_thread(release_first.wait, 5)
+
+    async def second():
+        async with scheduler.slot(None):
+            peak.append(scheduler.stats()["running"])
+
+    worker = threading.Thread(target=asyncio.run, args=(first(),))
+    worker.start()
+    assert admitted.wait(timeout=5)
+
+    def release_later():
+        release_first.set()
+
+    threading.Timer(0.1, release_later).start()
+    asyncio.run(second())
+    worker.join(timeout=5)
+
+    assert peak == [1]
+    stats = scheduler.stats()
+    assert stats["admitted_total"] == 2
+    assert stats["wait"]["max_ms"] >= 50
@@ -62,6 +62,7 @@ def _make_result(
         ai_messages=ai_messages or [],
         result=result,
         error=error,
+        update_version=0,
     )
 
 
@@ -73,8 +74,9 @@ def _run_task_tool(**kwargs) -> str:
     return task_tool_module.task_tool.func(**kwargs)
 
 
-async def _no_sleep(_: float) -> None:
-    return None
+async def _no_update(_task_id: str, _since: int, _timeout: float) -> bool:
+    # Report a quiet safety-net interval without actually waiting.
+    return False
 
 
 class _DummyScheduledTask:
@@ -146,7 +148,7 @@ def test_task_tool_emits_running_and_completed_events(monkeypatch):
     monkeypatch.setattr(task_tool_module, "get_skills_prompt_section", lambda: "Skills Appendix")
     monkeypatch.setattr(task_tool_module, "get_background_task_result", lambda _: next(responses))
     monkeypatch.setattr(task_tool_module, "get_stream_writer", lambda: events.append)
-    monkeypatch.setattr(task_tool_module.asyncio, "sleep", _no_sleep)
+    monkeypatch.setattr(task_tool_module, "wait_for_background_task_update", _no_update)
     # task_tool lazily imports from deerflow.tools at call time, so patch that module-level function.
     monkeypatch.setattr("deerflow.tools.get_available_tools", get_available_tools)
 
@@ -192,7 +194,7 @@ def test_task_tool_returns_failed_message(monkeypatch):
         lambda _: _make_result(FakeSubagentStatus.FAILED, error="subagent crashed"),
     )
     monkeypatch.setattr(task_tool_module, "get_stream_writer", lambda: events.append)
-    monkeypatch.setattr(task_tool_module.asyncio, "sleep", _no_sleep)
+    monkeypatch.setattr(task_tool_module, "wait_for_background_task_update", _no_update)
     monkeypatch.setattr("deerflow.tools.get_available_tools", lambda **kwargs: [])
 
     output = _run_task_tool(
@@ -226,7 +228,7 @@ def test_task_tool_returns_timed_out_message(monkeypatch):
         lambda _: _make_result(FakeSubagentStatus.TIMED_OUT, error="timeout"),
     )
     monkeypatch.setattr(task_tool_module, "get_stream_writer", lambda: events.append)
-    monkeypatch.setattr(task_tool_module.asyncio, "sleep", _no_sleep)
+    monkeypatch.setattr(task_tool_module, "wait_for_background_task_update", _no_update)
     monkeypatch.setattr("deerflow.tools.get_available_tools", lambda **kwargs: [])
 
     output = _run_task_tool(
@@ -262,7 +264,7 @@ def test_task_tool_polling_safety_timeout(monkeypatch):
         lambda _: _make_result(FakeSubagentStatus.RUNNING, ai_messages=[]),
     )
     monkeypatch.setattr(task_tool_module, "get_stream_writer", lambda: events.append)
-    monkeypatch.setattr(task_tool_module.asyncio, "sleep", _no_sleep)
+    monkeypatch.setattr(task_tool_module, "wait_for_background_task_update", _no_update)
     monkeypatch.setattr("deerflow.tools.get_available_tools", lambda **kwargs: [])
 
     output = _run_task_tool(
@@ -298,7 +300,7 @@ def test_cleanup_called_on_completed(monkeypatch):
         lambda _: _make_result(FakeSubagentStatus.COMPLETED, result="done"),
     )
     monkeypatch.setattr(task_tool_module, "get_stream_writer", lambda: events.append)
-    monkeypatch.setattr(task_tool_module.asyncio, "sleep", _no_sleep)
+    monkeypatch.setattr(task_tool_module, "wait_for_background_task_update", _no_update)
     monkeypatch.setattr("deerflow.tools.get_available_tools", lambda **kwargs: [])
     monkeypatch.setattr(
         task_tool_module,
@@ -338,7 +340,7 @@ def test_cleanup_called_on_failed(monkeypatch):
         lambda _: _make_result(FakeSubagentStatus.FAILED, error="error"),
     )
     monkeypatch.setattr(task_tool_module, "get_stream_writer", lambda: events.append)
-    monkeypatch.setattr(task_tool_module.asyncio, "sleep", _no_sleep)
+    monkeypatch.setattr(task_tool_module, "wait_for_background_task_update", _no_update)
     monkeypatch.setattr("deerflow.tools.get_available_tools", lambda **kwargs: [])
     monkeypatch.setattr(
         task_tool_module,
@@ -378,7 +380,7 @@ def test_cleanup_called_on_timed_out(monkeypatch):
         lambda _: _make_result(FakeSubagentStatus.TIMED_OUT, error="timeout"),
     )
     monkeypatch.setattr(task_tool_module, "get_stream_writer", lambda: events.append)
-    monkeypatch.setattr(task_tool_module.asyncio, "sleep", _no_sleep)
+    monkeypatch.setattr(task_tool_module, "wait_for_background_task_update", _no_update)
     monkeypatch.setattr("deerflow.tools.get_available_tools", lambda **kwargs: [])
     monkeypatch.setattr(
         task_tool_module,
@@ -425,7 +427,7 @@ def test_cleanup_not_called_on_polling_safety_timeout(monkeypatch):
         lambda _: _make_result(FakeSubagentStatus.RUNNING, ai_messages=[]),
     )
     monkeypatch.setattr(task_tool_module, "get_stream_writer", lambda: events.append)
-    monkeypatch.setattr(task_tool_module.asyncio, "sleep", _no_sleep)
+    monkeypatch.setattr(task_tool_module, "wait_for_background_task_update", _no_update)
     monkeypatch.setattr("deerflow.tools.get_available_tools", lambda **kwargs: [])
     monkeypatch.setattr(
         task_tool_module,
@@ -461,7 +463,7 @@ def test_cleanup_scheduled_on_cancellation(monkeypatch):
             return _make_result(FakeSubagentStatus.RUNNING, ai_messages=[])
         return _make_result(FakeSubagentStatus.COMPLETED, result="done")
 
-    async def cancel_on_first_sleep(_: float) -> None:
+    async def cancel_on_first_wait(*_) -> bool:
         raise asyncio.CancelledError
 
     monkeypatch.setattr(task_tool_module, "SubagentStatus", FakeSubagentStatus)
@@ -474,7 +476,7 @@ def test_cleanup_scheduled_on_cancellation(monkeypatch):
     monkeypatch.setattr(task_tool_module, "get_skills_prompt_section", lambda: "")
     monkeypatch.setattr(task_tool_module, "get_background_task_result", get_result)
     monkeypatch.setattr(task_tool_module, "get_stream_writer", lambda: events.append)
-    monkeypatch.setattr(task_tool_module.asyncio, "sleep", cancel_on_first_sleep)
+    monkeypatch.setattr(task_tool_module, "wait_for_background_task_update", cancel_on_first_wait)
     monkeypatch.setattr(
         task_tool_module.asyncio,
         "create_task",
@@ -512,7 +514,7 @@ def test_cancelled_cleanup_stops_after_timeout(monkeypatch):
     cleanup_calls = []
     scheduled_cleanup_coros = []
 
-    async def cancel_on_first_sleep(_: float) -> None:
+    async def cancel_on_first_wait(*_) -> bool:
         raise asyncio.CancelledError
 
     monkeypatch.setattr(task_tool_module, "SubagentStatus", FakeSubagentStatus)
@@ -529,7 +531,7 @@ def test_cancelled_cleanup_stops_after_timeout(monkeypatch):
         lambda _: _make_result(FakeSubagentStatus.RUNNING, ai_messages=[]),
     )
     monkeypatch.setattr(task_tool_module, "get_stream_writer", lambda: events.append)
-    monkeypatch.setattr(task_tool_module.asyncio, "sleep", cancel_on_first_sleep)
+    monkeypatch.setattr(task_tool_module, "wait_for_background_task_update", cancel_on_first_wait)
     monkeypatch.setattr(
         task_tool_module.asyncio,
         "create_task",
@@ -551,10 +553,7 @@ def test_cancelled_cleanup_stops_after_timeout(monkeypatch):
             tool_call_id="tc-cancelled-timeout",
         )
 
-    async def bounded_sleep(_seconds: float) -> None:
-        return None
-
-    monkeypatch.setattr(task_tool_module.asyncio, "sleep", bounded_sleep)
+    monkeypatch.setattr(task_tool_module, "wait_for_background_task_update", _no_update)
     asyncio.run(scheduled_cleanup_coros.pop())
 
     assert cleanup_calls == []
@@ -567,7 +566,7 @@ def test_cancellation_calls_request_cancel(monkeypatch):
     cancel_requests = []
     scheduled_cleanup_coros = []
 
-    async def cancel_on_first_sleep(_: float) -> None:
+    async def cancel_on_first_wait(*_) -> bool:
         raise asyncio.CancelledError
 
     monkeypatch.setattr(task_tool_module, "SubagentStatus", FakeSubagentStatus)
@@ -584,7 +583,7 @@ def test_cancellation_calls_request_cancel(monkeypatch):
         lambda _: _make_result(FakeSubagentStatus.RUNNING, ai_messages=[]),
     )
     monkeypatch.setattr(task_tool_module, "get_stream_writer", lambda: events.append)
-    monkeypatch.setattr(task_tool_module.asyncio, "sleep", cancel_on_first_sleep)
+    monkeypatch.setattr(task_tool_module, "wait_for_background_task_update", cancel_on_first_wait)
     monkeypatch.setattr(
         task_tool_module.asyncio,
         "create_task",
@@ -638,7 +637,7 @@ def test_task_tool_returns_cancelled_message(monkeypatch):
     monkeypatch.setattr(task_tool_module, "get_skills_prompt_section", lambda: "")
     monkeypatch.setattr(task_tool_module, "get_background_task_result", lambda _: next(responses))
     monkeypatch.setattr(task_tool_module, "get_stream_writer", lambda: events.append)
-    monkeypatch.setattr(task_tool_module.asyncio, "sleep", _no_sleep)
+    monkeypatch.setattr(task_tool_module, "wait_for_background_task_update", _no_update)
     monkeypatch.setattr("deerflow.tools.get_available_tools", lambda **kwargs: [])
     monkeypatch.setattr(
         task_tool_module,
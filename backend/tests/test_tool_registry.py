@@ -0,0 +1,172 @@
+"""Tests for the ToolRegistry cache behind get_available_tools."""
+
+import os
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from deerflow.config.acp_config import load_acp_config_from_dict
+from deerflow.tools.builtins.tool_search import get_deferred_registry
+from deerflow.tools.tools import get_available_tools, get_tool_registry, reset_tool_registry
+
+
+def _make_config(*, tool_search: bool = False):
+    return SimpleNamespace(
+        tools=[
+            SimpleNamespace(name="ls", group="file:read", use="tests:ls_tool"),
+            SimpleNamespace(name="web_search", group="web", use="tests:web_search_tool"),
+        ],
+        models=[],
+        sandbox=SimpleNamespace(use="deerflow.community.aio_sandbox:AioSandboxProvider"),
+        tool_search=SimpleNamespace(enabled=tool_search),
+        get_model_config=lambda name: None,
+    )
+
+
+@pytest.fixture()
+def resolved(monkeypatch, tmp_path):
+    """Record resolve_variable calls; isolate the registry and extensions config."""
+    extensions = tmp_path / "extensions_config.json"
+    extensions.write_text('{"mcpServers": {}, "skills": {}}')
+    monkeypatch.setenv("DEER_FLOW_EXTENSIONS_CONFIG_PATH", str(extensions))
+    calls: list[str] = []
+
+    def fake_resolve(use, _):
+        calls.append(use)
+        return SimpleNamespace(name=use.split(":")[1].removesuffix("_tool"))
+
+    monkeypatch.setattr("deerflow.tools.tools.resolve_variable", fake_resolve)
+    reset_tool_registry()
+    yield calls
+    reset_tool_registry()
+
+
+def test_repeated_calls_resolve_tools_once(monkeypatch, resolved):
+    config = _make_config()
+    monkeypatch.setattr("deerflow.tools.tools.get_app_config", lambda: config)
+
+    first = get_available_tools(subagent_enabled=False)
+    second = get_available_tools(subagent_enabled=False)
+
+    assert [t.name for t in first] == [t.name for t in second]
+    assert first is not second
+    assert resolved == ["tests:ls_tool", "tests:web_search_tool"]
+    stats = get_tool_registry().stats()
+    assert (stats["hits"], stats["misses"], stats["cached_lists"]) == (1, 1, 1)
+    assert stats["last_miss_ms"] is not None and stats["avg_miss_ms"] is not None
+
+
+def test_lists_are_cached_per_arguments(monkeypatch, resolved):
+    config = _make_config()
+    monkeypatch.setattr("deerflow.tools.tools.get_app_config", lambda: config)
+
+    web_only = [t.name for t in get_available_tools(groups=["web"], subagent_enabled=False)]
+    with_task = [t.name for t in get_available_tools(subagent_enabled=True)]
+    get_available_tools(groups=["web"], subagent_enabled=False)
+
+    assert "ls" not in web_only and "web_search" in web_only
+    assert "task" in with_task
+    # The second list reuses the resolved web_search tool.
+    assert resolved == ["tests:web_search_tool", "tests:ls_tool"]
+    assert get_tool_registry().stats()["cached_lists"] == 2
+
+
+def test_new_app_config_invalidates(monkeypatch, resolved):
+    configs = [_make_config()]
+    monkeypatch.setattr("deerflow.tools.tools.get_app_config", lambda: configs[-1])
+
+    get_available_tools()
+    version = get_tool_registry().stats()["version"]
+    configs.append(_make_config())
+    get_available_tools()
+
+    assert len(resolved) == 4
+    assert get_tool_registry().stats()["version"] == version + 1
+
+
+def test_extensions_config_change_invalidates(monkeypatch, resolved):
+    config = _make_config()
+    monkeypatch.setattr("deerflow.tools.tools.get_app_config", lambda: config)
+
+    get_available_tools()
+    get_available_tools()
+    path = os.environ["DEER_FLOW_EXTENSIONS_CONFIG_PATH"]
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    get_available_tools()
+
+    assert len(resolved) == 4
+    assert get_tool_registry().stats()["misses"] == 2
+
+
+def test_acp_agents_reload_invalidates(monkeypatch, resolved):
+    config = _make_config()
+    monkeypatch.setattr("deerflow.tools.tools.get_app_config", lambda: config)
+
+    assert "invoke_acp_agent" not in [t.name for t in get_available_tools()]
+    load_acp_config_from_dict({"codex": {"command": "codex-acp", "description": "Codex CLI"}})
+    try:
+        assert "invoke_acp_agent" in [t.name for t in get_available_tools()]
+    finally:
+        load_acp_config_from_dict({})
+
+
+def test_mcp_tools_with_tool_search(monkeypatch, resolved):
+    config = _make_config(tool_search=True)
+    mcp_cache = [[SimpleNamespace(name="github_search", description="Search GitHub"), SimpleNamespace(name="github_issue", description="Open an issue")]]
+    monkeypatch.setattr("deerflow.tools.tools.get_app_config", lambda: config)
+    monkeypatch.setattr(
+        "deerflow.config.extensions_config.ExtensionsConfig.from_file",
+        classmethod(lambda cls: SimpleNamespace(get_enabled_mcp_servers=lambda: {"github": object()})),
+    )
+    monkeypatch.setattr("deerflow.mcp.cache.get_cached_mcp_tools", lambda: mcp_cache[-1])
+
+    names = [t.name for t in get_available_tools()]
+    assert {"github_search", "github_issue", "tool_search"} <= set(names)
+
+    # Each call gets its own deferred registry, so promotions do not leak.
+    get_deferred_registry().promote({"github_search"})
+    get_available_tools()
+    assert len(get_deferred_registry()) == 2
+    assert get_tool_registry().stats()["misses"] == 1
+
+    # A re-initialized MCP cache rebuilds the list.
+    mcp_cache.append([SimpleNamespace(name="slack_post", description="Post to Slack")])
+    names = [t.name for t in get_available_tools()]
+    assert "slack_post" in names and "github_search" not in names
+    assert get_tool_registry().stats()["misses"] == 2
+
+
+def test_slow_mcp_initialization_does_not_block_other_lists(monkeypatch, resolved):
+    config = _make_config()
+    monkeypatch.setattr("deerflow.tools.tools.get_app_config", lambda: config)
+    monkeypatch.setattr(
+        "deerflow.config.extensions_config.ExtensionsConfig.from_file",
+        classmethod(lambda cls: SimpleNamespace(get_enabled_mcp_servers=lambda: {"github": object()})),
+    )
+    initializing = threading.Event()
+    finish = threading.Event()
+    mcp_tools = [SimpleNamespace(name="github_search", description="Search GitHub")]
+
+    def slow_mcp_tools():
+        initializing.set()
+        assert finish.wait(5)
+        return mcp_tools
+
+    monkeypatch.setattr("deerflow.mcp.cache.get_cached_mcp_tools", slow_mcp_tools)
+    with_mcp: list[list[str]] = []
+    builder = threading.Thread(target=lambda: with_mcp.append([t.name for t in get_available_tools()]))
+    builder.start()
+    try:
+        assert initializing.wait(5)
+        # Neither building nor reusing a list without MCP tools waits for MCP.
+        assert "github_search" not in [t.name for t in get_available_tools(include_mcp=False)]
+        assert "github_search" not in [t.name for t in get_available_tools(include_mcp=False)]
+        assert get_tool_registry().stats()["hits"] == 1
+    finally:
+        finish.set()
+        builder.join(5)
+
+    assert "github_search" in with_mcp[0]
+    assert get_tool_registry().stats()["cached_lists"] == 2
@@ -0,0 +1,222 @@
+"""Tests for the result cache of idempotent tools."""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+from typing import Annotated
+
+import pytest
+from langchain.tools import InjectedToolCallId, tool
+
+from deerflow.tools.result_cache import ToolResultCache, cache_key, cached_tool, reset_tool_result_cache
+from deerflow.tools.tools import get_available_tools, reset_tool_registry
+
+
+class _Counter:
+    def __init__(self, result="result", delay: float = 0.0):
+        self.calls = 0
+        self.result = result
+        self.delay = delay
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.result
+
+
+def test_memory_hit_and_expiry():
+    cache = ToolResultCache()
+    fn = _Counter()
+
+    assert cache.call("search", "k", 0.2, fn) == "result"
+    assert cache.call("search", "k", 0.2, fn) == "result"
+    assert fn.calls == 1
+    time.sleep(0.25)
+    cache.call("search", "k", 0.2, fn)
+    assert fn.calls == 2
+
+    stats = cache.stats()["tools"]["search"]
+    assert (stats["memory_hits"], stats["misses"], stats["hit_rate"]) == (1, 2, pytest.approx(1 / 3))
+
+
+def test_sqlite_tier_is_shared_across_instances(tmp_path):
+    path = tmp_path / "tool_cache.db"
+    first = ToolResultCache(sqlite_path=path)
+    first.call("fetch", "k", 60, lambda: ("content", {"url": "https://example.com"}))
+    first.close()
+
+    second = ToolResultCache(sqlite_path=path)
+    fn = _Counter()
+    assert second.call("fetch", "k", 60, fn) == ("content", {"url": "https://example.com"})
+    assert fn.calls == 0
+    assert second.stats()["sqlite_hits"] == 1
+
+    second.clear()
+    assert ToolResultCache(sqlite_path=path).call("fetch", "k", 60, fn) == "result"
+
+
+def test_concurrent_identical_calls_run_once():
+    cache = ToolResultCache()
+    fn = _Counter(delay=0.2)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.call("search", "k", 60, fn))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["result"] * 8
+    assert fn.calls == 1
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["coalesced"] + stats["memory_hits"] == 7
+    assert stats["in_flight"] == 0
+
+
+def test_concurrent_identical_async_calls_run_once():
+    cache = ToolResultCache()
+    calls = 0
+
+    async def fn():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.1)
+        return "result"
+
+    async def run():
+        return await asyncio.gather(*(cache.acall("search", "k", 60, fn) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["result"] * 5
+    assert calls == 1
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_async_calls_use_sqlite_off_the_event_loop(tmp_path):
+    path = tmp_path / "tool_cache.db"
+    threads: dict[str, list[threading.Thread]] = {"lookup": [], "put": []}
+
+    def on_thread(cache: ToolResultCache) -> ToolResultCache:
+        lookup, put = cache._lookup_sqlite, cache._put_sqlite
+        cache._lookup_sqlite = lambda *args: threads["lookup"].append(threading.current_thread()) or lookup(*args)
+        cache._put_sqlite = lambda *args: threads["put"].append(threading.current_thread()) or put(*args)
+        return cache
+
+    async def fn():
+        return "result"
+
+    writer = on_thread(ToolResultCache(sqlite_path=path))
+    assert asyncio.run(writer.acall("search", "k", 60, fn)) == "result"
+    writer.close()
+    reader = on_thread(ToolResultCache(sqlite_path=path))
+    assert asyncio.run(reader.acall("search", "k", 60, fn)) == "result"
+
+    assert reader.stats()["sqlite_hits"] == 1
+    assert len(threads["lookup"]) == 2 and len(threads["put"]) == 1
+    assert threading.main_thread() not in threads["lookup"] + threads["put"]
+
+
+def test_errors_are_not_cached():
+    cache = ToolResultCache()
+    attempts = 0
+
+    def flaky():
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise ConnectionError("temporary")
+        return "ok"
+
+    with pytest.raises(ConnectionError):
+        cache.call("search", "k", 60, flaky)
+    assert cache.call("search", "k", 60, flaky) == "ok"
+    assert cache.stats()["errors"] == 1
+
+
+def test_cache_key_normalizes_arguments():
+    assert cache_key("search", "", {"query": "x", "limit": 5}) == cache_key("search", "", {"limit": 5, "query": "x", "site": None})
+    assert cache_key("search", "", {"query": "x"}) != cache_key("search", "", {"query": "y"})
+    assert cache_key("search", "a", {"query": "x"}) != cache_key("search", "b", {"query": "x"})
+
+
+def test_cached_tool_ignores_injected_arguments():
+    calls = []
+
+    @tool
+    def search(query: str, tool_call_id: Annotated[str, InjectedToolCallId]) -> str:
+        """Search the web."""
+        calls.append(query)
+        return f"results for {query}"
+
+    cached = cached_tool(search, 60, cache=ToolResultCache())
+
+    assert cached.invoke({"args": {"query": "deer"}, "id": "call-1", "name": "search", "type": "tool_call"}).content == "results for deer"
+    assert cached.invoke({"args": {"query": "deer"}, "id": "call-2", "name": "search", "type": "tool_call"}).content == "results for deer"
+    assert asyncio.run(cached.ainvoke({"args": {"query": "deer"}, "id": "call-3", "name": "search", "type": "tool_call"})).content == "results for deer"
+    assert calls == ["deer"]
+    assert search.func is not cached.func
+
+
+@pytest.fixture()
+def isolated(monkeypatch, tmp_path):
+    extensions = tmp_path / "extensions_config.json"
+    extensions.write_text('{"mcpServers": {}, "skills": {}}')
+    monkeypatch.setenv("DEER_FLOW_EXTENSIONS_CONFIG_PATH", str(extensions))
+    monkeypatch.setenv("DEER_FLOW_HOME", str(tmp_path))
+    reset_tool_registry()
+    reset_tool_result_cache()
+    yield
+    reset_tool_registry()
+    reset_tool_result_cache()
+
+
+def _counting_tool(name: str, calls: list[str]):
+    def run(query: str) -> str:
+        calls.append(query)
+        return query.upper()
+
+    return tool(name, description=f"{name} tool")(run)
+
+
+def test_registry_caches_tools_with_ttl(monkeypatch, isolated):
+    calls: list[str] = []
+    tools = {"tests:web_search": _counting_tool("web_search", calls), "tests:ls": _counting_tool("ls", calls)}
+    config = SimpleNamespace(
+        tools=[
+            SimpleNamespace(name="web_search", group="web", use="tests:web_search", cache_ttl_seconds=60),
+            SimpleNamespace(name="ls", group="file:read", use="tests:ls"),
+        ],
+        models=[],
+        sandbox=SimpleNamespace(use="deerflow.community.aio_sandbox:AioSandboxProvider"),
+        tool_search=SimpleNamespace(enabled=False),
+        get_model_config=lambda name: None,
+    )
+    monkeypatch.setattr("deerflow.tools.tools.get_app_config", lambda: config)
+    monkeypatch.setattr("deerflow.tools.tools.resolve_variable", lambda use, _: tools[use])
+
+    by_name = {t.name: t for t in get_available_tools(subagent_enabled=False)}
+    for _ in range(2):
+        by_name["web_search"].invoke({"query": "deer"})
+        by_name["ls"].invoke({"query": "/mnt"})
+
+    assert calls == ["deer", "/mnt", "/mnt"]
+
+
+def test_registry_caches_listed_mcp_tools(monkeypatch, isolated):
+    from deerflow.config.extensions_config import McpServerConfig
+
+    calls: list[str] = []
+    config = SimpleNamespace(tools=[], models=[], sandbox=SimpleNamespace(use="x:y"), tool_search=SimpleNamespace(enabled=False), get_model_config=lambda name: None)
+    server = McpServerConfig(command="npx", cache_ttl_seconds={"search": 30})
+    monkeypatch.setattr("deerflow.tools.tools.get_app_config", lambda: config)
+    monkeypatch.setattr(
+        "deerflow.config.extensions_config.ExtensionsConfig.from_file",
+        classmethod(lambda cls: SimpleNamespace(get_enabled_mcp_servers=lambda: {"github": server})),
+    )
+    monkeypatch.setattr("deerflow.mcp.cache.get_cached_mcp_tools", lambda: [_counting_tool("github_search", calls), _counting_tool("github_create_issue", calls)])
+
+    by_name = {t.name: t for t in get_available_tools(subagent_enabled=False)}
+    for _ in range(2):
+        by_name["github_search"].invoke({"query": "deer"})
+        by_name["github_create_issue"].invoke({"query": "bug"})
+
+    assert calls == ["deer", "bug", "bug"]
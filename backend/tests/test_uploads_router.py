@@ -1,5 +1,6 @@
 import asyncio
 import stat
+import tarfile
 from io import BytesIO
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -32,6 +33,7 @@ def test_upload_files_writes_thread_storage_and_skips_local_sandbox_sync(tmp_pat
     assert (thread_uploads_dir / "notes.txt").read_bytes() == b"hello uploads"
 
     sandbox.update_file.assert_not_called()
+    sandbox.put_archive.assert_not_called()
 
 
 def test_upload_files_syncs_non_local_sandbox_and_marks_markdown_file(tmp_path):
@@ -42,6 +44,13 @@ def test_upload_files_syncs_non_local_sandbox_and_marks_markdown_file(tmp_path):
     provider.acquire.return_value = "aio-1"
     sandbox = MagicMock()
     provider.get.return_value = sandbox
+    archived: dict[str, bytes] = {}
+
+    def capture_archive(path, archive):
+        with tarfile.open(fileobj=archive, mode="r|*") as tar:
+            archived.update({f"{path}/{member.name}": tar.extractfile(member).read() for member in tar})
+
+    sandbox.put_archive.side_effect = capture_archive
 
     async def fake_convert(file_path: Path) -> Path:
         md_path = file_path.with_suffix(".md")
@@ -54,11 +63,11 @@ def test_upload_files_syncs_non_local_sandbox_and_marks_markdown_file(tmp_path):
         patch.object(uploads, "get_sandbox_provider", return_value=provider),
         patch.object(uploads, "convert_file_to_markdown", AsyncMock(side_effect=fake_convert)),
     ):
-        file = UploadFile(filename="report.pdf", file=BytesIO(b"pdf-bytes"))
-        result = asyncio.run(uploads.upload_files("thread-aio", files=[file]))
+        files = [UploadFile(filename="report.pdf", file=BytesIO(b"pdf-bytes")), UploadFile(filename="notes.txt", file=BytesIO(b"notes"))]
+        result = asyncio.run(uploads.upload_files("thread-aio", files=files))
 
     assert result.success is True
-    assert len(result.files) == 1
+    assert len(result.files) == 2
     file_info = result.files[0]
     assert file_info["filename"] == "report.pdf"
     assert file_info["markdown_file"] == "report.md"
@@ -66,8 +75,14 @@ def test_upload_files_syncs_non_local_sandbox_and_marks_markdown_file(tmp_path):
     assert (thread_uploads_dir / "report.pdf").read_bytes() == b"pdf-bytes"
     assert (thread_uploads_dir / "report.md").read_text(encoding="utf-8") == "converted"
 
-    sandbox.update_file.assert_any_call("/mnt/user-data/uploads/report.pdf", b"pdf-bytes")
-    sandbox.update_file.assert_any_call("/mnt/user-data/uploads/report.md", b"converted")
+    # One archive for the whole request instead of a write per file.
+    sandbox.put_archive.assert_called_once()
+    sandbox.update_file.assert_not_called()
+    assert archived == {
+        "/mnt/user-data/uploads/report.pdf": b"pdf-bytes",
+        "/mnt/user-data/uploads/report.md": b"converted",
+        "/mnt/user-data/uploads/notes.txt": b"notes",
+    }
 
 
 def test_upload_files_makes_non_local_files_sandbox_writable(tmp_path):
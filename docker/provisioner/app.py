@@ -4,12 +4,20 @@ Dynamically creates and manages per-sandbox Pods in Kubernetes.
 Each ``sandbox_id`` gets its own Pod + NodePort Service.  The backend
 accesses sandboxes directly via ``{NODE_HOST}:{NodePort}``.
 
+Sandbox Pods are tracked through a watch stream on the namespace, so
+readiness waits and status reads are answered from memory instead of by
+polling the API server.  With ``POOL_SIZE`` set, the provisioner also keeps
+idle Pods running; ``POST /api/sandboxes/claim`` relabels one of them for a
+sandbox (atomically, guarded by its resourceVersion) so a new thread skips
+image pull, scheduling and container start.
+
 The provisioner connects to the host machine's Kubernetes cluster via a
 mounted kubeconfig (``~/.kube/config``).  Sandbox Pods run on the host
 K8s and are accessed by the backend via ``{NODE_HOST}:{NodePort}``.
 
 Endpoints:
     POST   /api/sandboxes              — Create a sandbox Pod + Service
+    POST   /api/sandboxes/claim        — Claim an idle pool Pod + create its Service
     DELETE /api/sandboxes/{sandbox_id} — Destroy a sandbox Pod + Service
     GET    /api/sandboxes/{sandbox_id} — Get sandbox status & URL
     GET    /api/sandboxes              — List all sandboxes
@@ -32,13 +40,16 @@ from __future__ import annotations
 import logging
 import os
 import re
+import threading
 import time
+import uuid
 from contextlib import asynccontextmanager
 
 import urllib3
 from fastapi import FastAPI, HTTPException
 from kubernetes import client as k8s_client
 from kubernetes import config as k8s_config
+from kubernetes import watch as k8s_watch
 from kubernetes.client.rest import ApiException
 from pydantic import BaseModel, Field
 
@@ -71,6 +82,31 @@ KUBECONFIG_PATH = os.environ.get("KUBECONFIG_PATH", "/root/.kube/config")
 # is ``host.docker.internal``; on Linux it may be the host's LAN IP.
 NODE_HOST = os.environ.get("NODE_HOST", "host.docker.internal")
 
+# Number of idle sandbox Pods kept ready for new threads (0 disables the pool).
+POOL_SIZE = int(os.environ.get("POOL_SIZE", "0"))
+
+# Host path under which each pool Pod gets its own ``<slot>/user-data``
+# directory.  The backend moves that directory into the thread that claims
+# the Pod, so it must be the ``sandbox-pool`` directory next to
+# ``THREADS_HOST_PATH`` (the default).
+POOL_HOST_PATH = os.environ.get("POOL_HOST_PATH", "")
+
+# Seconds a create or claim waits for the Pod to become Ready.
+READY_TIMEOUT = float(os.environ.get("READY_TIMEOUT", "60"))
+
+SANDBOX_LABELS = {
+    "app": "deer-flow-sandbox",
+    "app.kubernetes.io/name": "deer-flow",
+    "app.kubernetes.io/component": "sandbox",
+}
+SANDBOX_SELECTOR = "app=deer-flow-sandbox"
+POOL_LABEL = "deer-flow.io/pool"  # "idle" until claimed, then "claimed"
+POOL_SLOT_LABEL = "deer-flow.io/pool-slot"
+THREAD_ANNOTATION = "deer-flow.io/thread-id"
+
+# Server-side timeout of one watch request; the cache re-lists after it.
+WATCH_TIMEOUT_SECONDS = 300
+
 
 def join_host_path(base: str, *parts: str) -> str:
     """Join host filesystem path segments while preserving native style."""
@@ -93,6 +129,24 @@ def join_host_path(base: str, *parts: str) -> str:
     return str(result)
 
 
+def host_path_parent(path: str) -> str:
+    """Return the parent of a host filesystem path while preserving native style."""
+    if re.match(r"^[A-Za-z]:[\\/]", path) or path.startswith("\\\\") or "\\" in path:
+        from pathlib import PureWindowsPath
+
+        return str(PureWindowsPath(path).parent)
+
+    from pathlib import PurePosixPath
+
+    return str(PurePosixPath(path).parent)
+
+
+def _pool_host_path() -> str:
+    return POOL_HOST_PATH or join_host_path(
+        host_path_parent(THREADS_HOST_PATH), "sandbox-pool"
+    )
+
+
 def _validate_thread_id(thread_id: str) -> str:
     if not re.match(SAFE_THREAD_ID_PATTERN, thread_id):
         raise ValueError(
@@ -202,12 +256,20 @@ def _ensure_namespace() -> None:
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
-    global core_v1
+    global core_v1, pod_cache, pod_pool
     _wait_for_kubeconfig()
     core_v1 = _init_k8s_client()
     _ensure_namespace()
+    pod_cache = PodCache()
+    pod_cache.start()
+    if POOL_SIZE > 0:
+        pod_pool = PodPool(pod_cache, POOL_SIZE)
+        pod_pool.start()
     logger.info("Provisioner is ready (using host Kubernetes)")
     yield
+    if pod_pool is not None:
+        pod_pool.stop()
+    pod_cache.stop()
 
 
 app = FastAPI(title="DeerFlow Sandbox Provisioner", lifespan=lifespan)
@@ -219,12 +281,18 @@ app = FastAPI(title="DeerFlow Sandbox Provisioner", lifespan=lifespan)
 class CreateSandboxRequest(BaseModel):
     sandbox_id: str
     thread_id: str = Field(pattern=SAFE_THREAD_ID_PATTERN)
+    # Respond only once the Pod is Ready (or READY_TIMEOUT passed).
+    wait_ready: bool = False
 
 
 class SandboxResponse(BaseModel):
     sandbox_id: str
     sandbox_url: str  # Direct access URL, e.g. http://host.docker.internal:{NodePort}
     status: str
+    ready: bool = False
+    # Set when the sandbox is a claimed pool Pod: its user-data directory is
+    # ``{POOL_HOST_PATH}/{pool_slot}/user-data``.
+    pool_slot: str | None = None
 
 
 # ── K8s resource helpers ─────────────────────────────────────────────────
@@ -246,16 +314,34 @@ def _sandbox_url(node_port: int) -> str:
 def _build_pod(sandbox_id: str, thread_id: str) -> k8s_client.V1Pod:
     """Construct a Pod manifest for a single sandbox."""
     thread_id = _validate_thread_id(thread_id)
+    return _pod_manifest(
+        _pod_name(sandbox_id),
+        {**SANDBOX_LABELS, "sandbox-id": sandbox_id},
+        join_host_path(THREADS_HOST_PATH, thread_id, "user-data"),
+    )
+
+
+def _build_pool_pod(slot_id: str) -> k8s_client.V1Pod:
+    """Construct an idle pool Pod with its own slot directory as user-data.
+
+    It carries no ``sandbox-id`` label, so no Service selects it until it is
+    claimed.
+    """
+    return _pod_manifest(
+        f"sandbox-{slot_id}",
+        {**SANDBOX_LABELS, POOL_LABEL: "idle", POOL_SLOT_LABEL: slot_id},
+        join_host_path(_pool_host_path(), slot_id, "user-data"),
+    )
+
+
+def _pod_manifest(
+    name: str, labels: dict[str, str], user_data_path: str
+) -> k8s_client.V1Pod:
     return k8s_client.V1Pod(
         metadata=k8s_client.V1ObjectMeta(
-            name=_pod_name(sandbox_id),
+            name=name,
             namespace=K8S_NAMESPACE,
-            labels={
-                "app": "deer-flow-sandbox",
-                "sandbox-id": sandbox_id,
-                "app.kubernetes.io/name": "deer-flow",
-                "app.kubernetes.io/component": "sandbox",
-            },
+            labels=labels,
         ),
         spec=k8s_client.V1PodSpec(
             containers=[
@@ -331,7 +417,7 @@ def _build_pod(sandbox_id: str, thread_id: str) -> k8s_client.V1Pod:
                 k8s_client.V1Volume(
                     name="user-data",
                     host_path=k8s_client.V1HostPathVolumeSource(
-                        path=join_host_path(THREADS_HOST_PATH, thread_id, "user-data"),
+                        path=user_data_path,
                         type="DirectoryOrCreate",
                     ),
                 ),
@@ -372,6 +458,27 @@ def _build_service(sandbox_id: str) -> k8s_client.V1Service:
     )
 
 
+def _create_service(sandbox_id: str) -> int:
+    """Create the sandbox's NodePort Service (or find it) and return the port.
+
+    The API server allocates the NodePort synchronously, so the create
+    response already carries it.
+    """
+    try:
+        svc = core_v1.create_namespaced_service(
+            K8S_NAMESPACE, _build_service(sandbox_id)
+        )
+        logger.info(f"Created Service {_svc_name(sandbox_id)}")
+    except ApiException as exc:
+        if exc.status != 409:
+            raise
+        svc = core_v1.read_namespaced_service(_svc_name(sandbox_id), K8S_NAMESPACE)
+    for port in svc.spec.ports or []:
+        if port.name == "http" and port.node_port:
+            return port.node_port
+    raise HTTPException(status_code=500, detail="NodePort was not allocated")
+
+
 def _get_node_port(sandbox_id: str) -> int | None:
     """Read the K8s-allocated NodePort from the Service."""
     try:
@@ -384,13 +491,283 @@ def _get_node_port(sandbox_id: str) -> int | None:
     return None
 
 
-def _get_pod_phase(sandbox_id: str) -> str:
+def _pod_phase(pod: k8s_client.V1Pod | None) -> str:
     """Return the Pod phase (Pending / Running / Succeeded / Failed / Unknown)."""
-    try:
-        pod = core_v1.read_namespaced_pod(_pod_name(sandbox_id), K8S_NAMESPACE)
-        return pod.status.phase or "Unknown"
-    except ApiException:
+    if pod is None:
         return "NotFound"
+    return (pod.status and pod.status.phase) or "Unknown"
+
+
+def _is_pod_ready(pod: k8s_client.V1Pod | None) -> bool:
+    """True if the Pod is running and its readiness probe passes."""
+    if pod is None or pod.metadata.deletion_timestamp or _pod_phase(pod) != "Running":
+        return False
+    return any(
+        c.type == "Ready" and c.status == "True" for c in (pod.status.conditions or [])
+    )
+
+
+def _sandbox_response(
+    sandbox_id: str, node_port: int, pool_slot: str | None = None
+) -> SandboxResponse:
+    pod = pod_cache.find(sandbox_id)
+    return SandboxResponse(
+        sandbox_id=sandbox_id,
+        sandbox_url=_sandbox_url(node_port),
+        status=_pod_phase(pod),
+        ready=_is_pod_ready(pod),
+        pool_slot=pool_slot,
+    )
+
+
+# ── Pod cache (watch) ────────────────────────────────────────────────────
+
+
+class PodCache:
+    """All sandbox Pods in the namespace, kept current by a watch stream.
+
+    One list seeds the cache, then a watch applies every change.  Readers
+    get Pod state from memory, and readiness waits block on a condition the
+    watch thread signals instead of polling the API server.
+    """
+
+    def __init__(self) -> None:
+        self._pods: dict[str, k8s_client.V1Pod] = {}
+        self._cond = threading.Condition()
+        self._synced = False
+        self._stopped = False
+        self._watch: k8s_watch.Watch | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="sandbox-pod-watch", daemon=True
+        )
+        self._thread.start()
+        self.wait_synced(timeout=30)
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._watch is not None:
+            self._watch.stop()
+
+    def _run(self) -> None:
+        while not self._stopped:
+            try:
+                pods = core_v1.list_namespaced_pod(
+                    K8S_NAMESPACE, label_selector=SANDBOX_SELECTOR
+                )
+                with self._cond:
+                    self._pods = {pod.metadata.name: pod for pod in pods.items}
+                    self._synced = True
+                    self._cond.notify_all()
+                self._watch = k8s_watch.Watch()
+                for event in self._watch.stream(
+                    core_v1.list_namespaced_pod,
+                    K8S_NAMESPACE,
+                    label_selector=SANDBOX_SELECTOR,
+                    resource_version=pods.metadata.resource_version,
+                    timeout_seconds=WATCH_TIMEOUT_SECONDS,
+                ):
+                    self.apply(event["type"], event["object"])
+            except ApiException as exc:
+                # 410 Gone: the resourceVersion expired, so re-list right away.
+                if exc.status != 410 and not self._stopped:
+                    logger.warning(f"Pod watch failed: {exc.reason}; retrying")
+                    time.sleep(1)
+            except Exception as exc:
+                if not self._stopped:
+                    logger.warning(f"Pod watch failed: {exc}; retrying")
+                    time.sleep(1)
+
+    def apply(self, event_type: str, pod: k8s_client.V1Pod) -> None:
+        """Record a Pod change and wake everyone waiting on the cache."""
+        with self._cond:
+            if event_type == "DELETED":
+                self._pods.pop(pod.metadata.name, None)
+            else:
+                self._pods[pod.metadata.name] = pod
+            self._cond.notify_all()
+
+    def wait_synced(self, timeout: float) -> bool:
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._synced or self._stopped, timeout=timeout
+            )
+
+    def _find(self, sandbox_id: str) -> k8s_client.V1Pod | None:
+        for pod in self._pods.values():
+            labels = pod.metadata.labels or {}
+            if (
+                labels.get("sandbox-id") == sandbox_id
+                and not pod.metadata.deletion_timestamp
+            ):
+                return pod
+        return None
+
+    def find(self, sandbox_id: str) -> k8s_client.V1Pod | None:
+        """The live Pod serving *sandbox_id*, pooled or not."""
+        with self._cond:
+            return self._find(sandbox_id)
+
+    def pod_names(self, sandbox_id: str) -> list[str]:
+        """Names of every Pod labelled with *sandbox_id*, terminating or not."""
+        with self._cond:
+            return [
+                name
+                for name, pod in self._pods.items()
+                if (pod.metadata.labels or {}).get("sandbox-id") == sandbox_id
+            ]
+
+    def by_sandbox_id(self) -> dict[str, k8s_client.V1Pod]:
+        with self._cond:
+            return {
+                pod.metadata.labels["sandbox-id"]: pod
+                for pod in self._pods.values()
+                if "sandbox-id" in (pod.metadata.labels or {})
+                and not pod.metadata.deletion_timestamp
+            }
+
+    def idle_pool_pods(self) -> list[k8s_client.V1Pod]:
+        """Unclaimed pool Pods, Ready ones first."""
+        with self._cond:
+            idle = [
+                pod
+                for pod in self._pods.values()
+                if (pod.metadata.labels or {}).get(POOL_LABEL) == "idle"
+                and not pod.metadata.deletion_timestamp
+            ]
+        return sorted(idle, key=lambda pod: not _is_pod_ready(pod))
+
+    def has(self, name: str) -> bool:
+        with self._cond:
+            return name in self._pods
+
+    def wait_ready(self, sandbox_id: str, timeout: float) -> bool:
+        """Block until the sandbox's Pod is Ready, as reported by the watch."""
+        with self._cond:
+            return (
+                self._cond.wait_for(
+                    lambda: self._stopped or _is_pod_ready(self._find(sandbox_id)),
+                    timeout=timeout,
+                )
+                and not self._stopped
+            )
+
+
+pod_cache: PodCache | None = None
+
+
+# ── Pod pool ─────────────────────────────────────────────────────────────
+
+
+class PodPool:
+    """Keeps *size* idle sandbox Pods running and hands them out.
+
+    A claim relabels an idle Pod with the sandbox's ``sandbox-id`` using a
+    patch that carries the Pod's resourceVersion.  The API server rejects
+    the patch with 409 if anyone else changed the Pod first, so concurrent
+    claims, even from several provisioner replicas, never share a Pod.
+    """
+
+    RECHECK_INTERVAL = 5.0
+
+    def __init__(self, cache: PodCache, size: int) -> None:
+        self._cache = cache
+        self._size = size
+        self._creating: dict[str, float] = {}  # Pod name -> creation time
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="sandbox-pod-pool", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self._fill()
+            except Exception as exc:
+                logger.warning(f"Failed to refill the sandbox Pod pool: {exc}")
+            self._wake.wait(self.RECHECK_INTERVAL)
+            self._wake.clear()
+
+    def _fill(self) -> None:
+        now = time.monotonic()
+        # Creations count until the watch reports the Pod (or they time out).
+        self._creating = {
+            name: created
+            for name, created in self._creating.items()
+            if not self._cache.has(name) and now - created < READY_TIMEOUT
+        }
+        missing = self._size - len(self._cache.idle_pool_pods()) - len(self._creating)
+        for _ in range(missing):
+            slot_id = f"pool-{uuid.uuid4().hex[:8]}"
+            pod = core_v1.create_namespaced_pod(K8S_NAMESPACE, _build_pool_pod(slot_id))
+            self._creating[pod.metadata.name] = now
+            logger.info(f"Created pool Pod {pod.metadata.name}")
+
+    def claim(self, sandbox_id: str, thread_id: str) -> k8s_client.V1Pod | None:
+        """Relabel an idle Pod for *sandbox_id*; None if none could be claimed."""
+        for pod in self._cache.idle_pool_pods():
+            claimed = self._claim_pod(pod, sandbox_id, thread_id)
+            if claimed is None:
+                continue
+            self._cache.apply("MODIFIED", claimed)
+            self._wake.set()
+            logger.info(
+                f"Claimed pool Pod {pod.metadata.name} for sandbox {sandbox_id}"
+            )
+            return claimed
+        self._wake.set()
+        return None
+
+    @staticmethod
+    def _claim_pod(
+        pod: k8s_client.V1Pod, sandbox_id: str, thread_id: str
+    ) -> k8s_client.V1Pod | None:
+        name = pod.metadata.name
+        for _ in range(3):
+            patch = {
+                "metadata": {
+                    "resourceVersion": pod.metadata.resource_version,
+                    "labels": {"sandbox-id": sandbox_id, POOL_LABEL: "claimed"},
+                    "annotations": {THREAD_ANNOTATION: thread_id},
+                }
+            }
+            try:
+                return core_v1.patch_namespaced_pod(name, K8S_NAMESPACE, patch)
+            except ApiException as exc:
+                if exc.status == 404:
+                    return None
+                if exc.status != 409:
+                    raise
+            # Changed since we saw it (e.g. it just became Ready): retry
+            # with the current version while it is still idle.
+            try:
+                pod = core_v1.read_namespaced_pod(name, K8S_NAMESPACE)
+            except ApiException:
+                return None
+            if (pod.metadata.labels or {}).get(POOL_LABEL) != "idle":
+                return None
+        return None
+
+
+pod_pool: PodPool | None = None
 
 
 # ── API endpoints ────────────────────────────────────────────────────────
@@ -403,11 +780,12 @@ async def health():
 
 
 @app.post("/api/sandboxes", response_model=SandboxResponse)
-async def create_sandbox(req: CreateSandboxRequest):
+def create_sandbox(req: CreateSandboxRequest):
     """Create a sandbox Pod + NodePort Service for *sandbox_id*.
 
     If the sandbox already exists, returns the existing information
-    (idempotent).
+    (idempotent).  With ``wait_ready`` the response is sent once the watch
+    reports the Pod Ready.
     """
     sandbox_id = req.sandbox_id
     thread_id = req.thread_id
@@ -419,15 +797,16 @@ async def create_sandbox(req: CreateSandboxRequest):
     # ── Fast path: sandbox already exists ────────────────────────────
     existing_port = _get_node_port(sandbox_id)
     if existing_port:
-        return SandboxResponse(
-            sandbox_id=sandbox_id,
-            sandbox_url=_sandbox_url(existing_port),
-            status=_get_pod_phase(sandbox_id),
-        )
+        if req.wait_ready:
+            pod_cache.wait_ready(sandbox_id, READY_TIMEOUT)
+        return _sandbox_response(sandbox_id, existing_port)
 
     # ── Create Pod ───────────────────────────────────────────────────
     try:
-        core_v1.create_namespaced_pod(K8S_NAMESPACE, _build_pod(sandbox_id, thread_id))
+        pod = core_v1.create_namespaced_pod(
+            K8S_NAMESPACE, _build_pod(sandbox_id, thread_id)
+        )
+        pod_cache.apply("ADDED", pod)
         logger.info(f"Created Pod {_pod_name(sandbox_id)}")
     except ApiException as exc:
         if exc.status != 409:  # 409 = AlreadyExists
@@ -437,41 +816,61 @@ async def create_sandbox(req: CreateSandboxRequest):
 
     # ── Create Service ───────────────────────────────────────────────
     try:
-        core_v1.create_namespaced_service(K8S_NAMESPACE, _build_service(sandbox_id))
-        logger.info(f"Created Service {_svc_name(sandbox_id)}")
+        node_port = _create_service(sandbox_id)
     except ApiException as exc:
-        if exc.status != 409:
-            # Roll back the Pod on failure
-            try:
-                core_v1.delete_namespaced_pod(_pod_name(sandbox_id), K8S_NAMESPACE)
-            except ApiException:
-                pass
-            raise HTTPException(
-                status_code=500, detail=f"Service creation failed: {exc.reason}"
-            )
+        # Roll back the Pod on failure
+        try:
+            core_v1.delete_namespaced_pod(_pod_name(sandbox_id), K8S_NAMESPACE)
+        except ApiException:
+            pass
+        raise HTTPException(
+            status_code=500, detail=f"Service creation failed: {exc.reason}"
+        )
 
-    # ── Read the auto-allocated NodePort ─────────────────────────────
-    node_port: int | None = None
-    for _ in range(20):
-        node_port = _get_node_port(sandbox_id)
-        if node_port:
-            break
-        time.sleep(0.5)
+    if req.wait_ready and not pod_cache.wait_ready(sandbox_id, READY_TIMEOUT):
+        logger.warning(f"Sandbox '{sandbox_id}' not Ready after {READY_TIMEOUT}s")
+    return _sandbox_response(sandbox_id, node_port)
 
-    if not node_port:
+
+@app.post("/api/sandboxes/claim", response_model=SandboxResponse)
+def claim_sandbox(req: CreateSandboxRequest):
+    """Hand an idle pool Pod to *sandbox_id* and expose it with a Service.
+
+    Responds 404 if the pool is disabled or has no idle Pod; the caller then
+    creates the sandbox with ``POST /api/sandboxes``.  The Pod's user-data
+    is its pool slot directory (see ``pool_slot`` in the response).
+    """
+    sandbox_id = req.sandbox_id
+    _validate_thread_id(req.thread_id)
+    if pod_pool is None:
+        raise HTTPException(status_code=404, detail="Pod pool is disabled")
+    if _get_node_port(sandbox_id):
+        raise HTTPException(status_code=409, detail=f"Sandbox '{sandbox_id}' exists")
+
+    pod = pod_pool.claim(sandbox_id, req.thread_id)
+    if pod is None:
+        raise HTTPException(status_code=404, detail="No idle pool Pod")
+
+    try:
+        node_port = _create_service(sandbox_id)
+    except ApiException as exc:
+        try:
+            core_v1.delete_namespaced_pod(pod.metadata.name, K8S_NAMESPACE)
+        except ApiException:
+            pass
         raise HTTPException(
-            status_code=500, detail="NodePort was not allocated in time"
+            status_code=500, detail=f"Service creation failed: {exc.reason}"
         )
 
-    return SandboxResponse(
-        sandbox_id=sandbox_id,
-        sandbox_url=_sandbox_url(node_port),
-        status=_get_pod_phase(sandbox_id),
+    if req.wait_ready and not pod_cache.wait_ready(sandbox_id, READY_TIMEOUT):
+        logger.warning(f"Sandbox '{sandbox_id}' not Ready after {READY_TIMEOUT}s")
+    return _sandbox_response(
+        sandbox_id, node_port, pool_slot=pod.metadata.labels[POOL_SLOT_LABEL]
     )
 
 
 @app.delete("/api/sandboxes/{sandbox_id}")
-async def destroy_sandbox(sandbox_id: str):
+def destroy_sandbox(sandbox_id: str):
     """Destroy a sandbox Pod + Service."""
     errors: list[str] = []
 
@@ -483,13 +882,14 @@ async def destroy_sandbox(sandbox_id: str):
         if exc.status != 404:
             errors.append(f"service: {exc.reason}")
 
-    # Delete Pod
-    try:
-        core_v1.delete_namespaced_pod(_pod_name(sandbox_id), K8S_NAMESPACE)
-        logger.info(f"Deleted Pod {_pod_name(sandbox_id)}")
-    except ApiException as exc:
-        if exc.status != 404:
-            errors.append(f"pod: {exc.reason}")
+    # Delete Pod (a claimed pool Pod keeps its pool name)
+    for pod_name in pod_cache.pod_names(sandbox_id) or [_pod_name(sandbox_id)]:
+        try:
+            core_v1.delete_namespaced_pod(pod_name, K8S_NAMESPACE)
+            logger.info(f"Deleted Pod {pod_name}")
+        except ApiException as exc:
+            if exc.status != 404:
+                errors.append(f"pod: {exc.reason}")
 
     if errors:
         raise HTTPException(
@@ -500,32 +900,32 @@ async def destroy_sandbox(sandbox_id: str):
 
 
 @app.get("/api/sandboxes/{sandbox_id}", response_model=SandboxResponse)
-async def get_sandbox(sandbox_id: str):
+def get_sandbox(sandbox_id: str):
     """Return current status and URL for a sandbox."""
     node_port = _get_node_port(sandbox_id)
     if not node_port:
         raise HTTPException(status_code=404, detail=f"Sandbox '{sandbox_id}' not found")
 
-    return SandboxResponse(
-        sandbox_id=sandbox_id,
-        sandbox_url=_sandbox_url(node_port),
-        status=_get_pod_phase(sandbox_id),
-    )
+    return _sandbox_response(sandbox_id, node_port)
 
 
 @app.get("/api/sandboxes")
-async def list_sandboxes():
-    """List every sandbox currently managed in the namespace."""
+def list_sandboxes():
+    """List every sandbox currently managed in the namespace.
+
+    One Service list call; Pod status comes from the watch cache.
+    """
     try:
         services = core_v1.list_namespaced_service(
             K8S_NAMESPACE,
-            label_selector="app=deer-flow-sandbox",
+            label_selector=SANDBOX_SELECTOR,
         )
     except ApiException as exc:
         raise HTTPException(
             status_code=500, detail=f"Failed to list services: {exc.reason}"
         )
 
+    pods = pod_cache.by_sandbox_id()
     sandboxes: list[SandboxResponse] = []
     for svc in services.items:
         sid = (svc.metadata.labels or {}).get("sandbox-id")
@@ -537,11 +937,13 @@ async def list_sandboxes():
                 node_port = port.node_port
                 break
         if node_port:
+            pod = pods.get(sid)
             sandboxes.append(
                 SandboxResponse(
                     sandbox_id=sid,
                     sandbox_url=_sandbox_url(node_port),
-                    status=_get_pod_phase(sid),
+                    status=_pod_phase(pod),
+                    ready=_is_pod_ready(pod),
                 )
             )
 